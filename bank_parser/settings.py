@@ -202,6 +202,22 @@ DATA_UPLOAD_MAX_NUMBER_FIELDS = 1000
 # Allowed file extensions for uploads
 ALLOWED_UPLOAD_EXTENSIONS = ['.csv', '.xlsx', '.xls', '.pdf', '.txt']
 
+# Queue uploads for the background ingest worker (python manage.py run_ingest_worker)
+# instead of parsing them inside the request. Off by default because the production
+# image runs no worker; turn it on only where one runs against the same MEDIA_ROOT
+INGEST_ASYNC = env.bool('INGEST_ASYNC', default=False)
+
+# Content-addressed store for raw uploads and cached parse results; a local
+# directory standing in for a GCS bucket
+SOURCE_STORE_ROOT = env('SOURCE_STORE_ROOT', default=str(BASE_DIR / 'media' / 'sources'))
+
+# Parse uploads in a child process with a wall-clock timeout, a memory cap and
+# a transaction cap, so one pathological file cannot pin a web worker
+PARSE_SANDBOX = env.bool('PARSE_SANDBOX', default=True)
+PARSE_TIMEOUT_SECONDS = env.float('PARSE_TIMEOUT_SECONDS', default=60)
+PARSE_MAX_MEMORY_MB = env.int('PARSE_MAX_MEMORY_MB', default=2048)
+PARSE_MAX_ROWS = env.int('PARSE_MAX_ROWS', default=200000)
+
 # Logging
 LOGGING = {
     'version': 1,
@@ -7,12 +7,21 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.http import HttpResponse
 
+from statements.warmup import is_ready
+
 def health_check(request):
     return HttpResponse("OK", content_type="text/plain")
 
+def readiness_check(request):
+    # Only OK once the server has warmed up (see gunicorn.conf.py)
+    if not is_ready():
+        return HttpResponse("WARMING UP", status=503, content_type="text/plain")
+    return HttpResponse("OK", content_type="text/plain")
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('health/', health_check, name='health_check'),
+    path('ready/', readiness_check, name='readiness_check'),
     path('accounts/', include('accounts.urls')),
     path('', include('statements.urls')),
 ]
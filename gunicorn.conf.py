@@ -0,0 +1,60 @@
+"""
+Gunicorn configuration for production
+
+The application is imported once in the master and forked into the
+workers, so Django, the parsers and the libraries behind them are shared
+copy-on-write. The master warms the application up before the first
+worker starts; /ready/ answers OK only after that.
+
+Every setting can be overridden from the environment:
+PORT, GUNICORN_WORKERS, GUNICORN_THREADS, GUNICORN_TIMEOUT, GUNICORN_PRELOAD.
+"""
+
+import os
+
+
+def available_cpus():
+    """CPUs this process may run on, which in a container can be fewer than the host has"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+wsgi_app = 'bank_parser.wsgi:application'
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+
+# Views mostly wait on the database, so each worker serves several requests on threads
+worker_class = 'gthread'
+workers = int(os.environ.get('GUNICORN_WORKERS', max(2, available_cpus())))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() not in ('0', 'false', 'no')
+
+# Large uploads are parsed inside the request
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then so memory dirtied by big parses is returned
+max_requests = 1000
+max_requests_jitter = 100
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    """Warm the preloaded application up in the master, before any worker is forked"""
+    if server.cfg.preload_app:
+        from statements.warmup import warm_up
+        timings = warm_up()
+        server.log.info(f"Warmup finished in {sum(timings.values()) * 1000:.0f} ms")
+
+
+def post_worker_init(worker):
+    """Without preloading, each worker warms up its own copy of the application"""
+    if not worker.cfg.preload_app:
+        from statements.warmup import warm_up
+        warm_up()
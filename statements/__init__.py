@@ -1,26 +1,29 @@
 """
 Bank statement parsing package
+
+Parsers are imported on first attribute access so that loading the app
+does not pull in pandas, pdfplumber or openpyxl.
 """
 
-from .base import BaseStatementParser
-from .csv_parser import CSVStatementParser
-from .excel_parser import ExcelStatementParser
-from .text_parser import TextStatementParser
-from .td_parser import TDChequeAccountParser
-from .amex_parser import AmexCreditCardParser
-from .wealthsimple_parser import WealthsimpleRRSPParser
-from .factory import StatementParserFactory
+import importlib
 
-__all__ = [
-    'BaseStatementParser',
-    'CSVStatementParser',
-    'ExcelStatementParser',
-    'TextStatementParser',
-    'TDChequeAccountParser',
-    'AmexCreditCardParser',
-    'WealthsimpleRRSPParser',
-    'StatementParserFactory',
-]
+_EXPORTS = {
+    'BaseStatementParser': '.base',
+    'CSVStatementParser': '.csv_parser',
+    'ExcelStatementParser': '.excel_parser',
+    'TextStatementParser': '.text_parser',
+    'TDChequeAccountParser': '.td_parser',
+    'AmexCreditCardParser': '.amex_parser',
+    'WealthsimpleRRSPParser': '.wealthsimple_parser',
+    'StatementParserFactory': '.factory',
+}
 
+__all__ = list(_EXPORTS)
 
 
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
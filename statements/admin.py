@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Statement, StatementDetail, Account, ContributionRoom, Contribution
+from .models import (
+    Statement, StatementDetail, Account, ContributionRoom, Contribution, IngestJob, SourceFile, CategoryRule,
+    Merchant, MonthlyAccountSummary,
+)
 
 
 class StatementDetailInline(admin.TabularInline):
@@ -45,15 +48,47 @@ class StatementAdmin(admin.ModelAdmin):
 @admin.register(StatementDetail)
 class StatementDetailAdmin(admin.ModelAdmin):
     list_display = [
-        'item', 'statement', 'transaction_date', 
-        'amount', 'direction'
+        'item', 'merchant', 'statement', 'transaction_date', 
+        'amount', 'direction', 'category'
     ]
-    list_filter = ['direction', 'transaction_date', 'statement__account__bank_name']
-    search_fields = ['item', 'statement__account__bank_name', 'statement__account__account_abbr']
+    list_filter = ['direction', 'category', 'transaction_date', 'statement__account__bank_name']
+    search_fields = ['item', 'merchant__name', 'statement__account__bank_name', 'statement__account__account_abbr']
     readonly_fields = ['id']
+    raw_id_fields = ['merchant']
     date_hierarchy = 'transaction_date'
 
 
+@admin.register(Merchant)
+class MerchantAdmin(admin.ModelAdmin):
+    list_display = ['name', 'created_at']
+    search_fields = ['name']
+    readonly_fields = ['id', 'created_at']
+
+
+@admin.register(MonthlyAccountSummary)
+class MonthlyAccountSummaryAdmin(admin.ModelAdmin):
+    list_display = ['account', 'year', 'month', 'category', 'direction', 'total', 'count']
+    list_filter = ['year', 'category', 'direction', 'account']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CategoryRule)
+class CategoryRuleAdmin(admin.ModelAdmin):
+    list_display = [
+        'pattern', 'match_type', 'category', 'direction',
+        'account', 'account_type', 'priority', 'is_active', 'updated_at'
+    ]
+    list_filter = ['category', 'match_type', 'direction', 'account_type', 'is_active']
+    list_editable = ['priority', 'is_active']
+    search_fields = ['pattern']
+    readonly_fields = ['id', 'created_at', 'updated_at']
+
+
 @admin.register(ContributionRoom)
 class ContributionRoomAdmin(admin.ModelAdmin):
     list_display = ['user', 'account_type', 'limit', 'tax_year', 'created_at']
@@ -69,3 +104,20 @@ class ContributionAdmin(admin.ModelAdmin):
     search_fields = ['user__username', 'user__email']
     readonly_fields = ['id', 'created_at', 'updated_at']
     date_hierarchy = 'date'
+
+
+@admin.register(IngestJob)
+class IngestJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'account', 'source_file', 'rows_inserted', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['kind', 'status', 'created_at']
+    search_fields = ['source_file', 'account__account_abbr', 'worker']
+    readonly_fields = ['id', 'rows_parsed', 'rows_inserted', 'attempts', 'worker', 'created_at', 'started_at', 'heartbeat_at', 'finished_at']
+    exclude = ['content']
+
+
+@admin.register(SourceFile)
+class SourceFileAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'sha256', 'size', 'parser_name', 'created_at']
+    list_filter = ['parser_name', 'created_at']
+    search_fields = ['filename', 'sha256']
+    readonly_fields = ['id', 'sha256', 'size', 'created_at']
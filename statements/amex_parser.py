@@ -3,101 +3,67 @@ American Express credit card parser for CSV statements
 """
 
 import csv
-import io
 from datetime import datetime
-from typing import List, Dict, Any, Tuple
+from typing import Dict, Any, Tuple, Iterator, Optional
 import logging
 from decimal import Decimal
-import decimal
 
-from .base import BaseStatementParser
+from .amounts import cents_to_decimal, match_amount
+from .base import StreamingStatementParser, TransactionStream, SniffContext
 
 logger = logging.getLogger(__name__)
 
 
-class AmexCreditCardParser(BaseStatementParser):
+class AmexCreditCardParser(StreamingStatementParser):
     """Parser specifically for American Express credit card CSV files"""
     
+    header_signatures = [
+        ['Date', 'Date Processed', 'Description', 'Card Member', 'Account #', 'Amount'],
+    ]
+    
     def __init__(self):
         self.supported_formats = ['.csv']
     
-    def can_parse(self, file_content: bytes, filename: str) -> bool:
+    def can_parse(self, file_content: bytes, filename: str, context: Optional[SniffContext] = None) -> bool:
         """Check if this is an Amex credit card statement"""
-        if not filename.lower().endswith('.csv'):
+        context = self._sniff(file_content, filename, context)
+        if context.extension != '.csv':
             return False
         
-        try:
-            content = file_content.decode('utf-8')
-        except UnicodeDecodeError:
-            try:
-                content = file_content.decode('latin-1')
-            except UnicodeDecodeError:
-                return False
-        
         # Check for Amex-specific headers
-        lines = content.split('\n')
-        if len(lines) < 2:
+        if len(context.lines) < 2:
             return False
         
-        header_line = lines[0].strip().lower()
         amex_headers = ['date', 'date processed', 'description', 'card member', 'account #', 'amount']
         
         # Check if all Amex headers are present
-        header_parts = [h.strip() for h in header_line.split(',')]
+        header_parts = context.header_lower
         return all(amex_header in header_parts for amex_header in amex_headers)
     
-    def parse(self, file_content: bytes, filename: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
-        """Parse Amex credit card statement"""
-        try:
-            content = file_content.decode('utf-8')
-        except UnicodeDecodeError:
-            content = file_content.decode('latin-1')
-        
-        # Parse CSV content
-        csv_reader = csv.DictReader(io.StringIO(content))
-        transactions = []
-        
-        # Get statement metadata from first few rows
-        statement_meta = self._extract_statement_metadata(content, filename)
-        
-        for row in csv_reader:
-            transaction = self._parse_amex_transaction(row)
-            if transaction:
-                transactions.append(transaction)
-        
-        return statement_meta, transactions
-    
-    def _extract_statement_metadata(self, content: str, filename: str) -> Dict[str, Any]:
-        """Extract statement metadata from Amex CSV"""
-        lines = content.split('\n')
-        
-        # Find date range from transactions
-        dates = []
-        for line in lines[1:]:  # Skip header
-            if line.strip():
-                parts = line.split(',')
-                if len(parts) >= 1:
-                    try:
-                        date_str = parts[0].strip()
-                        if date_str and date_str != 'Date':
-                            # Parse Amex date format: "03 Aug 2025"
-                            date_obj = datetime.strptime(date_str, '%d %b %Y').date()
-                            dates.append(date_obj)
-                    except ValueError:
-                        continue
-        
-        # Get account info from first transaction
-        account_info = self._extract_account_info(content)
-        
+    def _initial_statement_meta(self, filename: str) -> Dict[str, Any]:
+        """Return Amex metadata; account number and date range are filled in while streaming"""
         return {
             'bank_name': 'American Express',
-            'account_number': account_info.get('account_number', 'Unknown'),
+            'account_number': 'Unknown',
             'account_abbr': 'AMEX',
-            'statement_from_date': min(dates) if dates else datetime.now().date(),
-            'statement_to_date': max(dates) if dates else datetime.now().date(),
+            'statement_from_date': datetime.now().date(),
+            'statement_to_date': datetime.now().date(),
             'statement_type': 'CSV'
         }
     
+    def _iter_transactions(self, lines: Iterator[str], stream: TransactionStream) -> Iterator[Dict[str, Any]]:
+        """Parse Amex CSV rows one at a time"""
+        for row in csv.DictReader(lines):
+            # Take the account number from the first row that has one
+            if stream.meta['account_number'] == 'Unknown':
+                account_num = (row.get('Account #') or '').strip()
+                if account_num:
+                    stream.meta['account_number'] = account_num
+            
+            transaction = self._parse_amex_transaction(row)
+            if transaction:
+                yield transaction
+    
     def _extract_account_info(self, content: str) -> Dict[str, str]:
         """Extract account information from Amex CSV"""
         lines = content.split('\n')
@@ -150,36 +116,29 @@ class AmexCreditCardParser(BaseStatementParser):
         if not amount_str or amount_str.strip() == '':
             return Decimal('0.00'), 'IN'
         
-        # Remove common currency symbols and whitespace
-        cleaned = amount_str.strip().replace('$', '').replace(',', '').replace('(', '').replace(')', '')
+        parsed = match_amount(amount_str)
+        if parsed is None:
+            logger.warning(f"Could not parse Amex amount: {amount_str}")
+            return Decimal('0.00'), 'IN'
         
         # Check if it's negative (indicating a charge/refund transaction)
-        is_negative = cleaned.startswith('-')
+        cents, is_negative = parsed
+        amount = cents_to_decimal(cents)
         
-        # Remove negative sign
-        if is_negative:
-            cleaned = cleaned.replace('-', '')
+        # Determine direction based on description and amount
+        # For Amex credit cards:
+        # - Negative amounts can be either charges (OUT) or refunds (IN)
+        # - If description contains "PAYMENT RECEIVED", it's a payment (OUT)
+        # - If description does NOT contain "PAYMENT RECEIVED", negative amounts are refunds (IN)
+        # - Positive amounts are typically charges (OUT)
         
-        try:
-            amount = Decimal(cleaned)
-            
-            # Determine direction based on description and amount
-            # For Amex credit cards:
-            # - Negative amounts can be either charges (OUT) or refunds (IN)
-            # - If description contains "PAYMENT RECEIVED", it's a payment (OUT)
-            # - If description does NOT contain "PAYMENT RECEIVED", negative amounts are refunds (IN)
-            # - Positive amounts are typically charges (OUT)
-            
-            if is_negative:
-                # Check if this is a payment received (which should be OUT direction)
-                if 'PAYMENT RECEIVED' in description.upper():
-                    direction = 'OUT'  # Payment received - money going out to pay the card
-                else:
-                    direction = 'IN'   # Refund - money coming back to you
+        if is_negative:
+            # Check if this is a payment received (which should be OUT direction)
+            if 'PAYMENT RECEIVED' in description.upper():
+                direction = 'OUT'  # Payment received - money going out to pay the card
             else:
-                direction = 'OUT'  # Positive amount is typically a charge (money going out)
-            
-            return amount, direction
-        except (ValueError, decimal.InvalidOperation):
-            logger.warning(f"Could not parse Amex amount: {amount_str}")
-            return Decimal('0.00'), 'IN'
+                direction = 'IN'   # Refund - money coming back to you
+        else:
+            direction = 'OUT'  # Positive amount is typically a charge (money going out)
+        
+        return amount, direction
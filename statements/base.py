@@ -2,33 +2,299 @@
 Base parser class and common utilities for bank statement parsing
 """
 
-import pandas as pd
+import codecs
+import csv
+import io
+import os
+from functools import cached_property
+from itertools import chain, islice
 from datetime import datetime
-import decimal
 from decimal import Decimal
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Iterable, Iterator, BinaryIO, FrozenSet, Callable
 import logging
 
-from .constants import COMMON_DATE_FORMATS, DIRECTION_IN, DIRECTION_OUT
-from .exceptions import DateParsingError, AmountParsingError
+from .constants import (
+    DIRECTION_IN, DIRECTION_OUT, STREAM_CHUNK_SIZE, SNIFF_BYTES, SNIFF_LINES
+)
+from .amounts import cents_to_decimal, match_amount
+from .dates import DateParser, parse_date_value
+from .exceptions import AmountParsingError, StatementParsingError
 
 logger = logging.getLogger(__name__)
 
 
+def iter_decoded_lines(file_obj: BinaryIO, encoding: str = 'utf-8', fallback_encoding: str = 'latin-1',
+                       chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Yield text lines from a binary file object without reading it all at once.
+
+    Bytes are fed through an incremental decoder one chunk at a time. If the
+    primary encoding fails part way through, the remaining bytes (including
+    the failing chunk) are decoded with the fallback encoding, which mirrors
+    the utf-8 then latin-1 fallback the parsers use for whole files.
+
+    Args:
+        file_obj: Binary file-like object supporting read(size)
+        encoding: Encoding to try first
+        fallback_encoding: Encoding used once the primary encoding fails
+        chunk_size: Number of bytes to read per step
+
+    Returns:
+        Iterator of lines, each keeping its trailing newline
+    """
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ''
+
+    while True:
+        chunk = file_obj.read(chunk_size)
+        final = not chunk
+        try:
+            buffered = decoder.getstate()[0]
+            text = decoder.decode(chunk, final=final)
+        except UnicodeDecodeError:
+            logger.warning(f"Could not decode upload as {encoding}, falling back to {fallback_encoding}")
+            decoder = codecs.getincrementaldecoder(fallback_encoding)()
+            text = decoder.decode(buffered + chunk, final=final)
+
+        if text:
+            pending += text
+            lines = pending.split('\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line + '\n'
+
+        if final:
+            break
+
+    if pending:
+        yield pending
+
+
+def normalize_header(columns: Iterable[str]) -> FrozenSet[str]:
+    """
+    Build an order-insensitive fingerprint of a CSV header row.
+
+    Column names are lower-cased with runs of whitespace collapsed, and
+    empty columns are ignored, so exports that differ only in spacing,
+    case or column order produce the same key.
+
+    Args:
+        columns: Column names from a header row
+
+    Returns:
+        Frozen set of normalized column names
+    """
+    return frozenset(' '.join(column.split()).lower() for column in columns if column and column.strip())
+
+
+def peek_rows(rows: Iterable[Any], count: int) -> Tuple[List[Any], Iterator[Any]]:
+    """
+    Look ahead at the first rows of a stream without consuming them.
+
+    Args:
+        rows: Any iterable, including generators
+        count: Maximum number of rows to look at
+
+    Returns:
+        Tuple of (first rows, iterator over all rows including those)
+    """
+    iterator = iter(rows)
+    head = list(islice(iterator, count))
+    return head, chain(head, iterator)
+
+
+class TransactionStream:
+    """
+    Iterator over parsed transactions that collects statement metadata on the fly.
+
+    The statement date range in ``meta`` is widened as transactions are
+    yielded, so it is final once the stream has been fully consumed.
+    Streams wrapping the result of parse() pass observe_dates=False, since
+    parse() already returned the final statement dates.
+    """
+
+    def __init__(self, meta: Dict[str, Any], records: Optional[Iterable[Dict[str, Any]]] = None,
+                 wrap_errors: bool = False, observe_dates: bool = True):
+        self.meta = meta
+        self.records = records
+        self.wrap_errors = wrap_errors
+        self.observe_dates = observe_dates
+        self.parser_name: Optional[str] = None
+        self.row_count = 0
+        self.rows_read = 0
+        self.skipped_rows = 0
+        self.skip_reasons: Dict[str, int] = {}
+        self._min_date = None
+        self._max_date = None
+
+    def observe_date(self, value) -> None:
+        """Widen the statement date range to include the given date"""
+        if value is None:
+            return
+        if self._min_date is None or value < self._min_date:
+            self._min_date = value
+            self.meta['statement_from_date'] = value
+        if self._max_date is None or value > self._max_date:
+            self._max_date = value
+            self.meta['statement_to_date'] = value
+
+    def skip(self, reason: str) -> None:
+        """Record a data row that did not produce a transaction"""
+        self.skipped_rows += 1
+        self.skip_reasons[reason] = self.skip_reasons.get(reason, 0) + 1
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        try:
+            for record in self.records:
+                if self.observe_dates:
+                    self.observe_date(record.get('transaction_date'))
+                self.row_count += 1
+                yield record
+        except StatementParsingError:
+            raise
+        except Exception as e:
+            if not self.wrap_errors:
+                raise
+            logger.error(f"Error parsing statement stream: {e}", exc_info=True)
+            raise StatementParsingError(f"Failed to parse statement: {str(e)}") from e
+
+    def collect(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Consume the stream and return (statement_metadata, transactions_list)"""
+        transactions = list(self)
+        return self.meta, transactions
+
+
+class SkipRow(Exception):
+    """Raised by a row parser to skip a row with a reason for the stream stats"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class SniffContext:
+    """
+    Lazily decoded view of an upload shared by every parser's can_parse().
+
+    Only a bounded prefix of the file is decoded, and only the first time a
+    parser asks for text, so detecting the format of an upload costs one
+    decode no matter how many parsers are tried.
+    """
+
+    def __init__(self, file_content: bytes, filename: str, sniff_bytes: int = SNIFF_BYTES,
+                 max_lines: int = SNIFF_LINES):
+        self.file_content = file_content
+        self.filename = filename
+        self.prefix = file_content[:sniff_bytes]
+        self.truncated = len(file_content) >= sniff_bytes
+        self.max_lines = max_lines
+
+    @cached_property
+    def extension(self) -> str:
+        """Lower-cased file extension including the dot"""
+        return os.path.splitext(self.filename)[1].lower()
+
+    @cached_property
+    def is_pdf(self) -> bool:
+        """Whether the upload starts with the PDF magic bytes"""
+        return self.prefix.lstrip()[:5] == b'%PDF-'
+
+    @cached_property
+    def encoding(self) -> str:
+        """Encoding the prefix decodes with, mirroring the utf-8 then latin-1 fallback"""
+        try:
+            # A multibyte character cut off by the prefix is not a decode error
+            codecs.getincrementaldecoder('utf-8')().decode(self.prefix, final=not self.truncated)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            return 'latin-1'
+
+    @cached_property
+    def text(self) -> str:
+        """Decoded prefix of the upload"""
+        decoder = codecs.getincrementaldecoder(self.encoding)()
+        return decoder.decode(self.prefix, final=not self.truncated)
+
+    @cached_property
+    def lines(self) -> List[str]:
+        """First max_lines complete lines of the upload, without line endings"""
+        lines = self.text.splitlines()
+        if self.truncated and lines and not self.text.endswith(('\n', '\r')):
+            # The last line was cut off by the prefix
+            lines.pop()
+        return lines[:self.max_lines]
+
+    @cached_property
+    def header(self) -> List[str]:
+        """First CSV row, stripped; column names for headed formats, the first record otherwise"""
+        for row in csv.reader(self.lines[:1]):
+            return [field.strip() for field in row]
+        return []
+
+    @cached_property
+    def header_lower(self) -> List[str]:
+        """Lower-cased header row for case-insensitive column matching"""
+        return [field.lower() for field in self.header]
+
+    @cached_property
+    def header_key(self) -> FrozenSet[str]:
+        """Normalized header fingerprint used by the factory's dispatch index"""
+        return normalize_header(self.header)
+
+
 class BaseStatementParser:
     """Base class for parsing bank statements"""
     
+    # Exact CSV header rows this parser reads; the factory indexes them by normalize_header()
+    header_signatures: List[List[str]] = []
+    
+    # Bump when a parser's output changes so cached parse results are not reused
+    version = 1
+    
     def __init__(self):
         self.supported_formats = []
     
-    def can_parse(self, file_content: bytes, filename: str) -> bool:
-        """Check if this parser can handle the given file"""
+    def can_parse(self, file_content: bytes, filename: str, context: Optional[SniffContext] = None) -> bool:
+        """
+        Check if this parser can handle the given file.
+
+        Args:
+            file_content: Raw file content, or a prefix of it
+            filename: Name of the file
+            context: SniffContext shared across parsers; built on demand when omitted
+
+        Returns:
+            True if this parser recognises the file
+        """
         raise NotImplementedError
     
+    def _sniff(self, file_content: bytes, filename: str, context: Optional[SniffContext]) -> SniffContext:
+        """Return the shared sniff context, building one for direct can_parse() calls"""
+        if context is None:
+            context = SniffContext(file_content, filename)
+        return context
+    
     def parse(self, file_content: bytes, filename: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
         """Parse the file and return statement metadata and transaction details"""
         raise NotImplementedError
     
+    def stream(self, file_obj: BinaryIO, filename: str) -> TransactionStream:
+        """
+        Parse a file object and return a stream of transactions.
+
+        Parsers that cannot read incrementally read the whole file and
+        wrap the result of parse().
+
+        Args:
+            file_obj: Binary file-like object positioned at the start
+            filename: Name of the file
+
+        Returns:
+            TransactionStream yielding transaction dicts
+        """
+        statement_meta, transactions = self.parse(file_obj.read(), filename)
+        return TransactionStream(statement_meta, transactions, observe_dates=False)
+    
     def _parse_amount(self, amount_str: str) -> Tuple[Decimal, str]:
         """
         Parse amount string and determine direction (IN/OUT).
@@ -45,30 +311,23 @@ class BaseStatementParser:
         if not amount_str or amount_str.strip() == '':
             return Decimal('0.00'), DIRECTION_IN
 
-        # Remove common currency symbols and whitespace
-        cleaned = amount_str.strip().replace('$', '').replace(',', '').replace('(', '').replace(')', '')
+        # Negative amounts and accounting parentheses indicate OUT
+        parsed = match_amount(amount_str)
+        if parsed is None:
+            logger.error(f"Could not parse amount: {amount_str}")
+            raise AmountParsingError(f"Failed to parse amount: {amount_str}")
 
-        # Check if it's negative or in parentheses (indicating OUT)
-        is_negative = cleaned.startswith('-') or cleaned.startswith('(')
-
-        # Remove negative sign or parentheses
-        if is_negative:
-            cleaned = cleaned.replace('-', '').replace('(', '').replace(')', '')
-
-        try:
-            amount = Decimal(cleaned)
-            direction = DIRECTION_OUT if is_negative else DIRECTION_IN
-            return amount, direction
-        except (ValueError, decimal.InvalidOperation) as e:
-            logger.error(f"Could not parse amount: {amount_str}", exc_info=True)
-            raise AmountParsingError(f"Failed to parse amount: {amount_str}") from e
+        cents, is_negative = parsed
+        direction = DIRECTION_OUT if is_negative else DIRECTION_IN
+        return cents_to_decimal(cents), direction
     
-    def _parse_date(self, date_str: str) -> datetime.date:
+    def _parse_date(self, date_str: str, date_parser: Optional[DateParser] = None) -> datetime.date:
         """
         Parse date string into date object.
 
         Args:
             date_str: String representation of the date
+            date_parser: Per-file DateParser locked to the column's format, if known
 
         Returns:
             datetime.date object
@@ -80,16 +339,80 @@ class BaseStatementParser:
             logger.warning("Empty date string provided, using current date")
             return datetime.now().date()
 
-        # Try common date formats
-        for fmt in COMMON_DATE_FORMATS:
+        if date_parser is not None:
+            return date_parser.parse(date_str)
+        return parse_date_value(date_str)
+
+
+class StreamingStatementParser(BaseStatementParser):
+    """
+    Base class for parsers that read uploads incrementally.
+
+    Subclasses implement _initial_statement_meta() and _iter_transactions();
+    parse() is provided for callers that already hold the whole file.
+    """
+
+    def parse(self, file_content: bytes, filename: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Parse the file and return statement metadata and transaction details"""
+        return self.stream(io.BytesIO(file_content), filename).collect()
+
+    def stream(self, file_obj: BinaryIO, filename: str) -> TransactionStream:
+        """Parse a file object and return a stream of transactions"""
+        stream = TransactionStream(self._initial_statement_meta(filename))
+        stream.records = self._iter_transactions(iter_decoded_lines(file_obj), stream)
+        return stream
+
+    def _initial_statement_meta(self, filename: str) -> Dict[str, Any]:
+        """Return statement metadata before any rows have been read"""
+        raise NotImplementedError
+
+    def _iter_transactions(self, lines: Iterator[str], stream: TransactionStream) -> Iterator[Dict[str, Any]]:
+        """Yield transaction dicts from decoded lines, updating stream.meta as needed"""
+        raise NotImplementedError
+
+
+class CSVRowStatementParser(StreamingStatementParser):
+    """
+    Streaming parser driven by one csv.reader over the whole upload.
+
+    Each row is tokenized once and handed to _parse_row(). Row counts,
+    skipped rows and the statement date range accumulate on the stream in
+    the same pass, so no parser needs a separate metadata scan.
+    """
+
+    def _iter_transactions(self, lines: Iterator[str], stream: TransactionStream) -> Iterator[Dict[str, Any]]:
+        """Tokenize each CSV row once and yield the transactions _parse_row() builds"""
+        return self._parse_rows(csv.reader(lines), stream, self._parse_row)
+
+    def _parse_rows(self, rows: Iterable[List[str]], stream: TransactionStream,
+                    parse_row: Callable[[List[str]], Optional[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        """Run parse_row over tokenized rows, counting read and skipped rows on the stream"""
+        for parts in rows:
+            # Blank lines carry no data and are not counted as rows
+            if not any(part.strip() for part in parts):
+                continue
+            stream.rows_read += 1
+
             try:
-                return datetime.strptime(date_str.strip(), fmt).date()
-            except ValueError:
+                transaction = parse_row(parts)
+            except SkipRow as skip:
+                stream.skip(skip.reason)
+                continue
+            except Exception as e:
+                logger.warning(f"Error parsing {self.__class__.__name__} row {stream.rows_read}: {e}")
+                stream.skip('error')
                 continue
 
-        # If none of the formats work, try pandas parsing
-        try:
-            return pd.to_datetime(date_str).date()
-        except Exception as e:
-            logger.error(f"Could not parse date: {date_str}", exc_info=True)
-            raise DateParsingError(f"Failed to parse date: {date_str}") from e
+            if transaction:
+                yield transaction
+            else:
+                stream.skip('unparsed')
+
+        logger.info(
+            f"{self.__class__.__name__} read {stream.rows_read} rows: "
+            f"{stream.row_count} parsed, {stream.skipped_rows} skipped {stream.skip_reasons}"
+        )
+
+    def _parse_row(self, parts: List[str]) -> Optional[Dict[str, Any]]:
+        """Build a transaction dict from one tokenized row, or raise SkipRow"""
+        raise NotImplementedError
@@ -0,0 +1,123 @@
+"""
+Unpacking of many statement files uploaded or imported at once
+"""
+
+import os
+import logging
+import zipfile
+from io import BytesIO
+from typing import Iterable, List
+
+from .constants import ALLOWED_EXTENSIONS, BATCH_MAX_FILES, BATCH_MAX_TOTAL_BYTES
+from .exceptions import StatementParsingError
+
+logger = logging.getLogger(__name__)
+
+
+class BatchFile:
+    """One statement file of a batch, held in memory"""
+
+    def __init__(self, name: str, content: bytes):
+        self.name = name
+        self.content = content
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+    def __repr__(self):
+        return f"BatchFile(name={self.name!r}, size={self.size})"
+
+
+def _is_statement_name(name: str) -> bool:
+    """Whether a file name looks like a statement rather than archive clutter"""
+    base = os.path.basename(name)
+    if not base or base.startswith('.') or '__MACOSX' in name.split('/'):
+        return False
+    return os.path.splitext(base)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def expand_zip(content: bytes, max_total_bytes: int = BATCH_MAX_TOTAL_BYTES) -> List[BatchFile]:
+    """
+    Extract the statement files from a ZIP archive.
+
+    Directories, hidden files and unsupported extensions are skipped. The
+    uncompressed size declared by the archive is checked before anything
+    is read, so a small archive cannot expand past max_total_bytes.
+
+    Args:
+        content: Raw bytes of the archive
+        max_total_bytes: Limit on the combined uncompressed size
+
+    Returns:
+        List of BatchFile named by their path inside the archive
+
+    Raises:
+        StatementParsingError: If the archive is invalid or too large
+    """
+    try:
+        archive = zipfile.ZipFile(BytesIO(content))
+    except zipfile.BadZipFile as e:
+        raise StatementParsingError(f"Invalid ZIP archive: {e}") from e
+
+    with archive:
+        members = [info for info in archive.infolist() if not info.is_dir() and _is_statement_name(info.filename)]
+        total = sum(info.file_size for info in members)
+        if total > max_total_bytes:
+            raise StatementParsingError(
+                f"ZIP archive expands to {total} bytes, more than the {max_total_bytes} byte limit"
+            )
+        return [BatchFile(info.filename, archive.read(info)) for info in members]
+
+
+def expand_uploads(uploads: Iterable[BatchFile]) -> List[BatchFile]:
+    """
+    Flatten uploaded files into statement files, unpacking ZIP archives.
+
+    Args:
+        uploads: Uploaded files, any of which may be a ZIP archive
+
+    Returns:
+        List of BatchFile in upload order
+
+    Raises:
+        StatementParsingError: If an archive is invalid or the batch is too large
+    """
+    files = []
+    for upload in uploads:
+        if upload.name.lower().endswith('.zip'):
+            files.extend(expand_zip(upload.content))
+        else:
+            files.append(upload)
+
+    if len(files) > BATCH_MAX_FILES:
+        raise StatementParsingError(f"Batch has {len(files)} files, more than the limit of {BATCH_MAX_FILES}")
+    return files
+
+
+def collect_path(path: str) -> List[BatchFile]:
+    """
+    Read the statement files under a directory, a ZIP archive or a single file.
+
+    Args:
+        path: Filesystem path
+
+    Returns:
+        List of BatchFile named relative to the directory, sorted by name
+    """
+    if os.path.isdir(path):
+        names = []
+        for root, dirs, filenames in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for filename in filenames:
+                relative = os.path.relpath(os.path.join(root, filename), path).replace(os.sep, '/')
+                if _is_statement_name(relative) or filename.lower().endswith('.zip'):
+                    names.append(relative)
+        uploads = []
+        for relative in sorted(names):
+            with open(os.path.join(path, relative), 'rb') as f:
+                uploads.append(BatchFile(relative, f.read()))
+    else:
+        with open(path, 'rb') as f:
+            uploads = [BatchFile(os.path.basename(path), f.read())]
+    return expand_uploads(uploads)
@@ -0,0 +1,299 @@
+"""
+Parser throughput benchmarks over synthetic statement files
+"""
+
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from .categorizer import TransactionCategorizer
+from .constants import (
+    BENCHMARK_DETECTION_ITERATIONS, DIRECTION_IN, DIRECTION_OUT, INVESTMENT_KEYWORDS, SNIFF_BYTES, TRANSFER_KEYWORDS,
+)
+from .factory import StatementParserFactory
+from .synthetic import DEPOSITS, MERCHANTS, SYNTHETIC_FORMATS, generate_statement, iter_transactions
+
+# Metrics compared between runs, and whether a larger value is better
+COMPARED_METRICS = {
+    'rows_per_second': True,
+    'first_row_seconds': False,
+    'detection_seconds': False,
+    'peak_rss_kb': False,
+}
+
+# Descriptions mixed into the categorizer benchmark so that every category occurs
+CATEGORIZER_WITHDRAWALS = MERCHANTS + [
+    'EQ BANK TRANSFER OUT', 'PAY EMP-VENDOR 00123', 'QUESTRADE INC', 'MUTUAL FUNDS PURCHASE', 'GIC PURCHASE 1YR',
+]
+CATEGORIZER_DEPOSITS = DEPOSITS + ['GIC MATURITY']
+
+
+def _max_rss_kb() -> int:
+    """Peak resident set size of this process in KiB"""
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KiB
+    return max_rss // 1024 if sys.platform == 'darwin' else max_rss
+
+
+def measure_statement(path: str, format_name: str,
+                      detection_iterations: int = BENCHMARK_DETECTION_ITERATIONS) -> Dict[str, Any]:
+    """
+    Time detection and a full streaming parse of one file.
+
+    Detection is timed the way uploads are detected: get_parser() on the
+    first SNIFF_BYTES of the file (the whole file for PDFs), averaged over
+    detection_iterations calls. The parse goes through the parser's
+    stream() so time-to-first-row reflects what ingest sees.
+
+    Args:
+        path: Statement file
+        format_name: Key of SYNTHETIC_FORMATS the file was generated as
+        detection_iterations: get_parser() calls averaged for detection time
+
+    Returns:
+        Dict of the measurements of this file
+    """
+    baseline_rss_kb = _max_rss_kb()
+    filename = os.path.basename(path)
+    parser_factory = StatementParserFactory()
+
+    with open(path, 'rb') as f:
+        detection_content = f.read() if filename.lower().endswith('.pdf') else f.read(SNIFF_BYTES)
+
+    start = time.perf_counter()
+    for _ in range(detection_iterations):
+        parser = parser_factory.get_parser(detection_content, filename)
+    detection_seconds = (time.perf_counter() - start) / detection_iterations
+    parser_name = parser.__class__.__name__
+
+    first_row_seconds = None
+    rows = 0
+    with open(path, 'rb') as f:
+        start = time.perf_counter()
+        stream = parser.stream(f, filename)
+        for _ in stream:
+            if not rows:
+                first_row_seconds = time.perf_counter() - start
+            rows += 1
+        parse_seconds = time.perf_counter() - start
+
+    return {
+        'format': format_name,
+        'file': filename,
+        'file_bytes': os.path.getsize(path),
+        'parser': parser_name,
+        'expected_parser': SYNTHETIC_FORMATS[format_name].parser_name,
+        'rows': rows,
+        'skipped_rows': stream.skipped_rows,
+        'detection_seconds': detection_seconds,
+        'first_row_seconds': first_row_seconds,
+        'parse_seconds': parse_seconds,
+        'rows_per_second': rows / parse_seconds if parse_seconds else None,
+        'baseline_rss_kb': baseline_rss_kb,
+        'peak_rss_kb': _max_rss_kb(),
+    }
+
+
+def _measure_in_child(path: str, format_name: str, detection_iterations: int, queue) -> None:
+    """Child process body: measure one file and send the result back"""
+    try:
+        queue.put(measure_statement(path, format_name, detection_iterations))
+    except Exception as e:
+        queue.put({'format': format_name, 'file': os.path.basename(path), 'error': f"{type(e).__name__}: {e}"})
+
+
+def measure_isolated(path: str, format_name: str,
+                     detection_iterations: int = BENCHMARK_DETECTION_ITERATIONS) -> Dict[str, Any]:
+    """
+    Measure one file in a freshly spawned process.
+
+    Peak RSS is per process, so each file gets its own interpreter;
+    otherwise a large file would hide the footprint of every file after it.
+
+    Args:
+        path: Statement file
+        format_name: Key of SYNTHETIC_FORMATS the file was generated as
+        detection_iterations: get_parser() calls averaged for detection time
+
+    Returns:
+        Dict of the measurements, or with an 'error' key if the child failed
+    """
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_measure_in_child, args=(path, format_name, detection_iterations, queue))
+    process.start()
+    try:
+        result = queue.get()
+    except Exception as e:
+        result = {'format': format_name, 'file': os.path.basename(path), 'error': str(e)}
+    process.join()
+    if process.exitcode and 'error' not in result:
+        result['error'] = f"Benchmark process exited with code {process.exitcode}"
+    return result
+
+
+def run_benchmarks(formats: Iterable[str], row_counts: Iterable[int], data_dir: str, seed: int = 0,
+                   isolate: bool = True, detection_iterations: int = BENCHMARK_DETECTION_ITERATIONS,
+                   progress=None) -> List[Dict[str, Any]]:
+    """
+    Generate any missing synthetic files and benchmark each of them.
+
+    Args:
+        formats: Keys of SYNTHETIC_FORMATS
+        row_counts: Statement sizes in rows
+        data_dir: Directory generated files are kept in between runs
+        seed: Seed of the synthetic data
+        isolate: Measure every file in its own process
+        detection_iterations: get_parser() calls averaged for detection time
+        progress: Optional callable receiving each result as it completes
+
+    Returns:
+        List of result dicts, one per format and size
+    """
+    results = []
+    for rows in row_counts:
+        for format_name in formats:
+            path = generate_statement(format_name, rows, data_dir, seed)
+            if isolate:
+                result = measure_isolated(path, format_name, detection_iterations)
+            else:
+                result = measure_statement(path, format_name, detection_iterations)
+            result['target_rows'] = rows
+            results.append(result)
+            if progress:
+                progress(result)
+    return results
+
+
+def reference_categorize(item: str, direction: str) -> str:
+    """categorize_transaction() as it was before the compiled matcher: substring tests per keyword"""
+    item_upper = item.upper()
+    if direction == DIRECTION_OUT:
+        for keyword in TRANSFER_KEYWORDS:
+            if keyword in item_upper:
+                return 'transfer'
+    if direction == DIRECTION_OUT:
+        for keyword in INVESTMENT_KEYWORDS:
+            if keyword in item_upper:
+                return 'investment'
+    if direction == DIRECTION_OUT:
+        is_investment = any(keyword in item_upper for keyword in INVESTMENT_KEYWORDS)
+        is_transfer = any(keyword in item_upper for keyword in TRANSFER_KEYWORDS)
+        if not is_investment and not is_transfer:
+            return 'spending'
+    if direction == DIRECTION_IN and 'GIC' not in item_upper:
+        return 'income'
+    return 'other'
+
+
+def benchmark_categorizer(items: int, seed: int = 0, unique: bool = False) -> Dict[str, Any]:
+    """
+    Time the substring categorizer against the compiled one on synthetic descriptions.
+
+    Args:
+        items: Number of transactions categorized
+        seed: Seed of the synthetic data
+        unique: Append a reference number to every description, as some
+            banks do, so no two descriptions repeat
+
+    Returns:
+        Dict of seconds taken by each implementation and whether they agree
+    """
+    transactions = iter_transactions(items, seed, CATEGORIZER_DEPOSITS, CATEGORIZER_WITHDRAWALS)
+    descriptions, directions = [], []
+    for index, transaction in enumerate(transactions):
+        descriptions.append(f"{transaction.item} REF{index:08d}" if unique else transaction.item)
+        directions.append(transaction.direction)
+    categorizer = TransactionCategorizer()
+
+    start = time.perf_counter()
+    expected = [reference_categorize(item, direction) for item, direction in zip(descriptions, directions)]
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    single = [categorizer.categorize(item, direction) for item, direction in zip(descriptions, directions)]
+    compiled_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = categorizer.categorize_many(descriptions, directions)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        'items': items,
+        'unique_descriptions': len(set(descriptions)),
+        'reference_seconds': reference_seconds,
+        'compiled_seconds': compiled_seconds,
+        'batch_seconds': batch_seconds,
+        'speedup': reference_seconds / batch_seconds if batch_seconds else None,
+        'matches_reference': expected == single == batch,
+    }
+
+
+def git_revision() -> Optional[str]:
+    """Commit the working tree is at, if it is a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def build_report(results: List[Dict[str, Any]], seed: int = 0) -> Dict[str, Any]:
+    """Wrap benchmark results with the environment they were measured in"""
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'commit': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'seed': seed,
+        'results': results,
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold_percent: float = 10.0) -> List[Dict[str, Any]]:
+    """
+    Compare the metrics of two reports, file by file.
+
+    Args:
+        baseline: Earlier report from build_report()
+        current: Later report from build_report()
+        threshold_percent: Change in the wrong direction counted as a regression
+
+    Returns:
+        One dict per metric present in both reports, with the percentage
+        change and whether it is a regression
+    """
+    previous = {
+        (result['format'], result.get('target_rows')): result
+        for result in baseline.get('results', []) if 'error' not in result
+    }
+    changes = []
+    for result in current.get('results', []):
+        before = previous.get((result['format'], result.get('target_rows')))
+        if before is None or 'error' in result:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            worse = -change if higher_is_better else change
+            changes.append({
+                'format': result['format'],
+                'rows': result.get('target_rows'),
+                'metric': metric,
+                'baseline': old,
+                'current': new,
+                'change_percent': change,
+                'regression': worse > threshold_percent,
+            })
+    return changes
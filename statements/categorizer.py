@@ -0,0 +1,395 @@
+"""
+Keyword and rule categorization of transactions with compiled patterns
+"""
+
+import logging
+import re
+from collections import defaultdict
+from typing import (
+    Callable, Dict, FrozenSet, Hashable, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Set,
+    Tuple,
+)
+
+from django.db import transaction
+from django.db.models import Q
+
+from .constants import (
+    CATEGORIZE_BATCH_SIZE, CATEGORY_INCOME, CATEGORY_INVESTMENT, CATEGORY_OTHER, CATEGORY_SPENDING,
+    CATEGORY_TRANSFER, DIRECTION_IN, DIRECTION_OUT, INVESTMENT_KEYWORDS, PAYMENT_KEYWORDS, RULE_MATCH_CONTAINS,
+    RULE_MATCH_EXACT, RULE_MATCH_REGEX, RULE_MATCH_STARTS_WITH, TRANSFER_KEYWORDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Labels of the keyword groups the transaction categorizer looks for
+TRANSFER = 'transfer'
+INVESTMENT = 'investment'
+INCOME_EXCLUDED = 'income_excluded'
+
+# Keywords that keep money in from counting as income
+INCOME_EXCLUDED_KEYWORDS = ['GIC']
+
+# Joins the strings scanned in one pass; no keyword may contain it
+SEPARATOR = '\x00'
+
+# Account id and account type of the transactions being categorized
+AccountScope = Tuple[int, str]
+
+
+def direction_category(direction: str) -> str:
+    """Category of a transaction that no keyword or rule picks out"""
+    if direction == DIRECTION_OUT:
+        return CATEGORY_SPENDING
+    if direction == DIRECTION_IN:
+        return CATEGORY_INCOME
+    return CATEGORY_OTHER
+
+
+class KeywordMatcher:
+    """
+    Find every labelled keyword in a string with one regex scan.
+
+    All keywords are compiled into one alternation, longest first, and
+    each match is mapped back to the labels of its keyword. Matching is
+    done on the upper-cased string, like the `keyword in item.upper()`
+    checks it replaces. A keyword inherits the labels of keywords it
+    contains, and each search resumes one character after the previous
+    match started, so keywords that overlap are all found.
+    """
+
+    def __init__(self, keywords: Mapping[Hashable, Iterable[str]]):
+        self.labels: Dict[str, FrozenSet[Hashable]] = {}
+        for label, words in keywords.items():
+            for word in words:
+                word = word.upper()
+                if not word or SEPARATOR in word:
+                    raise ValueError(f"Invalid keyword {word!r} for label {label}")
+                self.labels[word] = self.labels.get(word, frozenset()) | {label}
+
+        words = sorted(self.labels, key=len, reverse=True)
+        for word in words:
+            for other in words:
+                if other != word and other in word:
+                    self.labels[word] |= self.labels[other]
+        self.pattern = re.compile('|'.join(re.escape(word) for word in words)) if words else None
+
+    def _matches(self, text: str) -> Iterator[re.Match]:
+        """Every keyword match in upper-cased text, including overlapping ones"""
+        match = self.pattern.search(text)
+        while match is not None:
+            yield match
+            match = self.pattern.search(text, match.start() + 1)
+
+    def __call__(self, text: str) -> FrozenSet[Hashable]:
+        """
+        Labels of every keyword found in text.
+
+        Args:
+            text: String to search; case does not matter
+
+        Returns:
+            frozenset of labels, empty if no keyword matches
+        """
+        if self.pattern is None:
+            return frozenset()
+        found = frozenset()
+        for match in self._matches(text.upper()):
+            found |= self.labels[match.group()]
+        return found
+
+    def scan(self, texts: Sequence[str]) -> Dict[int, FrozenSet[Hashable]]:
+        """
+        Find the keywords in many strings at once.
+
+        The strings are joined with a NUL separator, upper-cased and
+        searched in one pass. Each match is attributed to its string by
+        counting the separators since the previous match.
+
+        Args:
+            texts: Strings to search; case does not matter
+
+        Returns:
+            Dict mapping the position of each string that contains a
+            keyword to its labels; strings without one are left out
+        """
+        if self.pattern is None or not texts:
+            return {}
+        joined = SEPARATOR.join(texts).upper()
+        if joined.count(SEPARATOR) != len(texts) - 1:
+            # A string contains the separator itself
+            return {index: found for index, found in enumerate(map(self, texts)) if found}
+
+        hits: Dict[int, FrozenSet[Hashable]] = {}
+        index = position = 0
+        for match in self._matches(joined):
+            index += joined.count(SEPARATOR, position, match.start())
+            position = match.start()
+            labels = self.labels[match.group()]
+            hits[index] = hits[index] | labels if index in hits else labels
+        return hits
+
+
+class TransactionCategorizer:
+    """
+    Categorize transactions as transfer, investment, spending, income or other.
+
+    Money out is a transfer if it names a transfer keyword, otherwise an
+    investment if it names an investment keyword, otherwise spending.
+    Money in is income unless it names an excluded keyword such as GIC.
+    """
+
+    def __init__(self, transfer_keywords: Sequence[str] = TRANSFER_KEYWORDS,
+                 investment_keywords: Sequence[str] = INVESTMENT_KEYWORDS,
+                 income_excluded_keywords: Sequence[str] = INCOME_EXCLUDED_KEYWORDS):
+        self.matcher = KeywordMatcher({
+            TRANSFER: transfer_keywords,
+            INVESTMENT: investment_keywords,
+            INCOME_EXCLUDED: income_excluded_keywords,
+        })
+
+    @staticmethod
+    def _category(labels: FrozenSet[str], direction: str) -> str:
+        if direction == DIRECTION_OUT:
+            if TRANSFER in labels:
+                return CATEGORY_TRANSFER
+            if INVESTMENT in labels:
+                return CATEGORY_INVESTMENT
+        elif direction == DIRECTION_IN and INCOME_EXCLUDED in labels:
+            return CATEGORY_OTHER
+        return direction_category(direction)
+
+    def categorize(self, item: str, direction: str, account: Optional[AccountScope] = None) -> str:
+        """
+        Category of one transaction.
+
+        Args:
+            item: Transaction description
+            direction: IN or OUT
+            account: Ignored; keyword categories do not depend on the account
+
+        Returns:
+            Category string: 'transfer', 'investment', 'spending', 'income', or 'other'
+        """
+        return self._category(self.matcher(item), direction)
+
+    def categorize_many(self, items: Iterable[str], directions: Iterable[str],
+                        account: Optional[AccountScope] = None) -> List[str]:
+        """
+        Categories of many transactions at once.
+
+        All descriptions are searched in a single pass of the compiled
+        pattern; only those that contain a keyword are looked at again.
+
+        Args:
+            items: Transaction descriptions; a list, array or any iterable
+            directions: IN or OUT for each description
+            account: Ignored; keyword categories do not depend on the account
+
+        Returns:
+            List of category strings aligned with items
+        """
+        items = list(items)
+        directions = list(directions)
+        no_keyword = {direction: self._category(frozenset(), direction) for direction in set(directions)}
+        categories = [no_keyword[direction] for direction in directions]
+        for index, labels in self.matcher.scan(items).items():
+            categories[index] = self._category(labels, directions[index])
+        return categories
+
+
+transaction_categorizer = TransactionCategorizer()
+payment_matcher = KeywordMatcher({'payment': PAYMENT_KEYWORDS})
+
+
+class RuleSpec(NamedTuple):
+    """A categorization rule, detached from the CategoryRule row it was read from"""
+    pattern: str
+    match_type: str
+    category: str
+    direction: str = ''
+    account_id: Optional[int] = None
+    account_type: str = ''
+    priority: int = 0
+
+    def applies_to(self, direction: str, account: Optional[AccountScope]) -> bool:
+        """Whether the rule's direction and account scope allow a transaction"""
+        if self.direction and self.direction != direction:
+            return False
+        if self.account_id is not None and (account is None or account[0] != self.account_id):
+            return False
+        if self.account_type and (account is None or account[1] != self.account_type):
+            return False
+        return True
+
+    def compile(self) -> Callable[[str], Optional[re.Match]]:
+        """Test of a description for rules that are not plain substrings"""
+        if self.match_type == RULE_MATCH_REGEX:
+            return re.compile(self.pattern, re.IGNORECASE).search
+        pattern = re.compile(re.escape(self.pattern), re.IGNORECASE)
+        if self.match_type == RULE_MATCH_STARTS_WITH:
+            return pattern.match
+        if self.match_type == RULE_MATCH_EXACT:
+            return pattern.fullmatch
+        raise ValueError(f"Unknown match type {self.match_type}")
+
+    def condition(self) -> Q:
+        """Filter on StatementDetail selecting the rows the rule can match"""
+        lookup = {
+            RULE_MATCH_CONTAINS: 'item__icontains',
+            RULE_MATCH_STARTS_WITH: 'item__istartswith',
+            RULE_MATCH_EXACT: 'item__iexact',
+            RULE_MATCH_REGEX: 'item__iregex',
+        }[self.match_type]
+        condition = Q(**{lookup: self.pattern})
+        if self.direction:
+            condition &= Q(direction=self.direction)
+        if self.account_id is not None:
+            condition &= Q(statement__account_id=self.account_id)
+        if self.account_type:
+            condition &= Q(statement__account__account_type=self.account_type)
+        return condition
+
+
+class RuleCategorizer:
+    """
+    Categorize transactions with rules tried in order.
+
+    Substring rules are all found with one KeywordMatcher scan; the other
+    match types are compiled regexes. The first matching rule whose
+    direction and account scope allow the transaction sets its category.
+    Without one, money out is spending and money in is income.
+    """
+
+    def __init__(self, rules: Sequence[RuleSpec]):
+        self.rules = list(rules)
+        self.matcher = KeywordMatcher({
+            index: [rule.pattern]
+            for index, rule in enumerate(self.rules) if rule.match_type == RULE_MATCH_CONTAINS
+        })
+        self.tests = [
+            (index, rule.compile())
+            for index, rule in enumerate(self.rules) if rule.match_type != RULE_MATCH_CONTAINS
+        ]
+
+    def categorize(self, item: str, direction: str, account: Optional[AccountScope] = None) -> str:
+        """
+        Category of one transaction.
+
+        Args:
+            item: Transaction description
+            direction: IN or OUT
+            account: Account id and type the transaction belongs to
+
+        Returns:
+            Category string
+        """
+        return self.categorize_many([item], [direction], account)[0]
+
+    def categorize_many(self, items: Iterable[str], directions: Iterable[str],
+                        account: Optional[AccountScope] = None) -> List[str]:
+        """
+        Categories of many transactions of one account at once.
+
+        Args:
+            items: Transaction descriptions; a list, array or any iterable
+            directions: IN or OUT for each description
+            account: Account id and type the transactions belong to; rules
+                scoped to an account never match without it
+
+        Returns:
+            List of category strings aligned with items
+        """
+        items = list(items)
+        directions = list(directions)
+        matched: Dict[int, Set[int]] = {index: set(rules) for index, rules in self.matcher.scan(items).items()}
+        for rule_index, test in self.tests:
+            for index, item in enumerate(items):
+                if test(item):
+                    matched.setdefault(index, set()).add(rule_index)
+
+        categories = [direction_category(direction) for direction in directions]
+        for index, rule_indexes in matched.items():
+            for rule_index in sorted(rule_indexes):
+                rule = self.rules[rule_index]
+                if rule.applies_to(directions[index], account):
+                    categories[index] = rule.category
+                    break
+        return categories
+
+
+def categorize_details(detail_model, recategorize: bool = False, batch_size: int = CATEGORIZE_BATCH_SIZE,
+                       categorizer: Optional[TransactionCategorizer] = None,
+                       progress: Optional[Callable[[int, int], None]] = None,
+                       where: Optional[Q] = None,
+                       on_change: Optional[Callable[[List[Tuple]], None]] = None) -> int:
+    """
+    Store the category of saved transactions, a batch of primary keys at a time.
+
+    Rows are read in primary key order with only the columns the
+    categorizer needs, categorized per account, and written with one
+    UPDATE per category per batch. Takes the model class so migrations
+    can pass their historical model.
+
+    A batch's updates and the on_change call commit together, so the
+    monthly summaries a callback adjusts stay in step with the rows.
+
+    Args:
+        detail_model: StatementDetail model class
+        recategorize: Recompute every row, as after a keyword change, rather
+            than only rows without a category
+        batch_size: Rows read and updated per batch
+        categorizer: TransactionCategorizer or RuleCategorizer to use instead
+            of the default keywords
+        progress: Called with the rows examined and updated so far after each batch
+        where: Only look at rows matching this filter, such as those a changed rule can match
+        on_change: Called per batch with (account id, transaction date, direction,
+            amount, old category, new category) of every row whose category changed
+
+    Returns:
+        Number of rows whose category changed
+    """
+    categorizer = categorizer or transaction_categorizer
+    rows = detail_model.objects.order_by('pk')
+    if not recategorize:
+        rows = rows.filter(category='')
+    if where is not None:
+        rows = rows.filter(where)
+
+    examined = updated = 0
+    last_pk = None
+    while True:
+        batch = rows if last_pk is None else rows.filter(pk__gt=last_pk)
+        batch = list(batch.values_list(
+            'pk', 'item', 'direction', 'category', 'statement__account_id', 'statement__account__account_type',
+            'transaction_date', 'amount',
+        )[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1][0]
+
+        by_account = defaultdict(list)
+        for row in batch:
+            by_account[row[4], row[5]].append(row)
+        changed = defaultdict(list)
+        changes = []
+        for account, account_rows in by_account.items():
+            categories = categorizer.categorize_many(
+                [row[1] for row in account_rows], [row[2] for row in account_rows], account
+            )
+            for row, category in zip(account_rows, categories):
+                if category != row[3]:
+                    changed[category].append(row[0])
+                    changes.append((row[4], row[6], row[2], row[7], row[3], category))
+        with transaction.atomic():
+            for category, pks in changed.items():
+                detail_model.objects.filter(pk__in=pks).update(category=category)
+            if changes and on_change is not None:
+                on_change(changes)
+
+        examined += len(batch)
+        updated += sum(len(pks) for pks in changed.values())
+        if progress is not None:
+            progress(examined, updated)
+
+    logger.info(f"Categorized {examined} transactions, {updated} changed")
+    return updated
@@ -0,0 +1,72 @@
+"""
+Category rules from the database, compiled once per rules version
+"""
+
+import logging
+import re
+from typing import Optional, Tuple
+
+from django.db.models import Count, Max
+
+from .categorizer import RuleCategorizer
+from .models import CategoryRule
+
+logger = logging.getLogger(__name__)
+
+# Rules version and the categorizer compiled from it, shared by the threads of a process
+_compiled: Tuple[Optional[Tuple], Optional[RuleCategorizer]] = (None, None)
+
+
+def load_categorizer() -> RuleCategorizer:
+    """
+    Compile the active rules, highest priority first.
+
+    Rules whose pattern does not compile are logged and left out rather
+    than stopping every ingest.
+
+    Returns:
+        RuleCategorizer for the rules as stored now
+    """
+    specs = []
+    for rule in CategoryRule.objects.filter(is_active=True).order_by('-priority', 'id'):
+        spec = rule.to_spec()
+        try:
+            RuleCategorizer([spec])
+        except (re.error, ValueError) as e:
+            logger.warning(f"Skipping category rule {rule.id}: {e}")
+            continue
+        specs.append(spec)
+    return RuleCategorizer(specs)
+
+
+def rules_version() -> Tuple:
+    """
+    Current rules version, read from the database so every process sees the same one.
+
+    Saving a rule moves its updated_at, and deleting one lowers the count.
+
+    Returns:
+        Latest updated_at and number of rules
+    """
+    version = CategoryRule.objects.aggregate(updated=Max('updated_at'), count=Count('id'))
+    return version['updated'], version['count']
+
+
+def get_categorizer() -> RuleCategorizer:
+    """
+    Categorizer for the current rules.
+
+    Costs one small aggregate query while the rules version is unchanged;
+    the rules are read and compiled again only after it changes.
+
+    Returns:
+        RuleCategorizer shared by the process
+    """
+    global _compiled
+    version = rules_version()
+    compiled_version, categorizer = _compiled
+    if categorizer is None or compiled_version != version:
+        categorizer = load_categorizer()
+        _compiled = (version, categorizer)
+        logger.debug(f"Compiled {len(categorizer.rules)} category rules for version {version}")
+    return categorizer
@@ -0,0 +1,26 @@
+"""
+Plotly access for the views that draw charts
+"""
+
+from types import ModuleType
+from typing import Any
+
+
+def graph_objects() -> ModuleType:
+    """
+    Return plotly.graph_objs, importing plotly on first use.
+
+    plotly is one of the slowest imports of the project and only a few
+    views draw charts, so it is imported when the first chart is built
+    rather than when the URL configuration imports the views.
+    """
+    import plotly.graph_objs
+
+    return plotly.graph_objs
+
+
+def encode_chart(figure: Any) -> str:
+    """Encode a plotly figure as JSON for Plotly.newPlot in the templates"""
+    import plotly.utils
+
+    return plotly.utils.PlotlyJSONEncoder().encode(figure)
@@ -7,6 +7,34 @@ TRANSFER_KEYWORDS = ['EQ BANK', 'PAY EMP-VENDOR']
 INVESTMENT_KEYWORDS = ['INVESTMENTS', 'QUESTRADE', 'MUTUAL FUNDS', 'GIC']
 PAYMENT_KEYWORDS = ['ROYAL BANK OF CANADA TORONTO', 'PAYMENT RECEIVED']
 
+# Transaction categories, stored on StatementDetail.category
+CATEGORY_TRANSFER = 'transfer'
+CATEGORY_INVESTMENT = 'investment'
+CATEGORY_SPENDING = 'spending'
+CATEGORY_INCOME = 'income'
+CATEGORY_OTHER = 'other'
+CATEGORY_PAYMENT = 'payment'  # Paying off a credit card, which is neither a refund nor income
+CATEGORY_CHOICES = [
+    (CATEGORY_TRANSFER, 'Transfer'),
+    (CATEGORY_INVESTMENT, 'Investment'),
+    (CATEGORY_SPENDING, 'Spending'),
+    (CATEGORY_INCOME, 'Income'),
+    (CATEGORY_OTHER, 'Other'),
+    (CATEGORY_PAYMENT, 'Card payment'),
+]
+
+# How a CategoryRule pattern is compared with a transaction item, ignoring case
+RULE_MATCH_CONTAINS = 'CONTAINS'
+RULE_MATCH_STARTS_WITH = 'STARTS_WITH'
+RULE_MATCH_EXACT = 'EXACT'
+RULE_MATCH_REGEX = 'REGEX'
+RULE_MATCH_CHOICES = [
+    (RULE_MATCH_CONTAINS, 'Contains'),
+    (RULE_MATCH_STARTS_WITH, 'Starts with'),
+    (RULE_MATCH_EXACT, 'Exact'),
+    (RULE_MATCH_REGEX, 'Regular expression'),
+]
+
 # Account types
 ACCOUNT_TYPE_BANK = 'BANK'
 ACCOUNT_TYPE_CREDIT_CARD = 'CREDIT_CARD'
@@ -36,7 +64,59 @@ COMMON_DATE_FORMATS = [
     '%d %b %Y',
     '%d %B %Y'
 ]
+DATE_SAMPLE_SIZE = 50  # Values of a date column used to infer its format
 
 # File upload limits
 MAX_FILE_SIZE_MB = 10
 ALLOWED_EXTENSIONS = ['.csv', '.xlsx', '.xls', '.pdf', '.txt']
+
+# Batch upload settings
+BATCH_MAX_FILES = 100  # Statement files accepted in one batch, after unpacking ZIPs
+BATCH_MAX_TOTAL_BYTES = 100 * 1024 * 1024  # Combined uncompressed size of a ZIP archive
+
+# Ingest settings
+INGEST_BATCH_SIZE = 1000
+CATEGORIZE_BATCH_SIZE = 500  # Stored transactions re-categorized per batch
+MERCHANT_BATCH_SIZE = 500  # Distinct items linked to merchants per batch when backfilling
+MERCHANT_CACHE_SIZE = 10000  # Raw items whose normalized merchant name is kept in memory
+SUMMARY_KEYS_PER_UPDATE = 50  # Monthly summary rows created and incremented per statement
+TREND_YEARS = 5  # Years the monthly trend endpoint covers when no range is given
+TREND_MAX_YEARS = 20  # Longest range of years the monthly trend endpoint accepts
+TOP_MERCHANTS = 10  # Merchants listed by spending on the reports page
+REPORT_RECENT_TRANSACTIONS = 10  # Latest transactions kept per account on the reports page
+REPORT_RECENT_CREDIT_TRANSACTIONS = 20  # Latest credit card transactions listed on the reports page
+INGEST_WORKER_THREADS = 2  # Jobs a worker process runs concurrently
+INGEST_POLL_INTERVAL = 2.0  # Seconds an idle worker waits before polling again
+INGEST_JOB_LEASE_SECONDS = 600  # A running job not heard from for this long is retaken from its dead worker
+INGEST_JOB_MAX_ATTEMPTS = 3  # Claims of one job before it is failed instead of retaken
+
+# Streaming settings
+STREAM_CHUNK_SIZE = 64 * 1024  # Bytes read from an upload per decoder step
+SNIFF_BYTES = 64 * 1024  # Prefix of a text upload used for parser detection
+SNIFF_LINES = 20  # Leading lines of an upload parsers may inspect during detection
+TEXT_EXTENSIONS = ['.csv', '.txt', '.log']
+
+# Text statement settings
+TEXT_LAYOUT_SAMPLE_LINES = 5  # Matched lines of a text statement used to learn its column layout
+
+# Excel settings
+EXCEL_STREAMING_MIN_BYTES = 2 * 1024 * 1024  # Workbooks this large are read in openpyxl read-only mode
+EXCEL_CHUNK_ROWS = 5000  # Rows converted per vectorized step in read-only mode
+
+# PDF settings
+PDF_PARALLEL_MIN_PAGES = 8  # PDFs with fewer pages are extracted in-process
+PDF_MAX_WORKERS = 4  # Processes extracting the pages of one PDF in the ingest worker when not sandboxed
+PDF_PAGES_PER_TASK = 4  # Pages a worker extracts per task; smaller ranges stop sooner
+
+# Parser sandbox limits; settings of the same name override them
+PARSE_TIMEOUT_SECONDS = 60  # Wall-clock time a parser process may run
+PARSE_MAX_MEMORY_MB = 2048  # Address space a parser process may map
+PARSE_MAX_ROWS = 200000  # Transactions one statement may contain
+
+# Benchmark settings
+BENCHMARK_ROW_COUNTS = [1000, 100000, 1000000]  # Synthetic statement sizes benchmarked by default
+BENCHMARK_DETECTION_ITERATIONS = 50  # get_parser() calls averaged per file for detection time
+
+# Server warmup settings
+WARMUP_SAMPLE_ROWS = 20  # Rows of each synthetic format detected and parsed during warmup
+WARMUP_STATEMENTS = 50  # Most recent statements whose cached totals are primed during warmup
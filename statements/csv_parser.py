@@ -3,58 +3,52 @@ CSV statement parser for bank statements
 """
 
 import csv
-import io
 from datetime import datetime
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterator, Optional
 
-from .base import BaseStatementParser
+from .base import StreamingStatementParser, TransactionStream, SniffContext, peek_rows
+from .constants import DATE_SAMPLE_SIZE
+from .dates import DateParser
 
 
-class CSVStatementParser(BaseStatementParser):
+class CSVStatementParser(StreamingStatementParser):
     """Parser for CSV bank statements"""
     
+    # Common column name mappings
+    column_mappings = {
+        'date': ['date', 'transaction_date', 'post_date', 'posting_date'],
+        'description': ['description', 'item', 'transaction', 'memo', 'payee'],
+        'amount': ['amount', 'debit', 'credit', 'transaction_amount']
+    }
+    
     def __init__(self):
         self.supported_formats = ['.csv']
     
-    def can_parse(self, file_content: bytes, filename: str) -> bool:
-        return filename.lower().endswith('.csv')
+    def can_parse(self, file_content: bytes, filename: str, context: Optional[SniffContext] = None) -> bool:
+        return self._sniff(file_content, filename, context).extension == '.csv'
     
-    def parse(self, file_content: bytes, filename: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
-        try:
-            # Try to decode as UTF-8 first
-            content = file_content.decode('utf-8')
-        except UnicodeDecodeError:
-            # Fallback to other encodings
-            for encoding in ['latin-1', 'cp1252', 'iso-8859-1']:
-                try:
-                    content = file_content.decode(encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            else:
-                raise ValueError("Could not decode CSV file")
-        
-        # Parse CSV content
-        csv_reader = csv.DictReader(io.StringIO(content))
-        rows = list(csv_reader)
-        
-        if not rows:
-            raise ValueError("CSV file is empty or has no data rows")
+    def _iter_transactions(self, lines: Iterator[str], stream: TransactionStream) -> Iterator[Dict[str, Any]]:
+        """Parse CSV rows one at a time"""
+        # Infer the date format once from the leading rows of the file
+        sample, rows = peek_rows(csv.DictReader(lines), DATE_SAMPLE_SIZE)
+        date_parser = None
+        if sample:
+            date_col = self._find_column(sample[0], self.column_mappings['date'])
+            if date_col:
+                date_parser = DateParser.from_samples(row.get(date_col) for row in sample)
         
-        # Extract statement metadata from first row or filename
-        statement_meta = self._extract_statement_meta(filename, rows[0])
-        
-        # Parse transaction details
-        transactions = []
+        row_count = 0
         for row in rows:
-            transaction = self._parse_transaction_row(row)
+            row_count += 1
+            transaction = self._parse_transaction_row(row, date_parser)
             if transaction:
-                transactions.append(transaction)
+                yield transaction
         
-        return statement_meta, transactions
+        if not row_count:
+            raise ValueError("CSV file is empty or has no data rows")
     
-    def _extract_statement_meta(self, filename: str, first_row: Dict[str, str]) -> Dict[str, Any]:
-        """Extract statement metadata from filename and first row"""
+    def _initial_statement_meta(self, filename: str) -> Dict[str, Any]:
+        """Extract statement metadata from filename; the date range is filled in while streaming"""
         # Default values
         meta = {
             'bank_name': 'Unknown Bank',
@@ -76,32 +70,11 @@ class CSVStatementParser(BaseStatementParser):
         elif 'citibank' in filename_lower:
             meta['bank_name'] = 'Citibank'
         
-        # Try to extract dates from column names or data
-        date_columns = [col for col in first_row.keys() if 'date' in col.lower()]
-        if date_columns:
-            dates = []
-            for col in date_columns:
-                if first_row[col]:
-                    try:
-                        dates.append(self._parse_date(first_row[col]))
-                    except:
-                        continue
-            
-            if len(dates) >= 2:
-                dates.sort()
-                meta['statement_from_date'] = dates[0]
-                meta['statement_to_date'] = dates[-1]
-        
         return meta
     
-    def _parse_transaction_row(self, row: Dict[str, str]) -> Dict[str, Any]:
+    def _parse_transaction_row(self, row: Dict[str, str], date_parser: Optional[DateParser] = None) -> Dict[str, Any]:
         """Parse a single transaction row"""
-        # Common column name mappings
-        column_mappings = {
-            'date': ['date', 'transaction_date', 'post_date', 'posting_date'],
-            'description': ['description', 'item', 'transaction', 'memo', 'payee'],
-            'amount': ['amount', 'debit', 'credit', 'transaction_amount']
-        }
+        column_mappings = self.column_mappings
         
         # Find the actual column names
         date_col = self._find_column(row, column_mappings['date'])
@@ -112,7 +85,7 @@ class CSVStatementParser(BaseStatementParser):
             return None
         
         # Parse the data
-        transaction_date = self._parse_date(row[date_col])
+        transaction_date = self._parse_date(row[date_col], date_parser)
         item = row.get(desc_col, 'Unknown Transaction') if desc_col else 'Unknown Transaction'
         amount, direction = self._parse_amount(row[amount_col])
         
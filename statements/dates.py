@@ -0,0 +1,183 @@
+"""
+Date-column engine for bank statement parsing
+"""
+
+import logging
+from datetime import datetime, date
+from typing import List, Optional, Iterable, Sequence, Any
+
+from .constants import COMMON_DATE_FORMATS, DATE_SAMPLE_SIZE
+from .exceptions import DateParsingError
+
+logger = logging.getLogger(__name__)
+
+
+def _strptime(value: str, date_format: str) -> Optional[date]:
+    """Parse a value with one format, returning None instead of raising"""
+    try:
+        return datetime.strptime(value, date_format).date()
+    except ValueError:
+        return None
+
+
+def _disorder(dates: List[date]) -> int:
+    """Count how far a date sequence is from being sorted in either direction"""
+    pairs = list(zip(dates, dates[1:]))
+    backwards = sum(1 for earlier, later in pairs if later < earlier)
+    forwards = sum(1 for earlier, later in pairs if later > earlier)
+    return min(backwards, forwards)
+
+
+def infer_date_format(samples: Iterable[Any], formats: Sequence[str] = COMMON_DATE_FORMATS) -> Optional[str]:
+    """
+    Infer the date format of a column from a sample of its values.
+
+    The format that parses the most samples wins. Ambiguous day/month
+    orders such as '%m/%d/%Y' and '%d/%m/%Y' are usually settled by a
+    sample with a day above 12. If both still parse every sample, the
+    format whose dates run in a consistent order is preferred, since
+    statements list transactions chronologically. Remaining ties go to
+    the earlier format in the list.
+
+    Args:
+        samples: Raw values from the date column
+        formats: Candidate strptime formats in priority order
+
+    Returns:
+        The inferred format, or None if no format parses any sample
+    """
+    values = [str(value).strip() for value in samples if value is not None and str(value).strip()]
+    if not values:
+        return None
+
+    best_format = None
+    best_key = None
+    for priority, date_format in enumerate(formats):
+        parsed = [_strptime(value, date_format) for value in values]
+        matched = [value for value in parsed if value is not None]
+        if not matched:
+            continue
+
+        key = (len(matched), -_disorder(matched), -priority)
+        if best_key is None or key > best_key:
+            best_format, best_key = date_format, key
+
+    logger.debug(f"Inferred date format {best_format!r} from {len(values)} samples")
+    return best_format
+
+
+def parse_date_value(value: Any, formats: Sequence[str] = COMMON_DATE_FORMATS) -> date:
+    """
+    Parse a single date by trying every known format, then pandas.
+
+    Args:
+        value: Date string
+        formats: Candidate strptime formats in priority order
+
+    Returns:
+        datetime.date object
+
+    Raises:
+        DateParsingError: If the value cannot be parsed
+    """
+    text = str(value).strip()
+    for date_format in formats:
+        parsed = _strptime(text, date_format)
+        if parsed is not None:
+            return parsed
+
+    # If none of the formats work, try pandas parsing
+    import pandas as pd
+    try:
+        return pd.to_datetime(text).date()
+    except Exception as e:
+        logger.error(f"Could not parse date: {value}", exc_info=True)
+        raise DateParsingError(f"Failed to parse date: {value}") from e
+
+
+class DateParser:
+    """
+    Date parser locked to one format per file.
+
+    Values are parsed with the locked format in a single strptime call.
+    Only values that do not match it fall back to the full format search.
+    """
+
+    def __init__(self, date_format: Optional[str] = None, formats: Sequence[str] = COMMON_DATE_FORMATS):
+        self.date_format = date_format
+        self.formats = formats
+        self.fallbacks = 0
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[Any], formats: Sequence[str] = COMMON_DATE_FORMATS) -> 'DateParser':
+        """Build a parser locked to the format inferred from a sample of the column"""
+        return cls(infer_date_format(samples, formats), formats)
+
+    def parse(self, value: Any) -> date:
+        """
+        Parse one date value.
+
+        Args:
+            value: Date string
+
+        Returns:
+            datetime.date object
+
+        Raises:
+            DateParsingError: If the value cannot be parsed
+        """
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+
+        text = str(value).strip()
+        if self.date_format:
+            parsed = _strptime(text, self.date_format)
+            if parsed is not None:
+                return parsed
+
+        self.fallbacks += 1
+        return parse_date_value(text, self.formats)
+
+    def parse_column(self, values: Sequence[Any]) -> List[Optional[date]]:
+        """
+        Parse a whole date column in one vectorized call.
+
+        The format is inferred from the first DATE_SAMPLE_SIZE values if the
+        parser is not locked yet. Values the vectorized pass cannot read go
+        through parse() individually.
+
+        Args:
+            values: Date column values; strings, datetimes or blanks
+
+        Returns:
+            List of dates aligned with values, None where a value is blank
+            or cannot be parsed
+        """
+        values = list(values)
+        if self.date_format is None:
+            text_samples = [value for value in values[:DATE_SAMPLE_SIZE] if isinstance(value, str)]
+            self.date_format = infer_date_format(text_samples, self.formats)
+
+        import pandas as pd
+
+        series = pd.Series(values, dtype=object)
+        blank = series.isna() | series.astype(str).str.strip().eq('')
+        if self.date_format:
+            parsed = pd.to_datetime(series.astype(str).str.strip(), format=self.date_format, errors='coerce')
+        else:
+            parsed = pd.Series(pd.NaT, index=series.index)
+
+        results = []
+        for value, is_blank, timestamp in zip(values, blank, parsed):
+            if is_blank:
+                results.append(None)
+            elif not pd.isna(timestamp):
+                results.append(timestamp.date())
+            else:
+                try:
+                    results.append(self.parse(value))
+                except DateParsingError:
+                    results.append(None)
+        return results
@@ -3,15 +3,23 @@ Excel statement parser for bank statements
 """
 
 import pandas as pd
+import openpyxl
 import io
 from datetime import datetime
-from typing import List, Dict, Any, Tuple
+from itertools import islice
+from typing import List, Dict, Any, Tuple, Optional, Iterator, Sequence, BinaryIO
 import logging
 
-from .base import BaseStatementParser
+from .amounts import parse_amount_column
+from .base import BaseStatementParser, SniffContext, TransactionStream
+from .constants import EXCEL_CHUNK_ROWS, EXCEL_STREAMING_MIN_BYTES
+from .dates import DateParser
 
 logger = logging.getLogger(__name__)
 
+DESCRIPTION_WORDS = ['description', 'item', 'transaction', 'memo', 'payee']
+AMOUNT_WORDS = ['amount', 'debit', 'credit', 'transaction']
+
 
 class ExcelStatementParser(BaseStatementParser):
     """Parser for Excel bank statements"""
@@ -19,34 +27,40 @@ class ExcelStatementParser(BaseStatementParser):
     def __init__(self):
         self.supported_formats = ['.xlsx', '.xls']
     
-    def can_parse(self, file_content: bytes, filename: str) -> bool:
-        return filename.lower().endswith(('.xlsx', '.xls'))
+    def can_parse(self, file_content: bytes, filename: str, context: Optional[SniffContext] = None) -> bool:
+        return self._sniff(file_content, filename, context).extension in ('.xlsx', '.xls')
     
     def parse(self, file_content: bytes, filename: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
-        try:
-            # Read Excel file
-            df = pd.read_excel(io.BytesIO(file_content), engine='openpyxl')
-        except Exception as e:
-            logger.error(f"Error reading Excel file: {e}")
-            raise ValueError(f"Could not read Excel file: {e}")
-        
-        if df.empty:
-            raise ValueError("Excel file is empty or has no data")
-        
-        # Extract statement metadata
-        statement_meta = self._extract_statement_meta(filename, df)
-        
-        # Parse transaction details
-        transactions = []
-        for _, row in df.iterrows():
-            transaction = self._parse_transaction_row(row)
-            if transaction:
-                transactions.append(transaction)
+        return self.stream(io.BytesIO(file_content), filename).collect()
+    
+    def stream(self, file_obj: BinaryIO, filename: str) -> TransactionStream:
+        """
+        Parse a workbook and return a stream of transactions.
+
+        Workbooks below EXCEL_STREAMING_MIN_BYTES are loaded into DataFrames.
+        Larger ones are read through openpyxl's read-only mode in chunks of
+        EXCEL_CHUNK_ROWS, so a sheet is never materialized as a whole.
+
+        Args:
+            file_obj: Seekable binary file-like object
+            filename: Name of the file
+
+        Returns:
+            TransactionStream over every sheet with date and amount columns
+        """
+        file_obj.seek(0, io.SEEK_END)
+        size = file_obj.tell()
+        file_obj.seek(0)
         
-        return statement_meta, transactions
+        if size >= EXCEL_STREAMING_MIN_BYTES:
+            logger.debug(f"Streaming {size} byte workbook {filename} in read-only mode")
+            records = self._iter_workbook(file_obj)
+        else:
+            records = self._iter_dataframes(file_obj)
+        return TransactionStream(self._initial_statement_meta(filename), records)
     
-    def _extract_statement_meta(self, filename: str, df: pd.DataFrame) -> Dict[str, Any]:
-        """Extract statement metadata from filename and dataframe"""
+    def _initial_statement_meta(self, filename: str) -> Dict[str, Any]:
+        """Extract statement metadata from filename; the date range is filled in while streaming"""
         meta = {
             'bank_name': 'Unknown Bank',
             'account_number': 'Unknown',
@@ -67,60 +81,111 @@ class ExcelStatementParser(BaseStatementParser):
         elif 'citibank' in filename_lower:
             meta['bank_name'] = 'Citibank'
         
-        # Try to find date columns and extract date range
-        date_columns = [col for col in df.columns if 'date' in str(col).lower()]
-        if date_columns:
-            dates = []
-            for col in date_columns:
-                for date_val in df[col].dropna():
-                    try:
-                        if pd.notna(date_val):
-                            if isinstance(date_val, str):
-                                parsed_date = self._parse_date(date_val)
-                            else:
-                                parsed_date = pd.to_datetime(date_val).date()
-                            dates.append(parsed_date)
-                    except:
-                        continue
-            
-            if dates:
-                dates.sort()
-                meta['statement_from_date'] = dates[0]
-                meta['statement_to_date'] = dates[-1]
-        
         return meta
     
-    def _parse_transaction_row(self, row: pd.Series) -> Dict[str, Any]:
-        """Parse a single transaction row"""
-        # Find columns by name patterns
-        date_col = None
-        desc_col = None
-        amount_col = None
-        
-        for col in row.index:
+    def _resolve_columns(self, header: Sequence[Any]) -> Optional[Dict[str, int]]:
+        """Map the date, description and amount roles to column positions once per sheet"""
+        roles = {}
+        for position, col in enumerate(header):
+            if col is None:
+                continue
             col_str = str(col).lower()
             if 'date' in col_str:
-                date_col = col
-            elif any(word in col_str for word in ['description', 'item', 'transaction', 'memo', 'payee']):
-                desc_col = col
-            elif any(word in col_str for word in ['amount', 'debit', 'credit', 'transaction']):
-                amount_col = col
+                roles['date'] = position
+            elif any(word in col_str for word in DESCRIPTION_WORDS):
+                roles['description'] = position
+            elif any(word in col_str for word in AMOUNT_WORDS):
+                roles['amount'] = position
         
-        if date_col is None or amount_col is None:
+        if 'date' not in roles or 'amount' not in roles:
             return None
+        return roles
+    
+    def _iter_dataframes(self, file_obj: BinaryIO) -> Iterator[Dict[str, Any]]:
+        """Load every sheet into a DataFrame and convert its columns as whole Series"""
+        try:
+            sheets = pd.read_excel(file_obj, sheet_name=None, engine='openpyxl')
+        except Exception as e:
+            logger.error(f"Error reading Excel file: {e}")
+            raise ValueError(f"Could not read Excel file: {e}")
+        
+        if all(df.empty for df in sheets.values()):
+            raise ValueError("Excel file is empty or has no data")
+        
+        for sheet_name, df in sheets.items():
+            roles = self._resolve_columns(list(df.columns))
+            if roles is None:
+                logger.debug(f"Skipping sheet {sheet_name}: no date and amount columns")
+                continue
+            
+            description = df.iloc[:, roles['description']] if 'description' in roles else None
+            yield from self._build_transactions(
+                df.iloc[:, roles['date']],
+                description,
+                df.iloc[:, roles['amount']],
+                DateParser()
+            )
+    
+    def _iter_workbook(self, file_obj: BinaryIO) -> Iterator[Dict[str, Any]]:
+        """Stream every sheet through openpyxl's read-only mode in fixed-size chunks"""
+        try:
+            workbook = openpyxl.load_workbook(file_obj, read_only=True, data_only=True)
+        except Exception as e:
+            logger.error(f"Error reading Excel file: {e}")
+            raise ValueError(f"Could not read Excel file: {e}")
         
-        # Parse the data
         try:
-            transaction_date = self._parse_date(str(row[date_col]))
-            item = str(row.get(desc_col, 'Unknown Transaction')) if desc_col else 'Unknown Transaction'
-            amount, direction = self._parse_amount(str(row[amount_col]))
+            data_rows = 0
+            for sheet in workbook.worksheets:
+                rows = sheet.iter_rows(values_only=True)
+                roles = self._resolve_columns(next(rows, None) or [])
+                if roles is None:
+                    logger.debug(f"Skipping sheet {sheet.title}: no date and amount columns")
+                    continue
+                
+                # One parser per sheet so the date format inferred from the first chunk sticks
+                date_parser = DateParser()
+                while True:
+                    chunk = list(islice(rows, EXCEL_CHUNK_ROWS))
+                    if not chunk:
+                        break
+                    data_rows += len(chunk)
+                    
+                    columns = {
+                        role: [row[position] if position < len(row) else None for row in chunk]
+                        for role, position in roles.items()
+                    }
+                    yield from self._build_transactions(
+                        columns['date'], columns.get('description'), columns['amount'], date_parser
+                    )
             
-            return {
-                'item': item,
+            if not data_rows:
+                raise ValueError("Excel file is empty or has no data")
+        finally:
+            workbook.close()
+    
+    def _build_transactions(self, dates: Sequence[Any], descriptions: Optional[Sequence[Any]],
+                            amounts: Sequence[Any], date_parser: DateParser) -> Iterator[Dict[str, Any]]:
+        """Convert whole date, description and amount columns and yield one dict per usable row"""
+        parsed_dates = date_parser.parse_column(dates)
+        parsed_amounts = parse_amount_column(amounts)
+        amount_blank = pd.Series(list(amounts), dtype=object).isna().to_numpy()
+        bad_rows = set(parsed_amounts.bad_rows)
+        
+        if descriptions is None:
+            items = ['Unknown Transaction'] * len(parsed_dates)
+        else:
+            series = pd.Series(list(descriptions), dtype=object)
+            items = series.where(series.notna(), 'Unknown Transaction').astype(str).tolist()
+        
+        for index, transaction_date in enumerate(parsed_dates):
+            # Rows without a date or amount are totals, notes or spacing
+            if transaction_date is None or amount_blank[index] or index in bad_rows:
+                continue
+            
+            yield {
+                'item': items[index],
                 'transaction_date': transaction_date,
-                'amount': amount,
-                'direction': direction
+                'amount': parsed_amounts.amount(index),
+                'direction': parsed_amounts.directions[index]
             }
-        except Exception as e:
-            logger.warning(f"Error parsing row: {e}")
-            return None
@@ -31,3 +31,24 @@ class DateParsingError(StatementParsingError):
 class AmountParsingError(StatementParsingError):
     """Raised when amount parsing fails"""
     pass
+
+
+class FormatSpecError(StatementParsingError):
+    """Raised when a declarative bank format spec is invalid"""
+    pass
+
+
+class ParserLimitError(StatementParsingError):
+    """Raised when a sandboxed parser exceeds a resource limit"""
+
+    def __init__(self, message: str, reason: str, limit=None):
+        super().__init__(message)
+        self.reason = reason
+        self.limit = limit
+
+    def __reduce__(self):
+        return (self.__class__, (str(self), self.reason, self.limit))
+
+    def to_dict(self):
+        """Structured description of the exceeded limit"""
+        return {'error': str(self), 'reason': self.reason, 'limit': self.limit}
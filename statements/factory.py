@@ -2,49 +2,179 @@
 Factory class for creating appropriate statement parsers
 """
 
-from typing import List, Dict, Any, Tuple
+import functools
+import importlib
+import os
+from typing import List, Dict, Any, Tuple, BinaryIO, FrozenSet, NamedTuple, Optional, TYPE_CHECKING
 import logging
 
-from .base import BaseStatementParser
-from .amex_parser import AmexCreditCardParser
-from .td_parser import TDChequeAccountParser
-from .td_credit_parser import TDCreditCardParser
-from .csv_parser import CSVStatementParser
-from .excel_parser import ExcelStatementParser
-from .text_parser import TextStatementParser
-from .wealthsimple_parser import WealthsimpleRRSPParser
-from .rbc_business_parser import RBCBusinessParser
-from .eq_joint_parser import EQJointParser
-from .bmo_parser import BMOBankParser
+from .base import BaseStatementParser, TransactionStream, SniffContext, normalize_header
+from .constants import SNIFF_BYTES, TEXT_EXTENSIONS
 from .exceptions import ParserNotFoundError, StatementParsingError
 
+if TYPE_CHECKING:
+    # The package imports this module before the app registry is ready
+    from .models import Account
+
 logger = logging.getLogger(__name__)
 
 
+class ParserEntry(NamedTuple):
+    """A registered parser, imported the first time it is needed"""
+    name: str
+    module: Optional[str]  # None for parsers compiled from a format spec
+    extensions: Tuple[str, ...]
+
+    def load(self) -> type:
+        """Import and return the parser class"""
+        if self.module is None:
+            from .format_specs import compile_format
+            return compile_format(self.name)
+        return getattr(importlib.import_module(self.module), self.name)
+
+
+# Bank-specific parsers in priority order
+BANK_PARSERS = [
+    ParserEntry('WealthsimpleRRSPParser', 'statements.wealthsimple_parser', ('.pdf',)),  # First for PDF priority
+    ParserEntry('AmexCreditCardParser', 'statements.amex_parser', ('.csv',)),
+    ParserEntry('TDChequeAccountParser', 'statements.td_parser', ('.csv',)),
+    ParserEntry('TDCreditCardParser', 'statements.td_credit_parser', ('.csv',)),
+    ParserEntry('RBCBusinessParser', 'statements.rbc_business_parser', ('.csv',)),
+    ParserEntry('EQJointParser', 'statements.eq_joint_parser', ('.csv',)),
+    ParserEntry('BMOBankParser', 'statements.bmo_parser', ('.csv',)),
+]
+
+# Generic fallbacks, tried after every bank-specific parser
+GENERIC_PARSERS = [
+    ParserEntry('CSVStatementParser', 'statements.csv_parser', ('.csv',)),
+    ParserEntry('ExcelStatementParser', 'statements.excel_parser', ('.xlsx', '.xls')),
+    ParserEntry('TextStatementParser', 'statements.text_parser', ('.txt', '.log')),
+]
+# Generic parsers accept files of many banks, so they are never remembered per account
+GENERIC_PARSER_NAMES = frozenset(entry.name for entry in GENERIC_PARSERS)
+
+
+@functools.lru_cache(maxsize=None)
+def parser_registry() -> Tuple[ParserEntry, ...]:
+    """
+    Every parser the factory can use, in priority order.
+
+    Banks added as format specs only rank after the built-in formats.
+    Reading the specs is the only work done here; no parser module is
+    imported until a file with one of its extensions is detected.
+
+    Returns:
+        Tuple of ParserEntry
+    """
+    from .format_specs import compiled_formats
+
+    built_in = {entry.name for entry in BANK_PARSERS + GENERIC_PARSERS}
+    specs = [
+        ParserEntry(name, None, (parser_class.spec.extension,))
+        for name, parser_class in compiled_formats().items() if name not in built_in
+    ]
+    return tuple(BANK_PARSERS + specs + GENERIC_PARSERS)
+
+
 class StatementParserFactory:
-    """Factory class for creating appropriate parsers"""
+    """
+    Factory class for creating appropriate parsers.
+
+    Parsers are instantiated on first use, so detecting a CSV file never
+    imports the PDF or Excel parsers and the libraries behind them.
+    """
     
     def __init__(self):
-        self.parsers = [
-            WealthsimpleRRSPParser(),  # Add Wealthsimple parser first for PDF priority
-            AmexCreditCardParser(),    # Add Amex parser second for priority
-            TDChequeAccountParser(),   # Add TD parser third for priority
-            TDCreditCardParser(),      # Add TD credit card parser fourth for priority
-            RBCBusinessParser(),       # Add RBC Business parser for specific CSV format
-            EQJointParser(),           # Add EQ Joint parser for specific CSV format
-            BMOBankParser(),           # Add BMO Bank parser for specific CSV format
-            CSVStatementParser(),
-            ExcelStatementParser(),
-            TextStatementParser(),
-        ]
+        self._instances: Dict[str, BaseStatementParser] = {}
+    
+    def _load(self, entry: ParserEntry) -> BaseStatementParser:
+        """Return the factory's instance of a registered parser"""
+        parser = self._instances.get(entry.name)
+        if parser is None:
+            parser = self._instances[entry.name] = entry.load()()
+        return parser
+    
+    def parsers_for(self, extension: str) -> List[BaseStatementParser]:
+        """
+        Parsers that read files with an extension, in priority order.
+
+        Args:
+            extension: Lowercase file extension including the dot
+
+        Returns:
+            List of parser instances
+        """
+        return [self._load(entry) for entry in parser_registry() if extension in entry.extensions]
+    
+    def parser_by_name(self, name: str) -> Optional[BaseStatementParser]:
+        """Parser instance for a class name, or None if no such parser is registered"""
+        for entry in parser_registry():
+            if entry.name == name:
+                return self._load(entry)
+        return None
+    
+    @property
+    def parsers(self) -> List[BaseStatementParser]:
+        """Every parser in priority order; imports all parser modules"""
+        return [self._load(entry) for entry in parser_registry()]
+    
+    @functools.cached_property
+    def header_index(self) -> Dict[FrozenSet[str], BaseStatementParser]:
+        """Header signature lookup table over the parsers for text formats"""
+        return self._build_header_index()
+    
+    def _build_header_index(self) -> Dict[FrozenSet[str], BaseStatementParser]:
+        """
+        Compile parser header signatures into a normalized-header lookup table.
+
+        When two parsers declare the same signature the one earlier in the
+        priority list wins, matching what the linear scan would pick.
+
+        Returns:
+            Dict mapping normalize_header() keys to parser instances
+        """
+        index = {}
+        parsers = []
+        for extension in sorted(TEXT_EXTENSIONS):
+            parsers += [parser for parser in self.parsers_for(extension) if parser not in parsers]
+        for parser in parsers:
+            for signature in parser.header_signatures:
+                key = normalize_header(signature)
+                if key in index:
+                    logger.warning(
+                        f"Header signature of {parser.__class__.__name__} is already claimed by "
+                        f"{index[key].__class__.__name__}"
+                    )
+                    continue
+                index[key] = parser
+        return index
+    
+    def _try_parser(self, parser: BaseStatementParser, file_content: bytes, filename: str,
+                    context: SniffContext) -> bool:
+        """Run a parser's can_parse() check, treating errors as no match"""
+        try:
+            return parser.can_parse(file_content, filename, context)
+        except Exception as e:
+            logger.warning(f"Parser {parser.__class__.__name__} failed to check file: {e}")
+            return False
     
-    def get_parser(self, file_content: bytes, filename: str) -> BaseStatementParser:
+    def get_parser(self, file_content: bytes, filename: str, account: Optional['Account'] = None) -> BaseStatementParser:
         """
         Get the appropriate parser for the given file.
 
+        A single SniffContext is shared by every parser tried, so the upload
+        is decoded at most once, and only a bounded prefix of it.
+
+        Candidates are tried in this order:
+        1. The parser whose header signature matches the file's header row
+        2. The bank-specific parser that last succeeded for the account
+        3. Every parser for the file's extension in priority order, for
+           headerless formats such as TD
+
         Args:
             file_content: Raw file content as bytes
             filename: Name of the file
+            account: Account the statement belongs to, if known
 
         Returns:
             Parser instance that can handle the file
@@ -53,26 +183,58 @@ class StatementParserFactory:
             ParserNotFoundError: If no suitable parser is found
         """
         logger.info(f"Attempting to find parser for file: {filename}")
+        context = SniffContext(file_content, filename)
+        tried = set()
 
-        for parser in self.parsers:
-            try:
-                if parser.can_parse(file_content, filename):
-                    logger.info(f"Selected parser: {parser.__class__.__name__}")
-                    return parser
-            except Exception as e:
-                logger.warning(f"Parser {parser.__class__.__name__} failed to check file: {e}")
+        candidates = []
+        if context.extension in TEXT_EXTENSIONS:
+            candidates.append(self.header_index.get(context.header_key))
+        if account is not None and account.last_parser and account.last_parser not in GENERIC_PARSER_NAMES:
+            candidates.append(self.parser_by_name(account.last_parser))
+
+        for parser in candidates:
+            if parser is None or id(parser) in tried:
+                continue
+            tried.add(id(parser))
+            if self._try_parser(parser, file_content, filename, context):
+                logger.info(f"Selected parser: {parser.__class__.__name__} (direct match)")
+                return parser
+
+        for parser in self.parsers_for(context.extension):
+            if id(parser) in tried:
                 continue
+            if self._try_parser(parser, file_content, filename, context):
+                logger.info(f"Selected parser: {parser.__class__.__name__}")
+                return parser
 
         logger.error(f"No parser found for file: {filename}")
         raise ParserNotFoundError(f"No parser found for file: {filename}")
     
-    def parse_statement(self, file_content: bytes, filename: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    def remember_parser(self, account: 'Account', parser_name: str) -> None:
+        """
+        Record the parser that successfully read a statement for an account.
+
+        Generic parsers are not recorded: trying one first would take files
+        a bank-specific parser reads better, such as headerless TD exports.
+
+        Args:
+            account: Account the statement belongs to
+            parser_name: Class name of the parser that read it
+        """
+        if not parser_name or parser_name in GENERIC_PARSER_NAMES or account.last_parser == parser_name:
+            return
+        type(account).objects.filter(pk=account.pk).update(last_parser=parser_name)
+        account.last_parser = parser_name
+    
+    def parse_statement(self, file_content: bytes, filename: str,
+                        account: Optional['Account'] = None) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
         """
         Parse a statement file using the appropriate parser.
 
         Args:
             file_content: Raw file content as bytes
             filename: Name of the file
+            account: Account the statement belongs to; remembers the parser on success
 
         Returns:
             Tuple of (statement_metadata, transactions_list)
@@ -82,11 +244,56 @@ class StatementParserFactory:
             StatementParsingError: If parsing fails
         """
         try:
-            parser = self.get_parser(file_content, filename)
+            parser = self.get_parser(file_content, filename, account)
             logger.info(f"Parsing statement with {parser.__class__.__name__}")
-            return parser.parse(file_content, filename)
+            result = parser.parse(file_content, filename)
+            if account is not None:
+                self.remember_parser(account, parser.__class__.__name__)
+            return result
         except ParserNotFoundError:
             raise
         except Exception as e:
             logger.error(f"Error parsing statement: {e}", exc_info=True)
             raise StatementParsingError(f"Failed to parse statement: {str(e)}") from e
+
+    def stream_statement(self, file_obj: BinaryIO, filename: str,
+                         account: Optional['Account'] = None) -> TransactionStream:
+        """
+        Parse a statement file object incrementally using the appropriate parser.
+
+        Formats other than PDF are detected from a bounded prefix of the upload,
+        then the file is rewound and handed to the parser's stream() so transactions can
+        be consumed in batches without holding the decoded file in memory.
+        Call remember_parser() with the stream's parser_name once it has been
+        consumed successfully.
+
+        Args:
+            file_obj: Seekable binary file-like object
+            filename: Name of the file
+            account: Account the statement belongs to, if known
+
+        Returns:
+            TransactionStream whose meta is final once it has been consumed
+
+        Raises:
+            ParserNotFoundError: If no suitable parser is found
+            StatementParsingError: If parsing fails
+        """
+        extension = os.path.splitext(filename)[1].lower()
+        if extension == '.pdf':
+            # PDF detection opens the document, which needs the whole file
+            detection_content = file_obj.read()
+        else:
+            detection_content = file_obj.read(SNIFF_BYTES)
+        file_obj.seek(0)
+
+        parser = self.get_parser(detection_content, filename, account)
+        logger.info(f"Streaming statement with {parser.__class__.__name__}")
+        try:
+            stream = parser.stream(file_obj, filename)
+        except Exception as e:
+            logger.error(f"Error parsing statement: {e}", exc_info=True)
+            raise StatementParsingError(f"Failed to parse statement: {str(e)}") from e
+        stream.wrap_errors = True
+        stream.parser_name = parser.__class__.__name__
+        return stream
@@ -0,0 +1,66 @@
+"""
+Transaction fingerprints for merging overlapping statement imports
+"""
+
+import re
+import hashlib
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+from typing import Any, Tuple
+
+ITEM_WHITESPACE_REGEX = re.compile(r'\s+')
+
+
+def normalize_item(item: Any) -> str:
+    """Normalize a transaction description for matching: case-folded with single spaces"""
+    return ITEM_WHITESPACE_REGEX.sub(' ', str(item or '')).strip().casefold()
+
+
+def amount_to_cents(amount: Any) -> int:
+    """Convert a Decimal, number or numeric string amount to integer cents"""
+    return int(Decimal(str(amount)).scaleb(2).to_integral_value())
+
+
+def transaction_key(transaction_date: date, amount: Any, direction: str, item: Any) -> Tuple[str, int, str, str]:
+    """Identity of a transaction within an account, before occurrence numbering"""
+    return (transaction_date.isoformat(), amount_to_cents(amount), direction, normalize_item(item))
+
+
+def fingerprint(account_id: int, key: Tuple[str, int, str, str], occurrence: int) -> str:
+    """
+    Hash one occurrence of a transaction in an account.
+
+    Args:
+        account_id: Account the transaction belongs to
+        key: Result of transaction_key()
+        occurrence: 0 for the first identical transaction in a statement, 1 for the next, ...
+
+    Returns:
+        Hex SHA-256 fingerprint
+    """
+    transaction_date, cents, direction, item = key
+    raw = f"{account_id}|{transaction_date}|{cents}|{direction}|{item}|{occurrence}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class FingerprintCounter:
+    """
+    Assigns fingerprints to the transactions of one statement in order.
+
+    Identical transactions on the same day, such as two equal coffee
+    purchases, get successive occurrence numbers. Re-importing the same
+    statement, or one that overlaps it, reproduces the same fingerprints,
+    while a genuinely extra copy gets the next number and is inserted.
+    """
+
+    def __init__(self, account_id: int):
+        self.account_id = account_id
+        self.occurrences = Counter()
+
+    def next(self, transaction_date: date, amount: Any, direction: str, item: Any) -> str:
+        """Fingerprint the next transaction of the statement"""
+        key = transaction_key(transaction_date, amount, direction, item)
+        occurrence = self.occurrences[key]
+        self.occurrences[key] += 1
+        return fingerprint(self.account_id, key, occurrence)
@@ -0,0 +1,396 @@
+"""
+Declarative CSV bank formats compiled into streaming parsers
+"""
+
+import csv
+import functools
+import glob
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import yaml
+
+from .amounts import cents_to_decimal, match_amount
+from .base import CSVRowStatementParser, SkipRow, SniffContext, TransactionStream, peek_rows
+from .constants import COMMON_DATE_FORMATS, DATE_SAMPLE_SIZE, DIRECTION_IN, DIRECTION_OUT
+from .dates import DateParser
+from .exceptions import DateParsingError, FormatSpecError, StatementParsingError
+
+FORMAT_SPEC_DIR = os.path.join(os.path.dirname(__file__), 'formats')
+
+COLUMN_ROLES = ('date', 'description', 'amount', 'type', 'account_number')
+REQUIRED_ROLES = ('date', 'amount')
+ABBR_SUFFIXES = ('last_4', 'last_group')
+SPEC_KEYS = {
+    'name', 'description', 'version', 'extension', 'meta', 'header', 'detect',
+    'columns', 'date', 'amount', 'rules', 'account', 'strip_chars',
+}
+
+
+class ColumnRole:
+    """
+    How one field of a transaction is read from the columns of a row.
+
+    A role names a single column, a list of alternative names of which the
+    first present in the header is used, or a mapping with ``join`` (the
+    non-empty values of every listed column, space separated) or
+    ``coalesce`` (the first non-empty value). Names match the header
+    case-insensitively, ignoring surrounding whitespace.
+    """
+
+    def __init__(self, names: List[str], mode: str = 'first'):
+        self.names = names
+        self.mode = mode
+
+    @classmethod
+    def from_spec(cls, role: str, value: Any) -> 'ColumnRole':
+        if isinstance(value, str):
+            return cls([value])
+        if isinstance(value, list) and value and all(isinstance(name, str) for name in value):
+            return cls(value)
+        if isinstance(value, dict) and len(value) == 1:
+            mode, names = next(iter(value.items()))
+            if mode in ('join', 'coalesce') and isinstance(names, list) and names:
+                return cls([str(name) for name in names], mode)
+        raise FormatSpecError(f"Column role {role!r} must be a name, a list of names, or a join/coalesce mapping")
+
+    def resolve(self, header_index: Dict[str, int]) -> Optional[List[int]]:
+        """Column indexes this role reads in a file with the given header, or None if absent"""
+        indexes = [header_index[name.strip().lower()] for name in self.names if name.strip().lower() in header_index]
+        if not indexes:
+            return None
+        return indexes[:1] if self.mode == 'first' else indexes
+
+    def getter(self, indexes: List[int], strip_chars: Optional[str]) -> Callable[[List[str]], str]:
+        """Build the function reading this role's value from a row"""
+        if len(indexes) == 1:
+            index = indexes[0]
+            return lambda parts: parts[index].strip(strip_chars)
+        if self.mode == 'join':
+            return lambda parts: ' '.join(value for value in (parts[i].strip(strip_chars) for i in indexes) if value)
+        return lambda parts: next((value for value in (parts[i].strip(strip_chars) for i in indexes) if value), '')
+
+
+class DirectionRule:
+    """Sets the direction of, or skips, rows whose column equals or contains a value"""
+
+    def __init__(self, data: Dict[str, Any]):
+        self.role = data.get('column')
+        if self.role not in COLUMN_ROLES:
+            raise FormatSpecError(f"Rule column must be one of {', '.join(COLUMN_ROLES)}, got {self.role!r}")
+        if ('equals' in data) == ('contains' in data):
+            raise FormatSpecError("A rule needs exactly one of 'equals' or 'contains'")
+        self.contains = 'contains' in data
+        self.value = str(data['contains' if self.contains else 'equals']).upper()
+
+        self.direction = data.get('direction')
+        self.skip = data.get('skip')
+        if (self.direction is None) == (self.skip is None):
+            raise FormatSpecError("A rule needs exactly one of 'direction' or 'skip'")
+        if self.direction is not None and self.direction not in (DIRECTION_IN, DIRECTION_OUT):
+            raise FormatSpecError(f"Rule direction must be {DIRECTION_IN} or {DIRECTION_OUT}")
+
+    def matches(self, value: str) -> bool:
+        value = value.upper()
+        return self.value in value if self.contains else value == self.value
+
+
+class FormatSpec:
+    """A validated bank format spec loaded from YAML"""
+
+    def __init__(self, data: Dict[str, Any], source: str = '<spec>'):
+        if not isinstance(data, dict):
+            raise FormatSpecError(f"{source}: spec must be a mapping")
+        unknown = set(data) - SPEC_KEYS
+        if unknown:
+            raise FormatSpecError(f"{source}: unknown keys {', '.join(sorted(unknown))}")
+        if not data.get('name'):
+            raise FormatSpecError(f"{source}: 'name' is required")
+
+        self.source = source
+        self.name = data['name']
+        self.description = data.get('description', f"Parser for {self.name} statements")
+        self.version = int(data.get('version', 1))
+        self.extension = data.get('extension', '.csv')
+        # Whitespace is always stripped; some exports also quote values
+        self.strip_chars = ' \t\r\n' + data['strip_chars'] if data.get('strip_chars') else None
+
+        self.meta = {'account_number': 'Unknown', 'account_abbr': self.name, 'statement_type': 'CSV'}
+        self.meta.update(data.get('meta') or {})
+        if 'bank_name' not in self.meta:
+            raise FormatSpecError(f"{source}: 'meta.bank_name' is required")
+
+        header = data.get('header') or {}
+        self.header_columns: List[str] = list(header.get('columns') or [])
+        self.min_matches = int(header.get('min_matches', len(self.header_columns)))
+
+        detect = data.get('detect') or {}
+        self.keywords = [keyword.lower() for keyword in detect.get('keywords') or []]
+        self.keyword_rows = int(detect.get('keyword_rows', 2))
+
+        columns = data.get('columns') or {}
+        unknown = set(columns) - set(COLUMN_ROLES)
+        if unknown:
+            raise FormatSpecError(f"{source}: unknown column roles {', '.join(sorted(unknown))}")
+        missing = [role for role in REQUIRED_ROLES if role not in columns]
+        if missing:
+            raise FormatSpecError(f"{source}: column roles {', '.join(missing)} are required")
+        try:
+            self.roles = {role: ColumnRole.from_spec(role, value) for role, value in columns.items()}
+            self.rules = [DirectionRule(rule) for rule in data.get('rules') or []]
+        except FormatSpecError as e:
+            raise FormatSpecError(f"{source}: {e}") from e
+        for rule in self.rules:
+            if rule.role not in self.roles:
+                raise FormatSpecError(f"{source}: rule reads column role {rule.role!r}, which is not declared")
+
+        preferred = list((data.get('date') or {}).get('formats') or [])
+        self.date_formats = preferred + [fmt for fmt in COMMON_DATE_FORMATS if fmt not in preferred]
+
+        amount = data.get('amount') or {}
+        negative = amount.get('negative', DIRECTION_OUT)
+        if negative not in (DIRECTION_IN, DIRECTION_OUT):
+            raise FormatSpecError(f"{source}: 'amount.negative' must be {DIRECTION_IN} or {DIRECTION_OUT}")
+        self.negative_direction = negative
+        self.positive_direction = DIRECTION_IN if negative == DIRECTION_OUT else DIRECTION_OUT
+        self.skip_zero = bool(amount.get('skip_zero', False))
+
+        account = data.get('account') or {}
+        self.abbr_prefix = account.get('abbr_prefix')
+        self.abbr_suffix = account.get('abbr_suffix', 'last_4')
+        if self.abbr_suffix not in ABBR_SUFFIXES:
+            raise FormatSpecError(f"{source}: 'account.abbr_suffix' must be one of {', '.join(ABBR_SUFFIXES)}")
+
+    @classmethod
+    def load(cls, path: str) -> 'FormatSpec':
+        """Read and validate a spec from a YAML file"""
+        with open(path, encoding='utf-8') as f:
+            try:
+                data = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise FormatSpecError(f"{path}: invalid YAML: {e}") from e
+        return cls(data, source=path)
+
+    def account_abbr(self, account_number: str) -> str:
+        """Account abbreviation derived from the account number"""
+        if self.abbr_suffix == 'last_group' and '-' in account_number:
+            suffix = account_number.split('-')[-1]
+        else:
+            suffix = account_number[-4:]
+        return f"{self.abbr_prefix}{suffix}"
+
+    def __repr__(self):
+        return f"FormatSpec(name={self.name!r}, source={self.source!r})"
+
+
+def header_index(header: Sequence[str]) -> Dict[str, int]:
+    """Map normalized column names to their first position in a header row"""
+    index = {}
+    for position, name in enumerate(header):
+        index.setdefault(name.strip().lower(), position)
+    return index
+
+
+class RowParser:
+    """
+    A spec bound to the header of one file.
+
+    Column roles are resolved to indexes once, so reading a row is a few
+    list lookups instead of a name search per field.
+    """
+
+    def __init__(self, spec: FormatSpec, header: Sequence[str]):
+        self.spec = spec
+        index = header_index(header)
+        resolved = {role: column.resolve(index) for role, column in spec.roles.items()}
+        missing = [role for role in REQUIRED_ROLES if resolved[role] is None]
+        if missing:
+            raise StatementParsingError(f"{spec.name} file has no {' or '.join(missing)} column")
+
+        self.width = len(header)
+        self.getters = {
+            role: spec.roles[role].getter(indexes, spec.strip_chars)
+            for role, indexes in resolved.items() if indexes is not None
+        }
+        self.get_date = self.getters['date']
+        self.get_amount = self.getters['amount']
+        self.get_description = self.getters.get('description')
+        self.rules = [(self.getters[rule.role], rule) for rule in spec.rules if rule.role in self.getters]
+        self.date_parser = DateParser(spec.date_formats[0], spec.date_formats)
+        # Statements repeat each posting date many times; parse every spelling once
+        self.dates: Dict[str, Any] = {}
+
+    def _pad(self, parts: List[str]) -> List[str]:
+        return parts + [''] * (self.width - len(parts)) if len(parts) < self.width else parts
+
+    def learn_dates(self, sample: Sequence[List[str]]) -> None:
+        """Lock the date format to the one the sampled rows use"""
+        values = [self.get_date(self._pad(parts)) for parts in sample if any(part.strip() for part in parts)]
+        if values:
+            self.date_parser = DateParser.from_samples(values, self.spec.date_formats)
+
+    def apply_account_info(self, meta: Dict[str, Any], sample: Sequence[List[str]]) -> None:
+        """Take the account number from the first sampled row that has one"""
+        get_account = self.getters.get('account_number')
+        if get_account is None:
+            return
+        for parts in sample:
+            account_number = get_account(self._pad(parts))
+            if account_number:
+                meta['account_number'] = account_number
+                if self.spec.abbr_prefix is not None:
+                    meta['account_abbr'] = self.spec.account_abbr(account_number)
+                return
+
+    def __call__(self, parts: List[str]) -> Dict[str, Any]:
+        """Build a transaction from one tokenized row, or raise SkipRow"""
+        if len(parts) < self.width:
+            parts = self._pad(parts)
+
+        date_text = self.get_date(parts)
+        if not date_text:
+            raise SkipRow('no_date')
+        amount_text = self.get_amount(parts)
+        if not amount_text:
+            raise SkipRow('no_amount')
+
+        transaction_date = self.dates.get(date_text)
+        if transaction_date is None:
+            try:
+                transaction_date = self.dates[date_text] = self.date_parser.parse(date_text)
+            except DateParsingError:
+                raise SkipRow('invalid_date')
+        parsed = match_amount(amount_text)
+        if parsed is None:
+            raise SkipRow('invalid_amount')
+        cents, negative = parsed
+        if not cents and self.spec.skip_zero:
+            raise SkipRow('zero_amount')
+
+        direction = self.spec.negative_direction if negative else self.spec.positive_direction
+        for get_value, rule in self.rules:
+            if rule.matches(get_value(parts)):
+                if rule.skip:
+                    raise SkipRow(rule.skip)
+                direction = rule.direction
+                break
+
+        item = self.get_description(parts) if self.get_description else ''
+        return {
+            'item': item or 'Unknown Transaction',
+            'transaction_date': transaction_date,
+            'amount': cents_to_decimal(cents),
+            'direction': direction
+        }
+
+
+class SpecStatementParser(CSVRowStatementParser):
+    """Streaming parser for a headed CSV format described by a FormatSpec"""
+
+    spec: FormatSpec = None
+
+    def __init__(self):
+        self.supported_formats = [self.spec.extension]
+
+    def can_parse(self, file_content: bytes, filename: str, context: Optional[SniffContext] = None) -> bool:
+        """
+        Check the header, or for formats without a fixed header the column
+        roles and the keywords expected in the first data rows.
+        """
+        spec = self.spec
+        context = self._sniff(file_content, filename, context)
+        if context.extension != spec.extension:
+            return False
+
+        if spec.header_columns:
+            present = set(context.header_lower)
+            return sum(1 for column in spec.header_columns if column.lower() in present) >= spec.min_matches
+
+        if len(context.lines) < 2:
+            return False
+        index = header_index(context.header)
+        if any(column.resolve(index) is None for column in spec.roles.values()):
+            return False
+        if not spec.keywords:
+            return True
+        rows = [line.lower() for line in context.lines[1:1 + spec.keyword_rows] if line.strip()]
+        return any(keyword in row for row in rows for keyword in spec.keywords)
+
+    def _initial_statement_meta(self, filename: str) -> Dict[str, Any]:
+        """Return the spec's metadata; account number and date range are filled in while streaming"""
+        meta = dict(self.spec.meta)
+        meta['statement_from_date'] = datetime.now().date()
+        meta['statement_to_date'] = datetime.now().date()
+        return meta
+
+    def _iter_transactions(self, lines: Iterator[str], stream: TransactionStream) -> Iterator[Dict[str, Any]]:
+        """Resolve the columns from the header row, then parse the rest by position"""
+        reader = csv.reader(lines)
+        header = next((row for row in reader if any(part.strip() for part in row)), None)
+        if header is None:
+            raise StatementParsingError(f"{self.spec.name} file is empty or has no data rows")
+
+        row_parser = RowParser(self.spec, header)
+        sample, rows = peek_rows(reader, DATE_SAMPLE_SIZE)
+        row_parser.learn_dates(sample)
+        row_parser.apply_account_info(stream.meta, sample)
+
+        yield from self._parse_rows(rows, stream, row_parser)
+        if not stream.rows_read:
+            raise StatementParsingError(f"{self.spec.name} file is empty or has no data rows")
+
+    def _parse_date(self, date_str: str, date_parser: Optional[DateParser] = None):
+        """Parse a date with the spec's preferred formats, stripping its quote characters"""
+        if date_parser is None:
+            date_parser = DateParser(self.spec.date_formats[0], self.spec.date_formats)
+        return super()._parse_date((date_str or '').strip(self.spec.strip_chars), date_parser)
+
+
+def compile_spec(spec: FormatSpec) -> type:
+    """
+    Build a parser class from a spec.
+
+    The class is named after the spec, so parser names recorded on
+    accounts and cached parse results stay valid when a hand-written parser
+    is replaced by a spec.
+    """
+    signatures = [spec.header_columns] if spec.header_columns else []
+    return type(spec.name, (SpecStatementParser,), {
+        '__doc__': spec.description,
+        '__module__': __name__,
+        'spec': spec,
+        'version': spec.version,
+        'header_signatures': signatures,
+    })
+
+
+@functools.lru_cache(maxsize=None)
+def compiled_formats(directory: str = FORMAT_SPEC_DIR) -> Dict[str, type]:
+    """
+    Compile every *.yaml spec in a directory, once per process.
+
+    Args:
+        directory: Directory holding the specs
+
+    Returns:
+        Dict mapping parser class names to compiled classes, in file name order
+
+    Raises:
+        FormatSpecError: If a spec is invalid or two specs share a name
+    """
+    parsers = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.yaml'))):
+        spec = FormatSpec.load(path)
+        if spec.name in parsers:
+            raise FormatSpecError(f"{path}: format {spec.name} is already defined")
+        parsers[spec.name] = compile_spec(spec)
+    return parsers
+
+
+def compile_format(name: str) -> type:
+    """Compiled parser class of the spec with the given name"""
+    try:
+        return compiled_formats()[name]
+    except KeyError:
+        raise FormatSpecError(f"No format spec named {name} in {FORMAT_SPEC_DIR}") from None
@@ -1,5 +1,6 @@
 # Forms package for statements app
 from .statement_upload_form import StatementUploadForm
+from .batch_upload_form import BatchUploadForm
 from .report_filter_form import ReportFilterForm
 from .investment_filter_form import InvestmentFilterForm
 from .account_value_form import AccountValueForm
@@ -7,6 +8,7 @@ from .add_account_form import AddAccountForm
 
 __all__ = [
     'StatementUploadForm',
+    'BatchUploadForm',
     'ReportFilterForm',
     'InvestmentFilterForm',
     'AccountValueForm',
@@ -0,0 +1,61 @@
+import os
+from django import forms
+from django.conf import settings
+from ..models import Account
+
+
+class MultipleFileInput(forms.ClearableFileInput):
+    """File input that lets the browser select several files"""
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    """File field that cleans every selected file"""
+    
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('widget', MultipleFileInput())
+        super().__init__(*args, **kwargs)
+    
+    def clean(self, data, initial=None):
+        single_file_clean = super().clean
+        if isinstance(data, (list, tuple)):
+            return [single_file_clean(d, initial) for d in data]
+        return [single_file_clean(data, initial)]
+
+
+class BatchUploadForm(forms.Form):
+    """Form for uploading many statements, or ZIP archives of statements, at once"""
+    
+    account = forms.ModelChoiceField(
+        queryset=Account.objects.all(),
+        required=False,
+        empty_label="-- Detect from each statement --",
+        widget=forms.Select(attrs={
+            'class': 'form-control'
+        }),
+        help_text='Leave blank to file each statement under the account its format was last uploaded to.'
+    )
+    
+    source_files = MultipleFileField(
+        widget=MultipleFileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,.xlsx,.xls,.pdf,.txt,.zip'
+        }),
+        help_text='Select several statement files, or ZIP archives of statements.'
+    )
+    
+    def clean_source_files(self):
+        files = self.cleaned_data.get('source_files') or []
+        allowed_extensions = getattr(settings, 'ALLOWED_UPLOAD_EXTENSIONS', ['.csv', '.xlsx', '.xls', '.pdf', '.txt'])
+        max_size = getattr(settings, 'FILE_UPLOAD_MAX_MEMORY_SIZE', 10485760)
+        
+        for file in files:
+            ext = os.path.splitext(file.name)[1].lower()
+            if ext != '.zip' and ext not in allowed_extensions:
+                raise forms.ValidationError(f'{file.name}: unsupported file extension {ext}.')
+            if file.size > max_size:
+                raise forms.ValidationError(
+                    f'{file.name}: file size cannot exceed {max_size / (1024 * 1024):.1f} MB.'
+                )
+        
+        return files
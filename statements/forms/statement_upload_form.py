@@ -136,25 +136,8 @@ class StatementUploadForm(forms.ModelForm):
                 'Statement start date cannot be after end date.'
             )
         
-        # Check for overlapping date periods for the same account
-        if not is_investment_account and from_date and to_date and account:
-            overlapping_statements = Statement.objects.filter(
-                account=account
-            ).exclude(
-                id=self.instance.id if self.instance else None
-            ).filter(
-                # Check if the new period overlaps with any existing period
-                statement_from_date__lte=to_date,
-                statement_to_date__gte=from_date
-            )
-            
-            if overlapping_statements.exists():
-                overlapping_statement = overlapping_statements.first()
-                raise forms.ValidationError(
-                    f'This statement period overlaps with an existing statement for the same account. '
-                    f'Existing statement period: {overlapping_statement.statement_from_date} to {overlapping_statement.statement_to_date}. '
-                    f'Please choose a different date range or update the existing statement.'
-                )
+        # Overlapping periods are allowed: the ingest service merges them by
+        # transaction fingerprint and only inserts transactions not seen before
         
         # For investment accounts, validate investment fields
         book_cost = cleaned_data.get('book_cost')
@@ -0,0 +1,374 @@
+"""
+Ingest service for writing parsed statements to the database
+"""
+
+import logging
+import time
+from contextlib import nullcontext
+from functools import partial
+from datetime import date
+from itertools import islice
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from .category_rules import get_categorizer
+from .merchants import MerchantResolver
+from .constants import INGEST_BATCH_SIZE
+from .exceptions import StatementParsingError
+from .factory import StatementParserFactory
+from .fingerprints import FingerprintCounter
+from .models import Account, Merchant, MonthlyAccountSummary, SourceFile, Statement, StatementDetail
+from .rollups import apply_deltas, detail_deltas
+from .sandbox import parse_sandboxed
+from .source_store import ContentStore, ParseCache, get_content_store
+
+logger = logging.getLogger(__name__)
+
+
+class IngestResult:
+    """Summary of a completed statement ingest"""
+
+    def __init__(self, statement: Statement, rows_inserted: int, elapsed: float,
+                 parser_name: str = '', rows_parsed: int = 0, reused: bool = False, cached: bool = False,
+                 rows_skipped: int = 0):
+        self.statement = statement
+        self.rows_inserted = rows_inserted
+        self.rows_skipped = rows_skipped
+        self.elapsed = elapsed
+        self.parser_name = parser_name
+        self.rows_parsed = rows_parsed
+        self.reused = reused
+        self.cached = cached
+
+    @property
+    def rows_per_second(self) -> float:
+        """Insert throughput for this ingest"""
+        if self.elapsed <= 0:
+            return float(self.rows_inserted)
+        return self.rows_inserted / self.elapsed
+
+    def __repr__(self):
+        return (
+            f"IngestResult(statement={self.statement.id}, rows={self.rows_inserted}, skipped={self.rows_skipped}, "
+            f"elapsed={self.elapsed:.3f}s, rows_per_second={self.rows_per_second:.0f})"
+        )
+
+
+def iter_batches(items: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """
+    Split an iterable into lists of at most batch_size items.
+
+    Args:
+        items: Any iterable, including generators
+        batch_size: Maximum number of items per batch
+
+    Returns:
+        Iterator of lists
+    """
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def account_scope(statement: Statement) -> Tuple[int, str]:
+    """Account id and type that category rules of a statement's transactions are scoped by"""
+    return statement.account_id, statement.account.account_type
+
+
+def build_statement_detail(statement: Statement, transaction_data: Dict[str, Any],
+                           fingerprint: Optional[str] = None, category: str = '') -> StatementDetail:
+    """Build an unsaved StatementDetail from a parsed transaction dict"""
+    return StatementDetail(
+        statement=statement,
+        item=transaction_data['item'],
+        transaction_date=transaction_data['transaction_date'],
+        amount=transaction_data['amount'],
+        direction=transaction_data['direction'],
+        fingerprint=fingerprint,
+        category=category or get_categorizer().categorize(
+            transaction_data['item'], transaction_data['direction'], account_scope(statement)
+        )
+    )
+
+
+def build_new_details(statement: Statement, batch: List[Dict[str, Any]],
+                      counter: FingerprintCounter,
+                      merchants: Optional[MerchantResolver] = None) -> List[StatementDetail]:
+    """
+    Fingerprint and categorize a batch of transactions and drop those the account already has.
+
+    Existing fingerprints are found with one IN query per batch rather than
+    a lookup per row, and the whole batch is categorized in one pass of
+    the category rules. The new transactions are then linked to their
+    merchants, which costs at most one lookup and one insert per batch.
+
+    Args:
+        statement: Statement the new details belong to
+        batch: Parsed transaction dicts
+        counter: Fingerprint counter shared by every batch of the statement
+        merchants: Resolver shared by every batch of the statement, so
+            repeated items are resolved from memory
+
+    Returns:
+        Unsaved StatementDetail objects for transactions not stored yet
+    """
+    categories = get_categorizer().categorize_many(
+        (data['item'] for data in batch), (data['direction'] for data in batch), account_scope(statement)
+    )
+    details = [
+        build_statement_detail(
+            statement, data,
+            counter.next(data['transaction_date'], data['amount'], data['direction'], data['item']),
+            category
+        )
+        for data, category in zip(batch, categories)
+    ]
+    existing = set(
+        StatementDetail.objects.filter(
+            fingerprint__in=[detail.fingerprint for detail in details]
+        ).values_list('fingerprint', flat=True)
+    )
+    details = [detail for detail in details if detail.fingerprint not in existing]
+    merchants = merchants or MerchantResolver(Merchant)
+    for detail, merchant_id in zip(details, merchants.resolve_many(detail.item for detail in details)):
+        detail.merchant_id = merchant_id
+    return details
+
+
+def ingest_statement(
+    account: Account,
+    statement_meta: Dict[str, Any],
+    transactions: Iterable[Dict[str, Any]],
+    source_file: Optional[str] = None,
+    statement_from_date: Optional[date] = None,
+    statement_to_date: Optional[date] = None,
+    batch_size: int = INGEST_BATCH_SIZE,
+    atomic: bool = True,
+    progress: Optional[Callable[[Statement, int], None]] = None,
+    source: Optional[SourceFile] = None,
+) -> IngestResult:
+    """
+    Write a parsed statement and all of its transactions in one transaction.
+
+    Details are written with batched bulk_create, which does not send the
+    per-row post_save signal, so the statement cache is invalidated once
+    after the transaction commits instead of once per row. The monthly
+    account summaries are incremented with each batch, in the same
+    transaction as its rows.
+
+    Transactions already stored for the account, matched by fingerprint,
+    are skipped, so a statement overlapping an earlier one is merged and
+    only its new transactions are inserted.
+
+    Transactions may be a generator such as a TransactionStream. Parsed
+    dates are re-read from statement_meta once it has been consumed, since
+    streaming parsers only know the statement date range at the end.
+
+    With atomic=False every batch commits on its own, so progress written
+    by the callback is visible to other connections while the ingest runs
+    and SQLite is not write-locked for the whole file. A failure then
+    deletes the partly written statement instead of rolling it back.
+
+    Args:
+        account: Account the statement belongs to
+        statement_meta: Metadata dict returned by a parser
+        transactions: Iterable of parsed transaction dicts
+        source_file: Original filename to record on the statement
+        statement_from_date: Overrides the parsed start date when provided
+        statement_to_date: Overrides the parsed end date when provided
+        batch_size: Number of rows per INSERT
+        atomic: Write the whole statement in one database transaction
+        progress: Called with the statement once created, and with the rows inserted so far after each batch
+        source: Stored content the statement is parsed from
+
+    Returns:
+        IngestResult with the created statement and throughput figures
+    """
+    started = time.perf_counter()
+    rows_inserted = 0
+    rows_skipped = 0
+    counter = FingerprintCounter(account.id)
+    merchants = MerchantResolver(Merchant)
+
+    with transaction.atomic() if atomic else nullcontext():
+        statement = Statement.objects.create(
+            account=account,
+            source_file=source_file,
+            source=source,
+            statement_from_date=statement_from_date or statement_meta['statement_from_date'],
+            statement_to_date=statement_to_date or statement_meta['statement_to_date'],
+            statement_type=statement_meta['statement_type']
+        )
+
+        try:
+            if progress is not None:
+                progress(statement, 0)
+            for batch in iter_batches(transactions, batch_size):
+                details = build_new_details(statement, batch, counter, merchants)
+                # A batch and its summary changes commit together even when batches commit on their own
+                with transaction.atomic(savepoint=False):
+                    StatementDetail.objects.bulk_create(details, batch_size=batch_size)
+                    apply_deltas(MonthlyAccountSummary, detail_deltas(
+                        (account.id, detail.transaction_date, detail.category, detail.direction, detail.amount)
+                        for detail in details
+                    ))
+                rows_inserted += len(details)
+                rows_skipped += len(batch) - len(details)
+                if progress is not None:
+                    progress(statement, rows_inserted)
+
+            # Streaming parsers widen the date range while they are consumed
+            final_from_date = statement_from_date or statement_meta['statement_from_date']
+            final_to_date = statement_to_date or statement_meta['statement_to_date']
+            if (final_from_date, final_to_date) != (statement.statement_from_date, statement.statement_to_date):
+                statement.statement_from_date = final_from_date
+                statement.statement_to_date = final_to_date
+                statement.save(update_fields=['statement_from_date', 'statement_to_date'])
+        except Exception:
+            if not atomic:
+                statement.delete()
+            raise
+
+        transaction.on_commit(statement.clear_cache)
+
+    result = IngestResult(statement, rows_inserted, time.perf_counter() - started, rows_skipped=rows_skipped)
+    logger.info(
+        f"Ingested {result.rows_inserted} transactions into statement {statement.id}, "
+        f"skipped {result.rows_skipped} already imported, "
+        f"in {result.elapsed:.3f}s ({result.rows_per_second:.0f} rows/sec)"
+    )
+    return result
+
+
+def resolve_account(parser_name: str) -> Optional[Account]:
+    """Return the only account whose statements were last read by parser_name, if exactly one"""
+    accounts = list(Account.objects.filter(last_parser=parser_name)[:2])
+    return accounts[0] if len(accounts) == 1 else None
+
+
+def _existing_result(account: Account, source: SourceFile, filename: str) -> Optional[IngestResult]:
+    """Result for a statement the account already has from identical content, if any"""
+    existing = Statement.objects.filter(account=account, source=source).first()
+    if existing is None:
+        return None
+    logger.info(f"{filename} matches statement {existing.id} by content hash; skipping ingest")
+    return IngestResult(existing, 0, 0.0, parser_name=source.parser_name, reused=True)
+
+
+def ingest_upload(
+    account: Optional[Account],
+    file_obj: BinaryIO,
+    filename: str,
+    statement_from_date: Optional[date] = None,
+    statement_to_date: Optional[date] = None,
+    atomic: bool = True,
+    progress: Optional[Callable[[Statement, int], None]] = None,
+    store: Optional[ContentStore] = None,
+) -> IngestResult:
+    """
+    Store an uploaded statement by content hash and ingest it, reusing earlier work.
+
+    The raw bytes are kept compressed in the content store and recorded
+    as a SourceFile. If the account already has a statement parsed from
+    identical content, that statement is returned without parsing. If the
+    file was parsed before by the same parser version, the cached result
+    is ingested instead of parsing again. Otherwise the file is parsed, in
+    a resource-limited child process when settings.PARSE_SANDBOX is set or
+    streamed in-process if not, and the result is cached on the way to the
+    database.
+
+    Without an account, the statement goes to the account whose statements
+    were last read by the detected parser, when exactly one account matches.
+
+    Args:
+        account: Account the statement belongs to; detected from the parser if None
+        file_obj: Binary file object, or a Django UploadedFile
+        filename: Original filename to record on the statement
+        statement_from_date: Overrides the parsed start date when provided
+        statement_to_date: Overrides the parsed end date when provided
+        atomic: Write the whole statement in one database transaction
+        progress: Called with the statement once created, and with the rows inserted so far after each batch
+        store: Content store; defaults to settings.SOURCE_STORE_ROOT
+
+    Returns:
+        IngestResult; reused is set when an existing statement was returned
+        and cached when parsing was skipped
+
+    Raises:
+        StatementParsingError: If no account is given and none can be detected
+    """
+    store = store or get_content_store()
+    parse_cache = ParseCache(store)
+    digest, size = store.put(file_obj)
+    source, _ = SourceFile.objects.get_or_create(sha256=digest, defaults={'size': size, 'filename': filename})
+
+    existing = _existing_result(account, source, filename) if account is not None else None
+    if existing is not None:
+        return existing
+
+    parser_factory = StatementParserFactory()
+    parser = parser_factory.parser_by_name(source.parser_name)
+    cached = parse_cache.get(digest, source.parser_name, parser.version) if parser else None
+    transaction_stream = None
+    if cached is not None:
+        parser_name = source.parser_name
+        statement_meta, transactions = cached
+        rows_parsed = len(transactions)
+    elif settings.PARSE_SANDBOX:
+        # Parse the untrusted upload in a time- and memory-limited child process, which reads it from the store
+        sandboxed = parse_sandboxed(
+            partial(store.open, digest), filename, last_parser=account.last_parser if account is not None else ''
+        )
+        parser_name = sandboxed.parser_name
+        statement_meta = sandboxed.meta
+        transactions = parse_cache.record(
+            digest, parser_name, parser_factory.parser_by_name(parser_name).version,
+            statement_meta, sandboxed.transactions
+        )
+        rows_parsed = sandboxed.rows_read
+    else:
+        transaction_stream = parser_factory.stream_statement(file_obj, filename, account)
+        parser_name = transaction_stream.parser_name
+        statement_meta = transaction_stream.meta
+        transactions = parse_cache.record(
+            digest, parser_name, parser_factory.parser_by_name(parser_name).version,
+            transaction_stream.meta, transaction_stream
+        )
+
+    if account is None:
+        account = resolve_account(parser_name)
+        if account is None:
+            raise StatementParsingError(
+                f"No account selected and {parser_name} is not linked to exactly one account"
+            )
+        existing = _existing_result(account, source, filename)
+        if existing is not None:
+            return existing
+
+    result = ingest_statement(
+        account,
+        statement_meta,
+        transactions,
+        source_file=filename,
+        statement_from_date=statement_from_date,
+        statement_to_date=statement_to_date,
+        atomic=atomic,
+        progress=progress,
+        source=source,
+    )
+    if transaction_stream is not None:
+        rows_parsed = transaction_stream.rows_read or transaction_stream.row_count
+    result.parser_name = parser_name
+    result.cached = cached is not None
+    result.rows_parsed = rows_parsed
+
+    parser_factory.remember_parser(account, parser_name)
+    if source.parser_name != parser_name:
+        source.parser_name = parser_name
+        source.save(update_fields=['parser_name'])
+    return result
@@ -0,0 +1,403 @@
+"""
+Background job queue for statement ingestion and re-categorization
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from io import BytesIO
+from functools import partial, reduce
+from operator import or_
+from typing import Callable, Dict, List, Optional
+
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .batch import BatchFile
+from .categorizer import RuleSpec, categorize_details
+from .category_rules import load_categorizer
+from .ingest import ingest_upload
+from .constants import INGEST_JOB_LEASE_SECONDS, INGEST_JOB_MAX_ATTEMPTS, INGEST_POLL_INTERVAL
+from .models import Account, IngestJob, MonthlyAccountSummary, Statement, StatementDetail
+from .rollups import move_categories
+
+logger = logging.getLogger(__name__)
+
+
+def worker_name() -> str:
+    """Identify the current worker thread in claimed jobs and logs"""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+
+
+def enqueue_ingest(
+    account: Account,
+    uploaded_file,
+    statement_from_date: Optional[date] = None,
+    statement_to_date: Optional[date] = None,
+) -> IngestJob:
+    """
+    Store an upload's raw bytes and queue it for the ingest worker.
+
+    Args:
+        account: Account the statement belongs to
+        uploaded_file: Django UploadedFile from the upload form
+        statement_from_date: Overrides the parsed start date when provided
+        statement_to_date: Overrides the parsed end date when provided
+
+    Returns:
+        The pending IngestJob
+    """
+    job = IngestJob.objects.create(
+        account=account,
+        source_file=uploaded_file.name,
+        content=b''.join(uploaded_file.chunks()),
+        statement_from_date=statement_from_date,
+        statement_to_date=statement_to_date,
+    )
+    logger.info(f"Queued ingest job {job.id} for {job.source_file}")
+    return job
+
+
+def enqueue_batch(files: List[BatchFile], account: Optional[Account] = None) -> List[IngestJob]:
+    """
+    Queue every file of a batch as its own ingest job.
+
+    Each file is then ingested by the worker like a single upload, with
+    the parse sandbox, content dedupe and the parse cache, and a file that
+    fails only fails its own job. Nothing is parsed in the calling process.
+
+    Args:
+        files: Statement files, with any ZIP archives already expanded
+        account: Account every file belongs to; each job detects it from
+            the parser history if None
+
+    Returns:
+        The pending IngestJobs, in the order of files
+    """
+    jobs = IngestJob.objects.bulk_create([
+        IngestJob(account=account, source_file=os.path.basename(batch_file.name), content=batch_file.content)
+        for batch_file in files
+    ])
+    logger.info(f"Queued {len(jobs)} ingest jobs for a batch")
+    return jobs
+
+
+def enqueue_recategorize(rules: List[RuleSpec]) -> IngestJob:
+    """
+    Queue re-categorization of the transactions some rules can match.
+
+    Called with a changed rule as it was and as it is, so only rows the
+    change can affect are rewritten rather than the whole table.
+
+    Args:
+        rules: Rules whose matching transactions are re-categorized
+
+    Returns:
+        The pending IngestJob
+    """
+    job = IngestJob.objects.create(
+        kind=IngestJob.KIND_RECATEGORIZE,
+        source_file=', '.join(rule.pattern for rule in rules)[:255],
+        params={'rules': [rule._asdict() for rule in rules]},
+    )
+    logger.info(f"Queued re-categorize job {job.id} for {len(rules)} rules")
+    return job
+
+
+def claimable_jobs(now) -> Q:
+    """Jobs a worker may claim: pending ones, and running ones whose worker stopped reporting"""
+    return Q(status=IngestJob.STATUS_PENDING) | Q(
+        status=IngestJob.STATUS_RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=INGEST_JOB_LEASE_SECONDS),
+        attempts__lt=INGEST_JOB_MAX_ATTEMPTS,
+    )
+
+
+def fail_abandoned_jobs(now) -> int:
+    """
+    Fail running jobs whose lease expired after their last allowed attempt.
+
+    A job that keeps killing its worker, for example by running it out of
+    memory, is given up on rather than retaken forever.
+
+    Returns:
+        Number of jobs failed
+    """
+    failed = IngestJob.objects.filter(
+        status=IngestJob.STATUS_RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=INGEST_JOB_LEASE_SECONDS),
+        attempts__gte=INGEST_JOB_MAX_ATTEMPTS,
+    ).update(
+        status=IngestJob.STATUS_FAILED,
+        error=f'Worker stopped responding on each of {INGEST_JOB_MAX_ATTEMPTS} attempts',
+        finished_at=now,
+    )
+    if failed:
+        logger.warning(f"Failed {failed} jobs abandoned by their workers")
+    return failed
+
+
+def claim_next_job(worker: str, job_ids: Optional[List[int]] = None) -> Optional[IngestJob]:
+    """
+    Claim the oldest pending job for a worker, or one whose worker died.
+
+    A claimed job holds a lease renewed by heartbeat_at whenever it
+    reports progress. Once INGEST_JOB_LEASE_SECONDS pass without one, its
+    worker is taken to be dead and the job can be claimed again, up to
+    INGEST_JOB_MAX_ATTEMPTS claims in all.
+
+    On Postgres the candidate row is locked with SKIP LOCKED so concurrent
+    workers never wait on each other. The claim itself is a conditional
+    UPDATE on the job's status and lease, which also keeps SQLite (where
+    row locks are not available) from handing one job to two workers.
+
+    Args:
+        worker: Name recorded on the claimed job
+        job_ids: Only claim one of these jobs; any job if None
+
+    Returns:
+        The claimed job, or None if no job can be claimed
+    """
+    fail_abandoned_jobs(timezone.now())
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    while True:
+        now = timezone.now()
+        # On SQLite a read transaction upgraded to a write fails at once with "database is locked"
+        # when another thread writes, so the select and the UPDATE there run in autocommit
+        with transaction.atomic() if skip_locked else nullcontext():
+            claimable = IngestJob.objects.filter(claimable_jobs(now)).order_by('created_at')
+            if job_ids is not None:
+                claimable = claimable.filter(pk__in=job_ids)
+            if skip_locked:
+                claimable = claimable.select_for_update(skip_locked=True)
+            job_id = claimable.values_list('id', flat=True).first()
+            if job_id is None:
+                return None
+
+            claimed = IngestJob.objects.filter(claimable_jobs(now), pk=job_id).update(
+                status=IngestJob.STATUS_RUNNING,
+                worker=worker,
+                started_at=now,
+                heartbeat_at=now,
+                attempts=F('attempts') + 1,
+            )
+
+        if claimed:
+            return IngestJob.objects.select_related('account').get(pk=job_id)
+        # Another worker claimed it first; try the next one
+
+
+def run_ingest_job(job: IngestJob) -> IngestJob:
+    """
+    Parse and ingest a claimed statement upload.
+
+    Batches commit as they are written so the status endpoint can report
+    rows inserted while the job runs, and each report renews the job's
+    lease. Jobs queued without an account ingest into the account detected
+    from the parser history. The statement is linked to the job as soon as it is created,
+    so a retry after the worker died deletes the partial statement before
+    ingesting again. Uploads identical to an existing statement of the
+    account finish immediately with that statement.
+
+    Args:
+        job: A RUNNING ingest job
+
+    Returns:
+        The job, marked SUCCEEDED or FAILED
+    """
+    def report_progress(statement, rows_inserted):
+        IngestJob.objects.filter(pk=job.pk).update(
+            statement=statement, rows_parsed=rows_inserted, rows_inserted=rows_inserted, heartbeat_at=timezone.now()
+        )
+
+    try:
+        if job.statement_id is not None:
+            logger.info(f"Deleting statement {job.statement_id} left by an earlier attempt of job {job.id}")
+            Statement.objects.filter(pk=job.statement_id).delete()
+        result = ingest_upload(
+            job.account,
+            BytesIO(bytes(job.content)),
+            job.source_file,
+            statement_from_date=job.statement_from_date,
+            statement_to_date=job.statement_to_date,
+            atomic=False,
+            progress=report_progress,
+        )
+    except Exception as e:
+        logger.error(f"Ingest job {job.id} failed: {e}", exc_info=True)
+        job.status = IngestJob.STATUS_FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+        return job
+
+    job.status = IngestJob.STATUS_SUCCEEDED
+    job.account = result.statement.account
+    job.statement = result.statement
+    job.rows_parsed = result.rows_parsed
+    job.rows_inserted = result.rows_inserted
+    job.finished_at = timezone.now()
+    # The content store holds the upload now; drop the queued copy
+    job.content = b''
+    job.save(update_fields=[
+        'status', 'account', 'statement', 'rows_parsed', 'rows_inserted', 'finished_at', 'content'
+    ])
+    return job
+
+
+def run_recategorize_job(job: IngestJob) -> IngestJob:
+    """
+    Re-categorize the transactions the job's rules can match.
+
+    The rules are compiled afresh rather than taken from the process
+    cache, so the job always uses the rules as committed when it runs.
+    rows_parsed counts the transactions examined and rows_inserted those
+    whose category changed; the monthly summaries are moved with them.
+
+    Args:
+        job: A RUNNING re-categorize job
+
+    Returns:
+        The job, marked SUCCEEDED or FAILED
+    """
+    def report_progress(examined, updated):
+        IngestJob.objects.filter(pk=job.pk).update(
+            rows_parsed=examined, rows_inserted=updated, heartbeat_at=timezone.now()
+        )
+
+    try:
+        rules = [RuleSpec(**rule) for rule in job.params.get('rules', [])]
+        updated = 0
+        if rules:
+            updated = categorize_details(
+                StatementDetail,
+                recategorize=True,
+                categorizer=load_categorizer(),
+                progress=report_progress,
+                where=reduce(or_, (rule.condition() for rule in rules)),
+                on_change=partial(move_categories, MonthlyAccountSummary),
+            )
+    except Exception as e:
+        logger.error(f"Re-categorize job {job.id} failed: {e}", exc_info=True)
+        job.status = IngestJob.STATUS_FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+        return job
+
+    job.status = IngestJob.STATUS_SUCCEEDED
+    job.rows_inserted = updated
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'rows_inserted', 'finished_at'])
+    return job
+
+
+JOB_HANDLERS: Dict[str, Callable[[IngestJob], IngestJob]] = {
+    IngestJob.KIND_INGEST: run_ingest_job,
+    IngestJob.KIND_RECATEGORIZE: run_recategorize_job,
+}
+
+
+def run_job(job: IngestJob) -> IngestJob:
+    """Run a claimed job with the handler for its kind"""
+    logger.info(f"Worker {job.worker} running {job.kind} job {job.id}")
+    return JOB_HANDLERS[job.kind](job)
+
+
+def run_pending_jobs(worker: Optional[str] = None, limit: Optional[int] = None,
+                     job_ids: Optional[List[int]] = None) -> int:
+    """
+    Claim and run jobs until the queue is empty.
+
+    Args:
+        worker: Name recorded on claimed jobs; defaults to worker_name()
+        limit: Maximum number of jobs to run
+        job_ids: Only run these jobs; any job if None
+
+    Returns:
+        Number of jobs run
+    """
+    worker = worker or worker_name()
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job(worker, job_ids)
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
+
+
+def work_loop(stop: threading.Event, poll_interval: float, exit_when_idle: bool = False,
+              job_ids: Optional[List[int]] = None) -> int:
+    """
+    Worker thread body: run jobs as they arrive until stopped.
+
+    Args:
+        stop: Event that ends the loop once the current job finishes
+        poll_interval: Seconds to wait when the queue is empty
+        exit_when_idle: Return as soon as the queue is empty
+        job_ids: Only run these jobs; any job if None
+
+    Returns:
+        Number of jobs run
+    """
+    worker = worker_name()
+    processed = 0
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            job = claim_next_job(worker, job_ids)
+            if job is None:
+                if exit_when_idle:
+                    break
+                stop.wait(poll_interval)
+                continue
+            run_job(job)
+            processed += 1
+    finally:
+        connection.close()
+    return processed
+
+
+def run_until_finished(job_ids: List[int], threads: int = 1,
+                       poll_interval: float = INGEST_POLL_INTERVAL) -> List[IngestJob]:
+    """
+    Run the given jobs in this process and wait until they are finished.
+
+    For callers that queue jobs and report on them without a background
+    worker. Other queued jobs are left to the worker. With more than one
+    thread the jobs are run by work_loop threads, as in the worker
+    command; each sandboxed parse then runs in its own child process.
+    Jobs claimed meanwhile by a separate worker are waited for.
+
+    Args:
+        job_ids: Jobs to wait for
+        threads: Number of jobs run concurrently
+        poll_interval: Seconds to wait for jobs running elsewhere
+
+    Returns:
+        The jobs, without their content, in the order of job_ids
+    """
+    while True:
+        if threads > 1:
+            stop = threading.Event()
+            with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='ingest') as pool:
+                futures = [
+                    pool.submit(work_loop, stop, poll_interval, True, job_ids) for _ in range(threads)
+                ]
+                for future in futures:
+                    future.result()
+        else:
+            run_pending_jobs(job_ids=job_ids)
+
+        jobs = IngestJob.objects.select_related('account', 'statement__source').defer('content').in_bulk(job_ids)
+        if all(job.is_finished for job in jobs.values()):
+            return [jobs[job_id] for job_id in job_ids]
+        time.sleep(poll_interval)
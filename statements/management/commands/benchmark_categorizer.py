@@ -0,0 +1,45 @@
+"""
+Benchmark transaction categorization against the substring implementation
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmark import benchmark_categorizer, git_revision
+
+
+class Command(BaseCommand):
+    help = (
+        'Categorize synthetic transactions with the original substring checks and the compiled '
+        'keyword matcher, with repeated and with unique descriptions, and report the timings'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1000000, help='Transactions categorized (default: %(default)s)')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic data')
+        parser.add_argument('--output', help='JSON file the results are written to')
+
+    def handle(self, *args, **options):
+        if options['items'] < 1:
+            raise CommandError('--items must be at least 1')
+
+        results = []
+        for unique in (False, True):
+            result = benchmark_categorizer(options['items'], seed=options['seed'], unique=unique)
+            result['descriptions'] = 'unique' if unique else 'repeated'
+            results.append(result)
+            self.stdout.write(
+                f"  {result['descriptions']:<8} {result['items']:>9} items  "
+                f"substring {result['reference_seconds']:>7.3f} s  "
+                f"compiled {result['compiled_seconds']:>7.3f} s  "
+                f"batch {result['batch_seconds']:>7.3f} s  "
+                f"x{result['speedup']:.1f}"
+            )
+            if not result['matches_reference']:
+                raise CommandError('The compiled categorizer disagrees with the substring implementation')
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'commit': git_revision(), 'results': results}, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
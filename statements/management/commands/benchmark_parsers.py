@@ -0,0 +1,146 @@
+"""
+Benchmark parser throughput on synthetic statements
+"""
+
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmark import build_report, compare_reports, run_benchmarks
+from ...constants import BENCHMARK_DETECTION_ITERATIONS, BENCHMARK_ROW_COUNTS
+from ...synthetic import SYNTHETIC_FORMATS
+
+
+def _csv_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate synthetic statements in every supported format and report rows/sec, '
+        'peak RSS, time-to-first-row and detection time per parser as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--formats', type=_csv_list, default=list(SYNTHETIC_FORMATS),
+            help=f"Comma-separated formats to benchmark (default: all of {', '.join(SYNTHETIC_FORMATS)})"
+        )
+        parser.add_argument(
+            '--rows', type=_csv_list, default=[str(rows) for rows in BENCHMARK_ROW_COUNTS],
+            help='Comma-separated statement sizes in rows (default: %(default)s)'
+        )
+        parser.add_argument(
+            '--data-dir', default=os.path.join(settings.BASE_DIR, 'benchmarks', 'data'),
+            help='Directory generated statements are kept in and reused from'
+        )
+        parser.add_argument(
+            '--output',
+            help='JSON file the report is written to (default: benchmarks/results/<commit>.json)'
+        )
+        parser.add_argument('--compare', help='Earlier JSON report to compare this run against')
+        parser.add_argument(
+            '--threshold', type=float, default=10.0,
+            help='Percentage change in the wrong direction reported as a regression'
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Exit with an error if --compare finds a regression'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic data')
+        parser.add_argument(
+            '--detection-iterations', type=int, default=BENCHMARK_DETECTION_ITERATIONS,
+            help='get_parser() calls averaged per file for detection time'
+        )
+        parser.add_argument(
+            '--no-isolate', action='store_true',
+            help='Measure in this process instead of one process per file; peak RSS then accumulates'
+        )
+
+    def handle(self, *args, **options):
+        unknown = [name for name in options['formats'] if name not in SYNTHETIC_FORMATS]
+        if unknown:
+            raise CommandError(f"Unknown formats: {', '.join(unknown)}")
+        try:
+            row_counts = [int(rows) for rows in options['rows']]
+        except ValueError:
+            raise CommandError(f"--rows must be integers, got {','.join(options['rows'])}")
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {options['compare']}: {e}")
+
+        # Per-call parser logging would otherwise dominate the detection timings
+        statements_logger = logging.getLogger('statements')
+        level = statements_logger.level
+        statements_logger.setLevel(logging.WARNING)
+        try:
+            results = run_benchmarks(
+                options['formats'], row_counts, options['data_dir'],
+                seed=options['seed'],
+                isolate=not options['no_isolate'],
+                detection_iterations=options['detection_iterations'],
+                progress=self._write_result,
+            )
+        finally:
+            statements_logger.setLevel(level)
+        report = build_report(results, seed=options['seed'])
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'benchmarks', 'results', f"{report['commit'] or 'working-tree'}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(f"Report written to {output}")
+
+        if baseline is not None:
+            self._write_comparison(baseline, report, options['threshold'], options['fail_on_regression'])
+
+        failed = [result for result in results if 'error' in result or result['parser'] != result['expected_parser']]
+        if failed:
+            raise CommandError(f"{len(failed)} benchmarks failed or used an unexpected parser")
+
+    def _write_result(self, result):
+        if 'error' in result:
+            self.stdout.write(self.style.ERROR(f"  FAIL  {result['file']}: {result['error']}"))
+            return
+        first_row_ms = (result['first_row_seconds'] or 0) * 1000
+        line = (
+            f"  {result['format']:<13} {result['rows']:>9} rows  "
+            f"{result['rows_per_second'] or 0:>11,.0f} rows/s  "
+            f"first row {first_row_ms:>8.1f} ms  "
+            f"detect {result['detection_seconds'] * 1000:>7.2f} ms  "
+            f"peak RSS {result['peak_rss_kb'] / 1024:>7.1f} MiB  "
+            f"{result['parser']}"
+        )
+        if result['parser'] != result['expected_parser']:
+            self.stdout.write(self.style.WARNING(f"{line} (expected {result['expected_parser']})"))
+        else:
+            self.stdout.write(line)
+
+    def _write_comparison(self, baseline, report, threshold, fail_on_regression):
+        changes = compare_reports(baseline, report, threshold)
+        regressions = [change for change in changes if change['regression']]
+        self.stdout.write(f"Compared with {baseline.get('commit') or 'baseline'}:")
+        for change in changes:
+            line = (
+                f"  {change['format']:<13} {change['rows']:>9} {change['metric']:<18} "
+                f"{change['change_percent']:+7.1f}%"
+            )
+            self.stdout.write(self.style.ERROR(line) if change['regression'] else line)
+
+        if regressions:
+            summary = f"{len(regressions)} metrics regressed by more than {threshold:g}%"
+            if fail_on_regression:
+                raise CommandError(summary)
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS('No regressions'))
@@ -0,0 +1,108 @@
+"""
+Benchmark cold start from WSGI import to the first response byte
+"""
+
+import json
+import os
+import platform
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...benchmark import git_revision
+from ...startup_benchmark import compare_startup, run_startup_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Import the WSGI application and serve one request in fresh interpreters under '
+        '`python -X importtime`, reporting time to first byte and the slowest packages to import as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/health/', help='Request path served (default: %(default)s)')
+        parser.add_argument('--host', default='localhost', help='Host header of the request (default: %(default)s)')
+        parser.add_argument('--runs', type=int, default=5, help='Cold starts measured; medians are reported')
+        parser.add_argument(
+            '--output',
+            help='JSON file the report is written to (default: benchmarks/results/startup-<commit>.json)'
+        )
+        parser.add_argument('--compare', help='Earlier startup report to compare this run against')
+        parser.add_argument(
+            '--threshold', type=float, default=10.0,
+            help='Percentage slowdown reported as a regression'
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Exit with an error if --compare finds a regression'
+        )
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be at least 1')
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {options['compare']}: {e}")
+
+        try:
+            startup = run_startup_benchmark(
+                runs=options['runs'], path=options['path'], host=options['host'], cwd=str(settings.BASE_DIR),
+            )
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        report = {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'commit': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'path': options['path'],
+            'startup': startup,
+        }
+        self._write_summary(startup)
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'benchmarks', 'results', f"startup-{report['commit'] or 'working-tree'}.json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(f"Report written to {output}")
+
+        if baseline is not None:
+            self._write_comparison(baseline, report, options['threshold'], options['fail_on_regression'])
+
+    def _write_summary(self, startup):
+        self.stdout.write(
+            f"  {startup['status']}  wsgi import {startup['wsgi_import_seconds'] * 1000:.0f} ms  "
+            f"first byte {startup['first_byte_seconds'] * 1000:.0f} ms  "
+            f"{startup['modules_imported']} modules, {startup['import_self_seconds'] * 1000:.0f} ms importing"
+        )
+        for item in startup['slowest_packages']:
+            self.stdout.write(f"    {item['self_ms']:>8.1f} ms  {item['package']}")
+        if startup['heavy_modules']:
+            self.stdout.write(self.style.WARNING(
+                f"  Loaded before the first byte: {', '.join(startup['heavy_modules'])}"
+            ))
+
+    def _write_comparison(self, baseline, report, threshold, fail_on_regression):
+        changes = compare_startup(baseline, report, threshold)
+        regressions = [change for change in changes if change['regression']]
+        self.stdout.write(f"Compared with {baseline.get('commit') or 'baseline'}:")
+        for change in changes:
+            line = f"  {change['metric']:<22} {change['change_percent']:+7.1f}%"
+            self.stdout.write(self.style.ERROR(line) if change['regression'] else line)
+
+        if regressions:
+            summary = f"{len(regressions)} startup metrics regressed by more than {threshold:g}%"
+            if fail_on_regression:
+                raise CommandError(summary)
+            self.stdout.write(self.style.WARNING(summary))
+        else:
+            self.stdout.write(self.style.SUCCESS('No regressions'))
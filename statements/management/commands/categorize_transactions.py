@@ -0,0 +1,47 @@
+"""
+Store the category of saved transactions in batches
+"""
+
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...categorizer import categorize_details
+from ...category_rules import load_categorizer
+from ...constants import CATEGORIZE_BATCH_SIZE
+from ...models import MonthlyAccountSummary, StatementDetail
+from ...rollups import move_categories
+
+
+class Command(BaseCommand):
+    help = (
+        'Categorize transactions that have no category yet, '
+        'or every transaction with --all, using the current category rules'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Re-categorize every transaction, not only those without a category'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=CATEGORIZE_BATCH_SIZE,
+            help='Transactions read and updated per batch (default: %(default)s)'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        updated = categorize_details(
+            StatementDetail,
+            recategorize=options['all'],
+            batch_size=options['batch_size'],
+            categorizer=load_categorizer(),
+            progress=self._write_progress if options['verbosity'] > 1 else None,
+            on_change=partial(move_categories, MonthlyAccountSummary),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Updated the category of {updated} transactions"))
+
+    def _write_progress(self, examined, updated):
+        self.stdout.write(f"  {examined} examined, {updated} updated")
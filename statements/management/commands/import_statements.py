@@ -0,0 +1,70 @@
+"""
+Import a directory or ZIP archive of statements in one batch
+"""
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...batch import collect_path
+from ...constants import INGEST_WORKER_THREADS
+from ...exceptions import StatementParsingError
+from ...jobs import enqueue_batch, run_until_finished
+from ...models import Account
+
+
+class Command(BaseCommand):
+    help = 'Queue every statement in a directory, ZIP archive or file for ingest and run the jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Directory, ZIP archive or single statement file')
+        parser.add_argument(
+            '--account',
+            help='Abbreviation of the account every statement belongs to; '
+                 'detected per file from the parser history when omitted'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=INGEST_WORKER_THREADS,
+            help='Number of statements ingested concurrently'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"No such file or directory: {path}")
+
+        account = None
+        if options['account']:
+            try:
+                account = Account.objects.get(account_abbr=options['account'])
+            except Account.DoesNotExist:
+                raise CommandError(f"No account with abbreviation {options['account']!r}")
+
+        try:
+            files = collect_path(path)
+        except StatementParsingError as e:
+            raise CommandError(str(e))
+        if not files:
+            raise CommandError(f"No statement files found in {path}")
+
+        workers = max(1, options['workers'])
+        self.stdout.write(f"Importing {len(files)} files with {workers} workers")
+        jobs = run_until_finished([job.id for job in enqueue_batch(files, account=account)], threads=workers)
+
+        failed = [job for job in jobs if job.status == job.STATUS_FAILED]
+        for job in jobs:
+            if job.status == job.STATUS_SUCCEEDED:
+                self.stdout.write(self.style.SUCCESS(
+                    f"  OK    {job.source_file}: {job.rows_inserted} transactions "
+                    f"into {job.account.account_abbr} ({job.statement.source.parser_name})"
+                ))
+            else:
+                self.stdout.write(self.style.ERROR(f"  FAIL  {job.source_file}: {job.error}"))
+
+        summary = (
+            f"{len(jobs) - len(failed)} imported, {len(failed)} failed, "
+            f"{sum(job.rows_inserted for job in jobs)} transactions"
+        )
+        if failed:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,35 @@
+"""
+Recompute monthly account summaries from the stored transactions
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...models import Account, MonthlyAccountSummary, StatementDetail
+from ...rollups import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the monthly account summaries the report charts read, for every account '
+        'or the accounts given with --account, after transactions were changed in bulk'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--account', action='append', dest='accounts', metavar='ABBR',
+            help='Only rebuild this account, by abbreviation; may be repeated'
+        )
+
+    def handle(self, *args, **options):
+        account_ids = None
+        if options['accounts']:
+            found = dict(
+                Account.objects.filter(account_abbr__in=options['accounts']).values_list('account_abbr', 'id')
+            )
+            missing = sorted(set(options['accounts']) - found.keys())
+            if missing:
+                raise CommandError(f"Unknown account: {', '.join(missing)}")
+            account_ids = list(found.values())
+
+        written = rebuild_summaries(MonthlyAccountSummary, StatementDetail, account_ids)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} monthly account summaries"))
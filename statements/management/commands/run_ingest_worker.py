@@ -0,0 +1,53 @@
+"""
+Run the background statement ingest worker
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...constants import INGEST_POLL_INTERVAL, INGEST_WORKER_THREADS, PDF_MAX_WORKERS
+from ...jobs import work_loop
+
+
+class Command(BaseCommand):
+    help = 'Process queued statement ingest and re-categorize jobs with a pool of worker threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=INGEST_WORKER_THREADS,
+            help='Number of jobs processed concurrently'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=INGEST_POLL_INTERVAL,
+            help='Seconds to wait between polls when the queue is empty'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once the queue is empty instead of polling for new jobs'
+        )
+
+    def handle(self, *args, **options):
+        threads = max(1, options['threads'])
+        stop = threading.Event()
+        self.stdout.write(f"Starting ingest worker with {threads} threads")
+        if not settings.PARSE_SANDBOX:
+            # Parsing happens in this dedicated process, so long PDFs may use a page extraction pool
+            from ...pdf import set_max_workers
+            set_max_workers(PDF_MAX_WORKERS)
+
+        with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='ingest') as pool:
+            futures = [
+                pool.submit(work_loop, stop, options['poll_interval'], options['once'])
+                for _ in range(threads)
+            ]
+            try:
+                processed = sum(future.result() for future in futures)
+            except KeyboardInterrupt:
+                # Let each thread finish its current job before exiting
+                stop.set()
+                processed = sum(future.result() for future in futures)
+
+        self.stdout.write(self.style.SUCCESS(f"Ingest worker processed {processed} jobs"))
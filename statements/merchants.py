@@ -0,0 +1,132 @@
+"""
+Merchant normalization: map raw transaction items to Merchant rows
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .constants import MERCHANT_BATCH_SIZE, MERCHANT_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Rewrites applied in order to the upper-cased item; each removes one kind of noise
+NORMALIZATION_STEPS = [
+    # Masked card numbers: ****1234, XXXX 1234, CARD #1234
+    (re.compile(r'(?:\*{2,}|\bX{2,})\s*\d{2,4}\b|\bCARD\s*#?\s*\d{4}\b'), ' '),
+    # Dates and times: 2025-01-15, 01/15/25, 15/01, 14:32
+    (re.compile(r'\b\d{1,4}[/-]\d{1,2}(?:[/-]\d{2,4})?\b|\b\d{1,2}:\d{2}(?::\d{2})?\b'), ' '),
+    # Store numbers: #1234, STORE 12, STR #12
+    (re.compile(r'#\s*\d+|\b(?:STORE|STR|LOC|NO)\.?\s*#?\s*\d+\b'), ' '),
+    # Trailing reference codes and numbers: any final words containing a digit
+    (re.compile(r'(?:\s+\S*\d\S*)+$'), ''),
+    # Punctuation left dangling at either end, and repeated whitespace
+    (re.compile(r'^[\s\-*#.,/:;]+|[\s\-*#.,/:;]+$'), ''),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+@lru_cache(maxsize=MERCHANT_CACHE_SIZE)
+def normalize_merchant(item: str) -> str:
+    """
+    Canonical merchant name of a transaction item.
+
+    Card suffixes, dates, store numbers and trailing reference codes are
+    removed so one merchant's transactions share a name. Results are
+    cached, so repeated items cost a dict lookup.
+
+    Args:
+        item: Raw transaction description
+
+    Returns:
+        Upper-cased merchant name; the whole item if nothing would be left
+    """
+    upper = ' '.join(item.upper().split())
+    name = upper
+    for pattern, replacement in NORMALIZATION_STEPS:
+        name = pattern.sub(replacement, name).strip()
+    return name or upper
+
+
+class MerchantResolver:
+    """
+    Resolve raw items to Merchant ids, creating merchants as they appear.
+
+    Items the resolver has seen are answered from a dict. New items are
+    normalized, and all their names are looked up with one query per call;
+    merchants that do not exist yet are created with one bulk insert.
+    """
+
+    def __init__(self, merchant_model):
+        self.merchant_model = merchant_model
+        self.ids: Dict[str, int] = {}
+
+    def resolve_many(self, items: Iterable[str]) -> List[int]:
+        """
+        Merchant ids of many items.
+
+        Args:
+            items: Raw transaction descriptions
+
+        Returns:
+            List of Merchant ids aligned with items
+        """
+        items = list(items)
+        names = {item: normalize_merchant(item) for item in set(items) if item not in self.ids}
+        if names:
+            wanted = set(names.values())
+            found = dict(self.merchant_model.objects.filter(name__in=wanted).values_list('name', 'id'))
+            new = wanted - found.keys()
+            if new:
+                # Another ingest may create the same merchant concurrently
+                self.merchant_model.objects.bulk_create(
+                    [self.merchant_model(name=name) for name in new], ignore_conflicts=True
+                )
+                found.update(self.merchant_model.objects.filter(name__in=new).values_list('name', 'id'))
+            for item, name in names.items():
+                self.ids[item] = found[name]
+        return [self.ids[item] for item in items]
+
+    def resolve(self, item: str) -> int:
+        """Merchant id of one item"""
+        return self.resolve_many([item])[0]
+
+
+def assign_merchants(detail_model, merchant_model, batch_size: int = MERCHANT_BATCH_SIZE,
+                     progress: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Link saved transactions without a merchant to one, a batch of distinct items at a time.
+
+    Takes the model classes so migrations can pass their historical models.
+
+    Args:
+        detail_model: StatementDetail model class
+        merchant_model: Merchant model class
+        batch_size: Distinct items resolved and updated per batch
+        progress: Called with the rows linked so far after each batch
+
+    Returns:
+        Number of transactions linked
+    """
+    resolver = MerchantResolver(merchant_model)
+    linked = 0
+    while True:
+        items = list(
+            detail_model.objects.filter(merchant__isnull=True)
+            .order_by().values_list('item', flat=True).distinct()[:batch_size]
+        )
+        if not items:
+            break
+        by_merchant: Dict[int, List[str]] = {}
+        for item, merchant_id in zip(items, resolver.resolve_many(items)):
+            by_merchant.setdefault(merchant_id, []).append(item)
+        for merchant_id, merchant_items in by_merchant.items():
+            linked += detail_model.objects.filter(
+                merchant__isnull=True, item__in=merchant_items
+            ).update(merchant_id=merchant_id)
+        if progress is not None:
+            progress(linked)
+
+    logger.info(f"Linked {linked} transactions to merchants")
+    return linked
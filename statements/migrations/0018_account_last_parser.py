@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statements', '0017_contribution_contributionroom'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='last_parser',
+            field=models.CharField(blank=True, default='', help_text='Parser that last read a statement for this account', max_length=100),
+        ),
+    ]
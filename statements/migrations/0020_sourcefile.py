@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statements', '0019_ingestjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SourceFile',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('size', models.PositiveBigIntegerField(help_text='Uncompressed size in bytes')),
+                ('filename', models.CharField(help_text='Name the content was first uploaded as', max_length=255)),
+                ('parser_name', models.CharField(blank=True, default='', help_text='Parser that read this file', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Source File',
+                'verbose_name_plural': 'Source Files',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='statement',
+            name='source',
+            field=models.ForeignKey(blank=True, help_text='Stored content the statement was parsed from', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statements', to='statements.sourcefile'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:31
+
+from django.db import migrations, models
+
+from statements.fingerprints import FingerprintCounter
+
+
+def backfill_fingerprints(apps, schema_editor):
+    """Fingerprint existing transactions, numbering repeats across each account"""
+    StatementDetail = apps.get_model('statements', 'StatementDetail')
+    
+    counters = {}
+    pending = []
+    details = StatementDetail.objects.select_related('statement').order_by(
+        'statement__account_id', 'statement_id', 'id'
+    )
+    for detail in details.iterator(chunk_size=2000):
+        account_id = detail.statement.account_id
+        counter = counters.setdefault(account_id, FingerprintCounter(account_id))
+        detail.fingerprint = counter.next(detail.transaction_date, detail.amount, detail.direction, detail.item)
+        pending.append(detail)
+        if len(pending) >= 2000:
+            StatementDetail.objects.bulk_update(pending, ['fingerprint'])
+            pending = []
+    if pending:
+        StatementDetail.objects.bulk_update(pending, ['fingerprint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statements', '0020_sourcefile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statementdetail',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of account, date, amount, direction, item and occurrence; set on ingest', max_length=64, null=True),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='statementdetail',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of account, date, amount, direction, item and occurrence; set on ingest', max_length=64, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:03
+
+from django.db import migrations, models
+
+from statements.categorizer import categorize_details
+
+
+def backfill_categories(apps, schema_editor):
+    """Categorize existing transactions in batches"""
+    categorize_details(apps.get_model('statements', 'StatementDetail'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statements', '0021_statementdetail_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='statementdetail',
+            name='category',
+            field=models.CharField(blank=True, choices=[('transfer', 'Transfer'), ('investment', 'Investment'), ('spending', 'Spending'), ('income', 'Income'), ('other', 'Other')], default='', help_text='Set from the item and direction on ingest; recompute with the categorize_transactions command', max_length=20),
+        ),
+        migrations.RunPython(backfill_categories, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='statementdetail',
+            index=models.Index(fields=['transaction_date', 'category'], name='statements__transac_22249f_idx'),
+        ),
+    ]
@@ -0,0 +1,102 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The keyword categorization that was hard-coded until now: (pattern, direction, account type, category, priority)
+DEFAULT_RULES = [
+    ('ROYAL BANK OF CANADA TORONTO', 'IN', 'CREDIT_CARD', 'payment', 30),
+    ('EQ BANK', 'OUT', '', 'transfer', 20),
+    ('PAY EMP-VENDOR', 'OUT', '', 'transfer', 20),
+    ('INVESTMENTS', 'OUT', '', 'investment', 10),
+    ('QUESTRADE', 'OUT', '', 'investment', 10),
+    ('MUTUAL FUNDS', 'OUT', '', 'investment', 10),
+    ('GIC', 'OUT', '', 'investment', 10),
+    ('GIC', 'IN', '', 'other', 10),
+]
+
+
+def create_default_rules(apps, schema_editor):
+    """Store the built-in keywords as rules and mark card payments already imported"""
+    CategoryRule = apps.get_model('statements', 'CategoryRule')
+    StatementDetail = apps.get_model('statements', 'StatementDetail')
+    CategoryRule.objects.bulk_create([
+        CategoryRule(
+            pattern=pattern, match_type='CONTAINS', direction=direction,
+            account_type=account_type, category=category, priority=priority,
+        )
+        for pattern, direction, account_type, category, priority in DEFAULT_RULES
+    ])
+    StatementDetail.objects.filter(
+        direction='IN',
+        item__icontains='ROYAL BANK OF CANADA TORONTO',
+        statement__account__account_type='CREDIT_CARD',
+    ).update(category='payment')
+
+
+def remove_payment_category(apps, schema_editor):
+    """Card payments were categorized as income before rules existed"""
+    StatementDetail = apps.get_model('statements', 'StatementDetail')
+    StatementDetail.objects.filter(category='payment').update(category='income')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statements', '0022_statementdetail_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestjob',
+            name='params',
+            field=models.JSONField(blank=True, default=dict, help_text='Arguments of jobs that are not uploads'),
+        ),
+        migrations.AlterField(
+            model_name='ingestjob',
+            name='account',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ingest_jobs', to='statements.account'),
+        ),
+        migrations.AlterField(
+            model_name='ingestjob',
+            name='content',
+            field=models.BinaryField(blank=True, default=b'', help_text='Raw bytes of the uploaded file'),
+        ),
+        migrations.AlterField(
+            model_name='ingestjob',
+            name='kind',
+            field=models.CharField(choices=[('INGEST', 'Statement ingest'), ('RECATEGORIZE', 'Re-categorize transactions')], default='INGEST', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='ingestjob',
+            name='source_file',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='statementdetail',
+            name='category',
+            field=models.CharField(blank=True, choices=[('transfer', 'Transfer'), ('investment', 'Investment'), ('spending', 'Spending'), ('income', 'Income'), ('other', 'Other'), ('payment', 'Card payment')], default='', help_text='Set from the item and direction on ingest; recompute with the categorize_transactions command', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='CategoryRule',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('pattern', models.CharField(help_text='Compared with the transaction item, ignoring case', max_length=255)),
+                ('match_type', models.CharField(choices=[('CONTAINS', 'Contains'), ('STARTS_WITH', 'Starts with'), ('EXACT', 'Exact'), ('REGEX', 'Regular expression')], default='CONTAINS', max_length=20)),
+                ('category', models.CharField(choices=[('transfer', 'Transfer'), ('investment', 'Investment'), ('spending', 'Spending'), ('income', 'Income'), ('other', 'Other'), ('payment', 'Card payment')], max_length=20)),
+                ('direction', models.CharField(blank=True, choices=[('IN', 'In'), ('OUT', 'Out')], default='', help_text='Only match transactions in this direction; blank for both', max_length=6)),
+                ('account_type', models.CharField(blank=True, choices=[('CREDIT_CARD', 'Credit Card'), ('INVESTMENT', 'Investment'), ('BANK', 'Bank')], default='', help_text='Only match transactions of accounts of this type; blank for every type', max_length=20)),
+                ('priority', models.IntegerField(default=0, help_text='Rules with a higher priority are tried first')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('account', models.ForeignKey(blank=True, help_text='Only match transactions of this account; blank for every account', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='category_rules', to='statements.account')),
+            ],
+            options={
+                'verbose_name': 'Category Rule',
+                'verbose_name_plural': 'Category Rules',
+                'ordering': ['-priority', 'id'],
+            },
+        ),
+        migrations.RunPython(create_default_rules, remove_payment_category),
+    ]
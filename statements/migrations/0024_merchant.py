@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from statements.merchants import assign_merchants
+
+
+def link_merchants(apps, schema_editor):
+    """Link existing transactions to merchants in batches of distinct items"""
+    assign_merchants(apps.get_model('statements', 'StatementDetail'), apps.get_model('statements', 'Merchant'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statements', '0023_categoryrule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Merchant',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(help_text='Normalized item: upper case, without store numbers, dates or card suffixes', max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Merchant',
+                'verbose_name_plural': 'Merchants',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='statementdetail',
+            name='item',
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddField(
+            model_name='statementdetail',
+            name='merchant',
+            field=models.ForeignKey(blank=True, help_text='Set from the normalized item on ingest', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statementdetail_set', to='statements.merchant'),
+        ),
+        migrations.RunPython(link_merchants, migrations.RunPython.noop),
+    ]
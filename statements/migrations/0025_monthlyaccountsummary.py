@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:22
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+from statements.rollups import rebuild_summaries
+
+
+def summarize_transactions(apps, schema_editor):
+    """Fill the summaries from the transactions already stored"""
+    rebuild_summaries(
+        apps.get_model('statements', 'MonthlyAccountSummary'), apps.get_model('statements', 'StatementDetail')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statements', '0024_merchant'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyAccountSummary',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('category', models.CharField(blank=True, choices=[('transfer', 'Transfer'), ('investment', 'Investment'), ('spending', 'Spending'), ('income', 'Income'), ('other', 'Other'), ('payment', 'Card payment')], default='', max_length=20)),
+                ('direction', models.CharField(choices=[('IN', 'In'), ('OUT', 'Out')], max_length=6)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('count', models.IntegerField(default=0, help_text='Transactions in the total')),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_summaries', to='statements.account')),
+            ],
+            options={
+                'verbose_name': 'Monthly Account Summary',
+                'verbose_name_plural': 'Monthly Account Summaries',
+                'ordering': ['account', 'year', 'month', 'category', 'direction'],
+                'indexes': [models.Index(fields=['year', 'month'], name='statements__year_f05c16_idx')],
+                'constraints': [models.UniqueConstraint(fields=('account', 'year', 'month', 'category', 'direction'), name='unique_monthly_account_summary')],
+            },
+        ),
+        migrations.RunPython(summarize_transactions, migrations.RunPython.noop),
+    ]
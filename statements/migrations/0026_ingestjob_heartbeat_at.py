@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statements', '0025_monthlyaccountsummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Last progress from the worker; the job is retaken when this is too old', null=True),
+        ),
+    ]
@@ -1,17 +1,27 @@
 # Models package for statements app
 from .account import Account
+from .source_file import SourceFile
 from .statement import Statement
+from .merchant import Merchant
 from .statement_detail import StatementDetail
 from .investment_data import InvestmentData
 from .account_value import AccountValue
 from .contribution import ContributionRoom, Contribution
+from .ingest_job import IngestJob
+from .category_rule import CategoryRule
+from .monthly_account_summary import MonthlyAccountSummary
 
 __all__ = [
     'Account',
+    'SourceFile',
     'Statement',
+    'Merchant',
     'StatementDetail',
     'InvestmentData',
     'AccountValue',
     'ContributionRoom',
     'Contribution',
+    'IngestJob',
+    'CategoryRule',
+    'MonthlyAccountSummary',
 ]
@@ -14,6 +14,7 @@ class Account(models.Model):
     bank_name = models.CharField(max_length=100)
     account_number = models.CharField(max_length=50)
     account_type = models.CharField(max_length=20, choices=ACCOUNT_TYPES)
+    last_parser = models.CharField(max_length=100, blank=True, default='', help_text='Parser that last read a statement for this account')
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
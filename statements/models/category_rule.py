@@ -0,0 +1,90 @@
+import re
+
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from ..categorizer import RuleSpec
+from ..constants import (
+    CATEGORY_CHOICES, DIRECTION_IN, DIRECTION_OUT, RULE_MATCH_CHOICES, RULE_MATCH_CONTAINS, RULE_MATCH_REGEX,
+)
+from .account import Account
+
+
+class CategoryRule(models.Model):
+    """User-defined rule that sets the category of matching transactions"""
+    DIRECTION_CHOICES = [
+        (DIRECTION_IN, 'In'),
+        (DIRECTION_OUT, 'Out'),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    pattern = models.CharField(max_length=255, help_text='Compared with the transaction item, ignoring case')
+    match_type = models.CharField(max_length=20, choices=RULE_MATCH_CHOICES, default=RULE_MATCH_CONTAINS)
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
+    direction = models.CharField(
+        max_length=6, choices=DIRECTION_CHOICES, blank=True, default='',
+        help_text='Only match transactions in this direction; blank for both'
+    )
+    account = models.ForeignKey(
+        Account, on_delete=models.CASCADE, null=True, blank=True, related_name='category_rules',
+        help_text='Only match transactions of this account; blank for every account'
+    )
+    account_type = models.CharField(
+        max_length=20, choices=Account.ACCOUNT_TYPES, blank=True, default='',
+        help_text='Only match transactions of accounts of this type; blank for every type'
+    )
+    priority = models.IntegerField(default=0, help_text='Rules with a higher priority are tried first')
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-priority', 'id']
+        verbose_name = 'Category Rule'
+        verbose_name_plural = 'Category Rules'
+
+    def __str__(self):
+        return f"{self.get_match_type_display()} '{self.pattern}' -> {self.get_category_display()}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the rule as loaded, so a change can re-categorize what it used to match"""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_spec = instance.to_spec() if instance.is_active else None
+        return instance
+
+    def clean(self):
+        """Reject regular expressions that do not compile"""
+        if self.match_type == RULE_MATCH_REGEX:
+            try:
+                re.compile(self.pattern)
+            except re.error as e:
+                raise ValidationError({'pattern': f"Invalid regular expression: {e}"})
+
+    def to_spec(self) -> RuleSpec:
+        """Detached copy of the fields the categorizer uses"""
+        return RuleSpec(
+            pattern=self.pattern,
+            match_type=self.match_type,
+            category=self.category,
+            direction=self.direction,
+            account_id=self.account_id,
+            account_type=self.account_type,
+            priority=self.priority,
+        )
+
+
+# Signal handlers to re-categorize the rows a rule affects
+@receiver(post_save, sender=CategoryRule)
+@receiver(post_delete, sender=CategoryRule)
+def category_rule_changed(sender, instance, **kwargs):
+    """Queue re-categorization of the rows the rule matched before and after the change"""
+    from ..jobs import enqueue_recategorize
+
+    before = getattr(instance, '_loaded_spec', None)
+    after = instance.to_spec() if instance.is_active and 'created' in kwargs else None
+    instance._loaded_spec = after
+    if before == after:
+        return
+    enqueue_recategorize([spec for spec in (before, after) if spec is not None])
@@ -0,0 +1,82 @@
+from django.db import models
+from .account import Account
+from .statement import Statement
+
+
+class IngestJob(models.Model):
+    """Queued background work: a statement upload, or re-categorizing after a rule change"""
+    STATUS_PENDING = 'PENDING'
+    STATUS_RUNNING = 'RUNNING'
+    STATUS_SUCCEEDED = 'SUCCEEDED'
+    STATUS_FAILED = 'FAILED'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    KIND_INGEST = 'INGEST'
+    KIND_RECATEGORIZE = 'RECATEGORIZE'
+    KIND_CHOICES = [
+        (KIND_INGEST, 'Statement ingest'),
+        (KIND_RECATEGORIZE, 'Re-categorize transactions'),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default=KIND_INGEST)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    account = models.ForeignKey(
+        Account, on_delete=models.CASCADE, null=True, blank=True, related_name='ingest_jobs'
+    )
+    source_file = models.CharField(max_length=255, blank=True, default='')
+    content = models.BinaryField(blank=True, default=b'', help_text='Raw bytes of the uploaded file')
+    params = models.JSONField(blank=True, default=dict, help_text='Arguments of jobs that are not uploads')
+    statement_from_date = models.DateField(null=True, blank=True)
+    statement_to_date = models.DateField(null=True, blank=True)
+    statement = models.ForeignKey(
+        Statement, on_delete=models.SET_NULL, null=True, blank=True, related_name='ingest_jobs'
+    )
+    rows_parsed = models.PositiveIntegerField(default=0)
+    rows_inserted = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    attempts = models.PositiveIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, default='', help_text='Worker that claimed the job')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, help_text='Last progress from the worker; the job is retaken when this is too old'
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Ingest Job'
+        verbose_name_plural = 'Ingest Jobs'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.id} - {self.source_file} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        """Whether the worker is done with this job"""
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+
+    def to_dict(self):
+        """Progress summary for the status endpoint"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'source_file': self.source_file,
+            'rows_parsed': self.rows_parsed,
+            'rows_inserted': self.rows_inserted,
+            'statement_id': self.statement_id,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,19 @@
+from django.db import models
+
+
+class Merchant(models.Model):
+    """Canonical merchant that raw transaction items are normalized to"""
+    id = models.AutoField(primary_key=True)
+    name = models.CharField(
+        max_length=255, unique=True,
+        help_text='Normalized item: upper case, without store numbers, dates or card suffixes'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Merchant'
+        verbose_name_plural = 'Merchants'
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,87 @@
+from django.db import models
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from decimal import Decimal
+from ..constants import CATEGORY_CHOICES
+from ..rollups import add_delta, apply_deltas, detail_deltas, queryset_deltas
+from .account import Account
+from .statement import Statement
+from .statement_detail import StatementDetail
+
+
+class MonthlyAccountSummary(models.Model):
+    """Total and count of an account's transactions in one month, category and direction"""
+    DIRECTION_CHOICES = [
+        ('IN', 'In'),
+        ('OUT', 'Out'),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='monthly_summaries')
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, blank=True, default='')
+    direction = models.CharField(max_length=6, choices=DIRECTION_CHOICES)
+    total = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    count = models.IntegerField(default=0, help_text='Transactions in the total')
+
+    class Meta:
+        ordering = ['account', 'year', 'month', 'category', 'direction']
+        verbose_name = 'Monthly Account Summary'
+        verbose_name_plural = 'Monthly Account Summaries'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['account', 'year', 'month', 'category', 'direction'], name='unique_monthly_account_summary'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['year', 'month']),
+        ]
+
+    def __str__(self):
+        return f"{self.account.account_abbr} {self.year}-{self.month:02d} {self.category} {self.direction}: {self.total}"
+
+
+def _deleted_model(origin):
+    """Model whose deletion a cascade started from"""
+    return origin.model if isinstance(origin, models.QuerySet) else type(origin)
+
+
+def _summarized(rows):
+    """Add the account id to (statement id, date, category, direction, amount) rows"""
+    accounts = dict(
+        Statement.objects.filter(pk__in={row[0] for row in rows}).values_list('pk', 'account_id')
+    )
+    return [(accounts[row[0]], *row[1:]) for row in rows if row[0] in accounts]
+
+
+# Signal handlers keeping the summaries in step with single transactions and deleted statements;
+# ingest writes in bulk and updates the summaries itself
+@receiver(post_save, sender=StatementDetail)
+def summarize_saved_detail(sender, instance, created, **kwargs):
+    """Count a new transaction, or move an edited one between summaries"""
+    before = getattr(instance, '_loaded_summary', None)
+    if not created and before is None:
+        return
+    after = instance.summary_row()
+    instance._loaded_summary = after
+    if before == after:
+        return
+    deltas = detail_deltas(_summarized([before]), sign=-1) if before else {}
+    for key, (amount, count) in detail_deltas(_summarized([after])).items():
+        add_delta(deltas, key, amount, count)
+    apply_deltas(MonthlyAccountSummary, deltas)
+
+
+@receiver(post_delete, sender=StatementDetail)
+def summarize_deleted_detail(sender, instance, origin=None, **kwargs):
+    """Remove a deleted transaction, unless it goes with its statement or account"""
+    if _deleted_model(origin) is StatementDetail:
+        apply_deltas(MonthlyAccountSummary, detail_deltas(_summarized([instance.summary_row()]), sign=-1))
+
+
+@receiver(pre_delete, sender=Statement)
+def summarize_deleted_statement(sender, instance, origin=None, **kwargs):
+    """Remove a deleted statement's transactions with one grouped query, unless its account goes too"""
+    if _deleted_model(origin) is Statement:
+        apply_deltas(MonthlyAccountSummary, queryset_deltas(instance.statementdetail_set.all(), sign=-1))
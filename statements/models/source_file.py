@@ -0,0 +1,19 @@
+from django.db import models
+
+
+class SourceFile(models.Model):
+    """Uploaded statement file, identified by the SHA-256 of its content"""
+    id = models.AutoField(primary_key=True)
+    sha256 = models.CharField(max_length=64, unique=True)
+    size = models.PositiveBigIntegerField(help_text='Uncompressed size in bytes')
+    filename = models.CharField(max_length=255, help_text='Name the content was first uploaded as')
+    parser_name = models.CharField(max_length=100, blank=True, default='', help_text='Parser that read this file')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Source File'
+        verbose_name_plural = 'Source Files'
+    
+    def __str__(self):
+        return f"{self.filename} ({self.sha256[:12]})"
@@ -2,6 +2,7 @@ from django.db import models
 from django.core.cache import cache
 from decimal import Decimal
 from .account import Account
+from .source_file import SourceFile
 
 
 class Statement(models.Model):
@@ -17,6 +18,10 @@ class Statement(models.Model):
     id = models.AutoField(primary_key=True)
     account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name='statements')
     source_file = models.CharField(max_length=255, null=True, blank=True)
+    source = models.ForeignKey(
+        SourceFile, on_delete=models.SET_NULL, null=True, blank=True, related_name='statements',
+        help_text='Stored content the statement was parsed from'
+    )
     statement_from_date = models.DateField(db_index=True)
     statement_to_date = models.DateField(db_index=True)
     statement_type = models.CharField(max_length=20, choices=STATEMENT_TYPES)
@@ -3,8 +3,14 @@ from django.core.validators import MinValueValidator
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from decimal import Decimal
+from ..constants import CATEGORY_CHOICES
+from ..merchants import MerchantResolver
+from .merchant import Merchant
 from .statement import Statement
 
+# Fields that decide which monthly summary a transaction is counted in, and by how much
+SUMMARY_FIELDS = {'statement_id', 'transaction_date', 'category', 'direction', 'amount'}
+
 
 class StatementDetail(models.Model):
     """Individual transaction details within a statement"""
@@ -15,7 +21,11 @@ class StatementDetail(models.Model):
 
     id = models.AutoField(primary_key=True)
     statement = models.ForeignKey(Statement, on_delete=models.CASCADE, related_name='statementdetail_set')
-    item = models.CharField(max_length=255, db_index=True)
+    item = models.CharField(max_length=255)
+    merchant = models.ForeignKey(
+        Merchant, on_delete=models.SET_NULL, null=True, blank=True, related_name='statementdetail_set',
+        help_text='Set from the normalized item on ingest'
+    )
     transaction_date = models.DateField(db_index=True)
     amount = models.DecimalField(
         max_digits=15,
@@ -23,6 +33,14 @@ class StatementDetail(models.Model):
         validators=[MinValueValidator(Decimal('0.01'))]
     )
     direction = models.CharField(max_length=6, choices=DIRECTION_CHOICES, db_index=True)
+    fingerprint = models.CharField(
+        max_length=64, unique=True, null=True, blank=True, editable=False,
+        help_text='Hash of account, date, amount, direction, item and occurrence; set on ingest'
+    )
+    category = models.CharField(
+        max_length=20, choices=CATEGORY_CHOICES, blank=True, default='',
+        help_text='Set from the item and direction on ingest; recompute with the categorize_transactions command'
+    )
 
     class Meta:
         ordering = ['-transaction_date']
@@ -32,11 +50,38 @@ class StatementDetail(models.Model):
             models.Index(fields=['statement', '-transaction_date']),
             models.Index(fields=['transaction_date', 'direction']),
             models.Index(fields=['direction', 'amount']),
+            models.Index(fields=['transaction_date', 'category']),
         ]
     
     def __str__(self):
         return f"{self.item} - {self.amount} ({self.direction}) on {self.transaction_date}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember how the transaction was summarized as loaded, so an edit can move it"""
+        instance = super().from_db(db, field_names, values)
+        if not instance.get_deferred_fields() & SUMMARY_FIELDS:
+            instance._loaded_summary = instance.summary_row()
+        return instance
+
+    def summary_row(self):
+        """Statement, date, category, direction and amount the monthly summaries count"""
+        return self.statement_id, self.transaction_date, self.category, self.direction, self.amount
+
+    def save(self, *args, **kwargs):
+        """Categorize the transaction and link its merchant if ingest has not already"""
+        if self.merchant_id is None:
+            self.merchant_id = MerchantResolver(Merchant).resolve(self.item)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'merchant'}
+        if not self.category:
+            from ..category_rules import get_categorizer
+            account = self.statement.account
+            self.category = get_categorizer().categorize(self.item, self.direction, (account.id, account.account_type))
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'category'}
+        super().save(*args, **kwargs)
+
 
 # Signal handlers to clear Statement cache when details change
 @receiver(post_save, sender=StatementDetail)
@@ -0,0 +1,174 @@
+"""
+Cached PDF document access shared by parser detection and parsing
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pdfplumber
+
+from .constants import PDF_PAGES_PER_TASK, PDF_PARALLEL_MIN_PAGES
+
+logger = logging.getLogger(__name__)
+
+_open_documents = threading.local()
+
+# Default processes iter_texts extracts pages with. Web workers and parser sandboxes keep 1: a
+# pool per request would multiply their memory, and a sandbox's workers would escape its limits
+_max_workers = 1
+
+
+def set_max_workers(max_workers: int) -> None:
+    """
+    Set the default number of page extraction processes for this process.
+
+    Only dedicated processes such as the ingest worker should raise it.
+
+    Args:
+        max_workers: Number of processes; 1 extracts every page in-process
+    """
+    global _max_workers
+    _max_workers = max_workers
+
+
+def _pool_context():
+    """Start page extraction processes without forking a threaded parent, as parser sandboxes do"""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+def extract_page_texts(file_content: bytes, start: int, stop: int) -> List[Tuple[int, str]]:
+    """
+    Extract the text of a range of pages; runs inside a worker process.
+
+    Args:
+        file_content: Raw PDF bytes
+        start: First page index
+        stop: Page index after the last page
+
+    Returns:
+        List of (page index, text) pairs
+    """
+    with pdfplumber.open(BytesIO(file_content)) as pdf:
+        return [(index, pdf.pages[index].extract_text() or '') for index in range(start, stop)]
+
+
+class PDFDocument:
+    """
+    A PDF opened once, with per-page text and tables cached on first use.
+
+    Use PDFDocument.open() so that detection and parsing of the same upload
+    in one thread share a single handle instead of each re-opening and
+    re-extracting the file.
+    """
+
+    def __init__(self, file_content: bytes, digest: Optional[str] = None):
+        self.file_content = file_content
+        self.digest = digest or hashlib.sha256(file_content).hexdigest()
+        self.pdf = pdfplumber.open(BytesIO(file_content))
+        self._texts: Dict[int, str] = {}
+        self._tables: Dict[int, List[List[List[Optional[str]]]]] = {}
+
+    @classmethod
+    def open(cls, file_content: bytes) -> 'PDFDocument':
+        """
+        Return the document for these bytes, reusing the one this thread has open.
+
+        Args:
+            file_content: Raw PDF bytes
+
+        Returns:
+            An open PDFDocument; call close() once parsing is finished
+        """
+        digest = hashlib.sha256(file_content).hexdigest()
+        document = getattr(_open_documents, 'document', None)
+        if document is not None and document.digest == digest:
+            return document
+        if document is not None:
+            document.close()
+
+        document = cls(file_content, digest)
+        _open_documents.document = document
+        return document
+
+    def close(self) -> None:
+        """Close the file and forget it as this thread's open document"""
+        if getattr(_open_documents, 'document', None) is self:
+            _open_documents.document = None
+        self.pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf.pages)
+
+    def page_text(self, index: int) -> str:
+        """Text of one page, extracted once"""
+        if index not in self._texts:
+            self._texts[index] = self.pdf.pages[index].extract_text() or ''
+        return self._texts[index]
+
+    def page_tables(self, index: int) -> List[List[List[Optional[str]]]]:
+        """Tables of one page, extracted once"""
+        if index not in self._tables:
+            self._tables[index] = self.pdf.pages[index].extract_tables()
+        return self._tables[index]
+
+    def iter_texts(self, max_workers: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page index, text) for every page in order.
+
+        Cached pages are yielded first. Documents with at least
+        PDF_PARALLEL_MIN_PAGES pages have their remaining pages extracted in
+        a process pool, PDF_PAGES_PER_TASK pages per task. Stopping early,
+        for example once a section is found, cancels the ranges that have
+        not started yet.
+
+        Args:
+            max_workers: Number of processes; defaults to the value given to
+                set_max_workers(), which is 1 unless raised
+
+        Returns:
+            Iterator of (page index, text) pairs
+        """
+        missing = [index for index in range(self.page_count) if index not in self._texts]
+        workers = min(max_workers or _max_workers, len(missing))
+        if len(missing) < PDF_PARALLEL_MIN_PAGES or workers <= 1:
+            for index in range(self.page_count):
+                yield index, self.page_text(index)
+            return
+
+        for index in range(missing[0]):
+            yield index, self._texts[index]
+
+        ranges = [(start, min(start + PDF_PAGES_PER_TASK, self.page_count))
+                  for start in range(missing[0], self.page_count, PDF_PAGES_PER_TASK)]
+        logger.debug(f"Extracting {len(missing)} PDF pages with {workers} processes")
+
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context())
+        futures = [pool.submit(extract_page_texts, self.file_content, start, stop) for start, stop in ranges]
+        try:
+            for future in futures:
+                for index, text in future.result():
+                    self._texts.setdefault(index, text)
+                    yield index, self._texts[index]
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def find_page(self, predicate: Callable[[str], bool]) -> Optional[int]:
+        """Index of the first page whose text satisfies predicate, extracting no further"""
+        for index, text in self.iter_texts():
+            if predicate(text):
+                return index
+        return None
@@ -0,0 +1,202 @@
+"""
+Monthly account summaries: totals per account, month, category and direction kept up to date as rows change
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from .constants import SUMMARY_KEYS_PER_UPDATE
+
+logger = logging.getLogger(__name__)
+
+# Account id, year, month, category and direction of one summary row
+SummaryKey = Tuple[int, int, int, str, str]
+# Amount and transaction count to add to each summary row
+Deltas = Dict[SummaryKey, Tuple[Decimal, int]]
+
+
+def summary_key(account_id: int, transaction_date: date, category: str, direction: str) -> SummaryKey:
+    """Summary row a transaction is counted in"""
+    return account_id, transaction_date.year, transaction_date.month, category, direction
+
+
+def add_delta(deltas: Deltas, key: SummaryKey, amount: Decimal, count: int):
+    """Accumulate an amount and count for one summary row"""
+    total, rows = deltas.get(key, (Decimal('0.00'), 0))
+    deltas[key] = (total + amount, rows + count)
+
+
+def detail_deltas(rows: Iterable[Tuple[int, date, str, str, Decimal]], sign: int = 1) -> Deltas:
+    """
+    Summary changes for adding or removing transactions held in memory.
+
+    Args:
+        rows: (account id, transaction date, category, direction, amount) tuples
+        sign: 1 when the transactions are added, -1 when removed
+
+    Returns:
+        Deltas keyed by summary row
+    """
+    deltas: Deltas = {}
+    for account_id, transaction_date, category, direction, amount in rows:
+        add_delta(deltas, summary_key(account_id, transaction_date, category, direction), sign * amount, sign)
+    return deltas
+
+
+def category_deltas(changes: Iterable[Tuple[int, date, str, Decimal, str, str]]) -> Deltas:
+    """
+    Summary changes for transactions moved from one category to another.
+
+    Args:
+        changes: (account id, transaction date, direction, amount, old category, new category) tuples
+
+    Returns:
+        Deltas keyed by summary row
+    """
+    deltas: Deltas = {}
+    for account_id, transaction_date, direction, amount, old, new in changes:
+        add_delta(deltas, summary_key(account_id, transaction_date, old, direction), -amount, -1)
+        add_delta(deltas, summary_key(account_id, transaction_date, new, direction), amount, 1)
+    return deltas
+
+
+def summary_rows(details) -> Iterator[Tuple[SummaryKey, Decimal, int]]:
+    """
+    Totals of stored transactions per summary row, with one GROUP BY query.
+
+    Args:
+        details: StatementDetail queryset
+
+    Returns:
+        Iterator of (key, total, count)
+    """
+    rows = details.order_by().values_list(
+        'statement__account_id', ExtractYear('transaction_date'), ExtractMonth('transaction_date'),
+        'category', 'direction',
+    ).annotate(total=Sum('amount'), rows=Count('pk'))
+    for account_id, year, month, category, direction, total, count in rows:
+        yield (account_id, year, month, category, direction), total, count
+
+
+def queryset_deltas(details, sign: int = 1) -> Deltas:
+    """Summary changes for adding or removing the stored transactions of a queryset"""
+    return {key: (sign * total, sign * count) for key, total, count in summary_rows(details)}
+
+
+def _key_condition(key: SummaryKey) -> Q:
+    account_id, year, month, category, direction = key
+    return Q(account_id=account_id, year=year, month=month, category=category, direction=direction)
+
+
+def apply_deltas(summary_model, deltas: Deltas):
+    """
+    Add deltas to the summary rows, creating rows that do not exist yet.
+
+    Each group of keys costs one INSERT that skips existing rows and one
+    UPDATE incrementing every row in place, so concurrent writers never
+    overwrite each other's totals and the cost does not grow with the
+    number of transactions. Rows left without transactions are deleted.
+    Takes the model class so migrations can pass their historical model.
+
+    Args:
+        summary_model: MonthlyAccountSummary model class
+        deltas: Amount and count to add per summary row
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta != (0, 0)}
+    keys = list(deltas)
+    for start in range(0, len(keys), SUMMARY_KEYS_PER_UPDATE):
+        group = keys[start:start + SUMMARY_KEYS_PER_UPDATE]
+        conditions = [_key_condition(key) for key in group]
+        summary_model.objects.bulk_create([
+            summary_model(account_id=account_id, year=year, month=month, category=category, direction=direction)
+            for account_id, year, month, category, direction in group
+        ], ignore_conflicts=True)
+        rows = summary_model.objects.filter(reduce(or_, conditions))
+        rows.update(
+            total=F('total') + Case(
+                *[When(condition, then=Value(deltas[key][0])) for key, condition in zip(group, conditions)],
+                output_field=DecimalField(max_digits=15, decimal_places=2),
+            ),
+            count=F('count') + Case(
+                *[When(condition, then=Value(deltas[key][1])) for key, condition in zip(group, conditions)],
+                output_field=IntegerField(),
+            ),
+        )
+        if any(deltas[key][1] < 0 for key in group):
+            rows.filter(count__lte=0).delete()
+
+
+def move_categories(summary_model, changes: List[Tuple[int, date, str, Decimal, str, str]]):
+    """
+    Move re-categorized transactions between summary rows.
+
+    Args:
+        summary_model: MonthlyAccountSummary model class
+        changes: (account id, transaction date, direction, amount, old category, new category) tuples
+    """
+    apply_deltas(summary_model, category_deltas(changes))
+
+
+def rebuild_summaries(summary_model, detail_model, account_ids: Optional[List[int]] = None) -> int:
+    """
+    Recompute summary rows from the stored transactions.
+
+    Repairs summaries after changes the incremental updates do not see,
+    such as queryset updates of transactions. Runs in one transaction so
+    readers never see an account's summaries half rebuilt.
+
+    Args:
+        summary_model: MonthlyAccountSummary model class
+        detail_model: StatementDetail model class
+        account_ids: Only rebuild these accounts; every account if None
+
+    Returns:
+        Number of summary rows written
+    """
+    summaries = summary_model.objects.all()
+    details = detail_model.objects.all()
+    if account_ids is not None:
+        summaries = summaries.filter(account_id__in=account_ids)
+        details = details.filter(statement__account_id__in=account_ids)
+
+    with transaction.atomic():
+        summaries.delete()
+        created = summary_model.objects.bulk_create([
+            summary_model(
+                account_id=account_id, year=year, month=month, category=category, direction=direction,
+                total=total, count=count,
+            )
+            for (account_id, year, month, category, direction), total, count in summary_rows(details)
+        ])
+
+    logger.info(f"Rebuilt {len(created)} monthly account summaries")
+    return len(created)
+
+
+def monthly_series(summaries, categories: Iterable[str]) -> Dict[str, Dict[Tuple[int, int], Decimal]]:
+    """
+    Totals per category and month of summary rows, summed over accounts and directions.
+
+    Args:
+        summaries: MonthlyAccountSummary queryset
+        categories: Categories to total
+
+    Returns:
+        {category: {(year, month): total}}
+    """
+    series: Dict[str, Dict[Tuple[int, int], Decimal]] = defaultdict(dict)
+    totals = summaries.filter(category__in=list(categories)).order_by().values_list(
+        'category', 'year', 'month'
+    ).annotate(month_total=Sum('total'))
+    for category, year, month, total in totals:
+        series[category][year, month] = total
+    return series
@@ -0,0 +1,189 @@
+"""
+Resource-limited subprocess for parsing untrusted uploads
+"""
+
+import logging
+import multiprocessing
+import time
+from functools import partial
+from io import BytesIO
+from typing import Any, BinaryIO, Callable, Dict, List, NamedTuple, Optional, Union
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; memory is then unbounded
+    resource = None
+
+from django.conf import settings
+
+from .constants import PARSE_MAX_MEMORY_MB, PARSE_MAX_ROWS, PARSE_TIMEOUT_SECONDS
+from .exceptions import ParserLimitError, ParserNotFoundError, StatementParsingError
+from .factory import StatementParserFactory
+
+logger = logging.getLogger(__name__)
+
+_context = None
+
+
+class SandboxResult:
+    """Parse output returned by a sandboxed parser process"""
+
+    def __init__(self, meta: Dict[str, Any], transactions: List[Dict[str, Any]], parser_name: str,
+                 rows_read: int, max_rss_kb: int, elapsed: float = 0.0):
+        self.meta = meta
+        self.transactions = transactions
+        self.parser_name = parser_name
+        self.rows_read = rows_read
+        self.max_rss_kb = max_rss_kb
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return (
+            f"SandboxResult(parser={self.parser_name!r}, rows={len(self.transactions)}, "
+            f"max_rss_kb={self.max_rss_kb}, elapsed={self.elapsed:.3f}s)"
+        )
+
+
+class _AccountHint(NamedTuple):
+    """The part of an Account the parser factory reads, sent to the parser process in its place"""
+    last_parser: str
+
+
+def _get_context():
+    """
+    Multiprocessing context for parser processes.
+
+    Forking a threaded web worker can deadlock the child on locks held by
+    other threads, so parsers start from a forkserver that has the parsers
+    imported already, and fall back to spawn where forkserver is missing.
+    """
+    global _context
+    if _context is None:
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            _context = multiprocessing.get_context('forkserver')
+            _context.set_forkserver_preload(['statements.sandbox'])
+        else:
+            _context = multiprocessing.get_context('spawn')
+    return _context
+
+
+def _max_rss_kb() -> int:
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _sandbox_main(conn, file_content: Union[bytes, Callable[[], BinaryIO]], filename: str, last_parser: str,
+                  max_memory_bytes: int, max_rows: int) -> None:
+    """Parser process body: apply limits, parse, and send the result or error back"""
+    if resource is not None and max_memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (max_memory_bytes, max_memory_bytes))
+
+    open_file = file_content if callable(file_content) else partial(BytesIO, file_content)
+    try:
+        with open_file() as file_obj:
+            stream = StatementParserFactory().stream_statement(
+                file_obj, filename, _AccountHint(last_parser) if last_parser else None
+            )
+            transactions = []
+            for transaction_data in stream:
+                transactions.append(transaction_data)
+                if max_rows and len(transactions) > max_rows:
+                    raise ParserLimitError(
+                        f"Statement has more than {max_rows} transactions", 'rows', max_rows
+                    )
+        conn.send(('ok', (stream.meta, transactions, stream.parser_name,
+                          stream.rows_read or stream.row_count, _max_rss_kb())))
+    except MemoryError:
+        conn.send(('error', ParserLimitError(
+            f"Parsing needed more than {max_memory_bytes // (1024 * 1024)} MB of memory",
+            'memory', max_memory_bytes // (1024 * 1024)
+        )))
+    except (ParserLimitError, ParserNotFoundError) as e:
+        conn.send(('error', e))
+    except Exception as e:
+        conn.send(('error', StatementParsingError(str(e))))
+    finally:
+        conn.close()
+
+
+def parse_sandboxed(
+    file_content: Union[bytes, Callable[[], BinaryIO]],
+    filename: str,
+    timeout: Optional[float] = None,
+    max_memory_mb: Optional[int] = None,
+    max_rows: Optional[int] = None,
+    last_parser: str = '',
+) -> SandboxResult:
+    """
+    Detect and parse a statement in a child process with resource limits.
+
+    The child's address space is capped with RLIMIT_AS, which also bounds
+    its resident memory, and it stops as soon as the row cap is exceeded.
+    A child that outlives the timeout is killed. Limits default to the
+    PARSE_* settings.
+
+    Stored uploads are passed as a function opening them, such as
+    partial(store.open, digest), so the child reads the file itself and
+    neither process holds the whole upload in memory.
+
+    Args:
+        file_content: Raw file content as bytes, or a picklable callable
+            returning a binary file object of it
+        filename: Name of the file
+        timeout: Wall-clock seconds before the parser is killed
+        max_memory_mb: Address space limit of the parser process
+        max_rows: Maximum number of transactions
+        last_parser: Parser that last read the account's statements, tried
+            before the others as it is for in-process parsing
+
+    Returns:
+        SandboxResult with the statement metadata and transactions
+
+    Raises:
+        ParserLimitError: If a limit was exceeded or the parser process died;
+            its reason is 'timeout', 'memory', 'rows' or 'crashed'
+        ParserNotFoundError: If no suitable parser is found
+        StatementParsingError: If parsing fails
+    """
+    timeout = timeout or getattr(settings, 'PARSE_TIMEOUT_SECONDS', PARSE_TIMEOUT_SECONDS)
+    max_memory_mb = max_memory_mb or getattr(settings, 'PARSE_MAX_MEMORY_MB', PARSE_MAX_MEMORY_MB)
+    max_rows = max_rows or getattr(settings, 'PARSE_MAX_ROWS', PARSE_MAX_ROWS)
+
+    context = _get_context()
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_sandbox_main,
+        args=(child_conn, file_content, filename, last_parser, max_memory_mb * 1024 * 1024, max_rows),
+        daemon=True,
+    )
+    started = time.perf_counter()
+    process.start()
+    child_conn.close()
+
+    try:
+        if not parent_conn.poll(timeout):
+            logger.warning(f"Parsing {filename} exceeded {timeout}s; killing parser process {process.pid}")
+            raise ParserLimitError(f"Parsing took longer than {timeout:g} seconds", 'timeout', timeout)
+        try:
+            status, payload = parent_conn.recv()
+        except EOFError:
+            process.join()
+            logger.warning(f"Parser process for {filename} died with exit code {process.exitcode}")
+            raise ParserLimitError(
+                f"Parser process exited unexpectedly (exit code {process.exitcode})", 'crashed'
+            )
+    finally:
+        if process.is_alive():
+            process.kill()
+        process.join()
+        parent_conn.close()
+
+    if status == 'error':
+        logger.warning(f"Sandboxed parse of {filename} failed: {payload}")
+        raise payload
+
+    meta, transactions, parser_name, rows_read, max_rss_kb = payload
+    result = SandboxResult(meta, transactions, parser_name, rows_read, max_rss_kb, time.perf_counter() - started)
+    logger.info(f"Sandboxed parse of {filename}: {result}")
+    return result
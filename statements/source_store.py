@@ -0,0 +1,206 @@
+"""
+Content-addressed store for uploaded statements and their parse results
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import logging
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+from .constants import STREAM_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def hash_file(file_obj: BinaryIO) -> Tuple[str, int]:
+    """
+    Hash a file object in chunks and rewind it.
+
+    Args:
+        file_obj: Binary file object, or a Django UploadedFile
+
+    Returns:
+        Tuple of (hex SHA-256 digest, size in bytes)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    file_obj.seek(0)
+    for chunk in iter(lambda: file_obj.read(STREAM_CHUNK_SIZE), b''):
+        digest.update(chunk)
+        size += len(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest(), size
+
+
+def _encode_value(value: Any) -> Any:
+    """JSON default hook keeping dates and Decimals distinguishable from strings"""
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'$date': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {'$decimal': str(value)}
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+def _decode_value(obj: Dict[str, Any]) -> Any:
+    """JSON object hook reversing _encode_value"""
+    if len(obj) == 1:
+        if '$date' in obj:
+            return date.fromisoformat(obj['$date'])
+        if '$datetime' in obj:
+            return datetime.fromisoformat(obj['$datetime'])
+        if '$decimal' in obj:
+            return Decimal(obj['$decimal'])
+    return obj
+
+
+class ContentStore:
+    """
+    Gzip-compressed files on local disk addressed by the SHA-256 of their content.
+
+    Objects are sharded by the first two hex digits of the digest and
+    written through a temporary file and a rename, so a reader never sees
+    a partial object and storing the same content twice is a no-op.
+    """
+
+    def __init__(self, root: str):
+        self.root = str(root)
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.root, *parts)
+
+    def object_path(self, digest: str) -> str:
+        """Path of the compressed object for a digest"""
+        return self._path('objects', digest[:2], f"{digest}.gz")
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.object_path(digest))
+
+    def _write_atomic(self, path: str, write) -> None:
+        """Write a gzip file through a temporary file in the same directory"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as out:
+                write(out)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def put(self, file_obj: BinaryIO) -> Tuple[str, int]:
+        """
+        Store a file object's content, compressed, and rewind it.
+
+        Args:
+            file_obj: Binary file object, or a Django UploadedFile
+
+        Returns:
+            Tuple of (hex SHA-256 digest, uncompressed size in bytes)
+        """
+        digest, size = hash_file(file_obj)
+
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            def copy(out):
+                for chunk in iter(lambda: file_obj.read(STREAM_CHUNK_SIZE), b''):
+                    out.write(chunk)
+            self._write_atomic(path, copy)
+            file_obj.seek(0)
+            logger.info(f"Stored source file {digest} ({size} bytes)")
+        return digest, size
+
+    def open(self, digest: str) -> BinaryIO:
+        """Open a stored object for reading its uncompressed bytes"""
+        return gzip.open(self.object_path(digest), 'rb')
+
+    def read(self, digest: str) -> bytes:
+        with self.open(digest) as f:
+            return f.read()
+
+
+class ParseCache:
+    """
+    Parse results cached in a ContentStore by (content digest, parser, parser version).
+
+    Entries are gzip-compressed JSON lines: one line per transaction, then
+    a final line holding the statement metadata, which streaming parsers
+    only complete once every row has been read.
+    """
+
+    def __init__(self, store: ContentStore):
+        self.store = store
+
+    def path(self, digest: str, parser_name: str, version: int) -> str:
+        return self.store._path('parsed', digest[:2], f"{digest}.{parser_name}.v{version}.jsonl.gz")
+
+    def get(self, digest: str, parser_name: str, version: int) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        Load a cached parse result.
+
+        Returns:
+            Tuple of (statement_metadata, transactions_list), or None on a miss
+        """
+        path = self.path(digest, parser_name, version)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                records = [json.loads(line, object_hook=_decode_value) for line in f]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable parse cache entry {path}: {e}")
+            return None
+
+        logger.info(f"Parse cache hit for {digest} ({parser_name} v{version})")
+        return records[-1]['meta'], records[:-1]
+
+    def record(self, digest: str, parser_name: str, version: int, meta: Dict[str, Any],
+               transactions: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Pass transactions through while writing them to the cache.
+
+        The entry is only committed once the iterator is exhausted, so a
+        parse that fails part way leaves no cache entry behind.
+
+        Args:
+            digest: SHA-256 of the source file
+            parser_name: Class name of the parser producing the transactions
+            version: The parser's version attribute
+            meta: Statement metadata dict, read after the last transaction
+            transactions: Iterable of parsed transaction dicts, such as a TransactionStream
+
+        Returns:
+            Iterator yielding the same transactions
+        """
+        path = self.path(digest, parser_name, version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        committed = False
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as out:
+                for transaction_data in transactions:
+                    out.write(json.dumps(transaction_data, default=_encode_value) + '\n')
+                    yield transaction_data
+                out.write(json.dumps({'meta': meta}, default=_encode_value) + '\n')
+            os.replace(temp_path, path)
+            committed = True
+        finally:
+            if not committed and os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+
+def get_content_store() -> ContentStore:
+    """Content store configured by settings.SOURCE_STORE_ROOT"""
+    return ContentStore(settings.SOURCE_STORE_ROOT)
+
+
+def get_parse_cache() -> ParseCache:
+    return ParseCache(get_content_store())
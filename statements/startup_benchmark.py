@@ -0,0 +1,165 @@
+"""
+Cold-start benchmark: from importing the WSGI application to the first response byte
+"""
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+# Libraries that should only load once a request actually needs them
+HEAVY_MODULES = ('numpy', 'pandas', 'plotly', 'pdfplumber', 'openpyxl', 'yaml')
+
+# Startup metrics compared between runs; smaller is better for all of them
+STARTUP_METRICS = ('wsgi_import_seconds', 'first_byte_seconds', 'import_self_seconds')
+
+# "import time: self [us] | cumulative | imported package", one line per module
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+# Runs in a fresh interpreter: import the WSGI application, then serve one request
+STARTUP_SCRIPT = '''
+import io, json, sys, time
+start = time.perf_counter()
+from bank_parser.wsgi import application
+imported = time.perf_counter()
+statuses = []
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': sys.argv[1], 'QUERY_STRING': '',
+    'SERVER_NAME': sys.argv[2], 'SERVER_PORT': '80', 'HTTP_HOST': sys.argv[2], 'SERVER_PROTOCOL': 'HTTP/1.1',
+    'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+    'wsgi.multithread': False, 'wsgi.multiprocess': True, 'wsgi.run_once': False,
+}
+response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+for chunk in response:
+    if chunk:
+        break
+first_byte = time.perf_counter()
+response.close()
+print(json.dumps({
+    'status': statuses[0] if statuses else None,
+    'wsgi_import_seconds': imported - start,
+    'first_byte_seconds': first_byte - start,
+    'heavy_modules': sorted(name for name in sys.argv[3].split(',') if name in sys.modules),
+}))
+'''
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    Parse the stderr of `python -X importtime`.
+
+    Args:
+        output: Captured stderr; lines that are not import timings are ignored
+
+    Returns:
+        One dict per imported module with its self and cumulative time in
+        microseconds and its nesting depth (0 for top-level imports)
+    """
+    imports = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            imports.append({
+                'module': match.group(4),
+                'self_us': int(match.group(1)),
+                'cumulative_us': int(match.group(2)),
+                'depth': (len(match.group(3)) - 1) // 2,
+            })
+    return imports
+
+
+def measure_startup(path: str = '/health/', host: str = 'localhost', cwd: Optional[str] = None,
+                    top: int = 15) -> Dict[str, Any]:
+    """
+    Import the WSGI application and serve one request in a fresh interpreter.
+
+    The child runs under `-X importtime`, so the report shows which modules
+    the cold start paid for as well as how long it took.
+
+    Args:
+        path: Request path served after the import
+        host: Host header of the request; must be in ALLOWED_HOSTS
+        cwd: Project directory the child runs in
+        top: Number of most expensive top-level packages reported
+
+    Returns:
+        Dict of the timings, response status, heavy modules loaded and the
+        top-level packages that took longest to import, counting their submodules
+
+    Raises:
+        RuntimeError: If the child process fails
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'bank_parser.settings')
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT, path, host, ','.join(HEAVY_MODULES)],
+        capture_output=True, text=True, cwd=cwd, env=env, timeout=300,
+    )
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode or not lines:
+        raise RuntimeError(f"Startup benchmark failed: {completed.stderr.strip()[-2000:]}")
+
+    result = json.loads(lines[-1])
+    imports = parse_importtime(completed.stderr)
+    result['import_self_seconds'] = sum(item['self_us'] for item in imports) / 1e6
+    result['modules_imported'] = len(imports)
+    packages = {}
+    for item in imports:
+        package = item['module'].split('.')[0]
+        packages[package] = packages.get(package, 0) + item['self_us']
+    slowest = sorted(packages.items(), key=lambda package: package[1], reverse=True)[:top]
+    result['slowest_packages'] = [{'package': name, 'self_ms': self_us / 1000} for name, self_us in slowest]
+    return result
+
+
+def run_startup_benchmark(runs: int = 5, **kwargs) -> Dict[str, Any]:
+    """
+    Measure the cold start several times and keep the median of each metric.
+
+    Args:
+        runs: Fresh interpreters started
+        **kwargs: Passed on to measure_startup()
+
+    Returns:
+        The median run's details with every metric replaced by its median
+        and the individual runs under 'runs'
+    """
+    results = [measure_startup(**kwargs) for _ in range(runs)]
+    summary = dict(sorted(results, key=lambda result: result['first_byte_seconds'])[len(results) // 2])
+    for metric in STARTUP_METRICS:
+        summary[metric] = statistics.median(result[metric] for result in results)
+    summary['runs'] = [{metric: result[metric] for metric in STARTUP_METRICS} for result in results]
+    return summary
+
+
+def compare_startup(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold_percent: float = 10.0) -> List[Dict[str, Any]]:
+    """
+    Compare the startup metrics of two reports.
+
+    Args:
+        baseline: Earlier report
+        current: Later report
+        threshold_percent: Slowdown counted as a regression
+
+    Returns:
+        One dict per metric present in both reports, with the percentage
+        change and whether it is a regression
+    """
+    changes = []
+    for metric in STARTUP_METRICS:
+        old, new = baseline.get('startup', {}).get(metric), current.get('startup', {}).get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        changes.append({
+            'metric': metric,
+            'baseline': old,
+            'current': new,
+            'change_percent': change,
+            'regression': change > threshold_percent,
+        })
+    return changes
@@ -0,0 +1,232 @@
+"""
+Synthetic statement files in every supported format, for benchmarks and tests
+"""
+
+import csv
+import os
+import random
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterator, List, NamedTuple, TextIO
+
+import openpyxl
+
+MERCHANTS = [
+    'TIM HORTONS #4412', 'LOBLAWS 1021', 'SHELL C00456', 'AMAZON.CA', 'UBER* TRIP',
+    'NETFLIX.COM', 'METRO 213', 'COSTCO WHOLESALE W1234', 'PRESTO FARE', 'SHOPPERS DRUG MART',
+    'CANADIAN TIRE 0187', 'STARBUCKS 0453', 'HYDRO ONE', 'ROGERS WIRELESS', 'LCBO/RAO #0217',
+    'INDIGO 00934', 'DOLLARAMA #1145', 'IKEA NORTH YORK', 'SPOTIFY P1A2B3', 'BELL CANADA',
+]
+DEPOSITS = ['PAYROLL DEPOSIT', 'E-TRANSFER RECEIVED', 'REFUND', 'GST CREDIT', 'INTEREST']
+EQ_DEPOSITS = ['Interest received', 'Transfer from WS Investments', 'EQ Bank transfer in']
+EQ_WITHDRAWALS = ['Auto-withdrawal', 'Transfer to WS Investments', 'Bill payment']
+
+SYNTHETIC_START_DATE = date(2024, 1, 1)
+TRANSACTIONS_PER_DAY = 25  # Density of the generated date range
+DEPOSIT_RATE = 0.15  # Share of generated transactions that are money in
+
+
+class SyntheticTransaction(NamedTuple):
+    """One generated transaction; amounts are positive cents"""
+    transaction_date: date
+    item: str
+    cents: int
+    direction: str
+
+
+def iter_transactions(rows: int, seed: int = 0, deposits: List[str] = DEPOSITS,
+                      withdrawals: List[str] = MERCHANTS) -> Iterator[SyntheticTransaction]:
+    """
+    Yield a reproducible sequence of realistic-looking transactions.
+
+    Dates advance one day every TRANSACTIONS_PER_DAY rows from
+    SYNTHETIC_START_DATE. Spending is mostly small with an occasional large
+    purchase; deposits are larger.
+
+    Args:
+        rows: Number of transactions
+        seed: Seed of the random generator, so runs produce identical files
+        deposits: Descriptions used for money in
+        withdrawals: Descriptions used for money out
+
+    Returns:
+        Iterator of SyntheticTransaction
+    """
+    rng = random.Random(seed)
+    for index in range(rows):
+        transaction_date = SYNTHETIC_START_DATE + timedelta(days=index // TRANSACTIONS_PER_DAY)
+        if rng.random() < DEPOSIT_RATE:
+            yield SyntheticTransaction(transaction_date, rng.choice(deposits), rng.randint(5000, 350000), 'IN')
+        else:
+            cents = rng.randint(100, 9999) if rng.random() < 0.9 else rng.randint(10000, 150000)
+            yield SyntheticTransaction(transaction_date, rng.choice(withdrawals), cents, 'OUT')
+
+
+def _money(cents: int) -> str:
+    """Amount of a number of cents with two decimals, negative amounts with a leading minus"""
+    sign = '-' if cents < 0 else ''
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def _signed(transaction: SyntheticTransaction) -> str:
+    """Amount with a minus sign for money out"""
+    sign = '-' if transaction.direction == 'OUT' else ''
+    return sign + _money(transaction.cents)
+
+
+def _with_balance(transactions: Iterator[SyntheticTransaction]) -> Iterator[tuple]:
+    """Pair each transaction with the running balance after it, in cents"""
+    balance = 250000
+    for transaction in transactions:
+        balance += transaction.cents if transaction.direction == 'IN' else -transaction.cents
+        yield transaction, balance
+
+
+def write_td_cheque(f: TextIO, rows: int, seed: int = 0) -> None:
+    """TD chequing export: no header; date, description, withdrawal, deposit, balance"""
+    writer = csv.writer(f)
+    for t, balance in _with_balance(iter_transactions(rows, seed)):
+        out_amount, in_amount = (_money(t.cents), '') if t.direction == 'OUT' else ('', _money(t.cents))
+        writer.writerow([t.transaction_date.isoformat(), t.item, out_amount, in_amount, _money(balance)])
+
+
+def write_td_credit(f: TextIO, rows: int, seed: int = 0) -> None:
+    """TD credit card export: no header; MM/DD/YYYY date, description, debit, credit, balance"""
+    writer = csv.writer(f)
+    for t, balance in _with_balance(iter_transactions(rows, seed)):
+        debit, credit = (_money(t.cents), '') if t.direction == 'OUT' else ('', _money(t.cents))
+        writer.writerow([t.transaction_date.strftime('%m/%d/%Y'), t.item, debit, credit, _money(balance)])
+
+
+def write_amex(f: TextIO, rows: int, seed: int = 0) -> None:
+    """Amex export: charges positive, refunds negative, '03 Aug 2025' dates"""
+    writer = csv.writer(f)
+    writer.writerow(['Date', 'Date Processed', 'Description', 'Card Member', 'Account #', 'Amount'])
+    for t in iter_transactions(rows, seed, deposits=['MERCHANDISE RETURN', 'STATEMENT CREDIT']):
+        amount = _money(t.cents) if t.direction == 'OUT' else '-' + _money(t.cents)
+        writer.writerow([
+            t.transaction_date.strftime('%d %b %Y'),
+            (t.transaction_date + timedelta(days=1)).strftime('%d %b %Y'),
+            t.item, 'J SAMPLE', 'XXXX-XXXXX1-01004', amount,
+        ])
+
+
+def write_bmo(f: TextIO, rows: int, seed: int = 0) -> None:
+    """BMO bank export: quoted card number, YYYYMMDD dates, signed amounts"""
+    writer = csv.writer(f)
+    writer.writerow(['First Bank Card', 'Transaction Type', 'Date Posted', 'Transaction Amount', 'Description'])
+    for t in iter_transactions(rows, seed):
+        writer.writerow([
+            "'5191230000001234'", 'CREDIT' if t.direction == 'IN' else 'DEBIT',
+            t.transaction_date.strftime('%Y%m%d'), _signed(t), t.item,
+        ])
+
+
+def write_rbc_business(f: TextIO, rows: int, seed: int = 0) -> None:
+    """RBC business export: split descriptions and separate CAD$/USD$ columns"""
+    writer = csv.writer(f)
+    writer.writerow([
+        'Account Type', 'Account Number', 'Transaction Date', 'Cheque Number',
+        'Description 1', 'Description 2', 'CAD$', 'USD$',
+    ])
+    for index, t in enumerate(iter_transactions(rows, seed)):
+        merchant, _, detail = t.item.partition(' ')
+        writer.writerow([
+            'Chequing', '00102-1003456', t.transaction_date.strftime('%m/%d/%Y'),
+            str(100 + index) if index % 50 == 0 else '', merchant, detail, _signed(t), '',
+        ])
+
+
+def write_eq_joint(f: TextIO, rows: int, seed: int = 0) -> None:
+    """EQ Bank joint account export: '01 MAY 2025' dates, dollar-signed amounts"""
+    writer = csv.writer(f)
+    writer.writerow(['Transfer date', 'Description', 'Amount', 'Balance'])
+    transactions = iter_transactions(rows, seed, deposits=EQ_DEPOSITS, withdrawals=EQ_WITHDRAWALS)
+    for index, (t, balance) in enumerate(_with_balance(transactions)):
+        # Detection looks for EQ wording in the first data rows
+        item = 'Interest received' if index == 0 else t.item
+        amount = ('-$' if t.direction == 'OUT' else '$') + _money(t.cents)
+        writer.writerow([t.transaction_date.strftime('%d %b %Y').upper(), item, amount, '$' + _money(balance)])
+
+
+def write_generic_csv(f: TextIO, rows: int, seed: int = 0) -> None:
+    """Headered CSV with ISO dates and signed amounts, read by the generic parser"""
+    writer = csv.writer(f)
+    writer.writerow(['Date', 'Payee', 'Amount'])
+    for t in iter_transactions(rows, seed):
+        writer.writerow([t.transaction_date.isoformat(), t.item, _signed(t)])
+
+
+def write_text(f: TextIO, rows: int, seed: int = 0) -> None:
+    """Plain text statement, one 'date description amount' line; money out in parentheses"""
+    for t in iter_transactions(rows, seed):
+        amount = f"({_money(t.cents)})" if t.direction == 'OUT' else _money(t.cents)
+        f.write(f"{t.transaction_date.isoformat()} {t.item} {amount}\n")
+
+
+def write_xlsx(path: str, rows: int, seed: int = 0) -> None:
+    """Single-sheet workbook written in openpyxl's write-only mode"""
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Transactions')
+    sheet.append(['Date', 'Description', 'Amount'])
+    for t in iter_transactions(rows, seed):
+        amount = t.cents / 100
+        sheet.append([t.transaction_date, t.item, -amount if t.direction == 'OUT' else amount])
+    workbook.save(path)
+
+
+class SyntheticFormat(NamedTuple):
+    """A generated statement format and the parser expected to read it"""
+    name: str
+    extension: str
+    parser_name: str
+    writer: Callable
+    binary: bool = False
+
+
+SYNTHETIC_FORMATS: Dict[str, SyntheticFormat] = {
+    fmt.name: fmt for fmt in [
+        SyntheticFormat('td_cheque', '.csv', 'TDChequeAccountParser', write_td_cheque),
+        SyntheticFormat('td_credit', '.csv', 'TDCreditCardParser', write_td_credit),
+        SyntheticFormat('amex', '.csv', 'AmexCreditCardParser', write_amex),
+        SyntheticFormat('bmo', '.csv', 'BMOBankParser', write_bmo),
+        SyntheticFormat('rbc_business', '.csv', 'RBCBusinessParser', write_rbc_business),
+        SyntheticFormat('eq_joint', '.csv', 'EQJointParser', write_eq_joint),
+        SyntheticFormat('csv', '.csv', 'CSVStatementParser', write_generic_csv),
+        SyntheticFormat('xlsx', '.xlsx', 'ExcelStatementParser', write_xlsx, binary=True),
+        SyntheticFormat('txt', '.txt', 'TextStatementParser', write_text),
+    ]
+}
+
+
+def generate_statement(format_name: str, rows: int, directory: str, seed: int = 0,
+                       overwrite: bool = False) -> str:
+    """
+    Write a synthetic statement file, reusing one generated earlier.
+
+    Files are named after the format, row count and seed, so a directory
+    of generated files can be shared between benchmark runs.
+
+    Args:
+        format_name: Key of SYNTHETIC_FORMATS
+        rows: Number of transactions
+        directory: Directory the file is written to
+        seed: Seed of the random generator
+        overwrite: Regenerate the file even if it exists
+
+    Returns:
+        Path of the file
+    """
+    fmt = SYNTHETIC_FORMATS[format_name]
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{fmt.name}_{rows}_{seed}{fmt.extension}")
+    if os.path.exists(path) and not overwrite:
+        return path
+
+    partial = path + '.part'
+    if fmt.binary:
+        fmt.writer(partial, rows, seed)
+    else:
+        with open(partial, 'w', newline='', encoding='utf-8') as f:
+            fmt.writer(f, rows, seed)
+    os.replace(partial, path)
+    return path
@@ -2,89 +2,46 @@
 TD Bank credit card parser for CSV statements
 """
 
-import csv
 import re
-from io import StringIO
 from datetime import datetime
-from typing import List, Dict, Any, Tuple
+from typing import Dict, Any, List, Tuple, Optional
 import logging
 from decimal import Decimal
-import decimal
 
-from .base import BaseStatementParser
+from .amounts import cents_to_decimal, match_amount
+from .base import CSVRowStatementParser, SkipRow, SniffContext
 
 logger = logging.getLogger(__name__)
 
+# TD credit card uses MM/DD/YYYY format
+TD_CREDIT_DATE_PATTERN = re.compile(r'^\d{2}/\d{2}/\d{4}$')
+TD_CREDIT_DATE_FORMAT = '%m/%d/%Y'
 
-class TDCreditCardParser(BaseStatementParser):
+
+class TDCreditCardParser(CSVRowStatementParser):
     """Parser specifically for TD Bank credit card CSV files"""
     
     def __init__(self):
         self.supported_formats = ['.csv']
     
-    def can_parse(self, file_content: bytes, filename: str) -> bool:
+    def can_parse(self, file_content: bytes, filename: str, context: Optional[SniffContext] = None) -> bool:
         """Check if this is a TD credit card CSV file"""
-        if not filename.lower().endswith('.csv'):
+        context = self._sniff(file_content, filename, context)
+        if context.extension != '.csv':
             return False
         
-        try:
-            content = file_content.decode('utf-8')
-            lines = content.split('\n')
-            
-            # Check for TD credit card format: date,description,debit,credit,balance
-            if len(lines) > 0:
-                first_line = lines[0].strip()
-                
-                try:
-                    csv_reader = csv.reader(StringIO(first_line))
-                    parts = next(csv_reader)
-                    
-                    # TD credit card format should have at least 4 parts: date, description, debit, credit
-                    if len(parts) >= 4:
-                        date_part = parts[0].strip()
-                        # Check if first field looks like a TD credit card date (MM/DD/YYYY)
-                        if self._looks_like_td_credit_date(date_part):
-                            return True
-                except:
-                    pass
-        except:
-            pass
-        
-        return False
-    
-    def parse(self, file_content: bytes, filename: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
-        """Parse TD credit card CSV file"""
-        try:
-            content = file_content.decode('utf-8')
-        except UnicodeDecodeError:
-            # Try other encodings
-            for encoding in ['latin-1', 'cp1252', 'iso-8859-1']:
-                try:
-                    content = file_content.decode(encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            else:
-                raise ValueError("Could not decode TD credit card CSV file")
+        # TD exports have no header row, so the first row is a transaction: date,description,debit,credit,balance
+        parts = context.header
         
-        lines = content.split('\n')
+        # TD format should have at least 4 parts
+        if len(parts) >= 4:
+            return self._looks_like_td_credit_date(parts[0])
         
-        # Extract statement metadata
-        statement_meta = self._extract_statement_meta(filename, lines)
-        
-        # Parse transaction details
-        transactions = []
-        for line in lines:
-            if line.strip():
-                transaction = self._parse_transaction_line(line)
-                if transaction:
-                    transactions.append(transaction)
-        
-        return statement_meta, transactions
+        return False
     
-    def _extract_statement_meta(self, filename: str, lines: List[str]) -> Dict[str, Any]:
-        """Extract statement metadata from TD credit card CSV file"""
-        meta = {
+    def _initial_statement_meta(self, filename: str) -> Dict[str, Any]:
+        """Return TD credit card metadata; the date range is filled in while streaming"""
+        return {
             'bank_name': 'TD Bank',
             'account_number': 'Unknown',
             'account_abbr': 'TD-CREDIT',
@@ -92,92 +49,66 @@ class TDCreditCardParser(BaseStatementParser):
             'statement_to_date': datetime.now().date(),
             'statement_type': 'TD-CREDIT-CSV'
         }
+    
+    def _parse_row(self, parts: List[str]) -> Dict[str, Any]:
+        """Parse a single tokenized TD credit card transaction row"""
+        # TD credit card format: date, description, debit, credit, balance
+        if len(parts) < 4:
+            raise SkipRow('short_row')
         
-        # Extract date range from transaction dates
-        dates = []
-        for line in lines:
-            if line.strip():
-                transaction = self._parse_transaction_line(line)
-                if transaction:
-                    dates.append(transaction['transaction_date'])
+        date_str = parts[0].strip()
+        description = parts[1].strip()
+        debit_str = parts[2].strip()
+        credit_str = parts[3].strip()
         
-        if dates:
-            dates.sort()
-            meta['statement_from_date'] = dates[0]
-            meta['statement_to_date'] = dates[-1]
+        # Skip payment transactions
+        if description.upper() == "PAYMENT - THANK YOU":
+            raise SkipRow('payment')
         
-        return meta
-    
-    def _parse_transaction_line(self, line: str) -> Dict[str, Any]:
-        """Parse a single TD credit card transaction line"""
-        try:
-            # Use CSV reader to properly handle quoted fields
-            csv_reader = csv.reader(StringIO(line))
-            parts = next(csv_reader)
-            
-            # TD credit card format: date, description, debit, credit, balance
-            if len(parts) >= 4:
-                date_str = parts[0].strip()
-                description = parts[1].strip()
-                debit_str = parts[2].strip()
-                credit_str = parts[3].strip()
-                
-                # Skip payment transactions
-                if description.upper() == "PAYMENT - THANK YOU":
-                    return None
-                
-                # Validate date format
-                if not self._looks_like_td_credit_date(date_str):
-                    return None
-                
-                # Determine transaction type and amount
-                if debit_str and not credit_str:
-                    # This is a spending transaction (debit)
-                    amount_str = debit_str
-                    direction = 'OUT'
-                elif credit_str and not debit_str:
-                    # This is a refund/credit transaction
-                    amount_str = credit_str
-                    direction = 'IN'
-                else:
-                    # Both fields have values or both are empty - skip
-                    return None
-                
-                # Parse the data
-                transaction_date = self._parse_date(date_str)
-                item = description if description else 'Unknown Transaction'
-                amount, _ = self._parse_td_credit_amount(amount_str)  # Ignore direction from parser, use our logic
-                
-                return {
-                    'item': item,
-                    'transaction_date': transaction_date,
-                    'amount': amount,
-                    'direction': direction
-                }
-        except Exception as e:
-            logger.warning(f"Error parsing TD credit card transaction line: {e}")
+        # Validate date format
+        if not self._looks_like_td_credit_date(date_str):
+            raise SkipRow('invalid_date')
+        
+        # Determine transaction type and amount
+        if debit_str and not credit_str:
+            # This is a spending transaction (debit)
+            amount_str = debit_str
+            direction = 'OUT'
+        elif credit_str and not debit_str:
+            # This is a refund/credit transaction
+            amount_str = credit_str
+            direction = 'IN'
+        else:
+            # Both fields have values or both are empty - skip
+            raise SkipRow('no_amount')
+        
+        # TD credit card dates have a fixed format, so skip the generic format search
+        transaction_date = datetime.strptime(date_str, TD_CREDIT_DATE_FORMAT).date()
+        item = description if description else 'Unknown Transaction'
+        amount, _ = self._parse_td_credit_amount(amount_str)  # Ignore direction from parser, use our logic
         
-        return None
+        return {
+            'item': item,
+            'transaction_date': transaction_date,
+            'amount': amount,
+            'direction': direction
+        }
     
     def _looks_like_td_credit_date(self, text: str) -> bool:
         """Check if text looks like a TD credit card date (MM/DD/YYYY)"""
-        # TD credit card uses MM/DD/YYYY format
-        pattern = r'^\d{2}/\d{2}/\d{4}$'
-        return bool(re.match(pattern, text))
+        return bool(TD_CREDIT_DATE_PATTERN.match(text))
     
     def _parse_td_credit_amount(self, amount_str: str) -> Tuple[Decimal, str]:
         """Parse TD credit card amount string"""
         if not amount_str or amount_str.strip() == '':
             return Decimal('0.00'), 'IN'
         
-        # Remove common currency symbols and whitespace
-        cleaned = amount_str.strip().replace('$', '').replace(',', '')
-        
-        try:
-            amount = Decimal(cleaned)
-            # Direction is determined by field position, not by the amount itself
-            # Just return a default direction (will be overridden by caller)
-            return amount, 'IN'
-        except (ValueError, decimal.InvalidOperation):
+        parsed = match_amount(amount_str)
+        if parsed is None:
             logger.warning(f"Could not parse TD credit card amount: {amount_str}")
             return Decimal('0.00'), 'IN'
+        
+        # Direction is determined by field position, not by the amount itself
+        # Just return a default direction (will be overridden by caller)
+        cents, _ = parsed
+        return cents_to_decimal(cents), 'IN'
@@ -0,0 +1,69 @@
+"""
+Tests for amount parsing into integer cents
+"""
+
+from django.test import TestCase
+from decimal import Decimal
+
+from ..amounts import cents_to_decimal, match_amount, parse_amount_column
+from ..constants import DIRECTION_IN, DIRECTION_OUT
+
+
+class MatchAmountTest(TestCase):
+    """Test cases for match_amount"""
+
+    def test_match_amount_spellings(self):
+        """Test currency symbols, separators, signs and parentheses"""
+        self.assertEqual(match_amount('$1,234.56'), (123456, False))
+        self.assertEqual(match_amount('-50.25'), (5025, True))
+        self.assertEqual(match_amount('$-3'), (300, True))
+        self.assertEqual(match_amount('(250.00)'), (25000, True))
+        self.assertEqual(match_amount('.99'), (99, False))
+
+    def test_match_amount_rounds_to_cents(self):
+        """Test that extra fraction digits round half-up"""
+        self.assertEqual(match_amount('1.005'), (101, False))
+        self.assertEqual(match_amount('1.004'), (100, False))
+
+    def test_match_amount_rejects_non_amounts(self):
+        """Test that malformed values are not amounts"""
+        for value in ['invalid', '(5', '1,23.00', '$', '']:
+            self.assertIsNone(match_amount(value), value)
+
+    def test_cents_to_decimal(self):
+        """Test that cents convert to two-place Decimals"""
+        self.assertEqual(str(cents_to_decimal(123456)), '1234.56')
+        self.assertEqual(str(cents_to_decimal(0)), '0.00')
+
+
+class ParseAmountColumnTest(TestCase):
+    """Test cases for parse_amount_column"""
+
+    def test_parse_amount_column(self):
+        """Test that a column parses to cents and directions in one pass"""
+        parsed = parse_amount_column(['$1,234.56', '-50.25', '(250.00)', '', None, 12.5])
+
+        self.assertEqual(parsed.cents.dtype.name, 'int64')
+        self.assertEqual(list(parsed.cents), [123456, 5025, 25000, 0, 0, 1250])
+        self.assertEqual(
+            list(parsed.directions),
+            [DIRECTION_IN, DIRECTION_OUT, DIRECTION_OUT, DIRECTION_IN, DIRECTION_IN, DIRECTION_IN]
+        )
+        self.assertEqual(parsed.bad_rows, [])
+        self.assertEqual(parsed.amount(0), Decimal('1234.56'))
+
+    def test_bad_cells_reported_by_row(self):
+        """Test that bad cells are reported by position instead of raising"""
+        parsed = parse_amount_column(['10.00', 'n/a', '5.00', '(5'])
+
+        self.assertEqual(parsed.bad_rows, [1, 3])
+        self.assertEqual(list(parsed.cents), [1000, 0, 500, 0])
+
+    def test_column_matches_scalar_parser(self):
+        """Test that the column and scalar paths agree"""
+        values = ['$1,234.56', '-50.25', '(250.00)', '+12.5', '$-3', '1.005']
+        parsed = parse_amount_column(values)
+        for index, value in enumerate(values):
+            cents, negative = match_amount(value)
+            self.assertEqual(parsed.cents[index], cents)
+            self.assertEqual(parsed.directions[index], DIRECTION_OUT if negative else DIRECTION_IN)
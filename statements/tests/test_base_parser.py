@@ -5,8 +5,11 @@ Tests for the base parser class
 from django.test import TestCase
 from decimal import Decimal
 from datetime import datetime
+from io import BytesIO
 
-from ..base import BaseStatementParser
+from ..base import BaseStatementParser, TransactionStream, iter_decoded_lines
+from ..csv_parser import CSVStatementParser
+from ..td_credit_parser import TDCreditCardParser
 from ..exceptions import AmountParsingError, DateParsingError
 from ..constants import DIRECTION_IN, DIRECTION_OUT
 
@@ -87,3 +90,93 @@ class BaseStatementParserTest(TestCase):
         """Test that parse raises NotImplementedError"""
         with self.assertRaises(NotImplementedError):
             self.parser.parse(b'', 'test.csv')
+
+
+class StreamingParserTest(TestCase):
+    """Test cases for the streaming parser helpers"""
+
+    def test_iter_decoded_lines_handles_split_multibyte_characters(self):
+        """Test that a UTF-8 character split across chunks is decoded intact"""
+        content = 'Date,Description\n2025-01-15,Café Olé\n'.encode('utf-8')
+        lines = list(iter_decoded_lines(BytesIO(content), chunk_size=3))
+        self.assertEqual(lines, ['Date,Description\n', '2025-01-15,Café Olé\n'])
+
+    def test_iter_decoded_lines_falls_back_to_latin1(self):
+        """Test that undecodable UTF-8 falls back to latin-1"""
+        content = 'Date,Description\n2025-01-15,Caf\xe9\n'.encode('latin-1')
+        lines = list(iter_decoded_lines(BytesIO(content), chunk_size=4))
+        self.assertEqual(''.join(lines), 'Date,Description\n2025-01-15,Caf\xe9\n')
+
+    def test_iter_decoded_lines_without_trailing_newline(self):
+        """Test that the last line is yielded without a trailing newline"""
+        lines = list(iter_decoded_lines(BytesIO(b'a\nb')))
+        self.assertEqual(lines, ['a\n', 'b'])
+
+    def test_transaction_stream_collects_date_range(self):
+        """Test that the stream widens the statement date range as it is consumed"""
+        meta = {'statement_from_date': None, 'statement_to_date': None}
+        records = [
+            {'transaction_date': datetime(2025, 1, 15).date()},
+            {'transaction_date': datetime(2025, 1, 3).date()},
+            {'transaction_date': datetime(2025, 1, 20).date()},
+        ]
+        stream = TransactionStream(meta, iter(records))
+        statement_meta, transactions = stream.collect()
+
+        self.assertEqual(len(transactions), 3)
+        self.assertEqual(stream.row_count, 3)
+        self.assertEqual(statement_meta['statement_from_date'], datetime(2025, 1, 3).date())
+        self.assertEqual(statement_meta['statement_to_date'], datetime(2025, 1, 20).date())
+
+    def test_wrapped_parse_keeps_statement_dates(self):
+        """Test that streaming a parser without stream() keeps the dates parse() returned"""
+        class SnapshotParser(BaseStatementParser):
+            def parse(self, file_content, filename):
+                meta = {
+                    'statement_from_date': datetime(2025, 6, 1).date(),
+                    'statement_to_date': datetime(2025, 6, 2).date(),
+                }
+                return meta, [{'transaction_date': datetime(2025, 7, 15).date()}]
+
+        stream = SnapshotParser().stream(BytesIO(b''), 'holdings.pdf')
+        statement_meta, transactions = stream.collect()
+
+        self.assertEqual(len(transactions), 1)
+        self.assertEqual(statement_meta['statement_from_date'], datetime(2025, 6, 1).date())
+        self.assertEqual(statement_meta['statement_to_date'], datetime(2025, 6, 2).date())
+
+    def test_stream_matches_parse(self):
+        """Test that streaming a file yields the same result as parse()"""
+        csv_content = b"""Date,Description,Amount
+2025-01-20,COFFEE,-4.50
+2025-01-05,SALARY,2000.00
+"""
+        parser = CSVStatementParser()
+        stream = parser.stream(BytesIO(csv_content), 'statement.csv')
+        streamed = list(stream)
+
+        statement_meta, transactions = parser.parse(csv_content, 'statement.csv')
+        self.assertEqual(streamed, transactions)
+        self.assertEqual(stream.meta['statement_from_date'], datetime(2025, 1, 5).date())
+        self.assertEqual(statement_meta['statement_to_date'], datetime(2025, 1, 20).date())
+
+    def test_csv_row_parser_single_pass_stats(self):
+        """Test that row stats and the date range come from the same pass as the transactions"""
+        csv_content = b"""01/15/2025,GROCERY STORE,45.67,,1000.00
+01/03/2025,PAYMENT - THANK YOU,,500.00,954.33
+
+01/20/2025,"REFUND, ONLINE",,12.00,966.33
+not-a-date,BROKEN ROW,1.00,,0.00
+"""
+        parser = TDCreditCardParser()
+        stream = parser.stream(BytesIO(csv_content), 'td_credit.csv')
+        transactions = list(stream)
+
+        self.assertEqual(len(transactions), 2)
+        self.assertEqual(transactions[1]['item'], 'REFUND, ONLINE')
+        self.assertEqual(transactions[1]['direction'], DIRECTION_IN)
+        self.assertEqual(stream.rows_read, 4)
+        self.assertEqual(stream.row_count, 2)
+        self.assertEqual(stream.skip_reasons, {'payment': 1, 'invalid_date': 1})
+        self.assertEqual(stream.meta['statement_from_date'], datetime(2025, 1, 15).date())
+        self.assertEqual(stream.meta['statement_to_date'], datetime(2025, 1, 20).date())
@@ -0,0 +1,276 @@
+"""
+Tests for batch upload and import of many statements
+"""
+
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import date
+from io import BytesIO, StringIO
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+
+from ..batch import BatchFile, expand_uploads, expand_zip
+from ..exceptions import StatementParsingError
+from ..jobs import enqueue_batch, run_until_finished
+from ..models import Account, IngestJob, Statement
+
+User = get_user_model()
+
+TD_JANUARY = b"""2025-01-05,COFFEE SHOP,4.50,,995.50
+2025-01-10,PAYROLL,,2000.00,2995.50
+"""
+
+TD_FEBRUARY = b"""2025-02-03,BOOKSTORE,25.00,,2970.50
+"""
+
+AMEX_JANUARY = b"""Date,Date Processed,Description,Card Member,Account #,Amount
+15 Jan 2025,16 Jan 2025,GROCERY STORE,JOHN DOE,*****1234,100.00
+20 Jan 2025,21 Jan 2025,RESTAURANT,JOHN DOE,*****1234,45.20
+"""
+
+
+def make_zip(members):
+    """Build a ZIP archive from a dict of names to bytes"""
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def use_temporary_store(test):
+    """Point the content store at a directory removed after the test"""
+    directory = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, directory)
+    store_root = override_settings(SOURCE_STORE_ROOT=directory)
+    store_root.enable()
+    test.addCleanup(store_root.disable)
+
+
+class BatchExpandTest(TestCase):
+    """Test cases for expanding uploaded and imported batch files"""
+
+    def test_expand_zip_skips_clutter(self):
+        """Test that only statement files are taken from an archive"""
+        content = make_zip({
+            '2025/td-jan.csv': TD_JANUARY,
+            '__MACOSX/2025/._td-jan.csv': b'junk',
+            '.DS_Store': b'junk',
+            'notes.md': b'junk',
+        })
+        files = expand_zip(content)
+
+        self.assertEqual([f.name for f in files], ['2025/td-jan.csv'])
+        self.assertEqual(files[0].content, TD_JANUARY)
+
+    def test_expand_zip_size_limit(self):
+        """Test that archives expanding past the limit are rejected before reading"""
+        content = make_zip({'big.csv': b'0' * 1000})
+        with self.assertRaises(StatementParsingError):
+            expand_zip(content, max_total_bytes=999)
+
+    def test_expand_uploads_rejects_bad_zip(self):
+        """Test that a corrupt archive raises a parsing error"""
+        with self.assertRaises(StatementParsingError):
+            expand_uploads([BatchFile('statements.zip', b'not a zip')])
+
+
+class BatchIngestTest(TestCase):
+    """Test cases for queueing and running the jobs of a batch"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        use_temporary_store(self)
+        self.td = Account.objects.create(
+            account_abbr='TD-CHEQUE', bank_name='TD Bank', account_type='BANK',
+            last_parser='TDChequeAccountParser'
+        )
+        self.amex = Account.objects.create(
+            account_abbr='AMEX', bank_name='Amex', account_type='CREDIT_CARD',
+            last_parser='AmexCreditCardParser'
+        )
+
+    def _ingest(self, files, account=None):
+        return run_until_finished([job.id for job in enqueue_batch(files, account=account)])
+
+    def test_files_queued_without_parsing(self):
+        """Test that a batch becomes one pending job per file and nothing is parsed"""
+        jobs = enqueue_batch([
+            BatchFile('2025/td-jan.csv', TD_JANUARY),
+            BatchFile('amex-jan.csv', AMEX_JANUARY),
+        ])
+
+        self.assertEqual([job.source_file for job in jobs], ['td-jan.csv', 'amex-jan.csv'])
+        self.assertEqual(IngestJob.objects.filter(status=IngestJob.STATUS_PENDING, account=None).count(), 2)
+        self.assertFalse(Statement.objects.exists())
+
+    def test_accounts_detected_from_parser_history(self):
+        """Test that each file goes to the account last read by its parser"""
+        jobs = self._ingest([
+            BatchFile('td-jan.csv', TD_JANUARY),
+            BatchFile('amex-jan.csv', AMEX_JANUARY),
+        ])
+
+        self.assertEqual([job.status for job in jobs], [IngestJob.STATUS_SUCCEEDED] * 2)
+        self.assertEqual([job.account for job in jobs], [self.td, self.amex])
+        td_statement = Statement.objects.get(account=self.td)
+        self.assertEqual(td_statement.statement_from_date, date(2025, 1, 5))
+        self.assertEqual(td_statement.statementdetail_set.count(), 2)
+        self.assertEqual(Statement.objects.get(account=self.amex).source_file, 'amex-jan.csv')
+
+    def test_only_given_jobs_run(self):
+        """Test that running a batch leaves other queued jobs to the worker"""
+        other = enqueue_batch([BatchFile('amex-jan.csv', AMEX_JANUARY)])[0]
+
+        jobs = self._ingest([BatchFile('td-jan.csv', TD_JANUARY)])
+
+        self.assertEqual(jobs[0].status, IngestJob.STATUS_SUCCEEDED)
+        other.refresh_from_db()
+        self.assertEqual(other.status, IngestJob.STATUS_PENDING)
+        self.assertFalse(Statement.objects.filter(account=self.amex).exists())
+
+    def test_failures_do_not_block_other_files(self):
+        """Test that unparseable files fail alone and repeated files are not ingested twice"""
+        self._ingest([BatchFile('td-jan.csv', TD_JANUARY)], account=self.td)
+
+        jobs = self._ingest([
+            BatchFile('td-jan-again.csv', TD_JANUARY),
+            BatchFile('garbage.xyz', b'\x00\x01'),
+            BatchFile('td-feb.csv', TD_FEBRUARY),
+        ], account=self.td)
+
+        self.assertEqual(
+            [job.status for job in jobs],
+            [IngestJob.STATUS_SUCCEEDED, IngestJob.STATUS_FAILED, IngestJob.STATUS_SUCCEEDED]
+        )
+        self.assertEqual(jobs[0].rows_inserted, 0)
+        self.assertEqual(jobs[2].rows_inserted, 1)
+        self.assertEqual(Statement.objects.filter(account=self.td).count(), 2)
+
+    def test_ambiguous_account_fails(self):
+        """Test that a file is rejected when its parser maps to several accounts"""
+        Account.objects.create(
+            account_abbr='TD-JOINT', bank_name='TD Bank', account_type='BANK',
+            last_parser='TDChequeAccountParser'
+        )
+        jobs = self._ingest([BatchFile('td-jan.csv', TD_JANUARY)])
+
+        self.assertIn('not linked to exactly one account', jobs[0].error)
+        self.assertFalse(Statement.objects.exists())
+
+
+class ImportStatementsCommandTest(TestCase):
+    """Test cases for the import_statements management command"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        use_temporary_store(self)
+        self.account = Account.objects.create(account_abbr='TD-CHEQUE', bank_name='TD Bank', account_type='BANK')
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_imports_directory_with_zip(self):
+        """Test importing loose files and archives from a directory"""
+        with open(os.path.join(self.directory, 'td-jan.csv'), 'wb') as f:
+            f.write(TD_JANUARY)
+        with open(os.path.join(self.directory, 'more.zip'), 'wb') as f:
+            f.write(make_zip({'td-feb.csv': TD_FEBRUARY}))
+
+        out = StringIO()
+        call_command('import_statements', self.directory, account='TD-CHEQUE', workers=1, stdout=out)
+
+        self.assertIn('2 imported, 0 failed, 3 transactions', out.getvalue())
+        self.assertEqual(Statement.objects.filter(account=self.account).count(), 2)
+
+    def test_failures_raise_command_error(self):
+        """Test that a batch with failed files exits with an error summary"""
+        with open(os.path.join(self.directory, 'garbage.pdf'), 'wb') as f:
+            f.write(b'\x00\x01')
+
+        with self.assertRaisesMessage(CommandError, '0 imported, 1 failed'):
+            call_command('import_statements', self.directory, account='TD-CHEQUE', workers=1, stdout=StringIO())
+
+    def test_unknown_account(self):
+        """Test that an unknown account abbreviation is rejected"""
+        with self.assertRaises(CommandError):
+            call_command('import_statements', self.directory, account='NOPE', stdout=StringIO())
+
+
+class BatchUploadViewTest(TestCase):
+    """Test cases for the batch upload page"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        use_temporary_store(self)
+        User.objects.create_user(username='testuser', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+        self.account = Account.objects.create(account_abbr='TD-CHEQUE', bank_name='TD Bank', account_type='BANK')
+
+    def test_get(self):
+        """Test that the batch upload page renders"""
+        response = self.client.get(reverse('statements:batch_upload'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'statements/batch_upload.html')
+
+    def test_post_files_and_zip(self):
+        """Test that a loose file and a ZIP archive are ingested as one job per statement"""
+        response = self.client.post(reverse('statements:batch_upload'), {
+            'account': self.account.id,
+            'source_files': [
+                SimpleUploadedFile('td-jan.csv', TD_JANUARY),
+                SimpleUploadedFile('more.zip', make_zip({'td-feb.csv': TD_FEBRUARY})),
+            ],
+        })
+
+        self.assertEqual(response.status_code, 200)
+        jobs = response.context['jobs']
+        self.assertEqual([job.source_file for job in jobs], ['td-jan.csv', 'td-feb.csv'])
+        self.assertEqual([job.status for job in jobs], [IngestJob.STATUS_SUCCEEDED] * 2)
+        self.assertEqual(Statement.objects.filter(account=self.account).count(), 2)
+        self.assertContains(response, reverse('statements:statement_detail', args=[jobs[1].statement_id]))
+
+    def test_post_reports_failed_files(self):
+        """Test that a file that cannot be parsed is reported next to the ones that were"""
+        response = self.client.post(reverse('statements:batch_upload'), {
+            'account': self.account.id,
+            'source_files': [
+                SimpleUploadedFile('td-jan.csv', TD_JANUARY),
+                SimpleUploadedFile('garbage.csv', b'not,a,statement'),
+            ],
+        })
+
+        jobs = response.context['jobs']
+        self.assertEqual([job.status for job in jobs], [IngestJob.STATUS_SUCCEEDED, IngestJob.STATUS_FAILED])
+        self.assertContains(response, '1 files could not be uploaded')
+
+    @override_settings(INGEST_ASYNC=True)
+    def test_post_queues_when_async(self):
+        """Test that with INGEST_ASYNC the files are left to the background worker"""
+        response = self.client.post(reverse('statements:batch_upload'), {
+            'account': self.account.id,
+            'source_files': [SimpleUploadedFile('td-jan.csv', TD_JANUARY)],
+        })
+
+        jobs = response.context['jobs']
+        self.assertEqual([job.status for job in jobs], [IngestJob.STATUS_PENDING])
+        self.assertContains(response, reverse('statements:ingest_job_status', args=[jobs[0].id]))
+        self.assertFalse(Statement.objects.exists())
+
+        run_until_finished([job.id for job in jobs])
+        self.assertEqual(Statement.objects.filter(account=self.account).count(), 1)
+
+    def test_rejects_unsupported_extension(self):
+        """Test that unsupported uploads fail form validation"""
+        response = self.client.post(reverse('statements:batch_upload'), {
+            'source_files': [SimpleUploadedFile('virus.exe', b'MZ')],
+        })
+
+        self.assertIsNone(response.context['jobs'])
+        self.assertTrue(response.context['form'].errors)
@@ -0,0 +1,109 @@
+"""
+Tests for synthetic statement generation and the parser benchmark
+"""
+
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from ..benchmark import compare_reports, measure_statement, run_benchmarks
+from ..factory import StatementParserFactory
+from ..synthetic import SYNTHETIC_FORMATS, _money, generate_statement
+
+
+class SyntheticStatementTest(SimpleTestCase):
+    """Every generated format is detected and parsed by its own parser"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.data_dir = directory.name
+
+    def test_each_format_parses_every_row(self):
+        parser_factory = StatementParserFactory()
+        for name, fmt in SYNTHETIC_FORMATS.items():
+            with self.subTest(format=name):
+                path = generate_statement(name, 120, self.data_dir)
+                with open(path, 'rb') as f:
+                    content = f.read()
+                parser = parser_factory.get_parser(content, os.path.basename(path))
+                self.assertEqual(parser.__class__.__name__, fmt.parser_name)
+
+                meta, transactions = parser.parse(content, os.path.basename(path))
+                self.assertEqual(len(transactions), 120)
+                self.assertEqual({t['direction'] for t in transactions}, {'IN', 'OUT'})
+                self.assertLess(meta['statement_from_date'], meta['statement_to_date'])
+
+    def test_money_keeps_sign_of_negative_amounts(self):
+        self.assertEqual(_money(12345), '123.45')
+        self.assertEqual(_money(-12345), '-123.45')
+        self.assertEqual(_money(-5), '-0.05')
+        self.assertEqual(_money(0), '0.00')
+
+    def test_generation_is_reproducible_and_reused(self):
+        path = generate_statement('td_cheque', 50, self.data_dir, seed=3)
+        with open(path, 'rb') as f:
+            first = f.read()
+        mtime = os.path.getmtime(path)
+
+        self.assertEqual(generate_statement('td_cheque', 50, self.data_dir, seed=3), path)
+        self.assertEqual(os.path.getmtime(path), mtime)
+
+        again = generate_statement('td_cheque', 50, self.data_dir, seed=3, overwrite=True)
+        with open(again, 'rb') as f:
+            self.assertEqual(f.read(), first)
+
+
+class BenchmarkTest(SimpleTestCase):
+    """Measurements, report comparison and the management command"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.data_dir = directory.name
+
+    def test_measure_statement(self):
+        path = generate_statement('amex', 40, self.data_dir)
+        result = measure_statement(path, 'amex', detection_iterations=2)
+
+        self.assertEqual(result['parser'], 'AmexCreditCardParser')
+        self.assertEqual(result['rows'], 40)
+        self.assertGreater(result['rows_per_second'], 0)
+        self.assertLessEqual(result['first_row_seconds'], result['parse_seconds'])
+        self.assertGreaterEqual(result['peak_rss_kb'], result['baseline_rss_kb'])
+
+    def test_compare_reports_flags_regressions(self):
+        baseline = {'results': [
+            {'format': 'csv', 'target_rows': 1000, 'rows_per_second': 1000.0, 'peak_rss_kb': 100000},
+        ]}
+        current = {'results': [
+            {'format': 'csv', 'target_rows': 1000, 'rows_per_second': 800.0, 'peak_rss_kb': 104000},
+            {'format': 'txt', 'target_rows': 1000, 'rows_per_second': 10.0},
+        ]}
+        changes = {change['metric']: change for change in compare_reports(baseline, current, threshold_percent=10)}
+
+        self.assertEqual(set(changes), {'rows_per_second', 'peak_rss_kb'})
+        self.assertAlmostEqual(changes['rows_per_second']['change_percent'], -20.0)
+        self.assertTrue(changes['rows_per_second']['regression'])
+        self.assertFalse(changes['peak_rss_kb']['regression'])
+
+    def test_run_benchmarks_in_process(self):
+        results = run_benchmarks(['txt', 'bmo'], [30], self.data_dir, isolate=False, detection_iterations=1)
+        self.assertEqual([(r['format'], r['target_rows'], r['rows']) for r in results],
+                         [('txt', 30, 30), ('bmo', 30, 30)])
+
+    def test_command_writes_report(self):
+        output = os.path.join(self.data_dir, 'report.json')
+        call_command(
+            'benchmark_parsers', formats=['td_credit'], rows=['25'], data_dir=self.data_dir,
+            output=output, detection_iterations=1, no_isolate=True, stdout=StringIO(),
+        )
+        with open(output) as f:
+            report = json.load(f)
+        self.assertEqual(len(report['results']), 1)
+        self.assertEqual(report['results'][0]['parser'], 'TDCreditCardParser')
+        self.assertIn('commit', report)
@@ -0,0 +1,142 @@
+"""
+Tests for the stored transaction category
+"""
+
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from decimal import Decimal
+from datetime import date
+
+from ..models import Account, Statement, StatementDetail
+from ..categorizer import TransactionCategorizer, categorize_details
+from ..ingest import ingest_statement
+from ..utils import aggregate_transactions_by_category
+from ..constants import DIRECTION_IN, DIRECTION_OUT
+
+
+class StoredCategoryTest(TestCase):
+    """Test cases for the category column of StatementDetail"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        cache.clear()
+        self.account = Account.objects.create(
+            account_abbr='TEST_CHQ',
+            bank_name='Test Bank',
+            account_number='12345678',
+            account_type='BANK'
+        )
+        self.statement = Statement.objects.create(
+            account=self.account,
+            source_file='test_statement.csv',
+            statement_from_date=date(2025, 1, 1),
+            statement_to_date=date(2025, 1, 31),
+            statement_type='CSV'
+        )
+
+    def _detail(self, item, direction, amount='10.00', day=1):
+        return StatementDetail.objects.create(
+            statement=self.statement,
+            item=item,
+            transaction_date=date(2025, 1, day),
+            amount=Decimal(amount),
+            direction=direction
+        )
+
+    def _clear_categories(self):
+        StatementDetail.objects.update(category='')
+
+    def test_ingest_stores_category(self):
+        """Test that ingest categorizes every transaction it writes"""
+        transactions = [
+            {'item': 'SALARY', 'transaction_date': date(2025, 1, 2), 'amount': Decimal('100.00'), 'direction': 'IN'},
+            {'item': 'QUESTRADE', 'transaction_date': date(2025, 1, 3), 'amount': Decimal('50.00'), 'direction': 'OUT'},
+            {'item': 'COFFEE', 'transaction_date': date(2025, 1, 4), 'amount': Decimal('5.00'), 'direction': 'OUT'},
+        ]
+        result = ingest_statement(
+            self.account,
+            {'statement_from_date': date(2025, 1, 1), 'statement_to_date': date(2025, 1, 31), 'statement_type': 'CSV'},
+            transactions, source_file='test.csv'
+        )
+
+        categories = dict(result.statement.statementdetail_set.values_list('item', 'category'))
+        self.assertEqual(categories, {'SALARY': 'income', 'QUESTRADE': 'investment', 'COFFEE': 'spending'})
+
+    def test_save_fills_missing_category(self):
+        """Test that saving a transaction without a category categorizes it"""
+        detail = self._detail('TRANSFER TO EQ BANK', DIRECTION_OUT)
+        self.assertEqual(detail.category, 'transfer')
+
+        detail.category = ''
+        detail.save(update_fields=['item'])
+        detail.refresh_from_db()
+        self.assertEqual(detail.category, 'transfer')
+
+    def test_categorize_details_backfills_in_batches(self):
+        """Test that only uncategorized rows are filled, across several batches"""
+        for i in range(5):
+            self._detail(f'GROCERY {i}', DIRECTION_OUT)
+        kept = self._detail('GIC DEPOSIT', DIRECTION_IN)
+        self._clear_categories()
+        StatementDetail.objects.filter(pk=kept.pk).update(category='income')
+
+        progress = []
+        updated = categorize_details(StatementDetail, batch_size=2, progress=lambda *args: progress.append(args))
+
+        self.assertEqual(updated, 5)
+        self.assertEqual(progress[-1], (5, 5))
+        self.assertEqual(len(progress), 3)
+        self.assertFalse(StatementDetail.objects.filter(category='').exists())
+        self.assertEqual(StatementDetail.objects.get(pk=kept.pk).category, 'income')
+
+    def test_categorize_details_recategorize(self):
+        """Test that recategorizing applies changed keywords to every row"""
+        detail = self._detail('NETFLIX', DIRECTION_OUT)
+        self._detail('COFFEE', DIRECTION_OUT)
+        categorizer = TransactionCategorizer(transfer_keywords=['NETFLIX'])
+
+        self.assertEqual(categorize_details(StatementDetail, categorizer=categorizer), 0)
+        updated = categorize_details(StatementDetail, recategorize=True, categorizer=categorizer)
+
+        self.assertEqual(updated, 1)
+        self.assertEqual(StatementDetail.objects.get(pk=detail.pk).category, 'transfer')
+
+    def test_categorize_transactions_command(self):
+        """Test the backfill command and its --all option"""
+        self._detail('SALARY', DIRECTION_IN)
+        self._detail('QUESTRADE', DIRECTION_OUT)
+        self._clear_categories()
+
+        out = StringIO()
+        call_command('categorize_transactions', '--batch-size', '1', stdout=out)
+        self.assertIn('Updated the category of 2 transactions', out.getvalue())
+
+        out = StringIO()
+        call_command('categorize_transactions', '--all', stdout=out)
+        self.assertIn('Updated the category of 0 transactions', out.getvalue())
+
+    def test_aggregate_groups_by_stored_category(self):
+        """Test that totals come from the stored category in a few queries"""
+        self._detail('SALARY', DIRECTION_IN, '2000.00', 15)
+        self._detail('GROCERY STORE', DIRECTION_OUT, '150.00', 20)
+        self._detail('RESTAURANT', DIRECTION_OUT, '50.00', 21)
+        StatementDetail.objects.filter(item='RESTAURANT').update(category='transfer')
+
+        with self.assertNumQueries(2):
+            result = aggregate_transactions_by_category(StatementDetail.objects.all())
+
+        self.assertEqual(result['income'], Decimal('2000.00'))
+        self.assertEqual(result['spending'], Decimal('150.00'))
+        self.assertEqual(result['transfers'], Decimal('50.00'))
+        self.assertEqual(result['investments'], Decimal('0.00'))
+        self.assertEqual([t['item'] for t in result['transfer_transactions']], ['RESTAURANT'])
+
+    def test_aggregate_empty_queryset(self):
+        """Test aggregating no transactions"""
+        result = aggregate_transactions_by_category(StatementDetail.objects.none())
+
+        self.assertEqual(result['net_amount'], Decimal('0.00'))
+        self.assertEqual(result['income_transactions'], [])
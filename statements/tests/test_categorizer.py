@@ -0,0 +1,68 @@
+"""
+Tests for the compiled keyword categorizer
+"""
+
+from django.test import SimpleTestCase
+
+from ..benchmark import CATEGORIZER_DEPOSITS, CATEGORIZER_WITHDRAWALS, reference_categorize
+from ..categorizer import KeywordMatcher, TransactionCategorizer
+from ..synthetic import iter_transactions
+
+
+class KeywordMatcherTest(SimpleTestCase):
+    """One scan finds every keyword"""
+
+    def setUp(self):
+        self.matcher = KeywordMatcher({'a': ['GIC FUND'], 'b': ['GIC'], 'c': ['FUND X'], 'd': ['XY']})
+
+    def test_case_insensitive(self):
+        self.assertEqual(self.matcher('monthly gic'), {'b'})
+        self.assertEqual(self.matcher('COFFEE'), frozenset())
+
+    def test_contained_and_overlapping_keywords(self):
+        self.assertEqual(self.matcher('GIC FUND XY'), {'a', 'b', 'c', 'd'})
+
+    def test_scan_attributes_matches_to_strings(self):
+        texts = ['coffee', 'GIC fund', '', 'xy and gic', 'rent']
+        self.assertEqual(self.matcher.scan(texts), {1: {'a', 'b'}, 3: {'b', 'd'}})
+
+    def test_scan_with_separator_in_text(self):
+        self.assertEqual(self.matcher.scan(['a\x00gic', 'xy']), {0: {'b'}, 1: {'d'}})
+
+    def test_invalid_keyword(self):
+        with self.assertRaises(ValueError):
+            KeywordMatcher({'a': ['']})
+
+
+class TransactionCategorizerTest(SimpleTestCase):
+    """Categories match the original substring implementation"""
+
+    def setUp(self):
+        self.categorizer = TransactionCategorizer()
+
+    def test_categories(self):
+        cases = [
+            ('EQ Bank transfer', 'OUT', 'transfer'),
+            ('QUESTRADE GIC', 'OUT', 'investment'),
+            ('Transfer to EQ BANK Questrade', 'OUT', 'transfer'),
+            ('GROCERY STORE', 'OUT', 'spending'),
+            ('PAYROLL', 'IN', 'income'),
+            ('GIC maturity', 'IN', 'other'),
+            ('EQ BANK', 'PENDING', 'other'),
+        ]
+        for item, direction, category in cases:
+            with self.subTest(item=item, direction=direction):
+                self.assertEqual(self.categorizer.categorize(item, direction), category)
+                self.assertEqual(reference_categorize(item, direction), category)
+
+    def test_categorize_many_matches_reference(self):
+        transactions = list(iter_transactions(2000, 1, CATEGORIZER_DEPOSITS, CATEGORIZER_WITHDRAWALS))
+        items = [transaction.item for transaction in transactions] + ['straße gic', 'ß' * 3 + 'EQ BANK']
+        directions = [transaction.direction for transaction in transactions] + ['IN', 'OUT']
+
+        expected = [reference_categorize(item, direction) for item, direction in zip(items, directions)]
+        self.assertEqual(self.categorizer.categorize_many(items, directions), expected)
+        self.assertEqual(set(expected), {'transfer', 'investment', 'spending', 'income', 'other'})
+
+    def test_categorize_many_empty(self):
+        self.assertEqual(self.categorizer.categorize_many([], []), [])
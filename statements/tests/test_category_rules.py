@@ -0,0 +1,179 @@
+"""
+Tests for user-defined category rules
+"""
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+from decimal import Decimal
+from datetime import date
+
+from ..models import Account, Statement, StatementDetail, CategoryRule, IngestJob
+from ..categorizer import RuleCategorizer, RuleSpec, transaction_categorizer
+from ..category_rules import get_categorizer, load_categorizer
+from ..jobs import run_pending_jobs
+from ..constants import DIRECTION_IN, DIRECTION_OUT, RULE_MATCH_EXACT, RULE_MATCH_REGEX, RULE_MATCH_STARTS_WITH
+
+
+class RuleCategorizerTest(SimpleTestCase):
+    """Test cases for RuleCategorizer"""
+
+    def test_first_matching_rule_wins(self):
+        """Test that rules are tried in order"""
+        categorizer = RuleCategorizer([
+            RuleSpec('EQ BANK', 'CONTAINS', 'transfer'),
+            RuleSpec('BANK', 'CONTAINS', 'investment'),
+        ])
+
+        self.assertEqual(categorizer.categorize('TRANSFER TO EQ BANK', DIRECTION_OUT), 'transfer')
+        self.assertEqual(categorizer.categorize('BANK FEE', DIRECTION_OUT), 'investment')
+        self.assertEqual(categorizer.categorize('COFFEE', DIRECTION_OUT), 'spending')
+        self.assertEqual(categorizer.categorize('SALARY', DIRECTION_IN), 'income')
+
+    def test_match_types(self):
+        """Test starts with, exact and regular expression rules, ignoring case"""
+        categorizer = RuleCategorizer([
+            RuleSpec('uber', RULE_MATCH_STARTS_WITH, 'transfer'),
+            RuleSpec('netflix', RULE_MATCH_EXACT, 'investment'),
+            RuleSpec(r'^ATM \d+', RULE_MATCH_REGEX, 'other'),
+        ])
+
+        self.assertEqual(
+            categorizer.categorize_many(
+                ['UBER TRIP', 'MY UBER', 'Netflix', 'NETFLIX.COM', 'atm 42 withdrawal'], [DIRECTION_OUT] * 5
+            ),
+            ['transfer', 'spending', 'investment', 'spending', 'other']
+        )
+
+    def test_direction_and_account_scope(self):
+        """Test that scoped rules only match their direction and account"""
+        categorizer = RuleCategorizer([
+            RuleSpec('PAYMENT', 'CONTAINS', 'payment', direction=DIRECTION_IN, account_type='CREDIT_CARD'),
+            RuleSpec('RENT', 'CONTAINS', 'transfer', account_id=7),
+        ])
+
+        self.assertEqual(categorizer.categorize('PAYMENT', DIRECTION_IN, (1, 'CREDIT_CARD')), 'payment')
+        self.assertEqual(categorizer.categorize('PAYMENT', DIRECTION_IN, (1, 'BANK')), 'income')
+        self.assertEqual(categorizer.categorize('PAYMENT', DIRECTION_OUT, (1, 'CREDIT_CARD')), 'spending')
+        self.assertEqual(categorizer.categorize('RENT', DIRECTION_OUT, (7, 'BANK')), 'transfer')
+        self.assertEqual(categorizer.categorize('RENT', DIRECTION_OUT, (8, 'BANK')), 'spending')
+        self.assertEqual(categorizer.categorize('RENT', DIRECTION_OUT), 'spending')
+
+
+class CategoryRuleTest(TestCase):
+    """Test cases for CategoryRule and the cached categorizer"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        cache.clear()
+        self.account = Account.objects.create(
+            account_abbr='TEST_CHQ',
+            bank_name='Test Bank',
+            account_number='12345678',
+            account_type='BANK'
+        )
+        self.statement = Statement.objects.create(
+            account=self.account,
+            source_file='test_statement.csv',
+            statement_from_date=date(2025, 1, 1),
+            statement_to_date=date(2025, 1, 31),
+            statement_type='CSV'
+        )
+
+    def _detail(self, item, direction=DIRECTION_OUT):
+        return StatementDetail.objects.create(
+            statement=self.statement,
+            item=item,
+            transaction_date=date(2025, 1, 15),
+            amount=Decimal('10.00'),
+            direction=direction
+        )
+
+    def _save_rule(self, rule):
+        with self.captureOnCommitCallbacks(execute=True):
+            rule.save()
+        return rule
+
+    def test_default_rules_match_keywords(self):
+        """Test that the seeded rules categorize like the built-in keywords"""
+        categorizer = load_categorizer()
+        items = ['TRANSFER TO EQ BANK', 'QUESTRADE', 'GIC PURCHASE', 'GIC MATURITY', 'EQ BANK GIC', 'SALARY', 'COFFEE']
+        for direction in (DIRECTION_IN, DIRECTION_OUT):
+            self.assertEqual(
+                categorizer.categorize_many(items, [direction] * len(items), (self.account.id, 'BANK')),
+                transaction_categorizer.categorize_many(items, [direction] * len(items))
+            )
+
+    def test_categorizer_cached_until_rules_change(self):
+        """Test that rules are read again only after a rule is saved"""
+        categorizer = get_categorizer()
+        with self.assertNumQueries(1):
+            self.assertIs(get_categorizer(), categorizer)
+
+        self._save_rule(CategoryRule(pattern='NETFLIX', category='transfer'))
+
+        self.assertIsNot(get_categorizer(), categorizer)
+        self.assertEqual(get_categorizer().categorize('NETFLIX', DIRECTION_OUT), 'transfer')
+
+    def test_rule_changes_seen_by_other_processes(self):
+        """Test that a process which did not handle the change still picks up the new rules"""
+        get_categorizer()
+        # Another process saves the rule: no local cache or commit hook of this one is involved
+        CategoryRule.objects.create(pattern='NETFLIX', category='transfer')
+        cache.clear()
+        self.assertEqual(get_categorizer().categorize('NETFLIX', DIRECTION_OUT), 'transfer')
+
+        rule = CategoryRule.objects.get(pattern='NETFLIX')
+        rule.category = 'investment'
+        rule.save()
+        self.assertEqual(get_categorizer().categorize('NETFLIX', DIRECTION_OUT), 'investment')
+
+        CategoryRule.objects.filter(pk=rule.pk).delete()
+        self.assertEqual(get_categorizer().categorize('NETFLIX', DIRECTION_OUT), 'spending')
+
+    def test_rule_change_recategorizes_affected_rows(self):
+        """Test that a changed rule queues a job that only rewrites rows it matches"""
+        netflix = self._detail('NETFLIX')
+        coffee = self._detail('COFFEE')
+        StatementDetail.objects.filter(pk=coffee.pk).update(category='other')
+
+        rule = self._save_rule(CategoryRule(pattern='NETFLIX', category='transfer'))
+        job = IngestJob.objects.get(kind=IngestJob.KIND_RECATEGORIZE)
+        self.assertEqual(run_pending_jobs(worker='test'), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, IngestJob.STATUS_SUCCEEDED)
+        self.assertEqual(job.rows_inserted, 1)
+        self.assertEqual(StatementDetail.objects.get(pk=netflix.pk).category, 'transfer')
+        # Rows the rule cannot match are left alone
+        self.assertEqual(StatementDetail.objects.get(pk=coffee.pk).category, 'other')
+
+        # The old pattern is re-categorized too when the rule is edited
+        rule = CategoryRule.objects.get(pk=rule.pk)
+        rule.pattern = 'COFFEE'
+        self._save_rule(rule)
+        run_pending_jobs(worker='test')
+        self.assertEqual(StatementDetail.objects.get(pk=netflix.pk).category, 'spending')
+        self.assertEqual(StatementDetail.objects.get(pk=coffee.pk).category, 'transfer')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rule.delete()
+        run_pending_jobs(worker='test')
+        self.assertEqual(StatementDetail.objects.get(pk=coffee.pk).category, 'spending')
+
+    def test_unchanged_rule_queues_nothing(self):
+        """Test that saving a rule without changes does not re-categorize"""
+        rule = self._save_rule(CategoryRule(pattern='NETFLIX', category='transfer'))
+        IngestJob.objects.all().delete()
+
+        rule = CategoryRule.objects.get(pk=rule.pk)
+        self._save_rule(rule)
+
+        self.assertFalse(IngestJob.objects.exists())
+
+    def test_invalid_regex_rejected(self):
+        """Test that a regular expression that does not compile fails validation"""
+        rule = CategoryRule(pattern='(UNCLOSED', match_type=RULE_MATCH_REGEX, category='other')
+
+        with self.assertRaises(ValidationError):
+            rule.full_clean()
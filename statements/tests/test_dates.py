@@ -0,0 +1,72 @@
+"""
+Tests for the date-column engine
+"""
+
+from django.test import TestCase
+from datetime import date, datetime
+
+from ..dates import DateParser, infer_date_format, parse_date_value
+from ..bmo_parser import BMOBankParser
+from ..exceptions import DateParsingError
+
+
+class InferDateFormatTest(TestCase):
+    """Test cases for infer_date_format"""
+
+    def test_infer_iso_format(self):
+        """Test that an unambiguous column resolves to its format"""
+        self.assertEqual(infer_date_format(['2025-01-15', '2025-01-20']), '%Y-%m-%d')
+
+    def test_day_above_twelve_resolves_day_first(self):
+        """Test that one sample with a day above 12 settles day/month order"""
+        samples = ['05/01/2025', '09/01/2025', '23/01/2025']
+        self.assertEqual(infer_date_format(samples), '%d/%m/%Y')
+
+    def test_chronological_order_resolves_ambiguity(self):
+        """Test that the format giving a consistent date order wins when both parse"""
+        # Day first runs Jan 2, Feb 2, Mar 2, Apr 1; month first jumps back from Feb 3 to Jan 4
+        samples = ['02/01/2025', '02/02/2025', '02/03/2025', '01/04/2025']
+        self.assertEqual(infer_date_format(samples), '%d/%m/%Y')
+
+    def test_fully_ambiguous_prefers_list_order(self):
+        """Test that remaining ties go to the earlier format"""
+        self.assertEqual(infer_date_format(['01/02/2025']), '%m/%d/%Y')
+
+    def test_no_samples(self):
+        """Test that blank samples infer nothing"""
+        self.assertIsNone(infer_date_format(['', None, '   ']))
+
+
+class DateParserTest(TestCase):
+    """Test cases for DateParser"""
+
+    def test_parse_uses_locked_format(self):
+        """Test that values matching the locked format need no fallback"""
+        parser = DateParser.from_samples(['15/01/2025', '20/01/2025'])
+        self.assertEqual(parser.parse('03/02/2025'), date(2025, 2, 3))
+        self.assertEqual(parser.fallbacks, 0)
+
+    def test_parse_falls_back_for_other_formats(self):
+        """Test that a value in another format still parses"""
+        parser = DateParser('%d/%m/%Y')
+        self.assertEqual(parser.parse('Jan 15, 2025'), date(2025, 1, 15))
+        self.assertEqual(parser.fallbacks, 1)
+
+    def test_parse_column(self):
+        """Test vectorized column parsing with blanks, datetimes and stragglers"""
+        values = ['2025-01-15', '', None, datetime(2025, 1, 17, 9, 30), 'Jan 18, 2025', 'not a date']
+        parsed = DateParser().parse_column(values)
+        self.assertEqual(parsed, [
+            date(2025, 1, 15), None, None, date(2025, 1, 17), date(2025, 1, 18), None
+        ])
+
+    def test_parse_date_value_invalid(self):
+        """Test that an unparseable value raises DateParsingError"""
+        with self.assertRaises(DateParsingError):
+            parse_date_value('not a date')
+
+    def test_bmo_parse_date(self):
+        """Test that BMO dates keep their YYYYMMDD default and fallback"""
+        parser = BMOBankParser()
+        self.assertEqual(parser._parse_date("'20250115'"), date(2025, 1, 15))
+        self.assertEqual(parser._parse_date('2025-01-16'), date(2025, 1, 16))
@@ -0,0 +1,83 @@
+"""
+Tests for the Excel statement parser
+"""
+
+from django.test import TestCase
+from unittest import mock
+from decimal import Decimal
+from datetime import datetime
+from io import BytesIO
+
+import openpyxl
+
+from ..excel_parser import ExcelStatementParser
+
+
+class ExcelStatementParserTest(TestCase):
+    """Test cases for ExcelStatementParser"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.parser = ExcelStatementParser()
+        self.content = self._build_workbook()
+
+    def _build_workbook(self):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = 'January'
+        sheet.append(['Date', 'Description', 'Amount'])
+        sheet.append([datetime(2025, 1, 15), 'GROCERY STORE', -45.67])
+        sheet.append(['2025-01-20', 'SALARY', '$2,000.00'])
+        sheet.append([None, None, None])
+        sheet.append([None, 'TOTAL', 1954.33])
+
+        second = workbook.create_sheet('February')
+        second.append(['Posting Date', 'Memo', 'Debit'])
+        second.append(['2025-02-03', 'COFFEE', '(4.50)'])
+
+        notes = workbook.create_sheet('Notes')
+        notes.append(['Exported by online banking'])
+
+        buffer = BytesIO()
+        workbook.save(buffer)
+        return buffer.getvalue()
+
+    def _assert_transactions(self, statement_meta, transactions):
+        self.assertEqual(len(transactions), 3)
+        self.assertEqual(transactions[0], {
+            'item': 'GROCERY STORE',
+            'transaction_date': datetime(2025, 1, 15).date(),
+            'amount': Decimal('45.67'),
+            'direction': 'OUT'
+        })
+        self.assertEqual(transactions[1]['amount'], Decimal('2000.00'))
+        self.assertEqual(transactions[1]['direction'], 'IN')
+        self.assertEqual(transactions[2]['item'], 'COFFEE')
+        self.assertEqual(transactions[2]['direction'], 'OUT')
+        self.assertEqual(statement_meta['statement_from_date'], datetime(2025, 1, 15).date())
+        self.assertEqual(statement_meta['statement_to_date'], datetime(2025, 2, 3).date())
+
+    def test_can_parse(self):
+        """Test that Excel files are recognised by extension"""
+        self.assertTrue(self.parser.can_parse(self.content, 'statement.xlsx'))
+        self.assertFalse(self.parser.can_parse(self.content, 'statement.csv'))
+
+    def test_parse_all_sheets(self):
+        """Test that every sheet with date and amount columns is parsed"""
+        statement_meta, transactions = self.parser.parse(self.content, 'chase.xlsx')
+        self.assertEqual(statement_meta['bank_name'], 'Chase Bank')
+        self._assert_transactions(statement_meta, transactions)
+
+    def test_read_only_streaming_matches_dataframe(self):
+        """Test that the read-only streaming mode gives the same result"""
+        with mock.patch('statements.excel_parser.EXCEL_STREAMING_MIN_BYTES', 0), \
+                mock.patch('statements.excel_parser.EXCEL_CHUNK_ROWS', 2):
+            with mock.patch.object(self.parser, '_iter_dataframes') as dataframes:
+                statement_meta, transactions = self.parser.parse(self.content, 'statement.xlsx')
+                dataframes.assert_not_called()
+        self._assert_transactions(statement_meta, transactions)
+
+    def test_parse_invalid_workbook(self):
+        """Test that unreadable files raise ValueError"""
+        with self.assertRaises(ValueError):
+            self.parser.parse(b'not a workbook', 'statement.xlsx')
@@ -4,10 +4,13 @@ Tests for the statement parser factory
 
 from django.test import TestCase
 
+from ..base import SniffContext, normalize_header
 from ..factory import StatementParserFactory
 from ..amex_parser import AmexCreditCardParser
 from ..csv_parser import CSVStatementParser
+from ..td_parser import TDChequeAccountParser
 from ..exceptions import ParserNotFoundError
+from ..models import Account
 
 
 class StatementParserFactoryTest(TestCase):
@@ -63,3 +66,121 @@ class StatementParserFactoryTest(TestCase):
 
         # Wealthsimple PDF should come first
         self.assertEqual(parser_classes[0], 'WealthsimpleRRSPParser')
+
+    def test_get_parser_shares_one_sniff_context(self):
+        """Test that every parser tried receives the same sniff context"""
+        csv_content = b"""Date,Transaction,Amount
+2025-01-15,Purchase,100.00
+"""
+        seen = []
+        for parser in self.factory.parsers:
+            original = parser.can_parse
+
+            def recording_can_parse(file_content, filename, context=None, original=original):
+                seen.append(context)
+                return original(file_content, filename, context)
+
+            parser.can_parse = recording_can_parse
+
+        self.factory.get_parser(csv_content, 'statement.csv')
+        self.assertGreater(len(seen), 1)
+        self.assertTrue(all(context is seen[0] for context in seen))
+
+    def test_get_parser_td_from_large_upload_prefix(self):
+        """Test that detection only decodes a bounded prefix of the upload"""
+        row = b'2025-01-15,COFFEE SHOP,4.50,,995.50\n'
+        csv_content = row * 5000
+
+        parser = self.factory.get_parser(csv_content, 'td.csv')
+        self.assertIsInstance(parser, TDChequeAccountParser)
+
+
+    def test_header_index_resolves_signature(self):
+        """Test that declared header signatures resolve regardless of case, spacing and order"""
+        key = normalize_header(['amount', 'Account  #', 'CARD MEMBER', 'Description', 'Date Processed', 'Date'])
+        self.assertIsInstance(self.factory.header_index[key], AmexCreditCardParser)
+
+    def test_get_parser_header_match_beats_account_history(self):
+        """Test that an exact header match wins over the account's last parser"""
+        account = Account.objects.create(
+            account_abbr='AMEX', bank_name='American Express', account_number='1234',
+            account_type='CREDIT_CARD', last_parser='CSVStatementParser'
+        )
+        csv_content = b"""Date,Date Processed,Description,Card Member,Account #,Amount
+15 Jan 2025,16 Jan 2025,GROCERY STORE,JOHN DOE,*****1234,-100.00
+"""
+        parser = self.factory.get_parser(csv_content, 'statement.csv', account)
+        self.assertIsInstance(parser, AmexCreditCardParser)
+
+    def test_generic_last_parser_is_not_a_shortcut(self):
+        """Test that a generic parser remembered for an account does not take a TD file"""
+        account = Account.objects.create(
+            account_abbr='TD-CHQ', bank_name='TD Bank', account_number='1234',
+            account_type='BANK', last_parser='CSVStatementParser'
+        )
+        csv_content = b'2025-01-15,COFFEE SHOP,4.50,,995.50\n2025-01-16,PAYROLL,,2000.00,2995.50\n'
+
+        parser = self.factory.get_parser(csv_content, 'td.csv', account)
+        self.assertIsInstance(parser, TDChequeAccountParser)
+
+    def test_generic_parser_not_remembered(self):
+        """Test that reading a statement with a generic parser leaves last_parser alone"""
+        account = Account.objects.create(
+            account_abbr='TD-CHQ', bank_name='TD Bank', account_number='1234',
+            account_type='BANK', last_parser='TDChequeAccountParser'
+        )
+
+        self.factory.remember_parser(account, 'CSVStatementParser')
+        account.refresh_from_db()
+        self.assertEqual(account.last_parser, 'TDChequeAccountParser')
+
+    def test_parse_statement_remembers_parser_for_account(self):
+        """Test that the successful parser is stored on the account and tried first next time"""
+        account = Account.objects.create(
+            account_abbr='TD-CREDIT', bank_name='TD Bank', account_number='5678', account_type='CREDIT_CARD'
+        )
+        csv_content = b'01/15/2025,GROCERY STORE,45.67,,1000.00\n'
+
+        self.factory.parse_statement(csv_content, 'td_credit.csv', account)
+        account.refresh_from_db()
+        self.assertEqual(account.last_parser, 'TDCreditCardParser')
+
+        checked = []
+        for parser in self.factory.parsers:
+            original = parser.can_parse
+
+            def recording_can_parse(file_content, filename, context=None, parser=parser, original=original):
+                checked.append(parser.__class__.__name__)
+                return original(file_content, filename, context)
+
+            parser.can_parse = recording_can_parse
+
+        self.factory.get_parser(csv_content, 'td_credit.csv', account)
+        self.assertEqual(checked, ['TDCreditCardParser'])
+
+class SniffContextTest(TestCase):
+    """Test cases for SniffContext"""
+
+    def test_header_and_extension(self):
+        """Test that the header row is parsed from the first line"""
+        context = SniffContext(b'Date, Description ,Amount\n2025-01-15,Coffee,4.50\n', 'Statement.CSV')
+        self.assertEqual(context.extension, '.csv')
+        self.assertEqual(context.header, ['Date', 'Description', 'Amount'])
+        self.assertEqual(context.header_lower, ['date', 'description', 'amount'])
+
+    def test_truncated_prefix_drops_partial_line(self):
+        """Test that a line cut off by the prefix is not exposed"""
+        context = SniffContext('a,b\nc,dé\ne,f\n'.encode('utf-8'), 'x.csv', sniff_bytes=9)
+        self.assertEqual(context.encoding, 'utf-8')
+        self.assertEqual(context.lines, ['a,b'])
+
+    def test_latin1_fallback(self):
+        """Test that undecodable utf-8 falls back to latin-1"""
+        context = SniffContext('Café,Amount\n'.encode('latin-1'), 'x.csv')
+        self.assertEqual(context.encoding, 'latin-1')
+        self.assertEqual(context.header, ['Café', 'Amount'])
+
+    def test_pdf_magic_bytes(self):
+        """Test that PDF detection uses the file signature, not the name"""
+        self.assertTrue(SniffContext(b'%PDF-1.7\n...', 'statement.pdf').is_pdf)
+        self.assertFalse(SniffContext(b'Date,Amount\n', 'statement.pdf').is_pdf)
@@ -0,0 +1,108 @@
+"""
+Tests for transaction fingerprints and overlap-aware merge imports
+"""
+
+from django.test import TestCase
+from decimal import Decimal
+from datetime import date
+
+from ..fingerprints import FingerprintCounter, amount_to_cents, normalize_item
+from ..ingest import ingest_statement
+from ..models import Account, StatementDetail
+
+
+def transaction(day, item, amount='4.50', direction='OUT'):
+    return {
+        'item': item,
+        'transaction_date': date(2025, 1, day),
+        'amount': Decimal(amount),
+        'direction': direction
+    }
+
+
+class FingerprintCounterTest(TestCase):
+    """Test cases for fingerprint computation"""
+
+    def test_normalization(self):
+        """Test that descriptions match regardless of case and spacing"""
+        self.assertEqual(normalize_item('  Coffee   SHOP\t#12 '), 'coffee shop #12')
+        self.assertEqual(amount_to_cents(Decimal('4.5')), 450)
+        self.assertEqual(amount_to_cents('1234.56'), 123456)
+
+        first = FingerprintCounter(1).next(date(2025, 1, 5), Decimal('4.50'), 'OUT', 'Coffee Shop')
+        second = FingerprintCounter(1).next(date(2025, 1, 5), '4.5', 'OUT', ' COFFEE  SHOP ')
+        self.assertEqual(first, second)
+
+    def test_repeats_get_successive_occurrences(self):
+        """Test that identical same-day transactions get distinct fingerprints"""
+        counter = FingerprintCounter(1)
+        first = counter.next(date(2025, 1, 5), Decimal('4.50'), 'OUT', 'COFFEE')
+        second = counter.next(date(2025, 1, 5), Decimal('4.50'), 'OUT', 'COFFEE')
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(FingerprintCounter(1).next(date(2025, 1, 5), Decimal('4.50'), 'OUT', 'COFFEE'), first)
+
+    def test_account_and_direction_distinguish(self):
+        """Test that the same transaction in another account or direction differs"""
+        key = (date(2025, 1, 5), Decimal('4.50'), 'OUT', 'COFFEE')
+        self.assertNotEqual(FingerprintCounter(1).next(*key), FingerprintCounter(2).next(*key))
+        self.assertNotEqual(
+            FingerprintCounter(1).next(*key),
+            FingerprintCounter(1).next(date(2025, 1, 5), Decimal('4.50'), 'IN', 'COFFEE')
+        )
+
+
+class MergeImportTest(TestCase):
+    """Test cases for merging overlapping statements on ingest"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.account = Account.objects.create(account_abbr='TD-CHEQUE', bank_name='TD Bank', account_type='BANK')
+        self.meta = {
+            'statement_from_date': date(2025, 1, 1),
+            'statement_to_date': date(2025, 1, 31),
+            'statement_type': 'CSV'
+        }
+
+    def test_overlapping_statement_inserts_only_new_transactions(self):
+        """Test that re-imported transactions are skipped and new ones inserted"""
+        ingest_statement(self.account, self.meta, [transaction(5, 'COFFEE'), transaction(10, 'BOOKS', '20.00')])
+
+        result = ingest_statement(self.account, self.meta, [
+            transaction(10, 'Books', '20.00'),
+            transaction(15, 'GROCERY', '80.25'),
+        ])
+
+        self.assertEqual(result.rows_inserted, 1)
+        self.assertEqual(result.rows_skipped, 1)
+        self.assertEqual(StatementDetail.objects.count(), 3)
+        self.assertEqual(result.statement.statementdetail_set.get().item, 'GROCERY')
+
+    def test_extra_identical_transaction_is_inserted(self):
+        """Test that a second identical purchase in a later export is kept"""
+        ingest_statement(self.account, self.meta, [transaction(5, 'COFFEE')])
+
+        result = ingest_statement(self.account, self.meta, [transaction(5, 'COFFEE'), transaction(5, 'COFFEE')])
+
+        self.assertEqual(result.rows_inserted, 1)
+        self.assertEqual(StatementDetail.objects.filter(item='COFFEE').count(), 2)
+
+    def test_other_account_is_not_deduplicated(self):
+        """Test that identical transactions in another account are inserted"""
+        other = Account.objects.create(account_abbr='TD-JOINT', bank_name='TD Bank', account_type='BANK')
+        ingest_statement(self.account, self.meta, [transaction(5, 'COFFEE')])
+
+        result = ingest_statement(other, self.meta, [transaction(5, 'COFFEE')])
+
+        self.assertEqual(result.rows_inserted, 1)
+
+    def test_one_dedupe_query_per_batch(self):
+        """Test that existing fingerprints are looked up per batch, not per row"""
+        transactions = [transaction(1 + i % 28, f'PURCHASE {i}') for i in range(50)]
+        ingest_statement(self.account, self.meta, transactions[:25])
+
+        # Statement insert, category rules version, dedupe select, merchant select, bulk insert
+        # and two monthly summary queries per batch, plus savepoint handling
+        with self.assertNumQueries(9):
+            result = ingest_statement(self.account, self.meta, transactions, batch_size=100)
+        self.assertEqual(result.rows_inserted, 25)
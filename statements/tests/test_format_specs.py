@@ -0,0 +1,166 @@
+"""
+Tests for declarative bank format specs
+"""
+
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+
+from django.test import SimpleTestCase
+
+from ..bmo_parser import BMOBankParser
+from ..eq_joint_parser import EQJointParser
+from ..exceptions import FormatSpecError, StatementParsingError
+from ..factory import StatementParserFactory
+from ..format_specs import FormatSpec, compile_spec, compiled_formats
+from ..rbc_business_parser import RBCBusinessParser
+
+CARD_SPEC = {
+    'name': 'ExampleCardParser',
+    'meta': {'bank_name': 'Example Card', 'account_abbr': 'EXAMPLE'},
+    'header': {'columns': ['Posted', 'Merchant', 'Amount', 'Card']},
+    'columns': {
+        'date': 'Posted',
+        'description': 'Merchant',
+        'amount': 'Amount',
+        'account_number': 'Card',
+    },
+    'date': {'formats': ['%d.%m.%Y']},
+    'amount': {'negative': 'IN'},
+    'rules': [{'column': 'description', 'contains': 'payment - thank you', 'skip': 'payment'}],
+    'account': {'abbr_prefix': 'EX-'},
+}
+
+CARD_CSV = b"""Posted,Merchant,Amount,Card
+03.01.2025,COFFEE,4.50,4111000011112222
+04.01.2025,RETURNED SHOES,-60.00,4111000011112222
+05.01.2025,PAYMENT - THANK YOU,-500.00,4111000011112222
+31.02.2025,BAD DATE,1.00,4111000011112222
+06.01.2025,NO AMOUNT,,4111000011112222
+"""
+
+
+class FormatSpecValidationTest(SimpleTestCase):
+    """Invalid specs fail when loaded, naming the problem"""
+
+    def assertSpecError(self, data, message):
+        with self.assertRaisesMessage(FormatSpecError, message):
+            FormatSpec(data, source='test.yaml')
+
+    def test_missing_required_role(self):
+        self.assertSpecError({'name': 'X', 'meta': {'bank_name': 'X'}, 'columns': {'date': 'Date'}},
+                             'column roles amount are required')
+
+    def test_unknown_key(self):
+        self.assertSpecError(dict(CARD_SPEC, colums={}), 'unknown keys colums')
+
+    def test_bad_rule(self):
+        self.assertSpecError(dict(CARD_SPEC, rules=[{'column': 'type', 'equals': 'D', 'direction': 'OUT'}]),
+                             "rule reads column role 'type'")
+
+    def test_bad_role_mapping(self):
+        columns = dict(CARD_SPEC['columns'], amount={'sum': ['A', 'B']})
+        self.assertSpecError(dict(CARD_SPEC, columns=columns), "Column role 'amount'")
+
+
+class CompiledParserTest(SimpleTestCase):
+    """Parsers compiled from specs"""
+
+    def setUp(self):
+        self.parser = compile_spec(FormatSpec(CARD_SPEC))()
+
+    def test_class_is_named_after_spec(self):
+        self.assertEqual(self.parser.__class__.__name__, 'ExampleCardParser')
+        self.assertEqual(self.parser.header_signatures, [['Posted', 'Merchant', 'Amount', 'Card']])
+
+    def test_can_parse(self):
+        self.assertTrue(self.parser.can_parse(CARD_CSV, 'card.csv'))
+        self.assertFalse(self.parser.can_parse(CARD_CSV, 'card.txt'))
+        self.assertFalse(self.parser.can_parse(b'Date,Description,Amount\n', 'card.csv'))
+
+    def test_parse(self):
+        stream = self.parser.stream(BytesIO(CARD_CSV), 'card.csv')
+        transactions = list(stream)
+
+        self.assertEqual(transactions, [
+            {'item': 'COFFEE', 'transaction_date': date(2025, 1, 3), 'amount': Decimal('4.50'), 'direction': 'OUT'},
+            {'item': 'RETURNED SHOES', 'transaction_date': date(2025, 1, 4), 'amount': Decimal('60.00'),
+             'direction': 'IN'},
+        ])
+        self.assertEqual(stream.skip_reasons, {'payment': 1, 'invalid_date': 1, 'no_amount': 1})
+        self.assertEqual(stream.meta['account_number'], '4111000011112222')
+        self.assertEqual(stream.meta['account_abbr'], 'EX-2222')
+
+    def test_missing_required_column(self):
+        with self.assertRaisesMessage(StatementParsingError, 'has no amount column'):
+            self.parser.parse(b'Posted,Merchant\n03.01.2025,COFFEE\n', 'card.csv')
+
+    def test_empty_file(self):
+        with self.assertRaisesMessage(StatementParsingError, 'empty'):
+            self.parser.parse(b'Posted,Merchant,Amount,Card\n', 'card.csv')
+
+
+class BuiltInSpecTest(SimpleTestCase):
+    """The bank formats that ship as specs"""
+
+    def test_bmo(self):
+        content = (
+            b"First Bank Card,Transaction Type,Date Posted, Transaction Amount,Description\n"
+            b"'5191230000001234',DEBIT,'20250103',12.00,COFFEE\n"
+            b"'5191230000001234',CREDIT,20250104,-5.00,CORRECTION\n"
+            b"'5191230000001234',CREDIT,20250105,0,ZERO\n"
+            b"'5191230000001234',CREDIT,20250106,450.00,PAYROLL\n"
+        )
+        meta, transactions = BMOBankParser().parse(content, 'bmo.csv')
+
+        self.assertEqual(meta['account_abbr'], 'BMO-1234')
+        self.assertEqual([(t['item'], t['amount'], t['direction']) for t in transactions], [
+            ('COFFEE', Decimal('12.00'), 'OUT'),
+            ('CORRECTION', Decimal('5.00'), 'OUT'),
+            ('PAYROLL', Decimal('450.00'), 'IN'),
+        ])
+
+    def test_rbc_business(self):
+        content = (
+            b"Account Type,Account Number,Transaction Date,Cheque Number,Description 1,Description 2,CAD$,USD$\n"
+            b"Chequing,00102-1003456,1/3/2025,,DEPOSIT,BRANCH,250.00,\n"
+            b"Chequing,00102-1003456,1/4/2025,,WIRE,,,-70.00\n"
+        )
+        meta, transactions = RBCBusinessParser().parse(content, 'rbc.csv')
+
+        self.assertEqual(meta['account_abbr'], 'RBC-1003456')
+        self.assertEqual(transactions[0]['item'], 'DEPOSIT BRANCH')
+        self.assertEqual((transactions[1]['amount'], transactions[1]['direction']), (Decimal('70.00'), 'OUT'))
+
+    def test_eq_joint_detection_needs_eq_activity(self):
+        parser = EQJointParser()
+        eq = b"Transfer date,Description,Amount,Balance\n01 MAY 2025,Interest received,$1.23,$100.00\n"
+        other = b"Transfer date,Description,Amount,Balance\n01 MAY 2025,Coffee,-$4.00,$96.00\n"
+        self.assertTrue(parser.can_parse(eq, 'eq.csv'))
+        self.assertFalse(parser.can_parse(other, 'eq.csv'))
+
+        meta, transactions = parser.parse(eq, 'eq.csv')
+        self.assertEqual(meta['account_abbr'], 'EQ_JOINT')
+        self.assertEqual(transactions[0]['transaction_date'], date(2025, 5, 1))
+
+
+class FormatRegistryTest(SimpleTestCase):
+    """Specs dropped into the formats directory become parsers"""
+
+    def test_compiled_formats(self):
+        temporary = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary.cleanup)
+        directory = temporary.name
+        with open(os.path.join(directory, 'example.yaml'), 'w') as f:
+            f.write("name: ExampleBankParser\nmeta: {bank_name: Example}\ncolumns: {date: Date, amount: Amount}\n")
+
+        parsers = compiled_formats(directory)
+        self.assertEqual(list(parsers), ['ExampleBankParser'])
+        self.assertEqual(parsers['ExampleBankParser'].spec.meta['bank_name'], 'Example')
+
+    def test_factory_dispatches_by_spec_header(self):
+        factory = StatementParserFactory()
+        content = b"First Bank Card,Transaction Type,Date Posted,Transaction Amount,Description\n"
+        self.assertIsInstance(factory.get_parser(content, 'bmo.csv'), BMOBankParser)
@@ -0,0 +1,104 @@
+"""
+Tests for the statement ingest service
+"""
+
+from django.test import TestCase
+from django.core.cache import cache
+from decimal import Decimal
+from datetime import date
+
+from ..models import Account, Merchant, Statement, StatementDetail
+from ..category_rules import get_categorizer
+from ..ingest import ingest_statement, iter_batches
+
+
+class IngestStatementTest(TestCase):
+    """Test cases for ingest_statement"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        cache.clear()
+        # Compile the category rules up front so query counts only cover the ingest
+        get_categorizer()
+        self.account = Account.objects.create(
+            account_abbr='TEST_CHQ',
+            bank_name='Test Bank',
+            account_number='12345678',
+            account_type='BANK'
+        )
+        self.statement_meta = {
+            'statement_from_date': date(2025, 1, 1),
+            'statement_to_date': date(2025, 1, 31),
+            'statement_type': 'CSV'
+        }
+
+    def _transactions(self, count):
+        return [
+            {
+                'item': f'PURCHASE {i}',
+                'transaction_date': date(2025, 1, 1 + i % 28),
+                'amount': Decimal('10.00'),
+                'direction': 'OUT'
+            }
+            for i in range(count)
+        ]
+
+    def test_ingest_creates_statement_and_details(self):
+        """Test that the statement and all details are written"""
+        result = ingest_statement(
+            self.account, self.statement_meta, self._transactions(25), source_file='test.csv'
+        )
+
+        self.assertEqual(result.rows_inserted, 25)
+        self.assertEqual(result.statement.source_file, 'test.csv')
+        self.assertEqual(result.statement.statement_from_date, date(2025, 1, 1))
+        self.assertEqual(StatementDetail.objects.filter(statement=result.statement).count(), 25)
+        self.assertGreater(result.rows_per_second, 0)
+
+    def test_ingest_date_overrides(self):
+        """Test that explicit dates take precedence over parsed metadata"""
+        result = ingest_statement(
+            self.account, self.statement_meta, [],
+            statement_from_date=date(2024, 12, 15),
+            statement_to_date=date(2025, 2, 15)
+        )
+
+        self.assertEqual(result.statement.statement_from_date, date(2024, 12, 15))
+        self.assertEqual(result.statement.statement_to_date, date(2025, 2, 15))
+
+    def test_ingest_query_count_independent_of_row_count(self):
+        """Test that rows are inserted in batches rather than one query per row"""
+        # Every item normalizes to this merchant, so no batch has to create one
+        Merchant.objects.create(name='PURCHASE')
+        # Each batch is one category rules version check, one fingerprint lookup, one
+        # merchant lookup, one bulk insert and an insert and update of its monthly summaries
+        with self.assertNumQueries(9):
+            ingest_statement(self.account, self.statement_meta, self._transactions(10), batch_size=100)
+        with self.assertNumQueries(9):
+            ingest_statement(self.account, self.statement_meta, self._transactions(100), batch_size=100)
+
+    def test_ingest_is_atomic(self):
+        """Test that a bad row rolls back the whole statement"""
+        transactions = self._transactions(5)
+        del transactions[3]['amount']
+
+        with self.assertRaises(KeyError):
+            ingest_statement(self.account, self.statement_meta, transactions, batch_size=2)
+
+        self.assertFalse(Statement.objects.exists())
+        self.assertFalse(StatementDetail.objects.exists())
+
+    def test_ingest_clears_cache_once_on_commit(self):
+        """Test that statement totals are invalidated after commit"""
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            result = ingest_statement(self.account, self.statement_meta, self._transactions(3))
+
+        self.assertEqual(len(callbacks), 1)
+        cache.set(result.statement._get_cache_key('total_debits'), Decimal('1.00'))
+        callbacks[0]()
+        self.assertEqual(result.statement.total_debits, Decimal('30.00'))
+
+    def test_iter_batches(self):
+        """Test that iter_batches splits generators into fixed-size lists"""
+        batches = list(iter_batches((i for i in range(5)), 2))
+        self.assertEqual(batches, [[0, 1], [2, 3], [4]])
@@ -0,0 +1,198 @@
+"""
+Tests for the background ingest job queue
+"""
+
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from django.utils import timezone
+from datetime import date, timedelta
+
+from ..jobs import claim_next_job, enqueue_ingest, run_job, run_pending_jobs
+from ..constants import INGEST_JOB_LEASE_SECONDS, INGEST_JOB_MAX_ATTEMPTS
+from ..models import Account, IngestJob, Statement, StatementDetail
+
+User = get_user_model()
+
+TD_CSV = b"""2025-01-05,COFFEE SHOP,4.50,,995.50
+2025-01-10,PAYROLL,,2000.00,2995.50
+2025-01-12,GROCERY STORE,80.25,,2915.25
+"""
+
+
+class IngestJobQueueTest(TestCase):
+    """Test cases for enqueueing, claiming and running ingest jobs"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store_root = override_settings(SOURCE_STORE_ROOT=directory.name)
+        store_root.enable()
+        self.addCleanup(store_root.disable)
+        self.account = Account.objects.create(
+            account_abbr='TD-CHEQUE',
+            bank_name='TD Bank',
+            account_number='12345678',
+            account_type='BANK'
+        )
+
+    def _enqueue(self, content=TD_CSV, name='td.csv'):
+        return enqueue_ingest(self.account, SimpleUploadedFile(name, content))
+
+    def test_enqueue_stores_upload(self):
+        """Test that the raw bytes are stored on a pending job"""
+        job = self._enqueue()
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, IngestJob.STATUS_PENDING)
+        self.assertEqual(bytes(job.content), TD_CSV)
+        self.assertFalse(Statement.objects.exists())
+
+    def test_claim_is_exclusive_and_oldest_first(self):
+        """Test that each pending job is claimed by exactly one worker"""
+        first = self._enqueue()
+        second = self._enqueue()
+
+        claimed = claim_next_job('worker-a')
+        self.assertEqual(claimed.id, first.id)
+        self.assertEqual(claimed.status, IngestJob.STATUS_RUNNING)
+        self.assertEqual(claimed.worker, 'worker-a')
+        self.assertEqual(claimed.attempts, 1)
+
+        self.assertEqual(claim_next_job('worker-b').id, second.id)
+        self.assertIsNone(claim_next_job('worker-c'))
+
+    def test_job_of_dead_worker_is_retaken(self):
+        """Test that a running job whose lease expired is claimed again and its partial statement replaced"""
+        job = self._enqueue()
+        claim_next_job('worker-a')
+        self.assertIsNone(claim_next_job('worker-b'))
+
+        # worker-a died after writing part of the statement
+        partial = Statement.objects.create(
+            account=self.account, source_file='td.csv', statement_from_date=date(2025, 1, 5),
+            statement_to_date=date(2025, 1, 5), statement_type='CSV'
+        )
+        expired = timezone.now() - timedelta(seconds=INGEST_JOB_LEASE_SECONDS + 1)
+        IngestJob.objects.filter(pk=job.pk).update(statement=partial, heartbeat_at=expired)
+
+        retaken = claim_next_job('worker-b')
+        self.assertEqual(retaken.id, job.id)
+        self.assertEqual(retaken.worker, 'worker-b')
+        self.assertEqual(retaken.attempts, 2)
+
+        run_job(retaken)
+        job.refresh_from_db()
+        self.assertEqual(job.status, IngestJob.STATUS_SUCCEEDED)
+        self.assertFalse(Statement.objects.filter(pk=partial.pk).exists())
+        self.assertEqual(StatementDetail.objects.filter(statement=job.statement).count(), 3)
+
+    def test_job_failed_after_max_attempts(self):
+        """Test that a job whose worker keeps dying is failed rather than retaken forever"""
+        job = self._enqueue()
+        expired = timezone.now() - timedelta(seconds=INGEST_JOB_LEASE_SECONDS + 1)
+        IngestJob.objects.filter(pk=job.pk).update(
+            status=IngestJob.STATUS_RUNNING, attempts=INGEST_JOB_MAX_ATTEMPTS, heartbeat_at=expired
+        )
+
+        self.assertIsNone(claim_next_job('worker-a'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, IngestJob.STATUS_FAILED)
+        self.assertIn('stopped responding', job.error)
+
+    def test_run_pending_jobs_ingests_statement(self):
+        """Test that a worker run creates the statement and records progress"""
+        job = self._enqueue()
+
+        self.assertEqual(run_pending_jobs('worker-a'), 1)
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, IngestJob.STATUS_SUCCEEDED)
+        self.assertEqual(job.rows_parsed, 3)
+        self.assertEqual(job.rows_inserted, 3)
+        self.assertEqual(bytes(job.content), b'')
+        self.assertEqual(job.statement.statement_from_date, date(2025, 1, 5))
+        self.assertEqual(StatementDetail.objects.filter(statement=job.statement).count(), 3)
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.last_parser, 'TDChequeAccountParser')
+
+    def test_failed_job_leaves_no_statement(self):
+        """Test that a failing upload marks the job failed without partial data"""
+        job = self._enqueue(b'\x00\x01\x02', 'garbage.xyz')
+
+        run_pending_jobs('worker-a')
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, IngestJob.STATUS_FAILED)
+        self.assertIn('No parser found', job.error)
+        self.assertIsNone(job.statement)
+        self.assertFalse(Statement.objects.exists())
+
+
+class IngestJobViewTest(TestCase):
+    """Test cases for the async upload flow and job status endpoints"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store_root = override_settings(SOURCE_STORE_ROOT=directory.name)
+        store_root.enable()
+        self.addCleanup(store_root.disable)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.account = Account.objects.create(
+            account_abbr='TD-CHEQUE',
+            bank_name='TD Bank',
+            account_number='12345678',
+            account_type='BANK'
+        )
+
+    @override_settings(INGEST_ASYNC=True)
+    def test_async_upload_enqueues_and_redirects(self):
+        """Test that uploads are queued and redirect to the status page"""
+        self.client.login(username='testuser', password='testpass123')
+        response = self.client.post(reverse('statements:upload'), {
+            'account': self.account.id,
+            'statement_from_date': '2025-01-01',
+            'statement_to_date': '2025-01-31',
+            'source_file': SimpleUploadedFile('td.csv', TD_CSV),
+        })
+
+        job = IngestJob.objects.get()
+        self.assertRedirects(response, reverse('statements:ingest_job_status', args=[job.id]))
+        self.assertEqual(job.statement_from_date, date(2025, 1, 1))
+        self.assertFalse(Statement.objects.exists())
+
+    def test_status_endpoint_reports_progress(self):
+        """Test that the JSON endpoint reports status and the statement link"""
+        job = enqueue_ingest(self.account, SimpleUploadedFile('td.csv', TD_CSV))
+        url = reverse('statements:api_ingest_job', args=[job.id])
+
+        self.assertEqual(self.client.get(url).status_code, 302)  # Redirect to login
+
+        self.client.login(username='testuser', password='testpass123')
+        data = self.client.get(url).json()
+        self.assertEqual(data['status'], IngestJob.STATUS_PENDING)
+        self.assertIsNone(data['statement_url'])
+
+        run_pending_jobs()
+        data = self.client.get(url).json()
+        job.refresh_from_db()
+        self.assertEqual(data['status'], IngestJob.STATUS_SUCCEEDED)
+        self.assertEqual(data['rows_inserted'], 3)
+        self.assertEqual(data['statement_url'], reverse('statements:statement_detail', args=[job.statement_id]))
+
+    def test_status_page(self):
+        """Test that the status page renders for a queued job"""
+        job = enqueue_ingest(self.account, SimpleUploadedFile('td.csv', TD_CSV))
+        self.client.login(username='testuser', password='testpass123')
+
+        response = self.client.get(reverse('statements:ingest_job_status', args=[job.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'statements/ingest_job.html')
+        self.assertContains(response, 'td.csv')
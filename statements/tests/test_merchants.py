@@ -0,0 +1,129 @@
+"""
+Tests for merchant normalization
+"""
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from decimal import Decimal
+from datetime import date
+
+from ..models import Account, Merchant, Statement, StatementDetail
+from ..ingest import ingest_statement
+from ..merchants import MerchantResolver, assign_merchants, normalize_merchant
+from ..utils import spending_by_merchant
+from ..constants import DIRECTION_IN, DIRECTION_OUT
+
+
+class NormalizeMerchantTest(SimpleTestCase):
+    """Test cases for normalize_merchant"""
+
+    def test_strips_store_numbers_dates_and_card_suffixes(self):
+        """Test that variants of one merchant share a name"""
+        self.assertEqual(normalize_merchant('Tim Hortons #1234'), 'TIM HORTONS')
+        self.assertEqual(normalize_merchant('TIM HORTONS #0987'), 'TIM HORTONS')
+        self.assertEqual(normalize_merchant('POS 01/15 STARBUCKS STORE 123'), 'POS STARBUCKS')
+        self.assertEqual(normalize_merchant('VISA ****1234 COSTCO'), 'VISA COSTCO')
+        self.assertEqual(normalize_merchant('AMZN Mktp CA*2K3LM0'), 'AMZN MKTP')
+        self.assertEqual(normalize_merchant('SHELL  C12345'), 'SHELL')
+
+    def test_keeps_names_without_noise(self):
+        """Test that digits inside a name and plain items are kept"""
+        self.assertEqual(normalize_merchant('7-ELEVEN 33921'), '7-ELEVEN')
+        self.assertEqual(normalize_merchant('transfer to eq bank'), 'TRANSFER TO EQ BANK')
+        self.assertEqual(normalize_merchant('12345'), '12345')
+
+
+class MerchantTest(TestCase):
+    """Test cases for linking transactions to merchants"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        cache.clear()
+        self.account = Account.objects.create(
+            account_abbr='TEST_CHQ',
+            bank_name='Test Bank',
+            account_number='12345678',
+            account_type='BANK'
+        )
+        self.statement = Statement.objects.create(
+            account=self.account,
+            source_file='test_statement.csv',
+            statement_from_date=date(2025, 1, 1),
+            statement_to_date=date(2025, 1, 31),
+            statement_type='CSV'
+        )
+
+    def test_resolver_creates_merchants_once(self):
+        """Test that repeated items are resolved from memory"""
+        resolver = MerchantResolver(Merchant)
+        ids = resolver.resolve_many(['TIM HORTONS #1', 'TIM HORTONS #2', 'COSTCO #5', 'TIM HORTONS #1'])
+
+        self.assertEqual(ids[0], ids[1])
+        self.assertEqual(ids[0], ids[3])
+        self.assertNotEqual(ids[0], ids[2])
+        self.assertEqual(Merchant.objects.count(), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(resolver.resolve('TIM HORTONS #2'), ids[0])
+        # A new item of a known merchant is one lookup and no insert
+        with self.assertNumQueries(1):
+            self.assertEqual(resolver.resolve('TIM HORTONS #3'), ids[0])
+
+    def test_ingest_and_save_link_merchants(self):
+        """Test that ingested and individually saved transactions get a merchant"""
+        transactions = [
+            {'item': f'COFFEE SHOP #{i}', 'transaction_date': date(2025, 1, 2 + i),
+             'amount': Decimal('5.00'), 'direction': 'OUT'}
+            for i in range(3)
+        ]
+        result = ingest_statement(
+            self.account,
+            {'statement_from_date': date(2025, 1, 1), 'statement_to_date': date(2025, 1, 31), 'statement_type': 'CSV'},
+            transactions, source_file='test.csv'
+        )
+        detail = StatementDetail.objects.create(
+            statement=self.statement, item='COFFEE SHOP #99', transaction_date=date(2025, 1, 20),
+            amount=Decimal('4.00'), direction=DIRECTION_OUT
+        )
+
+        merchant = Merchant.objects.get(name='COFFEE SHOP')
+        self.assertEqual(result.statement.statementdetail_set.filter(merchant=merchant).count(), 3)
+        self.assertEqual(detail.merchant, merchant)
+
+    def test_assign_merchants_backfills(self):
+        """Test that transactions without a merchant are linked in batches"""
+        for item in ['GROCER #1', 'GROCER #2', 'BAKERY', 'BAKERY']:
+            StatementDetail.objects.create(
+                statement=self.statement, item=item, transaction_date=date(2025, 1, 5),
+                amount=Decimal('10.00'), direction=DIRECTION_OUT
+            )
+        StatementDetail.objects.update(merchant=None)
+        Merchant.objects.all().delete()
+
+        linked = assign_merchants(StatementDetail, Merchant, batch_size=1)
+
+        self.assertEqual(linked, 4)
+        self.assertEqual(
+            sorted(StatementDetail.objects.values_list('merchant__name', flat=True)),
+            ['BAKERY', 'BAKERY', 'GROCER', 'GROCER']
+        )
+
+    def test_spending_by_merchant(self):
+        """Test that spending is totalled per merchant, largest first"""
+        for item, amount, direction in [
+            ('GROCER #1', '30.00', DIRECTION_OUT),
+            ('GROCER #2', '20.00', DIRECTION_OUT),
+            ('BAKERY', '40.00', DIRECTION_OUT),
+            ('SALARY', '900.00', DIRECTION_IN),
+        ]:
+            StatementDetail.objects.create(
+                statement=self.statement, item=item, transaction_date=date(2025, 1, 5),
+                amount=Decimal(amount), direction=direction
+            )
+
+        with self.assertNumQueries(2):
+            merchants = spending_by_merchant(StatementDetail.objects.all())
+
+        self.assertEqual([(m['name'], m['total'], m['count']) for m in merchants], [
+            ('GROCER', Decimal('50.00'), 2),
+            ('BAKERY', Decimal('40.00'), 1),
+        ])
@@ -0,0 +1,196 @@
+"""
+Tests for the monthly account summaries
+"""
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from decimal import Decimal
+from datetime import date
+
+from ..models import Account, CategoryRule, MonthlyAccountSummary, Statement, StatementDetail
+from ..ingest import ingest_statement
+from ..jobs import run_pending_jobs
+from ..category_rules import get_categorizer
+from ..rollups import queryset_deltas
+from ..constants import DIRECTION_IN, DIRECTION_OUT, TREND_MAX_YEARS
+
+
+def transaction(day, item, amount='10.00', direction=DIRECTION_OUT, month=1):
+    return {'item': item, 'transaction_date': date(2025, month, day), 'amount': Decimal(amount), 'direction': direction}
+
+
+class MonthlyAccountSummaryTest(TestCase):
+    """Test cases for keeping the summaries in step with the transactions"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        cache.clear()
+        get_categorizer()
+        self.account = Account.objects.create(
+            account_abbr='TEST_CHQ',
+            bank_name='Test Bank',
+            account_number='12345678',
+            account_type='BANK'
+        )
+        self.meta = {
+            'statement_from_date': date(2025, 1, 1),
+            'statement_to_date': date(2025, 2, 28),
+            'statement_type': 'CSV',
+        }
+
+    def _summaries(self):
+        return {
+            (s.account_id, s.year, s.month, s.category, s.direction): (s.total, s.count)
+            for s in MonthlyAccountSummary.objects.all()
+        }
+
+    def assertSummariesMatchTransactions(self):
+        self.assertEqual(self._summaries(), queryset_deltas(StatementDetail.objects.all()))
+
+    def _ingest(self, transactions):
+        return ingest_statement(self.account, self.meta, transactions).statement
+
+    def test_ingest_adds_to_summaries(self):
+        """Test that ingested transactions are counted per month, category and direction"""
+        self._ingest([
+            transaction(5, 'COFFEE', '4.50'),
+            transaction(6, 'GROCER', '20.00'),
+            transaction(7, 'SALARY', '900.00', DIRECTION_IN),
+            transaction(3, 'TRANSFER TO EQ BANK', '100.00', month=2),
+        ])
+        self._ingest([transaction(8, 'BOOKS', '15.50')])
+
+        summary = MonthlyAccountSummary.objects.get(year=2025, month=1, category='spending', direction=DIRECTION_OUT)
+        self.assertEqual((summary.total, summary.count), (Decimal('40.00'), 3))
+        self.assertTrue(MonthlyAccountSummary.objects.filter(month=2, category='transfer').exists())
+        self.assertSummariesMatchTransactions()
+
+    def test_statement_deletion_subtracts(self):
+        """Test that deleting a statement removes its transactions and empty summaries"""
+        kept = self._ingest([transaction(5, 'COFFEE', '4.50')])
+        deleted = self._ingest([transaction(6, 'GROCER', '20.00'), transaction(3, 'RENT', '800.00', month=2)])
+
+        deleted.delete()
+
+        self.assertFalse(MonthlyAccountSummary.objects.filter(month=2).exists())
+        self.assertSummariesMatchTransactions()
+        self.assertEqual(kept.statementdetail_set.count(), 1)
+
+        self.account.delete()
+        self.assertFalse(MonthlyAccountSummary.objects.exists())
+
+    def test_single_transactions_saved_and_deleted(self):
+        """Test that creating, editing and deleting one transaction moves its summary"""
+        statement = Statement.objects.create(
+            account=self.account,
+            source_file='test_statement.csv',
+            statement_from_date=date(2025, 1, 1),
+            statement_to_date=date(2025, 1, 31),
+            statement_type='CSV'
+        )
+        detail = StatementDetail.objects.create(
+            statement=statement, item='COFFEE', transaction_date=date(2025, 1, 5),
+            amount=Decimal('4.50'), direction=DIRECTION_OUT
+        )
+        self.assertSummariesMatchTransactions()
+
+        detail = StatementDetail.objects.get(pk=detail.pk)
+        detail.amount = Decimal('6.00')
+        detail.transaction_date = date(2025, 2, 5)
+        detail.save()
+        self.assertSummariesMatchTransactions()
+        self.assertFalse(MonthlyAccountSummary.objects.filter(month=1).exists())
+
+        detail.delete()
+        self.assertFalse(MonthlyAccountSummary.objects.exists())
+
+    def test_recategorize_job_moves_summaries(self):
+        """Test that a rule change moves re-categorized transactions between summaries"""
+        self._ingest([transaction(5, 'NETFLIX', '15.00'), transaction(6, 'COFFEE', '4.50')])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CategoryRule.objects.create(pattern='NETFLIX', category='transfer')
+        run_pending_jobs(worker='test')
+
+        summary = MonthlyAccountSummary.objects.get(category='transfer')
+        self.assertEqual((summary.total, summary.count), (Decimal('15.00'), 1))
+        self.assertSummariesMatchTransactions()
+
+    def test_rebuild_command_repairs_summaries(self):
+        """Test that the rebuild command recomputes summaries after bulk updates"""
+        self._ingest([transaction(5, 'COFFEE', '4.50'), transaction(6, 'GROCER', '20.00')])
+        StatementDetail.objects.filter(item='GROCER').update(category='other')
+        self.assertNotEqual(self._summaries(), queryset_deltas(StatementDetail.objects.all()))
+
+        out = StringIO()
+        call_command('rebuild_monthly_summaries', account=['TEST_CHQ'], stdout=out)
+
+        self.assertIn('Wrote 2 monthly account summaries', out.getvalue())
+        self.assertSummariesMatchTransactions()
+
+
+class MonthlySummaryApiTest(TestCase):
+    """Test cases for the endpoints reading the monthly summaries"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_login(self.user)
+        account = Account.objects.create(
+            account_abbr='TEST_CHQ',
+            bank_name='Test Bank',
+            account_number='12345678',
+            account_type='BANK'
+        )
+        ingest_statement(
+            account,
+            {'statement_from_date': date(2024, 12, 1), 'statement_to_date': date(2025, 1, 31), 'statement_type': 'CSV'},
+            [
+                transaction(5, 'COFFEE', '4.50'),
+                transaction(7, 'SALARY', '900.00', DIRECTION_IN),
+                {'item': 'GROCER', 'transaction_date': date(2024, 12, 20), 'amount': Decimal('30.00'),
+                 'direction': DIRECTION_OUT},
+            ]
+        )
+
+    def test_trend_reads_summaries(self):
+        """Test that the trend endpoint returns a value per category and month"""
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse('statements:api_monthly_summary'), {'start_year': 2024, 'end_year': 2025}
+            )
+
+        data = response.json()
+        self.assertEqual(len(data['months']), 24)
+        self.assertEqual(data['months'][11], '2024-12')
+        self.assertEqual(data['series']['spending'][11], 30.0)
+        self.assertEqual(data['series']['spending'][12], 4.5)
+        self.assertEqual(data['series']['income'][12], 900.0)
+
+    def test_trend_rejects_long_ranges(self):
+        """Test that the trend endpoint does not build an unbounded month range"""
+        url = reverse('statements:api_monthly_summary')
+
+        self.assertEqual(self.client.get(url, {'start_year': 1, 'end_year': 9999}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'start_year': 2025, 'end_year': 2024}).status_code, 400)
+        response = self.client.get(url, {'start_year': 2025 - TREND_MAX_YEARS + 1, 'end_year': 2025})
+        self.assertEqual(len(response.json()['months']), 12 * TREND_MAX_YEARS)
+
+    def test_month_transactions(self):
+        """Test that the transactions behind a chart bar are fetched on demand"""
+        response = self.client.get(
+            reverse('statements:api_monthly_transactions'), {'year': 2025, 'month': 1, 'category': 'spending'}
+        )
+
+        transactions = response.json()['transactions']
+        self.assertEqual([t['item'] for t in transactions], ['COFFEE'])
+        self.assertEqual(transactions[0]['account']['account_abbr'], 'TEST_CHQ')
+
+        response = self.client.get(reverse('statements:api_monthly_transactions'), {'year': 2025})
+        self.assertEqual(response.status_code, 400)
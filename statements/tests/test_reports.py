@@ -0,0 +1,123 @@
+"""
+Tests for the reports dashboard
+"""
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from decimal import Decimal
+from datetime import date
+
+from ..models import Account, Statement, StatementDetail
+from ..utils import latest_by_account, totals_by_account
+
+REPORTS_URL = reverse('statements:reports') + '?start_date=2025-01-01&end_date=2025-01-31'
+
+
+class ReportsDashboardTest(TestCase):
+    """Test cases for the queries behind the reports view"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_login(self.user)
+        self.accounts = 0
+
+    def _account(self, account_type, transactions):
+        self.accounts += 1
+        account = Account.objects.create(
+            account_abbr=f'ACCT_{self.accounts}',
+            bank_name='Test Bank',
+            account_number=str(self.accounts),
+            account_type=account_type
+        )
+        statement = Statement.objects.create(
+            account=account,
+            source_file='test_statement.csv',
+            statement_from_date=date(2025, 1, 1),
+            statement_to_date=date(2025, 1, 31),
+            statement_type='CSV'
+        )
+        for day, (item, amount, direction) in enumerate(transactions, start=1):
+            StatementDetail.objects.create(
+                statement=statement, item=item, transaction_date=date(2025, 1, day),
+                amount=Decimal(amount), direction=direction
+            )
+        return account
+
+    def _add_accounts(self):
+        bank = self._account('BANK', [
+            ('SALARY', '2000.00', 'IN'),
+            ('GROCERY STORE', '150.00', 'OUT'),
+            ('TRANSFER TO EQ BANK', '500.00', 'OUT'),
+            ('QUESTRADE', '300.00', 'OUT'),
+        ])
+        card = self._account('CREDIT_CARD', [
+            ('RESTAURANT', '80.00', 'OUT'),
+            ('REFUND', '20.00', 'IN'),
+            ('ROYAL BANK OF CANADA TORONTO', '500.00', 'IN'),
+        ])
+        investment = self._account('INVESTMENT', [('DIVIDEND', '12.00', 'IN')])
+        return bank, card, investment
+
+    def test_query_count_independent_of_account_count(self):
+        """Test that the dashboard runs the same queries for one or many accounts of each type"""
+        bank, card, investment = self._add_accounts()
+        # Session and user, accounts, grouped totals, latest per account, detail rows,
+        # recent card transactions, monthly summaries for the chart and two for top merchants
+        with self.assertNumQueries(10):
+            response = self.client.get(REPORTS_URL)
+        self.assertEqual(response.status_code, 200)
+
+        added = [self._add_accounts() for _ in range(3)]
+        with self.assertNumQueries(10):
+            response = self.client.get(REPORTS_URL)
+        for bank, card, investment in added:
+            self.assertIn(bank, response.context['bank_accounts'])
+            self.assertIn(card, response.context['credit_accounts'])
+
+    def test_account_totals(self):
+        """Test the totals each tab shows"""
+        bank, card, investment = self._add_accounts()
+
+        response = self.client.get(REPORTS_URL)
+
+        bank_data = response.context['bank_accounts'][bank]
+        self.assertEqual(bank_data['income'], Decimal('2000.00'))
+        self.assertEqual(bank_data['spending'], Decimal('150.00'))
+        self.assertEqual(bank_data['transfers'], Decimal('500.00'))
+        self.assertEqual(bank_data['investments'], Decimal('300.00'))
+        self.assertEqual(bank_data['transaction_count'], 4)
+        self.assertEqual(len(bank_data['spending_transactions']), 1)
+
+        card_data = response.context['credit_accounts'][card]
+        self.assertEqual(card_data['spending'], Decimal('80.00'))
+        # The card payment is not a refund
+        self.assertEqual(card_data['refunds'], Decimal('20.00'))
+        self.assertEqual(card_data['net_spending'], Decimal('60.00'))
+        self.assertEqual([t['item'] for t in card_data['refund_transactions']], ['REFUND'])
+        self.assertEqual(response.context['credit_total'], Decimal('600.00'))
+        self.assertEqual(response.context['credit_transaction_count'], 3)
+
+        self.assertEqual(response.context['investment_by_account'][investment]['total'], Decimal('12.00'))
+
+    def test_latest_by_account(self):
+        """Test that the windowed query keeps the newest transactions of each account"""
+        bank, card, investment = self._add_accounts()
+
+        latest = latest_by_account(StatementDetail.objects.all(), 2)
+
+        self.assertEqual([t.item for t in latest[bank.id]], ['QUESTRADE', 'TRANSFER TO EQ BANK'])
+        self.assertEqual([t.item for t in latest[card.id]], ['ROYAL BANK OF CANADA TORONTO', 'REFUND'])
+        self.assertEqual([t.item for t in latest[investment.id]], ['DIVIDEND'])
+
+    def test_totals_by_account(self):
+        """Test that totals are grouped by account, direction and category"""
+        bank, card, investment = self._add_accounts()
+
+        totals = totals_by_account(StatementDetail.objects.all())
+
+        self.assertEqual(totals[card.id][('IN', 'payment')], (Decimal('500.00'), 1))
+        self.assertEqual(totals[bank.id][('OUT', 'spending')], (Decimal('150.00'), 1))
@@ -0,0 +1,159 @@
+"""
+Tests for the resource-limited parser sandbox
+"""
+
+import os
+import tempfile
+from datetime import date
+from functools import partial
+from io import BytesIO
+from unittest import mock
+
+from PyPDF2 import PdfReader, PdfWriter
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from ..exceptions import ParserLimitError, ParserNotFoundError
+from ..ingest import ingest_upload
+from ..jobs import enqueue_ingest, run_pending_jobs
+from ..models import Account, IngestJob, Statement
+from ..constants import PDF_PARALLEL_MIN_PAGES
+from ..sandbox import parse_sandboxed
+from ..source_store import ContentStore
+
+TD_CSV = b"""2025-01-05,COFFEE SHOP,4.50,,995.50
+2025-01-10,PAYROLL,,2000.00,2995.50
+2025-01-12,GROCERY STORE,80.25,,2915.25
+"""
+
+SAMPLE_PDF = os.path.join(settings.BASE_DIR, 'HQ4BDDB45CAD_person-007zdvlkVkxz_2025-06_v_0.pdf')
+
+
+def repeat_pdf_pages(path, min_pages):
+    """Bytes of a PDF repeating the pages of another until it has at least min_pages"""
+    reader = PdfReader(path)
+    writer = PdfWriter()
+    while len(writer.pages) < min_pages:
+        for page in reader.pages:
+            writer.add_page(page)
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+class ParseSandboxedTest(TestCase):
+    """Test cases for parse_sandboxed"""
+
+    def test_parses_in_child_process(self):
+        """Test that a normal statement comes back intact"""
+        result = parse_sandboxed(TD_CSV, 'td.csv')
+
+        self.assertEqual(result.parser_name, 'TDChequeAccountParser')
+        self.assertEqual([t['item'] for t in result.transactions], ['COFFEE SHOP', 'PAYROLL', 'GROCERY STORE'])
+        self.assertEqual(result.rows_read, 3)
+        self.assertEqual(str(result.meta['statement_to_date']), '2025-01-12')
+
+    def test_parses_stored_content(self):
+        """Test that the parser process can read an upload from the content store itself"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = ContentStore(directory.name)
+        digest, _ = store.put(BytesIO(TD_CSV))
+
+        result = parse_sandboxed(partial(store.open, digest), 'td.csv', last_parser='TDChequeAccountParser')
+
+        self.assertEqual(result.parser_name, 'TDChequeAccountParser')
+        self.assertEqual(result.rows_read, 3)
+
+    def test_row_cap(self):
+        """Test that statements over the row cap stop with a structured error"""
+        with self.assertRaises(ParserLimitError) as raised:
+            parse_sandboxed(TD_CSV, 'td.csv', max_rows=2)
+
+        self.assertEqual(raised.exception.to_dict()['reason'], 'rows')
+        self.assertEqual(raised.exception.limit, 2)
+
+    def test_timeout_kills_parser(self):
+        """Test that a parser running past the deadline is killed"""
+        with self.assertRaises(ParserLimitError) as raised:
+            parse_sandboxed(TD_CSV * 20000, 'td.csv', timeout=0.001)
+
+        self.assertEqual(raised.exception.reason, 'timeout')
+
+    def test_memory_cap(self):
+        """Test that a parser exceeding the memory cap fails instead of growing"""
+        with self.assertRaises(ParserLimitError) as raised:
+            parse_sandboxed(TD_CSV * 20000, 'td.csv', max_memory_mb=1)
+
+        self.assertIn(raised.exception.reason, ('memory', 'crashed'))
+
+    def test_long_pdf_keeps_statement_dates(self):
+        """Test that a PDF long enough for parallel page extraction is fully read in the sandbox"""
+        content = repeat_pdf_pages(SAMPLE_PDF, PDF_PARALLEL_MIN_PAGES + 2)
+        result = parse_sandboxed(content, 'wealthsimple.pdf')
+
+        self.assertEqual(result.parser_name, 'WealthsimpleRRSPParser')
+        self.assertEqual(result.meta['statement_from_date'], date(2025, 6, 1))
+        self.assertEqual(result.meta['statement_to_date'], date(2025, 6, 2))
+        self.assertEqual([t['symbol'] for t in result.transactions], ['ENB', 'AGG'])
+
+    def test_parser_errors_cross_process(self):
+        """Test that parser errors keep their type across the process boundary"""
+        with self.assertRaises(ParserNotFoundError):
+            parse_sandboxed(b'\x00\x01\x02', 'garbage.xyz')
+
+
+class SandboxedIngestTest(TestCase):
+    """Test cases for limits applied to uploads"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store_root = override_settings(SOURCE_STORE_ROOT=directory.name)
+        store_root.enable()
+        self.addCleanup(store_root.disable)
+        self.account = Account.objects.create(account_abbr='TD-CHEQUE', bank_name='TD Bank', account_type='BANK')
+
+    def test_ingest_upload_sends_store_and_parser_hint(self):
+        """Test that uploads reach the parser process through the store, with the account's last parser"""
+        self.account.last_parser = 'TDChequeAccountParser'
+        self.account.save()
+
+        with mock.patch('statements.ingest.parse_sandboxed', wraps=parse_sandboxed) as sandboxed:
+            result = ingest_upload(self.account, BytesIO(TD_CSV), 'td.csv')
+
+        file_content = sandboxed.call_args.args[0]
+        self.assertTrue(callable(file_content))
+        with file_content() as stored:
+            self.assertEqual(stored.read(), TD_CSV)
+        self.assertEqual(sandboxed.call_args.kwargs['last_parser'], 'TDChequeAccountParser')
+        self.assertEqual(result.rows_inserted, 3)
+
+    @override_settings(PARSE_MAX_ROWS=2)
+    def test_ingest_upload_rejects_oversized_statement(self):
+        """Test that an upload over the row cap writes nothing"""
+        with self.assertRaises(ParserLimitError):
+            ingest_upload(self.account, BytesIO(TD_CSV), 'td.csv')
+
+        self.assertFalse(Statement.objects.exists())
+
+    @override_settings(PARSE_MAX_ROWS=2)
+    def test_job_records_limit_error(self):
+        """Test that a queued upload over a limit fails with the reason"""
+        job = enqueue_ingest(self.account, SimpleUploadedFile('td.csv', TD_CSV))
+
+        run_pending_jobs('worker-a')
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, IngestJob.STATUS_FAILED)
+        self.assertIn('more than 2 transactions', job.error)
+
+    @override_settings(PARSE_SANDBOX=False)
+    def test_sandbox_can_be_disabled(self):
+        """Test that uploads stream in-process when the sandbox is off"""
+        result = ingest_upload(self.account, BytesIO(TD_CSV), 'td.csv')
+
+        self.assertEqual(result.rows_inserted, 3)
+        self.assertEqual(result.rows_parsed, 3)
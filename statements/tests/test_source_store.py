@@ -0,0 +1,181 @@
+"""
+Tests for the content-addressed source store and parse cache
+"""
+
+import hashlib
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from ..factory import StatementParserFactory
+from ..ingest import ingest_upload
+from ..models import Account, SourceFile, Statement
+from ..source_store import ContentStore, ParseCache
+from ..td_parser import TDChequeAccountParser
+
+User = get_user_model()
+
+TD_CSV = b"""2025-01-05,COFFEE SHOP,4.50,,995.50
+2025-01-10,PAYROLL,,2000.00,2995.50
+"""
+
+
+class ContentStoreTest(TestCase):
+    """Test cases for ContentStore and ParseCache"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = ContentStore(directory.name)
+
+    def test_put_is_content_addressed(self):
+        """Test that content is stored once under its SHA-256 and rewound"""
+        file_obj = BytesIO(TD_CSV)
+        digest, size = self.store.put(file_obj)
+
+        self.assertEqual(digest, hashlib.sha256(TD_CSV).hexdigest())
+        self.assertEqual(size, len(TD_CSV))
+        self.assertEqual(file_obj.tell(), 0)
+        self.assertEqual(self.store.read(digest), TD_CSV)
+
+        mtime = os.path.getmtime(self.store.object_path(digest))
+        self.assertEqual(self.store.put(BytesIO(TD_CSV))[0], digest)
+        self.assertEqual(os.path.getmtime(self.store.object_path(digest)), mtime)
+
+    def test_parse_cache_round_trip(self):
+        """Test that dates and Decimals survive the cache"""
+        cache = ParseCache(self.store)
+        meta = {'statement_type': 'CSV', 'statement_from_date': None}
+        transactions = [
+            {'item': 'COFFEE', 'transaction_date': date(2025, 1, 5), 'amount': Decimal('4.50'), 'direction': 'OUT'},
+        ]
+
+        self.assertIsNone(cache.get('ab' * 32, 'TDChequeAccountParser', 1))
+        passed = []
+        for transaction_data in cache.record('ab' * 32, 'TDChequeAccountParser', 1, meta, transactions):
+            passed.append(transaction_data)
+            meta['statement_from_date'] = transaction_data['transaction_date']
+
+        self.assertEqual(passed, transactions)
+        cached_meta, cached_transactions = cache.get('ab' * 32, 'TDChequeAccountParser', 1)
+        self.assertEqual(cached_transactions, transactions)
+        self.assertEqual(cached_meta['statement_from_date'], date(2025, 1, 5))
+        self.assertIsNone(cache.get('ab' * 32, 'TDChequeAccountParser', 2))
+
+    def test_parse_cache_discards_failed_parse(self):
+        """Test that a parse that raises leaves no cache entry"""
+        cache = ParseCache(self.store)
+
+        def failing():
+            yield {'item': 'COFFEE'}
+            raise ValueError('bad row')
+
+        with self.assertRaises(ValueError):
+            list(cache.record('cd' * 32, 'TDChequeAccountParser', 1, {}, failing()))
+        self.assertIsNone(cache.get('cd' * 32, 'TDChequeAccountParser', 1))
+        self.assertEqual(os.listdir(os.path.dirname(cache.path('cd' * 32, 'TDChequeAccountParser', 1))), [])
+
+
+class IngestUploadTest(TestCase):
+    """Test cases for hash-based dedupe and parse reuse in ingest_upload"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store_root = override_settings(SOURCE_STORE_ROOT=directory.name)
+        store_root.enable()
+        self.addCleanup(store_root.disable)
+        self.account = Account.objects.create(account_abbr='TD-CHEQUE', bank_name='TD Bank', account_type='BANK')
+        self.other = Account.objects.create(account_abbr='TD-JOINT', bank_name='TD Bank', account_type='BANK')
+
+    def test_identical_upload_returns_existing_statement(self):
+        """Test that re-uploading the same bytes skips parsing and ingest"""
+        first = ingest_upload(self.account, BytesIO(TD_CSV), 'td.csv')
+        self.assertFalse(first.reused)
+        self.assertEqual(first.rows_inserted, 2)
+        self.assertEqual(first.statement.source.sha256, hashlib.sha256(TD_CSV).hexdigest())
+
+        with mock.patch.object(StatementParserFactory, 'stream_statement') as stream_statement:
+            again = ingest_upload(self.account, BytesIO(TD_CSV), 'td-copy.csv')
+
+        stream_statement.assert_not_called()
+        self.assertTrue(again.reused)
+        self.assertEqual(again.statement, first.statement)
+        self.assertEqual(Statement.objects.count(), 1)
+        self.assertEqual(SourceFile.objects.get().parser_name, 'TDChequeAccountParser')
+
+    def test_cached_parse_reused_for_other_account(self):
+        """Test that a second import of the same file skips parsing"""
+        ingest_upload(self.account, BytesIO(TD_CSV), 'td.csv')
+
+        with mock.patch.object(StatementParserFactory, 'stream_statement') as stream_statement:
+            result = ingest_upload(self.other, BytesIO(TD_CSV), 'td.csv')
+
+        stream_statement.assert_not_called()
+        self.assertTrue(result.cached)
+        self.assertEqual(result.rows_inserted, 2)
+        self.assertEqual(result.statement.statement_from_date, date(2025, 1, 5))
+        self.assertEqual(result.statement.statementdetail_set.get(item='PAYROLL').amount, Decimal('2000.00'))
+
+    def test_parser_version_bump_invalidates_cache(self):
+        """Test that a new parser version parses the file again"""
+        ingest_upload(self.account, BytesIO(TD_CSV), 'td.csv')
+
+        with mock.patch.object(TDChequeAccountParser, 'version', 2):
+            result = ingest_upload(self.other, BytesIO(TD_CSV), 'td.csv')
+
+        self.assertFalse(result.cached)
+        self.assertEqual(result.rows_inserted, 2)
+
+
+class DuplicateUploadViewTest(TestCase):
+    """Test cases for re-uploading an identical statement"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store_root = override_settings(SOURCE_STORE_ROOT=directory.name)
+        store_root.enable()
+        self.addCleanup(store_root.disable)
+        User.objects.create_user(username='testuser', password='testpass123')
+        self.client.login(username='testuser', password='testpass123')
+        self.account = Account.objects.create(account_abbr='TD-CHEQUE', bank_name='TD Bank', account_type='BANK')
+
+    def _upload(self, content):
+        return self.client.post(reverse('statements:upload'), {
+            'account': self.account.id,
+            'statement_from_date': '2025-01-01',
+            'statement_to_date': '2025-01-31',
+            'source_file': SimpleUploadedFile('td.csv', content),
+        })
+
+    def test_identical_reupload_redirects_to_existing_statement(self):
+        """Test that the overlap check lets identical content through to its statement"""
+        self._upload(TD_CSV)
+        statement = Statement.objects.get()
+
+        response = self._upload(TD_CSV)
+
+        self.assertRedirects(response, reverse('statements:statement_detail', args=[statement.id]))
+        self.assertEqual(Statement.objects.count(), 1)
+
+    def test_overlapping_upload_merges(self):
+        """Test that a different file for the same period only adds new transactions"""
+        self._upload(TD_CSV)
+
+        response = self._upload(TD_CSV + b"2025-01-12,GROCERY STORE,80.25,,2915.25\n")
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Statement.objects.count(), 2)
+        self.assertEqual(Statement.objects.latest('id').statementdetail_set.get().item, 'GROCERY STORE')
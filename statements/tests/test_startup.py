@@ -0,0 +1,117 @@
+"""
+Tests for lazy parser loading and the startup benchmark
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from ..factory import StatementParserFactory, parser_registry
+from ..startup_benchmark import HEAVY_MODULES, compare_startup, parse_importtime
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | statements.base
+import time:      1500 |       1500 |     numpy.core
+import time:      2000 |       3500 |   pandas
+/some/warning.py:1: UserWarning: not an import line
+"""
+
+
+def modules_loaded_by(code):
+    """Heavy modules a fresh interpreter has loaded after running code"""
+    script = f"{code}\nimport json, sys\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    completed = subprocess.run(
+        [sys.executable, '-c', script], capture_output=True, text=True, check=True,
+        cwd=str(settings.BASE_DIR), env=dict(os.environ, DJANGO_SETTINGS_MODULE='bank_parser.settings'),
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+class LazyImportTest(SimpleTestCase):
+    """Heavy libraries stay out of startup and CSV detection"""
+
+    def test_wsgi_startup_and_url_loading(self):
+        loaded = modules_loaded_by(
+            "from bank_parser.wsgi import application\n"
+            "from django.urls import resolve\n"
+            "resolve('/')"
+        )
+        self.assertEqual(loaded, [])
+
+    def test_csv_detection_skips_pdf_and_excel_parsers(self):
+        loaded = modules_loaded_by(
+            "import django; django.setup()\n"
+            "from statements import StatementParserFactory\n"
+            "StatementParserFactory().get_parser(b'Date,Description,Amount\\n2025-01-02,X,1.00\\n', 'a.csv')"
+        )
+        self.assertNotIn('pdfplumber', loaded)
+        self.assertNotIn('openpyxl', loaded)
+
+
+class ParserRegistryTest(SimpleTestCase):
+    """Parsers are registered by module and loaded per extension"""
+
+    def test_registry_order(self):
+        names = [entry.name for entry in parser_registry()]
+        self.assertEqual(names[0], 'WealthsimpleRRSPParser')
+        self.assertEqual(names[-3:], ['CSVStatementParser', 'ExcelStatementParser', 'TextStatementParser'])
+
+    def test_parsers_for_extension(self):
+        factory = StatementParserFactory()
+        self.assertEqual([type(p).__name__ for p in factory.parsers_for('.xlsx')], ['ExcelStatementParser'])
+        self.assertNotIn('WealthsimpleRRSPParser', factory._instances)
+
+    def test_parser_by_name(self):
+        factory = StatementParserFactory()
+        self.assertIs(factory.parser_by_name('BMOBankParser'), factory.parser_by_name('BMOBankParser'))
+        self.assertIsNone(factory.parser_by_name('NoSuchParser'))
+        self.assertIsNone(factory.parser_by_name(''))
+
+
+class StartupBenchmarkTest(SimpleTestCase):
+    """importtime parsing, comparison and the management command"""
+
+    def test_parse_importtime(self):
+        imports = parse_importtime(IMPORTTIME_OUTPUT)
+        self.assertEqual([(item['module'], item['depth']) for item in imports], [
+            ('_io', 1), ('statements.base', 0), ('numpy.core', 2), ('pandas', 1),
+        ])
+        self.assertEqual(imports[3]['cumulative_us'], 3500)
+
+    def test_compare_startup(self):
+        baseline = {'startup': {'first_byte_seconds': 1.0, 'wsgi_import_seconds': 0.5}}
+        current = {'startup': {'first_byte_seconds': 0.4, 'wsgi_import_seconds': 0.6}}
+        changes = {change['metric']: change for change in compare_startup(baseline, current)}
+
+        self.assertAlmostEqual(changes['first_byte_seconds']['change_percent'], -60.0)
+        self.assertFalse(changes['first_byte_seconds']['regression'])
+        self.assertTrue(changes['wsgi_import_seconds']['regression'])
+
+    def test_command_writes_report(self):
+        measured = {
+            'status': '200 OK', 'wsgi_import_seconds': 0.2, 'first_byte_seconds': 0.3,
+            'import_self_seconds': 0.25, 'modules_imported': 600, 'heavy_modules': [],
+            'slowest_packages': [{'package': 'django', 'self_ms': 120.0}],
+        }
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = os.path.join(directory.name, 'startup.json')
+        with mock.patch(
+            'statements.management.commands.benchmark_startup.run_startup_benchmark', return_value=measured
+        ) as run:
+            call_command('benchmark_startup', runs=3, output=output, stdout=StringIO())
+
+        self.assertEqual(run.call_args.kwargs['runs'], 3)
+        with open(output) as f:
+            report = json.load(f)
+        self.assertEqual(report['startup']['first_byte_seconds'], 0.3)
+        self.assertEqual(report['path'], '/health/')
@@ -0,0 +1,123 @@
+"""
+Tests for the text statement parser
+"""
+
+import tempfile
+from datetime import date
+from decimal import Decimal
+from io import BytesIO
+
+from django.test import SimpleTestCase
+
+from ..source_store import ContentStore, ParseCache
+from ..text_parser import TextLayout, TextStatementParser, find_date_and_amount
+
+
+class FindDateAndAmountTest(SimpleTestCase):
+    """Single-pass token classification"""
+
+    def test_first_date_and_amount(self):
+        tokens = '2024-01-03 REFUND 12.00 FEE 3.00 2024-01-04'.split()
+        self.assertEqual(find_date_and_amount(tokens), (0, 2))
+
+    def test_amount_before_date(self):
+        self.assertEqual(find_date_and_amount('($4.50) COFFEE 01/31/2024'.split()), (2, 0))
+
+    def test_missing_amount(self):
+        self.assertIsNone(find_date_and_amount('2024-01-03 COFFEE SHOP'.split()))
+
+    def test_partial_tokens_are_words(self):
+        self.assertIsNone(find_date_and_amount('2024-01-03T10:00 COFFEE 4.50x'.split()))
+
+    def test_trailing_punctuation(self):
+        self.assertEqual(find_date_and_amount('01/02/2024, RENT (1200.00).'.split()), (0, 2))
+
+
+class TextLayoutTest(SimpleTestCase):
+    """Column layout learned from sampled lines"""
+
+    def test_amount_counted_from_end(self):
+        layout = TextLayout.learn([(0, 2, 3), (0, 4, 5), (0, 3, 4)])
+        self.assertEqual((layout.date_position, layout.amount_position), (0, -1))
+        self.assertEqual(layout.locate('2024-01-03 A B C D 9.99'.split()), (0, 5))
+
+    def test_line_off_layout(self):
+        layout = TextLayout(0, -1)
+        self.assertIsNone(layout.locate('2024-01-03 9.99 TRAILING'.split()))
+
+    def test_disagreeing_lines(self):
+        self.assertIsNone(TextLayout.learn([(0, 2, 3), (1, 2, 3)]))
+
+
+class TextStatementParserTest(SimpleTestCase):
+    """Parsing whole text statements"""
+
+    def setUp(self):
+        self.parser = TextStatementParser()
+
+    def test_parse_statement(self):
+        content = b"""ACCOUNT STATEMENT
+Opening balance 100.00
+2024-01-03 COFFEE SHOP (4.50)
+2024-01-04 PAYROLL 2,000.00
+
+2024-01-05 BOOK STORE $25.00
+2024-01-06 GAS (30.00)
+2024-01-07 GROCERIES (81.20)
+2024-01-08 PHARMACY TWO (12.00)
+2024-01-09 PARKING 1.50 LOT (3.00)
+2024-13-45 BAD DATE (1.00)
+"""
+        stream = self.parser.stream(BytesIO(content), 'statement.txt')
+        transactions = list(stream)
+
+        self.assertEqual(len(transactions), 7)
+        self.assertEqual(transactions[0], {
+            'item': 'COFFEE SHOP',
+            'transaction_date': date(2024, 1, 3),
+            'amount': Decimal('4.50'),
+            'direction': 'OUT',
+        })
+        self.assertEqual(transactions[1]['amount'], Decimal('2000.00'))
+        self.assertEqual(transactions[1]['direction'], 'IN')
+        # Once the layout is learned the amount column is read by position
+        self.assertEqual(transactions[6]['item'], 'PARKING 1.50 LOT')
+        self.assertEqual(transactions[6]['amount'], Decimal('3.00'))
+
+        self.assertEqual(stream.rows_read, 10)
+        self.assertEqual(stream.skip_reasons, {'short_line': 1, 'unparsed': 1, 'invalid_date': 1})
+        self.assertEqual(stream.meta['statement_from_date'], date(2024, 1, 3))
+        self.assertEqual(stream.meta['statement_to_date'], date(2024, 1, 9))
+
+    def test_dates_followed_by_punctuation(self):
+        content = b"""01/02/2024, RENT (1200.00)
+01/03/2024: COFFEE 4.50,
+01/04/2024 BOOKS 12.00
+"""
+        meta, transactions = self.parser.parse(content, 'statement.txt')
+
+        self.assertEqual([t['transaction_date'] for t in transactions],
+                         [date(2024, 1, 2), date(2024, 1, 3), date(2024, 1, 4)])
+        self.assertEqual([t['item'] for t in transactions], ['RENT', 'COFFEE', 'BOOKS'])
+        self.assertEqual(transactions[1]['amount'], Decimal('4.50'))
+
+    def test_statement_shorter_than_sample(self):
+        meta, transactions = self.parser.parse(b"01/02/2024 RENT (1200.00)\n", 'chase.txt')
+        self.assertEqual(meta['bank_name'], 'Chase Bank')
+        self.assertEqual(len(transactions), 1)
+        self.assertEqual(transactions[0]['transaction_date'], date(2024, 1, 2))
+        self.assertEqual(transactions[0]['amount'], Decimal('1200.00'))
+
+    def test_results_cached_by_older_version_are_skipped(self):
+        content = b"2024-01-09 PARKING 1.50 LOT (3.00)\n"
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = ContentStore(directory.name)
+        digest, _ = store.put(BytesIO(content))
+        cache = ParseCache(store)
+        meta, transactions = self.parser.parse(content, 'statement.txt')
+        list(cache.record(digest, 'TextStatementParser', 1, meta, [dict(transactions[0], amount=Decimal('1.50'))]))
+
+        self.assertGreater(TextStatementParser.version, 1)
+        self.assertIsNotNone(cache.get(digest, 'TextStatementParser', 1))
+        self.assertIsNone(cache.get(digest, 'TextStatementParser', TextStatementParser.version))
@@ -0,0 +1,82 @@
+"""
+Tests for server warmup and the readiness endpoint
+"""
+
+import os
+import runpy
+import threading
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase
+
+from .. import warmup
+from ..models import Account, Statement, StatementDetail
+
+
+class WarmupTest(TestCase):
+    """warm_up() primes the process and flips readiness"""
+
+    def setUp(self):
+        ready = mock.patch.object(warmup, '_ready', threading.Event())
+        ready.start()
+        self.addCleanup(ready.stop)
+        account = Account.objects.create(account_abbr='TEST', bank_name='Test Bank', account_type='BANK')
+        self.statement = Statement.objects.create(
+            account=account, statement_from_date=date(2025, 1, 1), statement_to_date=date(2025, 1, 31),
+            statement_type='CSV'
+        )
+        StatementDetail.objects.create(
+            statement=self.statement, transaction_date=date(2025, 1, 2), item='PAYROLL',
+            amount=Decimal('100.00'), direction='IN'
+        )
+        self.statement.clear_cache()
+
+    def test_ready_only_after_warmup(self):
+        self.assertEqual(self.client.get('/ready/').status_code, 503)
+
+        timings = warmup.warm_up()
+
+        self.assertEqual(set(timings), {'warm_parsers', 'warm_templates', 'warm_statement_totals'})
+        self.assertTrue(warmup.is_ready())
+        response = self.client.get('/ready/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'OK')
+
+    def test_primes_statement_totals(self):
+        self.assertEqual(warmup.warm_statement_totals(), 1)
+        self.assertEqual(cache.get(f'statement_{self.statement.id}_net_amount'), Decimal('100.00'))
+
+    def test_failing_step_does_not_block_readiness(self):
+        def warm_templates():
+            raise RuntimeError('broken')
+
+        with mock.patch.object(warmup, 'warm_templates', warm_templates):
+            timings = warmup.warm_up()
+        self.assertIn('warm_templates', timings)
+        self.assertTrue(warmup.is_ready())
+
+    def test_warm_parsers(self):
+        self.assertGreater(warmup.warm_parsers(), 0)
+
+
+class GunicornConfigTest(TestCase):
+    """Worker sizing in gunicorn.conf.py"""
+
+    def load_config(self, **env):
+        with mock.patch.dict(os.environ, env):
+            return runpy.run_path(os.path.join(settings.BASE_DIR, 'gunicorn.conf.py'))
+
+    def test_defaults(self):
+        config = self.load_config()
+        self.assertEqual(config['worker_class'], 'gthread')
+        self.assertTrue(config['preload_app'])
+        self.assertGreaterEqual(config['workers'], 2)
+
+    def test_environment_overrides(self):
+        config = self.load_config(GUNICORN_WORKERS='3', GUNICORN_THREADS='8', GUNICORN_PRELOAD='false')
+        self.assertEqual((config['workers'], config['threads']), (3, 8))
+        self.assertFalse(config['preload_app'])
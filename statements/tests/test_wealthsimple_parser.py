@@ -0,0 +1,92 @@
+"""
+Tests for the Wealthsimple RRSP PDF parser and shared PDF documents
+"""
+
+import os
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+import pdfplumber
+from django.conf import settings
+from django.test import TestCase
+
+from ..factory import StatementParserFactory
+from ..pdf import PDFDocument
+from ..wealthsimple_parser import WealthsimpleRRSPParser
+
+SAMPLE_PDF = os.path.join(settings.BASE_DIR, 'HQ4BDDB45CAD_person-007zdvlkVkxz_2025-06_v_0.pdf')
+
+
+class WealthsimpleRRSPParserTest(TestCase):
+    """Test cases for WealthsimpleRRSPParser against the bundled statement"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(SAMPLE_PDF, 'rb') as f:
+            cls.content = f.read()
+        cls.filename = os.path.basename(SAMPLE_PDF)
+
+    def test_parse_sample_statement(self):
+        """Test that the bundled statement yields its period and holdings"""
+        meta, transactions = WealthsimpleRRSPParser().parse(self.content, self.filename)
+
+        self.assertEqual(meta['statement_from_date'], date(2025, 6, 1))
+        self.assertEqual(meta['statement_to_date'], date(2025, 6, 2))
+        self.assertEqual([t['symbol'] for t in transactions], ['ENB', 'AGG'])
+        self.assertEqual(transactions[0]['amount'], Decimal('10021.24'))
+
+    def test_detection_and_parse_open_pdf_once(self):
+        """Test that the factory opens the PDF once for detection and parsing"""
+        with mock.patch('statements.pdf.pdfplumber.open', wraps=pdfplumber.open) as pdf_open:
+            StatementParserFactory().parse_statement(self.content, self.filename)
+
+        self.assertEqual(pdf_open.call_count, 1)
+
+    def test_parse_closes_shared_document(self):
+        """Test that a parsed document is no longer reused"""
+        parser = WealthsimpleRRSPParser()
+        self.assertTrue(parser.can_parse(self.content, self.filename))
+        document = PDFDocument.open(self.content)
+        parser.parse(self.content, self.filename)
+
+        self.assertIsNot(PDFDocument.open(self.content), document)
+        PDFDocument.open(self.content).close()
+
+    def test_rejected_pdf_closed(self):
+        """Test that a PDF detection rejects is not left open"""
+        with mock.patch('statements.wealthsimple_parser.WEALTHSIMPLE_INDICATORS', ['no such bank']):
+            self.assertFalse(WealthsimpleRRSPParser().can_parse(self.content, self.filename))
+
+        with mock.patch('statements.pdf.pdfplumber.open', wraps=pdfplumber.open) as pdf_open:
+            PDFDocument.open(self.content).close()
+        self.assertEqual(pdf_open.call_count, 1)
+
+    def test_pages_extracted_in_process_by_default(self):
+        """Test that no page extraction processes are started unless a worker asks for them"""
+        with mock.patch('statements.pdf.PDF_PARALLEL_MIN_PAGES', 2), \
+                mock.patch('statements.pdf.ProcessPoolExecutor') as pool:
+            with PDFDocument(self.content) as document:
+                list(document.iter_texts())
+
+        pool.assert_not_called()
+
+    def test_parallel_page_extraction_matches(self):
+        """Test that extracting pages in a process pool gives the same text"""
+        with PDFDocument(self.content) as document:
+            sequential = [document.page_text(index) for index in range(document.page_count)]
+
+        with mock.patch('statements.pdf.PDF_PARALLEL_MIN_PAGES', 2), \
+                mock.patch('statements.pdf.PDF_PAGES_PER_TASK', 2):
+            with PDFDocument(self.content) as document:
+                parallel = [text for index, text in document.iter_texts(max_workers=2)]
+
+        self.assertEqual(parallel, sequential)
+
+    def test_find_page_stops_early(self):
+        """Test that searching for a section extracts no pages past it"""
+        with PDFDocument(self.content) as document:
+            index = document.find_page(lambda text: 'equities' in text.lower())
+            self.assertIsNotNone(index)
+            self.assertEqual(sorted(document._texts), list(range(index + 1)))
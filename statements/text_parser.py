@@ -4,46 +4,244 @@ Text statement parser for bank statements
 
 import re
 from datetime import datetime
-from typing import List, Dict, Any, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+import logging
 
-from .base import BaseStatementParser
+from .base import StreamingStatementParser, TransactionStream, SniffContext
+from .constants import TEXT_LAYOUT_SAMPLE_LINES
+from .dates import DateParser
+from .exceptions import AmountParsingError, DateParsingError
 
+logger = logging.getLogger(__name__)
 
-class TextStatementParser(BaseStatementParser):
+# Every date and amount spelling a token may take, so one match classifies it:
+# dates YYYY-MM-DD, MM/DD/YYYY, MM-DD-YYYY; amounts 123.45, $1,234.56, ($123.45)
+TOKEN_REGEX = re.compile(
+    r'(?P<date>\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}|\d{2}-\d{2}-\d{4})'
+    r'|(?P<amount>\$?\d+(?:,\d{3})?\.\d{2}|\(\$?\d+\.\d{2}\))'
+)
+DATE_TOKEN = 'date'
+AMOUNT_TOKEN = 'amount'
+# Punctuation a date or amount may be followed by, as in "01/02/2024," or "2024-01-02:"
+TRAILING_PUNCTUATION = ',.;:'
+
+
+def token_value(token: str) -> str:
+    """Token without trailing punctuation, as it is classified and parsed"""
+    return token.rstrip(TRAILING_PUNCTUATION)
+
+
+def token_kind(token: str) -> Optional[str]:
+    """DATE_TOKEN, AMOUNT_TOKEN or None for an ordinary word"""
+    match = TOKEN_REGEX.fullmatch(token_value(token))
+    return match.lastgroup if match else None
+
+
+def find_date_and_amount(tokens: Sequence[str]) -> Optional[Tuple[int, int]]:
+    """
+    Locate the first date token and the first amount token of a line.
+
+    Each token is classified at most once, and the scan stops as soon as
+    both have been found.
+
+    Args:
+        tokens: Whitespace-separated tokens of one line
+
+    Returns:
+        Tuple of (date index, amount index), or None if either is missing
+    """
+    date_index = amount_index = None
+    for index, token in enumerate(tokens):
+        kind = token_kind(token)
+        if kind == DATE_TOKEN:
+            if date_index is None:
+                date_index = index
+        elif kind == AMOUNT_TOKEN:
+            if amount_index is None:
+                amount_index = index
+        else:
+            continue
+        if date_index is not None and amount_index is not None:
+            return date_index, amount_index
+    return None
+
+
+def _common_position(indexes: Sequence[Tuple[int, int]]) -> Optional[int]:
+    """
+    Position shared by every (index, token count) pair, if any.
+
+    Positions counted from the start are preferred; a column at the end of
+    lines whose descriptions vary in length is found counting from the end,
+    as a negative position.
+    """
+    from_start = {index for index, count in indexes}
+    if len(from_start) == 1:
+        return from_start.pop()
+    from_end = {index - count for index, count in indexes}
+    if len(from_end) == 1:
+        return from_end.pop()
+    return None
+
+
+class TextLayout:
+    """
+    Token positions of the date and the amount in a text statement.
+
+    Learned from the first lines the full scan matched, it lets later lines
+    check just two tokens instead of classifying every word.
+    """
+    
+    def __init__(self, date_position: int, amount_position: int):
+        self.date_position = date_position
+        self.amount_position = amount_position
+    
+    @classmethod
+    def learn(cls, matches: Sequence[Tuple[int, int, int]]) -> Optional['TextLayout']:
+        """
+        Find positions shared by every sampled line.
+
+        Args:
+            matches: (date index, amount index, token count) of matched lines
+
+        Returns:
+            TextLayout, or None if the lines do not share a layout
+        """
+        if not matches:
+            return None
+        date_position = _common_position([(date_index, count) for date_index, _, count in matches])
+        amount_position = _common_position([(amount_index, count) for _, amount_index, count in matches])
+        if date_position is None or amount_position is None:
+            return None
+        return cls(date_position, amount_position)
+    
+    def locate(self, tokens: Sequence[str]) -> Optional[Tuple[int, int]]:
+        """
+        (date index, amount index) of a line that follows the layout, else None.
+
+        Args:
+            tokens: Whitespace-separated tokens of one line
+
+        Returns:
+            Tuple of indexes into tokens, or None if the tokens at the
+            learned positions are not a date and an amount
+        """
+        count = len(tokens)
+        date_index = self.date_position % count if -count <= self.date_position < count else None
+        amount_index = self.amount_position % count if -count <= self.amount_position < count else None
+        if date_index is None or amount_index is None or date_index == amount_index:
+            return None
+        if token_kind(tokens[date_index]) != DATE_TOKEN or token_kind(tokens[amount_index]) != AMOUNT_TOKEN:
+            return None
+        return date_index, amount_index
+    
+    def __repr__(self):
+        return f"TextLayout(date={self.date_position}, amount={self.amount_position})"
+
+
+class TextStatementParser(StreamingStatementParser):
     """Parser for text-based bank statements"""
     
+    # Version 2 reads lines by a learned column layout, which can split item and amount differently;
+    # version 3 reads dates and amounts followed by punctuation, which version 2 dropped
+    version = 3
+    
     def __init__(self):
         self.supported_formats = ['.txt', '.log']
     
-    def can_parse(self, file_content: bytes, filename: str) -> bool:
-        return filename.lower().endswith(('.txt', '.log'))
+    def can_parse(self, file_content: bytes, filename: str, context: Optional[SniffContext] = None) -> bool:
+        return self._sniff(file_content, filename, context).extension in ('.txt', '.log')
     
-    def parse(self, file_content: bytes, filename: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
-        try:
-            content = file_content.decode('utf-8')
-        except UnicodeDecodeError:
-            try:
-                content = file_content.decode('latin-1')
-            except UnicodeDecodeError:
-                raise ValueError("Could not decode text file")
-        
-        lines = content.split('\n')
-        
-        # Extract statement metadata
-        statement_meta = self._extract_statement_meta(filename, lines)
+    def _iter_transactions(self, lines: Iterator[str], stream: TransactionStream) -> Iterator[Dict[str, Any]]:
+        """
+        Parse text statement lines one at a time.
+
+        Lines are scanned token by token until TEXT_LAYOUT_SAMPLE_LINES of
+        them have matched. Those lines fix the date format and, if they
+        agree on where the date and amount sit, a TextLayout used to read
+        later lines by position. Lines that do not fit the layout are
+        scanned in full.
+        """
+        sample: List[Tuple[List[str], int, int]] = []
+        layout = None
+        date_parser = None
         
-        # Parse transaction details
-        transactions = []
         for line in lines:
-            if line.strip():
-                transaction = self._parse_transaction_line(line)
+            tokens = line.split()
+            if not tokens:
+                continue
+            stream.rows_read += 1
+            if len(tokens) < 3:
+                stream.skip('short_line')
+                continue
+            
+            positions = layout.locate(tokens) if layout is not None else None
+            if positions is None:
+                positions = find_date_and_amount(tokens)
+            if positions is None:
+                stream.skip('unparsed')
+                continue
+            
+            if date_parser is not None:
+                transaction = self._build_transaction(tokens, positions, date_parser, stream)
                 if transaction:
-                    transactions.append(transaction)
+                    yield transaction
+                continue
+            
+            sample.append((tokens, *positions))
+            if len(sample) == TEXT_LAYOUT_SAMPLE_LINES:
+                layout, date_parser = yield from self._parse_sample(sample, stream)
+        
+        # Statements shorter than the sample are parsed once the input ends
+        if date_parser is None and sample:
+            layout, date_parser = yield from self._parse_sample(sample, stream)
+        
+        logger.info(
+            f"{self.__class__.__name__} read {stream.rows_read} lines: "
+            f"{stream.row_count} parsed, {stream.skipped_rows} skipped {stream.skip_reasons}, layout {layout}"
+        )
+    
+    def _parse_sample(self, sample: Sequence[Tuple[List[str], int, int]],
+                      stream: TransactionStream) -> Iterator[Dict[str, Any]]:
+        """
+        Learn the layout and date format from the sampled lines, then parse them.
+
+        Use with ``yield from``; the generator returns (layout, date_parser).
+        """
+        layout = TextLayout.learn([(date_index, amount_index, len(tokens)) for tokens, date_index, amount_index in sample])
+        date_parser = DateParser.from_samples(token_value(tokens[date_index]) for tokens, date_index, _ in sample)
+        for tokens, date_index, amount_index in sample:
+            transaction = self._build_transaction(tokens, (date_index, amount_index), date_parser, stream)
+            if transaction:
+                yield transaction
+        return layout, date_parser
+    
+    def _build_transaction(self, tokens: List[str], positions: Sequence[int], date_parser: DateParser,
+                           stream: TransactionStream) -> Optional[Dict[str, Any]]:
+        """Build a transaction from a line whose date and amount tokens are known"""
+        date_index, amount_index = positions
+        try:
+            transaction_date = self._parse_date(token_value(tokens[date_index]), date_parser)
+        except DateParsingError:
+            stream.skip('invalid_date')
+            return None
+        try:
+            amount, direction = self._parse_amount(token_value(tokens[amount_index]))
+        except AmountParsingError:
+            stream.skip('invalid_amount')
+            return None
         
-        return statement_meta, transactions
+        # Everything else on the line is the description
+        first, second = sorted(positions)
+        description = ' '.join(tokens[:first] + tokens[first + 1:second] + tokens[second + 1:])
+        return {
+            'item': description or 'Unknown Transaction',
+            'transaction_date': transaction_date,
+            'amount': amount,
+            'direction': direction
+        }
     
-    def _extract_statement_meta(self, filename: str, lines: List[str]) -> Dict[str, Any]:
-        """Extract statement metadata from filename and lines"""
+    def _initial_statement_meta(self, filename: str) -> Dict[str, Any]:
+        """Extract statement metadata from filename; the date range is filled in while streaming"""
         meta = {
             'bank_name': 'Unknown Bank',
             'account_number': 'Unknown',
@@ -65,65 +263,3 @@ class TextStatementParser(BaseStatementParser):
             meta['bank_name'] = 'Citibank'
         
         return meta
-    
-    def _parse_transaction_line(self, line: str) -> Dict[str, Any]:
-        """Parse a single transaction line"""
-        # Simple parsing for common formats
-        parts = line.strip().split()
-        if len(parts) < 3:
-            return None
-        
-        try:
-            # Try to find date, amount, and description
-            for i, part in enumerate(parts):
-                # Look for date pattern
-                if self._looks_like_date(part):
-                    date_str = part
-                    # Look for amount pattern
-                    amount_str = None
-                    for j, amount_part in enumerate(parts):
-                        if self._looks_like_amount(amount_part):
-                            amount_str = amount_part
-                            # Everything else is description
-                            desc_parts = [p for k, p in enumerate(parts) if k != i and k != j]
-                            description = ' '.join(desc_parts)
-                            break
-                    
-                    if amount_str:
-                        amount, direction = self._parse_amount(amount_str)
-                        return {
-                            'item': description or 'Unknown Transaction',
-                            'transaction_date': self._parse_date(date_str),
-                            'amount': amount,
-                            'direction': direction
-                        }
-        except:
-            pass
-        
-        return None
-    
-    def _looks_like_date(self, text: str) -> bool:
-        """Check if text looks like a date"""
-        date_patterns = [
-            r'\d{4}-\d{2}-\d{2}',  # YYYY-MM-DD
-            r'\d{2}/\d{2}/\d{4}',  # MM/DD/YYYY
-            r'\d{2}-\d{2}-\d{4}',  # MM-DD-YYYY
-        ]
-        
-        for pattern in date_patterns:
-            if re.match(pattern, text):
-                return True
-        return False
-    
-    def _looks_like_amount(self, text: str) -> bool:
-        """Check if text looks like an amount"""
-        amount_patterns = [
-            r'^\$?\d+\.\d{2}$',  # $123.45 or 123.45
-            r'^\$?\d+,\d{3}\.\d{2}$',  # $1,234.56
-            r'^\(\$?\d+\.\d{2}\)$',  # ($123.45)
-        ]
-        
-        for pattern in amount_patterns:
-            if re.match(pattern, text):
-                return True
-        return False
@@ -6,6 +6,8 @@ app_name = 'statements'
 urlpatterns = [
     path('', views.index, name='index'),
     path('upload/', views.upload_statement, name='upload'),
+    path('upload/batch/', views.batch_upload, name='batch_upload'),
+    path('upload/jobs/<int:job_id>/', views.ingest_job_status, name='ingest_job_status'),
     path('add-account/', views.add_account, name='add_account'),
     path('statements/', views.statement_list, name='statement_list'),
     path('statements/<int:statement_id>/', views.statement_detail, name='statement_detail'),
@@ -13,6 +15,9 @@ urlpatterns = [
     path('investments/', views.investment_detail, name='investment_detail'),
     path('account-values/', views.account_values, name='account_values'),
     path('api/transactions/', views.api_transactions, name='api_transactions'),
+    path('api/monthly-summary/', views.api_monthly_summary, name='api_monthly_summary'),
+    path('api/monthly-transactions/', views.api_monthly_transactions, name='api_monthly_transactions'),
+    path('api/ingest-jobs/<int:job_id>/', views.api_ingest_job, name='api_ingest_job'),
     path('contributions/', views.contribution_tracker, name='contribution_tracker'),
     path('contributions/edit-rooms/<int:user_id>/', views.edit_user_rooms, name='edit_user_rooms'),
     path('contributions/add/', views.add_contribution, name='add_contribution'),
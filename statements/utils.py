@@ -2,61 +2,64 @@
 Utility functions for the statements app
 """
 
-from typing import Dict, List, Any
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from decimal import Decimal
+from django.db.models import Count, F, Sum, Window
+from django.db.models.functions import RowNumber
+
+from .categorizer import payment_matcher
+from .category_rules import get_categorizer
 from .constants import (
-    TRANSFER_KEYWORDS,
-    INVESTMENT_KEYWORDS,
-    PAYMENT_KEYWORDS,
-    DIRECTION_IN,
-    DIRECTION_OUT
+    CATEGORY_INCOME, CATEGORY_INVESTMENT, CATEGORY_SPENDING, CATEGORY_TRANSFER, TOP_MERCHANTS,
 )
+from .models import Merchant
+
+# Result keys of the total and the transaction list of each reported category
+REPORTED_CATEGORIES = {
+    CATEGORY_INCOME: ('income', 'income_transactions'),
+    CATEGORY_SPENDING: ('spending', 'spending_transactions'),
+    CATEGORY_INVESTMENT: ('investments', 'investment_transactions'),
+    CATEGORY_TRANSFER: ('transfers', 'transfer_transactions'),
+}
 
 
 def categorize_transaction(transaction) -> str:
     """
-    Categorize a bank transaction based on its properties.
+    Categorize a bank transaction with the category rules.
 
     Args:
         transaction: StatementDetail instance
 
     Returns:
-        Category string: 'transfer', 'investment', 'spending', 'income', or 'other'
+        Category string: 'transfer', 'investment', 'spending', 'income', 'other' or 'payment'
     """
-    item_upper = transaction.item.upper()
-
-    # Check if it's a transfer (only OUT direction)
-    if transaction.direction == DIRECTION_OUT:
-        for keyword in TRANSFER_KEYWORDS:
-            if keyword in item_upper:
-                return 'transfer'
+    account = transaction.statement.account
+    return get_categorizer().categorize(transaction.item, transaction.direction, (account.id, account.account_type))
 
-    # Check if it's an investment transaction (only OUT direction)
-    if transaction.direction == DIRECTION_OUT:
-        for keyword in INVESTMENT_KEYWORDS:
-            if keyword in item_upper:
-                return 'investment'
 
-    # Check if it's spending (outgoing but not investment or transfer)
-    if transaction.direction == DIRECTION_OUT:
-        is_investment = any(keyword in item_upper for keyword in INVESTMENT_KEYWORDS)
-        is_transfer = any(keyword in item_upper for keyword in TRANSFER_KEYWORDS)
-        if not is_investment and not is_transfer:
-            return 'spending'
+# Columns of StatementDetail read for the transaction lists of reports
+DETAIL_COLUMNS = ('id', 'item', 'amount', 'transaction_date', 'direction', 'category')
 
-    # Check if it's income (IN direction, excluding GIC)
-    if transaction.direction == DIRECTION_IN and 'GIC' not in item_upper:
-        return 'income'
 
-    return 'other'
+def transaction_data(pk, item, amount, transaction_date, direction, category=None) -> Dict[str, Any]:
+    """Transaction as listed in report details; takes a whole row of DETAIL_COLUMNS"""
+    return {
+        'id': pk,
+        'item': item,
+        'amount': float(amount),
+        'date': transaction_date.strftime('%Y-%m-%d'),
+        'direction': direction
+    }
 
 
-def aggregate_transactions_by_category(transactions) -> Dict[str, Any]:
+def summarize_categories(totals: Iterable[Tuple[str, Optional[Decimal]]], rows: Iterable[Tuple]) -> Dict[str, Any]:
     """
-    Aggregate transactions by category.
+    Category totals and transaction lists from rows already read.
 
     Args:
-        transactions: QuerySet of StatementDetail instances
+        totals: (category, total) pairs; a category may appear more than once
+        rows: Transactions as rows of DETAIL_COLUMNS
 
     Returns:
         Dictionary with categorized amounts and transaction lists
@@ -72,34 +75,153 @@ def aggregate_transactions_by_category(transactions) -> Dict[str, Any]:
         'transfer_transactions': [],
     }
 
-    for transaction in transactions:
-        category = categorize_transaction(transaction)
-
-        transaction_data = {
-            'id': transaction.id,
-            'item': transaction.item,
-            'amount': float(transaction.amount),
-            'date': transaction.transaction_date.strftime('%Y-%m-%d'),
-            'direction': transaction.direction
-        }
-
-        if category == 'transfer':
-            result['transfers'] += transaction.amount
-            result['transfer_transactions'].append(transaction_data)
-        elif category == 'investment':
-            result['investments'] += transaction.amount
-            result['investment_transactions'].append(transaction_data)
-        elif category == 'spending':
-            result['spending'] += transaction.amount
-            result['spending_transactions'].append(transaction_data)
-        elif category == 'income':
-            result['income'] += transaction.amount
-            result['income_transactions'].append(transaction_data)
+    for category, total in totals:
+        if category in REPORTED_CATEGORIES:
+            result[REPORTED_CATEGORIES[category][0]] += total or Decimal('0.00')
+
+    for row in rows:
+        if row[5] in REPORTED_CATEGORIES:
+            result[REPORTED_CATEGORIES[row[5]][1]].append(transaction_data(*row))
 
     result['net_amount'] = result['income'] - result['spending'] - result['transfers']
     return result
 
 
+def aggregate_transactions_by_category(transactions) -> Dict[str, Any]:
+    """
+    Aggregate transactions by their stored category.
+
+    The totals are one GROUP BY category query; the transaction lists are
+    read with only the columns they show, without categorizing again.
+
+    Args:
+        transactions: QuerySet of StatementDetail instances
+
+    Returns:
+        Dictionary with categorized amounts and transaction lists
+    """
+    reported = transactions.filter(category__in=REPORTED_CATEGORIES)
+    totals = reported.order_by().values_list('category').annotate(total=Sum('amount'))
+    return summarize_categories(totals, reported.values_list(*DETAIL_COLUMNS))
+
+
+def totals_by_account(transactions) -> Dict[int, Dict[Tuple[str, str], Tuple[Decimal, int]]]:
+    """
+    Totals of every account's transactions, in one GROUP BY account, direction, category query.
+
+    Args:
+        transactions: QuerySet of StatementDetail instances
+
+    Returns:
+        Dict mapping account id to a dict of (direction, category) to the
+        total amount and number of transactions; accounts without
+        transactions are left out
+    """
+    grouped = transactions.order_by().values_list('statement__account_id', 'direction', 'category').annotate(
+        total=Sum('amount'), count=Count('id')
+    )
+    totals: Dict[int, Dict[Tuple[str, str], Tuple[Decimal, int]]] = defaultdict(dict)
+    for account_id, direction, category, total, count in grouped:
+        totals[account_id][direction, category] = (total, count)
+    return dict(totals)
+
+
+def sum_totals(totals: Dict[Tuple[str, str], Tuple[Decimal, int]], direction: Optional[str] = None,
+               exclude: Iterable[str] = ()) -> Tuple[Decimal, int]:
+    """
+    Add up an account's grouped totals.
+
+    Args:
+        totals: One account's entry from totals_by_account()
+        direction: Only add totals in this direction
+        exclude: Categories left out
+
+    Returns:
+        Total amount and number of transactions
+    """
+    amount, count = Decimal('0.00'), 0
+    for (total_direction, category), (total, total_count) in totals.items():
+        if (direction is None or total_direction == direction) and category not in exclude:
+            amount += total or Decimal('0.00')
+            count += total_count
+    return amount, count
+
+
+def rows_by_account(transactions) -> Dict[int, List[Tuple]]:
+    """
+    Transactions of every account as rows of DETAIL_COLUMNS, in one query.
+
+    Args:
+        transactions: QuerySet of StatementDetail instances
+
+    Returns:
+        Dict mapping account id to its rows, newest first
+    """
+    rows: Dict[int, List[Tuple]] = defaultdict(list)
+    for account_id, *row in transactions.values_list('statement__account_id', *DETAIL_COLUMNS):
+        rows[account_id].append(tuple(row))
+    return dict(rows)
+
+
+def latest_by_account(transactions, limit: int) -> Dict[int, List[Any]]:
+    """
+    The latest transactions of every account, in one windowed query.
+
+    Each account's transactions are numbered newest first with ROW_NUMBER()
+    and only the first `limit` are read.
+
+    Args:
+        transactions: QuerySet of StatementDetail instances
+        limit: Transactions kept per account
+
+    Returns:
+        Dict mapping account id to its latest StatementDetail instances, newest first
+    """
+    ranked = transactions.annotate(
+        account_rank=Window(
+            RowNumber(),
+            partition_by=F('statement__account_id'),
+            order_by=[F('transaction_date').desc(), F('id').desc()],
+        )
+    ).filter(account_rank__lte=limit).select_related('statement__account').order_by('-transaction_date', '-id')
+
+    latest: Dict[int, List[Any]] = defaultdict(list)
+    for transaction in ranked:
+        latest[transaction.statement.account_id].append(transaction)
+    return dict(latest)
+
+
+def spending_by_merchant(transactions, limit: int = TOP_MERCHANTS) -> List[Dict[str, Any]]:
+    """
+    Merchants with the most spending.
+
+    Spending is grouped on the integer merchant id; names are then read
+    for the returned merchants only.
+
+    Args:
+        transactions: QuerySet of StatementDetail instances
+        limit: Number of merchants returned
+
+    Returns:
+        List of dicts with the merchant id, name, total spent and
+        transaction count, largest total first
+    """
+    rows = list(
+        transactions.filter(category=CATEGORY_SPENDING, merchant__isnull=False)
+        .order_by().values('merchant_id')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by('-total', 'merchant_id')[:limit]
+    )
+    if not rows:
+        return []
+    names = dict(Merchant.objects.filter(pk__in=[row['merchant_id'] for row in rows]).values_list('id', 'name'))
+    return [
+        {'merchant_id': row['merchant_id'], 'name': names[row['merchant_id']], 'total': row['total'],
+         'count': row['count']}
+        for row in rows
+    ]
+
+
 def is_payment_transaction(item: str) -> bool:
     """
     Check if a transaction is a payment.
@@ -110,5 +232,4 @@ def is_payment_transaction(item: str) -> bool:
     Returns:
         True if it's a payment transaction
     """
-    item_upper = item.upper()
-    return any(keyword in item_upper for keyword in PAYMENT_KEYWORDS)
+    return bool(payment_matcher(item))
@@ -1,13 +1,16 @@
 # Views package for statements app
 from .index_view import index
 from .upload_view import upload_statement
+from .batch_upload_view import batch_upload
 from .statement_list_view import statement_list
 from .statement_detail_view import statement_detail
 from .reports_view import reports
 from .investment_detail_view import investment_detail
 from .account_values_view import account_values
 from .api_transactions_view import api_transactions
+from .monthly_summary_view import api_monthly_summary, api_monthly_transactions
 from .add_account_view import add_account
+from .ingest_job_view import ingest_job_status, api_ingest_job
 from .contribution_tracker_view import (
     contribution_tracker,
     edit_user_rooms,
@@ -18,13 +21,18 @@ from .contribution_tracker_view import (
 __all__ = [
     'index',
     'upload_statement',
+    'batch_upload',
     'statement_list',
     'statement_detail',
     'reports',
     'investment_detail',
     'account_values',
     'api_transactions',
+    'api_monthly_summary',
+    'api_monthly_transactions',
     'add_account',
+    'ingest_job_status',
+    'api_ingest_job',
     'contribution_tracker',
     'edit_user_rooms',
     'add_contribution',
@@ -0,0 +1,47 @@
+from django.shortcuts import render
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.conf import settings
+import logging
+
+from ..batch import BatchFile, expand_uploads
+from ..jobs import enqueue_batch, run_until_finished
+from ..forms import BatchUploadForm
+from ..exceptions import StatementParsingError
+
+logger = logging.getLogger(__name__)
+
+
+@login_required
+def batch_upload(request):
+    """Upload many statements or ZIP archives, ingesting each file as its own job"""
+    jobs = None
+    if request.method == 'POST':
+        form = BatchUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                uploads = [
+                    BatchFile(uploaded_file.name, b''.join(uploaded_file.chunks()))
+                    for uploaded_file in form.cleaned_data['source_files']
+                ]
+                jobs = enqueue_batch(expand_uploads(uploads), account=form.cleaned_data.get('account'))
+                if settings.INGEST_ASYNC:
+                    messages.success(request, f'Queued {len(jobs)} statements for processing')
+                else:
+                    # No background worker runs in this mode, so ingest the files before responding
+                    jobs = run_until_finished([job.id for job in jobs])
+                    failed = [job for job in jobs if job.status == job.STATUS_FAILED]
+                    if len(failed) < len(jobs):
+                        messages.success(request, f'Uploaded {len(jobs) - len(failed)} statements')
+                    if failed:
+                        messages.warning(request, f'{len(failed)} files could not be uploaded')
+            except StatementParsingError as e:
+                logger.warning(f"Batch upload rejected: {e}")
+                messages.error(request, str(e))
+    else:
+        form = BatchUploadForm()
+    
+    return render(request, 'statements/batch_upload.html', {
+        'form': form,
+        'jobs': jobs,
+    })
@@ -0,0 +1,29 @@
+from django.shortcuts import render, get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.urls import reverse
+
+from ..models import IngestJob
+
+
+def _get_job(job_id):
+    """Load a job without its stored upload bytes"""
+    return get_object_or_404(IngestJob.objects.select_related('account').defer('content'), id=job_id)
+
+
+@login_required
+def ingest_job_status(request, job_id):
+    """Status page for a queued statement upload"""
+    job = _get_job(job_id)
+    return render(request, 'statements/ingest_job.html', {'job': job})
+
+
+@login_required
+def api_ingest_job(request, job_id):
+    """API endpoint reporting ingest job progress for polling"""
+    job = _get_job(job_id)
+    data = job.to_dict()
+    data['statement_url'] = (
+        reverse('statements:statement_detail', args=[job.statement_id]) if job.statement_id else None
+    )
+    return JsonResponse(data)
@@ -2,9 +2,8 @@ from django.shortcuts import render
 from django.db.models import Sum, Q
 from django.contrib.auth.decorators import login_required
 from decimal import Decimal
-import plotly.graph_objs as go
-import plotly.utils
 
+from ..charts import encode_chart, graph_objects
 from ..models import Account, AccountValue
 from ..forms import InvestmentFilterForm
 
@@ -12,6 +11,7 @@ from ..forms import InvestmentFilterForm
 @login_required
 def investment_detail(request):
     """Investment detail report showing summary of all investment data from account values"""
+    go = graph_objects()
     
     # Initialize filter form
     filter_form = InvestmentFilterForm(request.GET)
@@ -211,7 +211,7 @@ def investment_detail(request):
                 height=500
             )
             
-            investment_value_chart = plotly.utils.PlotlyJSONEncoder().encode(investment_chart)
+            investment_value_chart = encode_chart(investment_chart)
     
     total_values_chart = None
     if bank_accounts.exists() or investment_accounts.exists():
@@ -382,7 +382,7 @@ def investment_detail(request):
                     height=500
                 )
                 
-                total_values_chart = plotly.utils.PlotlyJSONEncoder().encode(trend_chart)
+                total_values_chart = encode_chart(trend_chart)
     
     # Prepare detailed account data for clickable functionality
     bank_account_details = []
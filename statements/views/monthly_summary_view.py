@@ -0,0 +1,87 @@
+from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+from django.utils import timezone
+
+from ..models import MonthlyAccountSummary, StatementDetail
+from ..rollups import monthly_series
+from ..constants import ACCOUNT_TYPE_BANK, CATEGORY_CHOICES, TREND_MAX_YEARS, TREND_YEARS
+
+
+def _int_param(request, name, default):
+    """Integer query parameter, or the default when it is missing or not a number"""
+    try:
+        return int(request.GET[name])
+    except (KeyError, ValueError):
+        return default
+
+
+@login_required
+def api_monthly_summary(request):
+    """API endpoint for multi-year monthly trends, read from the monthly account summaries"""
+    end_year = _int_param(request, 'end_year', timezone.now().year)
+    start_year = _int_param(request, 'start_year', end_year - TREND_YEARS + 1)
+    if not 0 <= end_year - start_year < TREND_MAX_YEARS:
+        return JsonResponse(
+            {'error': f'start_year must not be after end_year, and at most {TREND_MAX_YEARS} years may be requested'},
+            status=400
+        )
+
+    summaries = MonthlyAccountSummary.objects.filter(year__range=[start_year, end_year])
+    account_type = request.GET.get('account_type')
+    if account_type:
+        summaries = summaries.filter(account__account_type=account_type)
+    account_id = _int_param(request, 'account', None)
+    if account_id is not None:
+        summaries = summaries.filter(account_id=account_id)
+
+    categories = [category for category, _ in CATEGORY_CHOICES]
+    totals = monthly_series(summaries, categories)
+    months = [(year, month) for year in range(start_year, end_year + 1) for month in range(1, 13)]
+
+    return JsonResponse({
+        'start_year': start_year,
+        'end_year': end_year,
+        'months': [f'{year}-{month:02d}' for year, month in months],
+        'series': {
+            category: [float(totals[category].get(month, 0)) for month in months]
+            for category in categories
+        },
+    })
+
+
+@login_required
+def api_monthly_transactions(request):
+    """API endpoint for the transactions behind one bar of the monthly chart"""
+    year = _int_param(request, 'year', None)
+    month = _int_param(request, 'month', None)
+    category = request.GET.get('category')
+    if year is None or month not in range(1, 13) or not category:
+        return JsonResponse({'error': 'year, month and category are required'}, status=400)
+
+    details = StatementDetail.objects.filter(
+        statement__account__account_type=request.GET.get('account_type', ACCOUNT_TYPE_BANK),
+        transaction_date__year=year,
+        transaction_date__month=month,
+        category=category,
+    ).values_list(
+        'item', 'amount', 'transaction_date', 'direction',
+        'statement__account__bank_name', 'statement__account__account_abbr',
+        'statement__account__account_number',
+    )
+
+    return JsonResponse({
+        'transactions': [
+            {
+                'item': item,
+                'amount': float(amount),
+                'date': transaction_date.strftime('%Y-%m-%d'),
+                'direction': direction,
+                'account': {
+                    'bank_name': bank_name,
+                    'account_abbr': account_abbr,
+                    'account_number': account_number
+                }
+            }
+            for item, amount, transaction_date, direction, bank_name, account_abbr, account_number in details
+        ]
+    })
@@ -1,21 +1,30 @@
 from django.shortcuts import render
-from django.db.models import Sum, Count, Q, Avg, Prefetch
+from django.db.models import Count, Q, Avg
 from django.utils import timezone
 from django.db import models
 from django.contrib.auth.decorators import login_required
 from datetime import datetime, timedelta
 from decimal import Decimal
-import plotly.graph_objs as go
-import plotly.utils
 
-from ..models import StatementDetail, Account, AccountValue, InvestmentData, Statement
-from ..utils import aggregate_transactions_by_category
-from ..constants import ACCOUNT_TYPE_BANK, ACCOUNT_TYPE_CREDIT_CARD, ACCOUNT_TYPE_INVESTMENT
+from ..charts import encode_chart, graph_objects
+from ..models import StatementDetail, Account, AccountValue, InvestmentData, MonthlyAccountSummary
+from ..rollups import monthly_series
+from ..utils import (
+    latest_by_account, rows_by_account, spending_by_merchant, summarize_categories, sum_totals, totals_by_account,
+    transaction_data,
+)
+from ..constants import (
+    ACCOUNT_TYPE_BANK, ACCOUNT_TYPE_CREDIT_CARD, ACCOUNT_TYPE_INVESTMENT,
+    CATEGORY_INCOME, CATEGORY_INVESTMENT, CATEGORY_PAYMENT, CATEGORY_SPENDING, CATEGORY_TRANSFER,
+    REPORT_RECENT_CREDIT_TRANSACTIONS, REPORT_RECENT_TRANSACTIONS,
+)
 
 
 @login_required
 def reports(request):
     """Generate various financial reports"""
+    go = graph_objects()
+    
     # Get filters
     start_date = request.GET.get('start_date')
     end_date = request.GET.get('end_date')
@@ -48,31 +57,30 @@ def reports(request):
     # Calculate bank-specific totals (will be calculated in Bank Account Summary section)
     total_bank_income = Decimal('0.00')
     total_bank_spending = Decimal('0.00')
-    
-    
-    # CREDIT transactions (all transactions from credit card accounts)
-    credit_transactions = transactions.filter(
-        statement__account__account_type='CREDIT_CARD'
-    ).order_by('-transaction_date')
-    
-    credit_total = credit_transactions.aggregate(
-        total=Sum('amount')
-    )['total'] or Decimal('0.00')
-    
-    # BANK account dashboard - optimized with prefetch to avoid N+1 queries
-    bank_accounts = Account.objects.filter(account_type=ACCOUNT_TYPE_BANK).prefetch_related(
-        Prefetch(
-            'statements',
-            queryset=Statement.objects.prefetch_related('statementdetail_set')
-        )
-    )
 
-    bank_by_account = {}
-    for account in bank_accounts:
-        account_transactions = transactions.filter(statement__account=account).select_related('statement')
+    # Every tab is fed by the same few queries, however many accounts there are
+    accounts = list(Account.objects.filter(
+        account_type__in=[ACCOUNT_TYPE_BANK, ACCOUNT_TYPE_CREDIT_CARD, ACCOUNT_TYPE_INVESTMENT]
+    ))
+    # Totals per account, direction and category in one GROUP BY query
+    account_totals = totals_by_account(transactions)
+    # Latest transactions of every account in one windowed query
+    latest = latest_by_account(transactions, REPORT_RECENT_TRANSACTIONS)
+    # Transaction lists of the bank and credit card tabs in one query
+    detail_rows = rows_by_account(transactions.filter(
+        statement__account__account_type__in=[ACCOUNT_TYPE_BANK, ACCOUNT_TYPE_CREDIT_CARD]
+    ))
 
-        # Use utility function to categorize transactions
-        categorized = aggregate_transactions_by_category(account_transactions)
+    # BANK account dashboard
+    bank_by_account = {}
+    for account in accounts:
+        if account.account_type != ACCOUNT_TYPE_BANK:
+            continue
+        totals = account_totals.get(account.id, {})
+        categorized = summarize_categories(
+            ((category, total) for (direction, category), (total, count) in totals.items()),
+            detail_rows.get(account.id, []),
+        )
 
         bank_by_account[account] = {
             'income': categorized['income'],
@@ -80,8 +88,8 @@ def reports(request):
             'investments': categorized['investments'],
             'transfers': categorized['transfers'],
             'net_amount': categorized['net_amount'],
-            'transaction_count': account_transactions.count(),
-            'transactions': account_transactions[:10],  # Last 10 transactions
+            'transaction_count': sum_totals(totals)[1],
+            'transactions': latest.get(account.id, []),  # Last 10 transactions
             'income_transactions': categorized['income_transactions'],
             'spending_transactions': categorized['spending_transactions'],
             'investment_transactions': categorized['investment_transactions'],
@@ -93,161 +101,86 @@ def reports(request):
         total_bank_spending += categorized['spending']
     
     # CREDIT CARD account dashboard
-    credit_accounts = Account.objects.filter(account_type='CREDIT_CARD')
     credit_by_account = {}
+    credit_total = Decimal('0.00')
+    credit_transaction_count = 0
     total_credit_spending = Decimal('0.00')
     
-    for account in credit_accounts:
-        account_transactions = transactions.filter(statement__account=account)
+    for account in accounts:
+        if account.account_type != ACCOUNT_TYPE_CREDIT_CARD:
+            continue
+        totals = account_totals.get(account.id, {})
+        account_total, transaction_count = sum_totals(totals)
+        credit_total += account_total
+        credit_transaction_count += transaction_count
         
         # For credit cards: OUT = spending, IN = refunds/payments
         # We want: spending - refunds (OUT - IN)
-        account_spending = account_transactions.filter(direction='OUT').aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-        # Exclude ROYAL BANK OF CANADA TORONTO transactions from refund calculations
-        account_refunds = account_transactions.filter(
-            direction='IN'
-        ).exclude(
-            item__icontains='ROYAL BANK OF CANADA TORONTO'
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+        account_spending = sum_totals(totals, direction='OUT')[0]
+        # Card payments, picked out by the category rules, are not refunds
+        account_refunds = sum_totals(totals, direction='IN', exclude=[CATEGORY_PAYMENT])[0]
         net_spending = account_spending - account_refunds
         
         # Get detailed transactions for spending and refunds
         spending_transactions = []
         refund_transactions = []
         
-        for transaction in account_transactions:
-            transaction_data = {
-                'id': transaction.id,
-                'item': transaction.item,
-                'amount': float(transaction.amount),
-                'date': transaction.transaction_date.strftime('%Y-%m-%d'),
-                'direction': transaction.direction
-            }
-            
-            if transaction.direction == 'OUT':
-                spending_transactions.append(transaction_data)
-            elif transaction.direction == 'IN':
-                # Exclude ROYAL BANK OF CANADA TORONTO transactions from refunds
-                if 'ROYAL BANK OF CANADA TORONTO' not in transaction.item.upper():
-                    refund_transactions.append(transaction_data)
+        for row in detail_rows.get(account.id, []):
+            direction, category = row[4], row[5]
+            if direction == 'OUT':
+                spending_transactions.append(transaction_data(*row))
+            elif direction == 'IN':
+                # Exclude card payments from refunds
+                if category != CATEGORY_PAYMENT:
+                    refund_transactions.append(transaction_data(*row))
         
         credit_by_account[account] = {
             'spending': account_spending,
             'refunds': account_refunds,
             'net_spending': net_spending,
-            'transaction_count': account_transactions.count(),
-            'transactions': account_transactions[:10],  # Last 10 transactions
+            'transaction_count': transaction_count,
+            'transactions': latest.get(account.id, []),  # Last 10 transactions
             'spending_transactions': spending_transactions,
             'refund_transactions': refund_transactions
         }
         
         total_credit_spending += net_spending
+
+    # CREDIT transactions (the most recent from all credit card accounts)
+    credit_transactions = list(
+        transactions.filter(statement__account__account_type=ACCOUNT_TYPE_CREDIT_CARD)
+        .select_related('statement__account')
+        .order_by('-transaction_date', '-id')[:REPORT_RECENT_CREDIT_TRANSACTIONS]
+    )
     
     # INVESTMENT account dashboard
-    investment_accounts = Account.objects.filter(account_type='INVESTMENT')
-    investment_transactions = transactions.filter(
-        statement__account__account_type='INVESTMENT'
-    ).order_by('-transaction_date')
-    
-    investment_total = investment_transactions.aggregate(
-        total=Sum('amount')
-    )['total'] or Decimal('0.00')
+    investment_accounts = [account for account in accounts if account.account_type == ACCOUNT_TYPE_INVESTMENT]
+    investment_total = Decimal('0.00')
+    investment_transaction_count = 0
     
     # Investment performance by account
     investment_by_account = {}
     for account in investment_accounts:
-        account_transactions = investment_transactions.filter(statement__account=account)
-        account_total = account_transactions.aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
+        account_total, transaction_count = sum_totals(account_totals.get(account.id, {}))
+        investment_total += account_total
+        investment_transaction_count += transaction_count
         investment_by_account[account] = {
             'total': account_total,
-            'transaction_count': account_transactions.count(),
-            'transactions': account_transactions[:10]  # Last 10 transactions
+            'transaction_count': transaction_count,
+            'transactions': latest.get(account.id, [])  # Last 10 transactions
         }
     
     
-    # Monthly chart data for the current year
+    # Monthly chart data for the current year, from a few hundred summary rows
     current_year = timezone.now().year
-    monthly_transactions = StatementDetail.objects.filter(
-        statement__account__account_type='BANK',
-        transaction_date__year=current_year
-    ).select_related('statement__account')
-    
-    # Prepare data for monthly chart
-    months = list(range(1, 13))
-    spending = [0] * 12
-    investments = [0] * 12
-    income = [0] * 12
-    transfers = [0] * 12
-    monthly_details = {}
-    
-    # Initialize monthly details structure
-    for month in range(1, 13):
-        monthly_details[month] = {
-            'spending': [],
-            'investments': [],
-            'income': [],
-            'transfers': []
-        }
-    
-    # Group transactions by month and categorize
-    for transaction in monthly_transactions:
-        month_idx = transaction.transaction_date.month - 1
-        month = transaction.transaction_date.month
-        
-        # Check if it's a transfer (EQ BANK or PAY EMP-VENDOR) - only OUT direction
-        is_transfer = (
-            transaction.direction == 'OUT' and (
-                'EQ BANK' in transaction.item.upper() or 
-                'PAY EMP-VENDOR' in transaction.item.upper()
-            )
-        )
-        
-        # Check if it's an investment transaction (only OUT direction transactions)
-        is_investment = (
-            transaction.direction == 'OUT' and (
-                'INVESTMENTS' in transaction.item.upper() or 
-                'QUESTRADE' in transaction.item.upper() or 
-                'MUTUAL FUNDS' in transaction.item.upper() or 
-                'GIC' in transaction.item.upper()
-            )
-        )
-        
-        # Check if it's spending (outgoing but not investment or transfer)
-        is_spending = (
-            transaction.direction == 'OUT' and 
-            not ('INVESTMENTS' in transaction.item.upper() or 'QUESTRADE' in transaction.item.upper() or 'MUTUAL FUNDS' in transaction.item.upper() or 'GIC' in transaction.item.upper()) and
-            not is_transfer
-        )
-        
-        # Check if it's income (all IN direction transactions, excluding GIC)
-        is_income = (transaction.direction == 'IN' and not (
-            'GIC' in transaction.item.upper()
-        ))
-        
-        transaction_data = {
-            'item': transaction.item,
-            'amount': float(transaction.amount),
-            'date': transaction.transaction_date.strftime('%Y-%m-%d'),
-            'direction': transaction.direction,
-            'account': {
-                'bank_name': transaction.statement.account.bank_name,
-                'account_abbr': transaction.statement.account.account_abbr,
-                'account_number': transaction.statement.account.account_number
-            }
-        }
-        
-        if is_transfer:
-            transfers[month_idx] += float(transaction.amount)
-            monthly_details[month]['transfers'].append(transaction_data)
-        elif is_investment:
-            investments[month_idx] += float(transaction.amount)
-            monthly_details[month]['investments'].append(transaction_data)
-        elif is_spending:
-            spending[month_idx] += float(transaction.amount)
-            monthly_details[month]['spending'].append(transaction_data)
-        elif is_income:
-            income[month_idx] += float(transaction.amount)
-            monthly_details[month]['income'].append(transaction_data)
+    monthly_totals = monthly_series(
+        MonthlyAccountSummary.objects.filter(account__account_type=ACCOUNT_TYPE_BANK, year=current_year),
+        [CATEGORY_INCOME, CATEGORY_SPENDING, CATEGORY_INVESTMENT, CATEGORY_TRANSFER],
+    )
+    income, spending, investments, transfers = (
+        [float(monthly_totals[category].get((current_year, month), 0)) for month in range(1, 13)]
+        for category in (CATEGORY_INCOME, CATEGORY_SPENDING, CATEGORY_INVESTMENT, CATEGORY_TRANSFER)
+    )
     
     # Create monthly chart
     monthly_chart = go.Figure()
@@ -308,17 +241,20 @@ def reports(request):
         'bank_accounts': bank_by_account,
         # Credit card tab data
         'credit_transactions': credit_transactions,
+        'credit_transaction_count': credit_transaction_count,
         'credit_total': credit_total,
         'credit_accounts': credit_by_account,
         'total_credit_spending': total_credit_spending,
         # Investment tab data
         'investment_accounts': investment_accounts,
-        'investment_transactions': investment_transactions,
+        'investment_transaction_count': investment_transaction_count,
         'investment_total': investment_total,
         'investment_by_account': investment_by_account,
         # Monthly chart data
-        'monthly_chart': plotly.utils.PlotlyJSONEncoder().encode(monthly_chart),
-        'monthly_details': monthly_details,
+        'monthly_chart': encode_chart(monthly_chart),
+        'monthly_year': current_year,
+        # Merchants with the most spending in the period
+        'top_merchants': spending_by_merchant(transactions),
     }
     
     return render(request, 'statements/reports.html', context)
@@ -1,14 +1,15 @@
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
-import plotly.graph_objs as go
-import plotly.utils
 
+from ..charts import encode_chart, graph_objects
 from ..models import Statement
 
 
 @login_required
 def statement_detail(request, statement_id):
     """View detailed information about a specific statement"""
+    go = graph_objects()
+    
     statement = get_object_or_404(Statement.objects.select_related('account'), id=statement_id)
     transactions = statement.statementdetail_set.all()
     
@@ -49,7 +50,7 @@ def statement_detail(request, statement_id):
             )
         )
         
-        chart_json = plotly.utils.PlotlyJSONEncoder().encode(transaction_chart)
+        chart_json = encode_chart(transaction_chart)
     else:
         chart_json = None
     
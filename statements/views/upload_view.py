@@ -1,12 +1,14 @@
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
 from django.core.exceptions import ValidationError
 import json
 import logging
 
 from ..models import Account, InvestmentData
-from ..factory import StatementParserFactory
+from ..ingest import ingest_upload
+from ..jobs import enqueue_ingest
 from ..forms import StatementUploadForm
 from ..validators import validate_file_extension, validate_file_size
 from ..exceptions import StatementParsingError
@@ -52,43 +54,38 @@ def upload_statement(request):
                         validate_file_size(uploaded_file)
                     except ValidationError as e:
                         messages.error(request, str(e))
-                        return redirect('upload_statement')
+                        return redirect('statements:upload')
 
-                    # Read file content
-                    file_content = uploaded_file.read()
-
-                    # Parse the statement
-                    parser_factory = StatementParserFactory()
-                    statement_meta, transactions = parser_factory.parse_statement(
-                        file_content, uploaded_file.name
-                    )
-                    
-                    # Create the statement record (save the filename)
-                    from ..models import Statement, StatementDetail
-                    statement = Statement.objects.create(
-                        account=account,
-                        source_file=uploaded_file.name,  # Save just the filename
-                        statement_from_date=form.cleaned_data.get('statement_from_date') or statement_meta['statement_from_date'],
-                        statement_to_date=form.cleaned_data.get('statement_to_date') or statement_meta['statement_to_date'],
-                        statement_type=statement_meta['statement_type']
-                    )
-                    
-                    # Create transaction details
-                    for transaction_data in transactions:
-                        StatementDetail.objects.create(
-                            statement=statement,
-                            item=transaction_data['item'],
-                            transaction_date=transaction_data['transaction_date'],
-                            amount=transaction_data['amount'],
-                            direction=transaction_data['direction']
+                    if settings.INGEST_ASYNC:
+                        # Hand the upload to the background worker and show its progress
+                        job = enqueue_ingest(
+                            account,
+                            uploaded_file,
+                            statement_from_date=form.cleaned_data.get('statement_from_date'),
+                            statement_to_date=form.cleaned_data.get('statement_to_date'),
                         )
+                        messages.info(request, f'Statement {uploaded_file.name} queued for processing')
+                        return redirect('statements:ingest_job_status', job_id=job.id)
                     
-                    messages.success(
-                        request, 
-                        f'Successfully uploaded statement with {len(transactions)} transactions'
+                    # Parse the statement incrementally from the upload, unless it was seen before
+                    result = ingest_upload(
+                        account,
+                        uploaded_file,
+                        uploaded_file.name,  # Save just the filename
+                        statement_from_date=form.cleaned_data.get('statement_from_date'),
+                        statement_to_date=form.cleaned_data.get('statement_to_date'),
                     )
+                    statement = result.statement
+                    
+                    if result.reused:
+                        messages.info(request, f'{uploaded_file.name} was already uploaded as this statement')
+                    else:
+                        message = f'Successfully uploaded statement with {result.rows_inserted} transactions'
+                        if result.rows_skipped:
+                            message += f' ({result.rows_skipped} already imported were skipped)'
+                        messages.success(request, message)
                 
-                return redirect('statement_detail', statement_id=statement.id)
+                return redirect('statements:statement_detail', statement_id=statement.id)
 
             except StatementParsingError as e:
                 logger.error(f"Statement parsing error: {e}", exc_info=True)
@@ -0,0 +1,113 @@
+"""
+Warm a server process up before it accepts traffic
+"""
+
+import logging
+import os
+import threading
+import time
+from io import StringIO
+from typing import Dict
+
+from .constants import WARMUP_SAMPLE_ROWS, WARMUP_STATEMENTS
+
+logger = logging.getLogger(__name__)
+
+_ready = threading.Event()
+
+
+def is_ready() -> bool:
+    """Whether warm_up() has finished in this process or the one it was forked from"""
+    return _ready.is_set()
+
+
+def warm_parsers() -> int:
+    """
+    Import every parser and run detection and a parse over small synthetic files.
+
+    Returns:
+        Number of sample statements parsed
+    """
+    from .factory import StatementParserFactory
+    from .synthetic import SYNTHETIC_FORMATS
+
+    parser_factory = StatementParserFactory()
+    # Imports every parser module and the libraries behind them
+    logger.info(f"Warming {len(parser_factory.parsers)} parsers")
+    parsed = 0
+    for fmt in SYNTHETIC_FORMATS.values():
+        if fmt.binary:
+            # Binary formats need a file on disk; importing their parser is enough
+            continue
+        buffer = StringIO()
+        fmt.writer(buffer, WARMUP_SAMPLE_ROWS)
+        filename = f"warmup{fmt.extension}"
+        content = buffer.getvalue().encode('utf-8')
+        parser_factory.get_parser(content, filename).parse(content, filename)
+        parsed += 1
+    return parsed
+
+
+def warm_templates() -> int:
+    """
+    Compile the project templates into the cached template loader.
+
+    Returns:
+        Number of templates compiled
+    """
+    from django.conf import settings
+    from django.template.loader import get_template
+
+    compiled = 0
+    for template_dir in settings.TEMPLATES[0]['DIRS']:
+        for root, _, files in os.walk(template_dir):
+            for name in sorted(files):
+                if name.endswith('.html'):
+                    get_template(os.path.relpath(os.path.join(root, name), template_dir).replace(os.sep, '/'))
+                    compiled += 1
+    return compiled
+
+
+def warm_statement_totals() -> int:
+    """
+    Prime the cached totals of the most recent statements.
+
+    Returns:
+        Number of statements primed
+    """
+    from .models import Statement
+
+    statements = list(Statement.objects.order_by('-uploaded_at')[:WARMUP_STATEMENTS])
+    for statement in statements:
+        statement.net_amount
+    return len(statements)
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Run every warmup step, then mark the process ready.
+
+    A failing step is logged and skipped; a server that cannot warm up is
+    still better ready than never ready. Database connections are closed
+    afterwards so that workers forked from a preloading master do not
+    share them.
+
+    Returns:
+        Dict of seconds spent per step
+    """
+    from django.db import connections
+
+    timings = {}
+    for step in (warm_parsers, warm_templates, warm_statement_totals):
+        start = time.perf_counter()
+        try:
+            count = step()
+        except Exception as e:
+            logger.warning(f"Warmup step {step.__name__} failed: {e}", exc_info=True)
+            count = 0
+        timings[step.__name__] = time.perf_counter() - start
+        logger.info(f"Warmup step {step.__name__}: {count} done in {timings[step.__name__] * 1000:.0f} ms")
+
+    connections.close_all()
+    _ready.set()
+    return timings
@@ -2,19 +2,26 @@
 Wealthsimple RRSP PDF statement parser
 """
 
-import pdfplumber
 import re
-from datetime import datetime
-from typing import List, Dict, Any, Tuple
+from datetime import datetime, date
+from typing import List, Dict, Any, Tuple, Optional
 import logging
 from decimal import Decimal
 import decimal
-from io import BytesIO
 
-from .base import BaseStatementParser
+from .base import BaseStatementParser, SniffContext
+from .pdf import PDFDocument
 
 logger = logging.getLogger(__name__)
 
+WEALTHSIMPLE_INDICATORS = ['wealthsimple', 'rrsp', 'portfolio', 'equities']
+WEALTHSIMPLE_DATE_PATTERNS = [
+    r'(\d{1,2}/\d{1,2}/\d{4})',  # MM/DD/YYYY
+    r'(\d{4}-\d{1,2}-\d{1,2})',  # YYYY-MM-DD
+    r'(\d{1,2}-\d{1,2}-\d{4})',  # MM-DD-YYYY
+]
+WEALTHSIMPLE_DATE_FORMATS = ['%m/%d/%Y', '%Y-%m-%d', '%m-%d-%Y']
+
 
 class WealthsimpleRRSPParser(BaseStatementParser):
     """Parser specifically for Wealthsimple RRSP PDF statements"""
@@ -22,38 +29,41 @@ class WealthsimpleRRSPParser(BaseStatementParser):
     def __init__(self):
         self.supported_formats = ['.pdf']
     
-    def can_parse(self, file_content: bytes, filename: str) -> bool:
+    def can_parse(self, file_content: bytes, filename: str, context: Optional[SniffContext] = None) -> bool:
         """Check if this is a Wealthsimple RRSP PDF statement"""
-        if not filename.lower().endswith('.pdf'):
+        context = self._sniff(file_content, filename, context)
+        if context.extension != '.pdf':
+            return False
+        
+        # Don't hand pdfplumber anything that isn't a PDF
+        if not context.is_pdf:
             return False
         
+        document = None
+        matched = False
         try:
-            # Try to read the PDF to check if it's a Wealthsimple statement
-            with pdfplumber.open(BytesIO(file_content)) as pdf:
-                if len(pdf.pages) > 0:
-                    first_page = pdf.pages[0]
-                    text = first_page.extract_text()
-                    if text:
-                        # Look for Wealthsimple indicators
-                        wealthsimple_indicators = [
-                            'wealthsimple', 'rrsp', 'portfolio', 'equities'
-                        ]
-                        text_lower = text.lower()
-                        return any(indicator in text_lower for indicator in wealthsimple_indicators)
+            # The document stays open for parse() when this is a Wealthsimple statement
+            document = PDFDocument.open(file_content)
+            if document.page_count > 0:
+                text_lower = document.page_text(0).lower()
+                matched = any(indicator in text_lower for indicator in WEALTHSIMPLE_INDICATORS)
         except Exception as e:
             logger.warning(f"Error checking PDF: {e}")
+        finally:
+            if document is not None and not matched:
+                document.close()
         
-        return False
+        return matched
     
     def parse(self, file_content: bytes, filename: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
         """Parse the Wealthsimple RRSP PDF and extract portfolio equities data"""
         try:
-            with pdfplumber.open(BytesIO(file_content)) as pdf:
+            with PDFDocument.open(file_content) as document:
                 # Extract statement metadata
-                statement_meta = self._extract_statement_meta(filename, pdf)
+                statement_meta = self._extract_statement_meta(filename, document)
                 
                 # Extract portfolio equities data
-                portfolio_data = self._extract_portfolio_equities(pdf)
+                portfolio_data = self._extract_portfolio_equities(document)
                 
                 # Convert portfolio data to transaction-like format for compatibility
                 transactions = self._convert_portfolio_to_transactions(portfolio_data)
@@ -64,8 +74,21 @@ class WealthsimpleRRSPParser(BaseStatementParser):
             logger.error(f"Error parsing Wealthsimple PDF: {e}")
             raise ValueError(f"Could not parse Wealthsimple PDF: {e}")
     
-    def _extract_statement_meta(self, filename: str, pdf) -> Dict[str, Any]:
-        """Extract basic statement metadata"""
+    def _first_date(self, text: str) -> Optional[date]:
+        """First date found on a page, trying each date pattern in turn"""
+        for pattern in WEALTHSIMPLE_DATE_PATTERNS:
+            dates = re.findall(pattern, text)
+            if not dates:
+                continue
+            for date_format in WEALTHSIMPLE_DATE_FORMATS:
+                try:
+                    return datetime.strptime(dates[0], date_format).date()
+                except ValueError:
+                    continue
+        return None
+    
+    def _extract_statement_meta(self, filename: str, document: PDFDocument) -> Dict[str, Any]:
+        """Extract basic statement metadata from the first dated pages"""
         meta = {
             'bank_name': 'Wealthsimple',
             'account_number': 'RRSP Account',
@@ -75,87 +98,50 @@ class WealthsimpleRRSPParser(BaseStatementParser):
             'statement_to_date': None,
         }
         
-        # Try to extract dates from the PDF
+        # Try to extract dates from the PDF, stopping once both are known
         try:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    # Look for date patterns
-                    date_patterns = [
-                        r'(\d{1,2}/\d{1,2}/\d{4})',  # MM/DD/YYYY
-                        r'(\d{4}-\d{1,2}-\d{1,2})',  # YYYY-MM-DD
-                        r'(\d{1,2}-\d{1,2}-\d{4})',  # MM-DD-YYYY
-                    ]
-                    
-                    for pattern in date_patterns:
-                        dates = re.findall(pattern, text)
-                        if dates:
-                            # Try to parse the first date found
-                            try:
-                                parsed_date = datetime.strptime(dates[0], '%m/%d/%Y').date()
-                                if not meta['statement_from_date']:
-                                    meta['statement_from_date'] = parsed_date
-                                elif not meta['statement_to_date']:
-                                    meta['statement_to_date'] = parsed_date
-                                break
-                            except ValueError:
-                                try:
-                                    parsed_date = datetime.strptime(dates[0], '%Y-%m-%d').date()
-                                    if not meta['statement_from_date']:
-                                        meta['statement_from_date'] = parsed_date
-                                    elif not meta['statement_to_date']:
-                                        meta['statement_to_date'] = parsed_date
-                                    break
-                                except ValueError:
-                                    try:
-                                        parsed_date = datetime.strptime(dates[0], '%m-%d-%Y').date()
-                                        if not meta['statement_from_date']:
-                                            meta['statement_from_date'] = parsed_date
-                                        elif not meta['statement_to_date']:
-                                            meta['statement_to_date'] = parsed_date
-                                        break
-                                    except ValueError:
-                                        continue
+            for index, text in document.iter_texts():
+                parsed_date = self._first_date(text) if text else None
+                if parsed_date is None:
+                    continue
+                if not meta['statement_from_date']:
+                    meta['statement_from_date'] = parsed_date
+                else:
+                    meta['statement_to_date'] = parsed_date
+                    break
         except Exception as e:
             logger.warning(f"Could not extract dates from PDF: {e}")
         
         return meta
     
-    def _extract_portfolio_equities(self, pdf) -> List[Dict[str, Any]]:
+    def _extract_portfolio_equities(self, document: PDFDocument) -> List[Dict[str, Any]]:
         """Extract portfolio equities table data from the PDF"""
         portfolio_data = []
         
         try:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    logger.info(f"Processing page with {len(text)} characters")
-                    logger.info(f"Text contains 'portfolio equities': {'portfolio equities' in text.lower()}")
-                    logger.info(f"Text contains 'equities': {'equities' in text.lower()}")
-                    
-                    # Look for portfolio equities section
-                    if 'portfolio equities' in text.lower() or 'equities' in text.lower():
-                        logger.info("Found portfolio equities section, processing...")
-                        # Try to extract table data first
-                        tables = page.extract_tables()
-                        
-                        for table in tables:
-                            if self._is_portfolio_equities_table(table):
-                                portfolio_data.extend(self._parse_equities_table(table))
-                                break
-                        
-                        # If no tables found, try to parse text patterns
-                        if not portfolio_data:
-                            portfolio_data.extend(self._parse_equities_from_text(text))
-                        
-                        # Also try to parse the specific Wealthsimple format
-                        wealthsimple_equities = self._parse_wealthsimple_specific_format(text)
-                        if wealthsimple_equities:
-                            portfolio_data.extend(wealthsimple_equities)
-                        
-                        break
-                    else:
-                        logger.info("No portfolio equities section found on this page")
+            # Look for the portfolio equities section, extracting no pages past it
+            index = document.find_page(lambda text: 'equities' in text.lower())
+            if index is None:
+                logger.debug("No portfolio equities section found")
+                return portfolio_data
+            
+            logger.debug(f"Found portfolio equities section on page {index + 1}, processing...")
+            text = document.page_text(index)
+            
+            # Try to extract table data first
+            for table in document.page_tables(index):
+                if self._is_portfolio_equities_table(table):
+                    portfolio_data.extend(self._parse_equities_table(table))
+                    break
+            
+            # If no tables found, try to parse text patterns
+            if not portfolio_data:
+                portfolio_data.extend(self._parse_equities_from_text(text))
+            
+            # Also try to parse the specific Wealthsimple format
+            wealthsimple_equities = self._parse_wealthsimple_specific_format(text)
+            if wealthsimple_equities:
+                portfolio_data.extend(wealthsimple_equities)
         except Exception as e:
             logger.warning(f"Error extracting portfolio equities: {e}")
         
@@ -416,18 +402,18 @@ class WealthsimpleRRSPParser(BaseStatementParser):
             # Line 41: 'Vanguard Total Bond Market ETF BND 91.3274 91.3274 $73.63 USD $9,174.14 $9,320.93'
             
             lines = text.split('\n')
-            logger.info(f"Parsing {len(lines)} lines for Wealthsimple format")
+            logger.debug(f"Parsing {len(lines)} lines for Wealthsimple format")
             
             # Find the start of the holdings section
             start_idx = -1
             for i, line in enumerate(lines):
                 if 'portfolio equities' in line.lower():
                     start_idx = i
-                    logger.info(f"Found 'Portfolio Equities' at line {i}")
+                    logger.debug(f"Found 'Portfolio Equities' at line {i}")
                     break
             
             if start_idx == -1:
-                logger.info("No portfolio equities section found")
+                logger.debug("No portfolio equities section found")
                 return equities
             
             # Look for the symbol header line (should be the next line or close by)
@@ -435,11 +421,11 @@ class WealthsimpleRRSPParser(BaseStatementParser):
             for i in range(start_idx + 1, min(len(lines), start_idx + 5)):
                 if 'symbol' in lines[i].lower():
                     symbol_line_idx = i
-                    logger.info(f"Found symbol header at line {i}")
+                    logger.debug(f"Found symbol header at line {i}")
                     break
             
             if symbol_line_idx == -1:
-                logger.info("No symbol header found")
+                logger.debug("No symbol header found")
                 return equities
             
             # Look for the actual holdings data
@@ -452,7 +438,7 @@ class WealthsimpleRRSPParser(BaseStatementParser):
                 
                 # Stop if we hit a total line
                 if 'total' in line.lower() and '$' in line:
-                    logger.info(f"Hit total line at {i}, stopping")
+                    logger.debug(f"Hit total line at {i}, stopping")
                     break
                 
                 # Look for lines that match the exact pattern we found
@@ -462,7 +448,7 @@ class WealthsimpleRRSPParser(BaseStatementParser):
                 if not re.search(r'\$[\d,]+\.?\d*', line):
                     continue
                 
-                logger.info(f"Processing line {i}: {line}")
+                logger.debug(f"Processing line {i}: {line}")
                 
                 # Look for ticker symbols that are followed by the right pattern
                 # We need to find a ticker that is followed by two decimal numbers, then a currency amount
@@ -488,7 +474,7 @@ class WealthsimpleRRSPParser(BaseStatementParser):
                     match = re.search(pattern, after_ticker)
                     
                     if match:
-                        logger.info(f"Pattern matched for ticker {ticker}")
+                        logger.debug(f"Pattern matched for ticker {ticker}")
                         potential_tickers.append({
                             'ticker': ticker,
                             'pos': ticker_pos,
@@ -533,7 +519,7 @@ class WealthsimpleRRSPParser(BaseStatementParser):
                         }
                         
                         equities.append(equity)
-                        logger.info(f"Found equity: {ticker} - {company_name} - {shares} shares at ${price} {currency}")
+                        logger.debug(f"Found equity: {ticker} - {company_name} - {shares} shares at ${price} {currency}")
                         
                     except (ValueError, IndexError) as e:
                         logger.debug(f"Could not parse line: {line} - {e}")
@@ -544,7 +530,7 @@ class WealthsimpleRRSPParser(BaseStatementParser):
         except Exception as e:
             logger.warning(f"Error parsing Wealthsimple specific format: {e}")
         
-        logger.info(f"Total equities found: {len(equities)}")
+        logger.debug(f"Total equities found: {len(equities)}")
         return equities
     
     def _convert_portfolio_to_transactions(self, portfolio_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]: